@@ -8,18 +8,52 @@ import hashlib
 from datetime import datetime, timezone
 import discord
 from discord.ext import commands
-from openai import OpenAI
+from openai import AsyncOpenAI
 from config.defaults import ACCESS_ROLE_KEYWORD
 from config.defaults import DEFAULT_ALLOWED_CHANNEL_IDS
 from config.defaults import DEFAULT_BACKFILL_LIMIT
 from config.defaults import DEFAULT_BACKFILL_PAUSE_EVERY
 from config.defaults import DEFAULT_BACKFILL_PAUSE_SECONDS
+from config.defaults import DEFAULT_CONTROLLER_CACHE_TTL_SECONDS
+from config.defaults import DEFAULT_POLICY_CACHE_TTL_SECONDS
+from config.defaults import DEFAULT_FTS_TERM_STATS_TTL_SECONDS
+from config.defaults import DEFAULT_FTS_CANDIDATE_BUDGET
+from config.defaults import DEFAULT_RECALL_CACHE_SIZE
+from config.defaults import DEFAULT_RECALL_CACHE_TTL_SECONDS
+from config.defaults import DEFAULT_VECTOR_RECALL
+from config.defaults import DEFAULT_HOT_MEMORY_INDEX
+from config.defaults import DEFAULT_JOB_WORKERS
+from config.defaults import DEFAULT_JOB_LEASE_SECONDS
+from config.defaults import DEFAULT_JOB_MAX_ATTEMPTS
+from config.defaults import DEFAULT_SUMMARY_MAX_EVENTS
+from config.defaults import DEFAULT_SUMMARY_CHUNK_TOKENS
+from config.defaults import DEFAULT_MEMORY_NEAR_DUP_MODE
+from config.defaults import DEFAULT_MEMORY_NEAR_DUP_THRESHOLD
+from config.defaults import DEFAULT_DB_READ_POOL_SIZE
+from config.defaults import DEFAULT_IDENTITY_CACHE_SIZE
+from config.defaults import DEFAULT_IDENTITY_CACHE_TTL_SECONDS
+from config.defaults import DEFAULT_IDENTITY_SEEN_FLUSH_SECONDS
+from config.defaults import DEFAULT_INGEST_FLUSH_BATCH_SIZE
+from config.defaults import DEFAULT_INGEST_FLUSH_INTERVAL_MS
+from config.defaults import DEFAULT_INGEST_MAX_PENDING
+from config.defaults import DEFAULT_EPISODE_LOG_FLUSH_BATCH_SIZE
+from config.defaults import DEFAULT_EPISODE_LOG_FLUSH_INTERVAL_MS
+from config.defaults import DEFAULT_EPISODE_LOG_MAX_PENDING
+from config.defaults import DEFAULT_LLM_BACKGROUND_YIELD_AT
+from config.defaults import DEFAULT_LLM_BURST
+from config.defaults import DEFAULT_LLM_MAX_BACKGROUND
+from config.defaults import DEFAULT_LLM_MAX_INTERACTIVE
+from config.defaults import DEFAULT_LLM_MAX_OPERATOR
+from config.defaults import DEFAULT_LLM_RATE_PER_MINUTE
 from config.defaults import DEFAULT_MUSIC_GENERAL_VOICE_CHANNEL_ID
 from config.defaults import DEFAULT_MEMORY_REVIEW_MODE
 from config.defaults import DEFAULT_RECENT_CONTEXT_LIMIT
 from config.defaults import DEFAULT_RECENT_CONTEXT_LINE_CHARS
 from config.defaults import DEFAULT_RECENT_CONTEXT_MAX_CHARS
+from config.defaults import DEFAULT_RECENT_BUFFER_MAX_CHANNELS
+from config.defaults import DEFAULT_RECENT_BUFFER_PER_CHANNEL
 from config.defaults import DEFAULT_TOPIC_ALLOWLIST
+from config.defaults import DEFAULT_TOPIC_CANDIDATE_ORDER
 from config.defaults import DRIVING_ROLE_KEYWORD
 from config.defaults import DEFAULT_ANNOUNCE_PREP_CHANNEL_ID
 from config.defaults import FULL_ACCESS_URL
@@ -32,6 +66,10 @@ from config.defaults import RESERVED_KIND_TAGS
 from config.defaults import STAGE_RANK
 from config.defaults import WELCOME_CHANNEL_ID
 from controller.dm_guidelines import load_dm_guidelines
+from controller.episode_log_filters import parse_episode_sample_rates
+from controller.episode_log_filters import sample_episode
+from controller.episode_sink import EpisodeLogSink
+from controller.identity_store import IdentityCache
 from controller.identity_store import canonical_person_id_sync
 from controller.identity_store import dedupe_memory_events_by_id
 from controller.identity_store import get_or_create_person_sync
@@ -44,46 +82,71 @@ from controller.context import (
     resolve_channel_groups,
 )
 from controller.store import (
+    ControllerResolutionCache,
     fetch_episode_logs_sync,
-    get_or_create_context_profile_sync,
     insert_episode_log_sync,
-    select_active_controller_config_sync,
+    insert_episode_logs_batch_sync,
+    resolve_context_profile_cached_sync,
+    select_active_controller_config_cached_sync,
     update_latest_dm_draft_evaluation_sync,
     update_latest_dm_draft_feedback_sync,
     upsert_user_profile_last_seen_sync,
 )
+from db.handles import DbHandles
 from db.migrate import apply_sqlite_migrations
+from db.read_pool import ReadConnectionPool
+from ingestion.recent_buffer import RecentMessageBuffer
 from ingestion.service import log_message as log_message_service
-from ingestion.store import fetch_last_messages_by_author_sync as fetch_last_messages_by_author_store
+from ingestion.store import fetch_last_messages_by_author_id_sync as fetch_last_messages_by_author_id_store
 from ingestion.store import fetch_latest_messages_sync as fetch_latest_messages_store
 from ingestion.store import fetch_messages_since_sync as fetch_messages_since_store
 from ingestion.store import fetch_recent_context_sync as fetch_recent_context_store
+from ingestion.store import fetch_recent_message_rows_sync as fetch_recent_message_rows_store
 from ingestion.store import get_backfill_done_sync as get_backfill_done_store
 from ingestion.store import insert_message_sync as insert_message_store
+from ingestion.store import insert_messages_batch_sync as insert_messages_batch_store
+from ingestion.write_queue import MessageWriteQueue
 from ingestion.store import reset_all_backfill_done_sync as reset_all_backfill_done_store
 from ingestion.store import reset_backfill_done_sync as reset_backfill_done_store
 from ingestion.store import set_backfill_done_sync as set_backfill_done_store
 from jobs.service import maintenance_loop as maintenance_loop_service
 from jobs.service import summarize_topic as summarize_topic_service
+from jobs.store import job_stats_sync
+from jobs.store import prune_jobs_sync
+from jobs.worker import JobWorkerPool
 from jobs.announcements import announcement_loop as announcement_loop_service
+from llm.gateway import LLMGateway
+from llm.scheduler import LLMScheduler
 from memory.meta_service import apply_policy_enforcement as apply_policy_enforcement_service
 from memory.meta_service import format_policy_directive as format_policy_directive_service
-from memory.meta_store import resolve_policy_bundle_sync as resolve_policy_bundle_store
+from memory.meta_store import PolicyBundleCache
+from memory.meta_store import resolve_policy_bundle_cached_sync as resolve_policy_bundle_store
 from memory.lifecycle_service import approve_memory_sync as approve_memory_service
 from memory.lifecycle_service import list_candidate_memories_sync as list_candidate_memories_service
 from memory.lifecycle_service import reject_memory_sync as reject_memory_service
+from memory.lifecycle_service import merge_memory_events_sync as merge_memory_events_service
 from memory.service import extract_json_array as extract_json_array_service
 from memory.service import get_topic_candidates as get_topic_candidates_service
 from memory.service import remember_event as remember_event_service
 from memory.service import safe_extract_json_obj as safe_extract_json_obj_service
 from memory.service import suggest_topic_id as suggest_topic_id_service
+from memory.store import auto_summary_candidates_sync
 from memory.store import cleanup_memory_sync as cleanup_memory_store
 from memory.store import fetch_latest_memory_events_sync as fetch_latest_memory_events_store
 from memory.store import fetch_memory_events_since_sync as fetch_memory_events_since_store
 from memory.store import fetch_topic_events_sync as fetch_topic_events_store
 from memory.store import get_topic_summary_sync as get_topic_summary_store
 from memory.store import insert_memory_event_sync as insert_memory_event_store
+from memory.store import merge_duplicate_memory_event_sync as merge_duplicate_memory_event_store
+from memory.store import find_near_duplicate_memory_events_sync as find_near_duplicate_memory_events_store
+from memory.store import backfill_memory_event_minhash_sync
+from memory.store import near_duplicate_clusters_sync
 from memory.store import list_known_topics_sync as list_known_topics_store
+from memory.store import load_topic_registry_sync
+from memory.store import load_recent_memory_events_sync as load_recent_memory_events_store
+from memory.store import memory_content_hash
+from memory.store import memory_write_generation
+from memory.store import maintain_memory_fts_sync as maintain_memory_fts_store
 from memory.store import mark_events_summarized_sync as mark_events_summarized_store
 from memory.store import search_memory_events_by_tag_sync as search_memory_events_by_tag_store
 from memory.store import search_memory_events_sync as search_memory_events_store
@@ -91,20 +154,32 @@ from memory.store import search_memory_summaries_sync as search_memory_summaries
 from memory.store import set_memory_origin_sync as set_memory_origin_store
 from memory.store import topic_counts_sync as topic_counts_store
 from memory.store import upsert_summary_sync as upsert_summary_store
+from memory.tiers import infer_tier as infer_tier_for_ts
+from memory.topic_registry import TOPIC_ORDERS
+from memory.topic_registry import TopicRegistry
 from misc.runtime_wiring import wire_bot_runtime
 from misc.adhoc_modules.announcements_service import AnnouncementService
 from misc.adhoc_modules.announcements_service import default_templates_path as announcement_templates_path_default
 from misc.adhoc_modules.music_service import MusicService
 from misc.adhoc_modules.welcome_panel import build_welcome_panel
 from retrieval.service import budget_and_diversify_events as retrieval_budget_and_diversify_events
+from retrieval.fts_query import FtsTermStats
 from retrieval.fts_query import build_fts_query
 from retrieval.service import format_memory_events_window as format_memory_events_window_service
 from retrieval.service import format_memory_for_llm as format_memory_for_llm_service
 from retrieval.service import format_profile_for_llm as format_profile_for_llm_service
 from retrieval.service import format_recent_context as format_recent_context_service
+from retrieval.service import fetch_recent_context_rows as fetch_recent_context_rows_service
+from retrieval.service import get_last_author_message as get_last_author_message_service
 from retrieval.service import get_recent_channel_context as get_recent_channel_context_service
 from retrieval.service import parse_duration_to_minutes as parse_duration_to_minutes_service
+from retrieval.service import RecallCache
+from retrieval.service import recall_prompt_key
+from retrieval.service import recall_terms_key
 from retrieval.service import recall_memory as recall_memory_service
+from retrieval.hot_index import HotMemoryIndex
+from retrieval.vector_index import HashedVectorIndex
+from retrieval.vector_index import backfill_vectors_sync
 
 # See AGENTS.md for complete roadmap and context
 
@@ -120,6 +195,10 @@ if not OPENAI_API_KEY:
     raise RuntimeError("Missing OPENAI_API_KEY env var")
 
 OPENAI_MODEL = os.getenv("OPENAI_MODEL", "gpt-5.1")
+try:
+    LLM_TIMEOUT_SECONDS = float(os.getenv("EPOXY_LLM_TIMEOUT_SECONDS", "90").strip() or "90")
+except ValueError:
+    LLM_TIMEOUT_SECONDS = 90.0
 
 # =========================
 # MEMORY STAGING
@@ -130,6 +209,9 @@ OPENAI_MODEL = os.getenv("OPENAI_MODEL", "gpt-5.1")
 #   EPOXY_MEMORY_ENABLE_AUTO_CAPTURE = 0/1   (default: 0)
 #   EPOXY_MEMORY_ENABLE_AUTO_SUMMARY = 0/1   (default: 0)
 #   EPOXY_MEMORY_REVIEW_MODE = off|capture_only|all (default: capture_only)
+#   EPOXY_MEMORY_DEDUPE = 0/1                (default: 1)
+#   EPOXY_MEMORY_NEAR_DUP_MODE = off|flag|merge (default: flag)
+#   EPOXY_MEMORY_NEAR_DUP_THRESHOLD = 0..1   (default: 0.8)
 #
 # Notes:
 # - “Wire to M3” means: the DB schema + codepaths exist up through M3,
@@ -145,9 +227,35 @@ MEMORY_STAGE_RANK = STAGE_RANK.get(MEMORY_STAGE, 0)
 def stage_at_least(stage: str) -> bool:
     return MEMORY_STAGE_RANK >= STAGE_RANK.get(stage.strip().upper(), 0)
 
+
+def _env_int(name: str, default: int) -> int:
+    raw = str(os.getenv(name, str(default)) or "").strip()
+    try:
+        return int(raw)
+    except Exception:
+        return int(default)
+
 # Feature toggles (default OFF; flip via env when testing)
 AUTO_CAPTURE = os.getenv("EPOXY_MEMORY_ENABLE_AUTO_CAPTURE", "0").strip() == "1"
 AUTO_SUMMARY = os.getenv("EPOXY_MEMORY_ENABLE_AUTO_SUMMARY", "0").strip() == "1"
+# Merge exact-duplicate memory text (same content_hash + scope) instead of inserting.
+MEMORY_DEDUPE = os.getenv("EPOXY_MEMORY_DEDUPE", "1").strip() == "1"
+# Near-duplicates (MinHash word-set similarity, same scope) are flagged in
+# provenance or merged like exact duplicates.
+MEMORY_NEAR_DUP_MODE = os.getenv("EPOXY_MEMORY_NEAR_DUP_MODE", DEFAULT_MEMORY_NEAR_DUP_MODE).strip().lower()
+if MEMORY_NEAR_DUP_MODE not in {"off", "flag", "merge"}:
+    print(
+        f"[CFG] invalid EPOXY_MEMORY_NEAR_DUP_MODE={MEMORY_NEAR_DUP_MODE!r}; "
+        f"falling back to {DEFAULT_MEMORY_NEAR_DUP_MODE!r}"
+    )
+    MEMORY_NEAR_DUP_MODE = DEFAULT_MEMORY_NEAR_DUP_MODE
+try:
+    MEMORY_NEAR_DUP_THRESHOLD = float(
+        os.getenv("EPOXY_MEMORY_NEAR_DUP_THRESHOLD", str(DEFAULT_MEMORY_NEAR_DUP_THRESHOLD)).strip()
+    )
+except ValueError:
+    MEMORY_NEAR_DUP_THRESHOLD = DEFAULT_MEMORY_NEAR_DUP_THRESHOLD
+MEMORY_NEAR_DUP_THRESHOLD = max(0.05, min(1.0, MEMORY_NEAR_DUP_THRESHOLD))
 MEMORY_REVIEW_MODE = os.getenv("EPOXY_MEMORY_REVIEW_MODE", DEFAULT_MEMORY_REVIEW_MODE).strip().lower()
 if MEMORY_REVIEW_MODE not in {"off", "capture_only", "all"}:
     print(
@@ -185,10 +293,20 @@ else:
         if t.strip()
     } - RESERVED_KIND_TAGS)
 
+# Known-topic candidates for suggestion (used when the allowlist is empty): recency|frequency.
+TOPIC_CANDIDATE_ORDER = os.getenv("EPOXY_TOPIC_CANDIDATE_ORDER", DEFAULT_TOPIC_CANDIDATE_ORDER).strip().lower()
+if TOPIC_CANDIDATE_ORDER not in TOPIC_ORDERS:
+    print(
+        f"[CFG] invalid EPOXY_TOPIC_CANDIDATE_ORDER={TOPIC_CANDIDATE_ORDER!r}; "
+        f"falling back to {DEFAULT_TOPIC_CANDIDATE_ORDER!r}"
+    )
+    TOPIC_CANDIDATE_ORDER = DEFAULT_TOPIC_CANDIDATE_ORDER
+topic_registry = TopicRegistry(load_topics=load_topic_registry_sync, order=TOPIC_CANDIDATE_ORDER)
+
 print(
     f"[CFG] stage={MEMORY_STAGE} auto_capture={AUTO_CAPTURE} auto_summary={AUTO_SUMMARY} "
     f"review_mode={MEMORY_REVIEW_MODE} "
-    f"topic_suggest={TOPIC_SUGGEST} topic_min_conf={TOPIC_MIN_CONF} "
+    f"topic_suggest={TOPIC_SUGGEST} topic_min_conf={TOPIC_MIN_CONF} topic_order={TOPIC_CANDIDATE_ORDER} "
     f"allowlist={'(db-topics)' if not TOPIC_ALLOWLIST else str(len(TOPIC_ALLOWLIST))+' topics'}"
 )
 # ---- end config ----
@@ -197,7 +315,34 @@ print(
 # Railway persistent path (set this to your mounted volume path)
 DB_PATH = os.getenv("EPOXY_DB_PATH", "epoxy_memory.db")
 
-client = OpenAI(api_key=OPENAI_API_KEY)
+LLM_MAX_INTERACTIVE = max(1, _env_int("EPOXY_LLM_MAX_INTERACTIVE", DEFAULT_LLM_MAX_INTERACTIVE))
+LLM_MAX_OPERATOR = max(1, _env_int("EPOXY_LLM_MAX_OPERATOR", DEFAULT_LLM_MAX_OPERATOR))
+LLM_MAX_BACKGROUND = max(1, _env_int("EPOXY_LLM_MAX_BACKGROUND", DEFAULT_LLM_MAX_BACKGROUND))
+LLM_RATE_PER_MINUTE = max(0, _env_int("EPOXY_LLM_RATE_PER_MINUTE", DEFAULT_LLM_RATE_PER_MINUTE))
+LLM_BURST = max(1, _env_int("EPOXY_LLM_BURST", DEFAULT_LLM_BURST))
+LLM_BACKGROUND_YIELD_AT = max(0, _env_int("EPOXY_LLM_BACKGROUND_YIELD_AT", DEFAULT_LLM_BACKGROUND_YIELD_AT))
+
+# One AsyncOpenAI instance = one shared HTTP connection pool; every LLM call
+# goes through the gateway (per-call timeouts + cancellation, never blocks the loop)
+# and the scheduler (interactive > operator > background).
+llm_scheduler = LLMScheduler(
+    interactive_limit=LLM_MAX_INTERACTIVE,
+    operator_limit=LLM_MAX_OPERATOR,
+    background_limit=LLM_MAX_BACKGROUND,
+    rate_per_minute=LLM_RATE_PER_MINUTE,
+    burst=LLM_BURST,
+    background_yield_at=LLM_BACKGROUND_YIELD_AT,
+)
+client = LLMGateway(
+    client=AsyncOpenAI(api_key=OPENAI_API_KEY),
+    default_timeout_seconds=LLM_TIMEOUT_SECONDS,
+    scheduler=llm_scheduler,
+)
+print(
+    f"[CFG] llm_model={OPENAI_MODEL} llm_timeout_s={LLM_TIMEOUT_SECONDS} "
+    f"caps(interactive/operator/background)={LLM_MAX_INTERACTIVE}/{LLM_MAX_OPERATOR}/{LLM_MAX_BACKGROUND} "
+    f"rate_per_min={LLM_RATE_PER_MINUTE} burst={LLM_BURST} background_yield_at={LLM_BACKGROUND_YIELD_AT}"
+)
 
 # =========================
 # ALLOWED CHANNELS + CONTEXT POLICY
@@ -224,6 +369,9 @@ if _episode_filters_raw is None:
 if _episode_filters_raw is None:
     _episode_filters_raw = "context:dm,context:public,context:member,context:staff,context:leadership"
 EPISODE_LOG_FILTERS = parse_str_set(_episode_filters_raw)
+# Optional per-selector keep rates, same selector syntax as the filters, e.g.:
+#   context:public=0.1,surface:public_channel=0.25
+EPISODE_LOG_SAMPLE_RATES = parse_episode_sample_rates(os.getenv("EPOXY_EPISODE_LOG_SAMPLE_RATES", ""))
 print(
     f"[CFG] allowed_channels={len(ALLOWED_CHANNEL_IDS)} "
     f"groups(leadership={len(CHANNEL_POLICY_GROUPS['leadership'])}, "
@@ -280,14 +428,6 @@ else:
 # =========================
 # MUSIC (CALM/CHILL YOUTUBE)
 # =========================
-def _env_int(name: str, default: int) -> int:
-    raw = str(os.getenv(name, str(default)) or "").strip()
-    try:
-        return int(raw)
-    except Exception:
-        return int(default)
-
-
 def _env_keywords(name: str, default_csv: str) -> list[str]:
     raw = os.getenv(name, default_csv)
     if raw is None:
@@ -588,6 +728,134 @@ db_conn = init_db(DB_PATH)
 print(f"[DB] Using DB_PATH={DB_PATH}")
 print(f"[DB] DB file exists? {os.path.exists(DB_PATH)}")
 db_lock = asyncio.Lock()
+DB_READ_POOL_SIZE = max(0, _env_int("EPOXY_DB_READ_POOL_SIZE", DEFAULT_DB_READ_POOL_SIZE))
+db_read_pool: ReadConnectionPool | None = None
+if DB_READ_POOL_SIZE > 0:
+    try:
+        db_read_pool = ReadConnectionPool(DB_PATH, size=DB_READ_POOL_SIZE)
+    except sqlite3.Error as e:
+        print(f"[DB] Read pool disabled (open failed): {e}")
+        db_read_pool = None
+db_handles = DbHandles(db_lock=db_lock, db_conn=db_conn, read_pool=db_read_pool)
+print(f"[CFG] db_read_pool_size={db_read_pool.size if db_read_pool else 0}")
+# Background jobs (summaries, cleanup, mining) run from the `jobs` table; 0 workers = legacy inline maintenance.
+JOB_WORKERS = max(0, _env_int("EPOXY_JOB_WORKERS", DEFAULT_JOB_WORKERS))
+JOB_LEASE_SECONDS = max(10, _env_int("EPOXY_JOB_LEASE_SECONDS", DEFAULT_JOB_LEASE_SECONDS))
+JOB_MAX_ATTEMPTS = max(1, _env_int("EPOXY_JOB_MAX_ATTEMPTS", DEFAULT_JOB_MAX_ATTEMPTS))
+job_pool: JobWorkerPool | None = None
+if JOB_WORKERS > 0:
+    job_pool = JobWorkerPool(
+        db_handles=db_handles,
+        workers=JOB_WORKERS,
+        lease_seconds=JOB_LEASE_SECONDS,
+        max_attempts=JOB_MAX_ATTEMPTS,
+    )
+print(f"[CFG] job_workers={JOB_WORKERS} lease_s={JOB_LEASE_SECONDS} max_attempts={JOB_MAX_ATTEMPTS}")
+# Topic summaries fold up to SUMMARY_MAX_EVENTS events per run, map-reduced in chunks of ~SUMMARY_CHUNK_TOKENS.
+SUMMARY_MAX_EVENTS = max(1, _env_int("EPOXY_SUMMARY_MAX_EVENTS", DEFAULT_SUMMARY_MAX_EVENTS))
+SUMMARY_CHUNK_TOKENS = max(200, _env_int("EPOXY_SUMMARY_CHUNK_TOKENS", DEFAULT_SUMMARY_CHUNK_TOKENS))
+print(f"[CFG] summary_max_events={SUMMARY_MAX_EVENTS} summary_chunk_tokens={SUMMARY_CHUNK_TOKENS}")
+INGEST_WRITE_BEHIND = os.getenv("EPOXY_INGEST_WRITE_BEHIND", "1").strip() == "1"
+INGEST_FLUSH_BATCH_SIZE = max(1, _env_int("EPOXY_INGEST_FLUSH_BATCH_SIZE", DEFAULT_INGEST_FLUSH_BATCH_SIZE))
+INGEST_FLUSH_INTERVAL_MS = max(10, _env_int("EPOXY_INGEST_FLUSH_INTERVAL_MS", DEFAULT_INGEST_FLUSH_INTERVAL_MS))
+INGEST_MAX_PENDING = max(INGEST_FLUSH_BATCH_SIZE, _env_int("EPOXY_INGEST_MAX_PENDING", DEFAULT_INGEST_MAX_PENDING))
+print(
+    f"[CFG] ingest_write_behind={INGEST_WRITE_BEHIND} batch={INGEST_FLUSH_BATCH_SIZE} "
+    f"interval_ms={INGEST_FLUSH_INTERVAL_MS} max_pending={INGEST_MAX_PENDING}"
+)
+EPISODE_LOG_WRITE_BEHIND = os.getenv("EPOXY_EPISODE_LOG_WRITE_BEHIND", "1").strip() == "1"
+EPISODE_LOG_FLUSH_BATCH_SIZE = max(1, _env_int("EPOXY_EPISODE_LOG_FLUSH_BATCH_SIZE", DEFAULT_EPISODE_LOG_FLUSH_BATCH_SIZE))
+EPISODE_LOG_FLUSH_INTERVAL_MS = max(10, _env_int("EPOXY_EPISODE_LOG_FLUSH_INTERVAL_MS", DEFAULT_EPISODE_LOG_FLUSH_INTERVAL_MS))
+EPISODE_LOG_MAX_PENDING = max(
+    EPISODE_LOG_FLUSH_BATCH_SIZE,
+    _env_int("EPOXY_EPISODE_LOG_MAX_PENDING", DEFAULT_EPISODE_LOG_MAX_PENDING),
+)
+print(
+    f"[CFG] episode_log_write_behind={EPISODE_LOG_WRITE_BEHIND} batch={EPISODE_LOG_FLUSH_BATCH_SIZE} "
+    f"interval_ms={EPISODE_LOG_FLUSH_INTERVAL_MS} max_pending={EPISODE_LOG_MAX_PENDING} "
+    f"sample_rates={EPISODE_LOG_SAMPLE_RATES or 'none'}"
+)
+IDENTITY_CACHE_SIZE = max(0, _env_int("EPOXY_IDENTITY_CACHE_SIZE", DEFAULT_IDENTITY_CACHE_SIZE))
+IDENTITY_CACHE_TTL_SECONDS = max(0, _env_int("EPOXY_IDENTITY_CACHE_TTL_SECONDS", DEFAULT_IDENTITY_CACHE_TTL_SECONDS))
+IDENTITY_SEEN_FLUSH_SECONDS = max(0, _env_int("EPOXY_IDENTITY_SEEN_FLUSH_SECONDS", DEFAULT_IDENTITY_SEEN_FLUSH_SECONDS))
+identity_cache: IdentityCache | None = None
+if IDENTITY_CACHE_SIZE > 0:
+    identity_cache = IdentityCache(
+        max_entries=IDENTITY_CACHE_SIZE,
+        ttl_seconds=IDENTITY_CACHE_TTL_SECONDS,
+        seen_flush_interval_seconds=IDENTITY_SEEN_FLUSH_SECONDS,
+    )
+print(
+    f"[CFG] identity_cache_size={IDENTITY_CACHE_SIZE} ttl_s={IDENTITY_CACHE_TTL_SECONDS} "
+    f"seen_flush_s={IDENTITY_SEEN_FLUSH_SECONDS}"
+)
+CONTROLLER_CACHE_TTL_SECONDS = _env_int("EPOXY_CONTROLLER_CACHE_TTL_SECONDS", DEFAULT_CONTROLLER_CACHE_TTL_SECONDS)
+controller_cache: ControllerResolutionCache | None = None
+if CONTROLLER_CACHE_TTL_SECONDS >= 0:
+    controller_cache = ControllerResolutionCache(ttl_seconds=CONTROLLER_CACHE_TTL_SECONDS)
+print(f"[CFG] controller_cache_ttl_s={CONTROLLER_CACHE_TTL_SECONDS if controller_cache else 'disabled'}")
+POLICY_CACHE_TTL_SECONDS = _env_int("EPOXY_POLICY_CACHE_TTL_SECONDS", DEFAULT_POLICY_CACHE_TTL_SECONDS)
+policy_cache: PolicyBundleCache | None = None
+if POLICY_CACHE_TTL_SECONDS >= 0:
+    policy_cache = PolicyBundleCache(ttl_seconds=POLICY_CACHE_TTL_SECONDS)
+print(f"[CFG] policy_cache_ttl_s={POLICY_CACHE_TTL_SECONDS if policy_cache else 'disabled'}")
+FTS_TERM_STATS_TTL_SECONDS = _env_int("EPOXY_FTS_TERM_STATS_TTL_SECONDS", DEFAULT_FTS_TERM_STATS_TTL_SECONDS)
+FTS_CANDIDATE_BUDGET = max(0, _env_int("EPOXY_FTS_CANDIDATE_BUDGET", DEFAULT_FTS_CANDIDATE_BUDGET))
+event_term_stats: FtsTermStats | None = None
+summary_term_stats: FtsTermStats | None = None
+if FTS_TERM_STATS_TTL_SECONDS >= 0:
+    event_term_stats = FtsTermStats(
+        vocab_table="memory_events_fts_vocab",
+        fts_table="memory_events_fts",
+        ttl_seconds=FTS_TERM_STATS_TTL_SECONDS,
+        candidate_budget=FTS_CANDIDATE_BUDGET,
+    )
+    summary_term_stats = FtsTermStats(
+        vocab_table="memory_summaries_fts_vocab",
+        fts_table="memory_summaries_fts",
+        ttl_seconds=FTS_TERM_STATS_TTL_SECONDS,
+        candidate_budget=FTS_CANDIDATE_BUDGET,
+    )
+print(
+    f"[CFG] fts_term_stats_ttl_s={FTS_TERM_STATS_TTL_SECONDS if event_term_stats else 'disabled'} "
+    f"fts_candidate_budget={FTS_CANDIDATE_BUDGET}"
+)
+RECALL_CACHE_SIZE = max(0, _env_int("EPOXY_RECALL_CACHE_SIZE", DEFAULT_RECALL_CACHE_SIZE))
+RECALL_CACHE_TTL_SECONDS = max(0, _env_int("EPOXY_RECALL_CACHE_TTL_SECONDS", DEFAULT_RECALL_CACHE_TTL_SECONDS))
+# Local hashed-vector recall fused with bm25 (no network). Vectors are always
+# written on insert; this only controls whether searches use them.
+VECTOR_RECALL = os.getenv("EPOXY_VECTOR_RECALL", DEFAULT_VECTOR_RECALL).strip() == "1"
+event_vector_index: HashedVectorIndex | None = None
+summary_vector_index: HashedVectorIndex | None = None
+if VECTOR_RECALL:
+    _vector_backfilled = backfill_vectors_sync(
+        db_conn, table="memory_event_vectors", source_table="memory_events", text_column="text"
+    ) + backfill_vectors_sync(
+        db_conn, table="memory_summary_vectors", source_table="memory_summaries", text_column="summary_text"
+    )
+    event_vector_index = HashedVectorIndex(table="memory_event_vectors")
+    summary_vector_index = HashedVectorIndex(table="memory_summary_vectors")
+    event_vector_index.refresh(db_conn)
+    summary_vector_index.refresh(db_conn)
+    print(
+        f"[CFG] vector_recall=on backfilled={_vector_backfilled} "
+        f"event_rows={event_vector_index.stats()['rows']} summary_rows={summary_vector_index.stats()['rows']} "
+        f"numpy={event_vector_index.stats()['numpy']}"
+    )
+else:
+    print("[CFG] vector_recall=off")
+recall_cache: RecallCache | None = None
+if RECALL_CACHE_SIZE > 0:
+    # Vector recall embeds the raw prompt, so term-equal prompts are not interchangeable.
+    recall_cache = RecallCache(
+        max_entries=RECALL_CACHE_SIZE,
+        ttl_seconds=RECALL_CACHE_TTL_SECONDS,
+        normalize_query=recall_prompt_key if VECTOR_RECALL else recall_terms_key,
+    )
+print(f"[CFG] recall_cache_size={RECALL_CACHE_SIZE} ttl_s={RECALL_CACHE_TTL_SECONDS}")
+# In-process index of active hot/warm memories (built after the helpers below).
+HOT_MEMORY_INDEX = os.getenv("EPOXY_HOT_MEMORY_INDEX", DEFAULT_HOT_MEMORY_INDEX).strip() == "1"
+hot_memory_index: HotMemoryIndex | None = None
 # =========================
 # MEMORY HELPERS
 # =========================
@@ -637,14 +905,7 @@ def subject_person_tag(person_id: int) -> str:
 
 def infer_tier(created_ts: int) -> int:
     """0=hot (0-24h), 1=warm (1-14d), 2=cold (14-90d), 3=archive (>90d)"""
-    age = max(0, int(time.time()) - int(created_ts or 0))
-    if age < 86400:
-        return 0
-    if age < 14 * 86400:
-        return 1
-    if age < 90 * 86400:
-        return 2
-    return 3
+    return infer_tier_for_ts(created_ts)
 
 def infer_scope(prompt: str) -> str:
     p = (prompt or "").lower()
@@ -725,11 +986,70 @@ def user_is_owner(user: discord.abc.User) -> bool:
 def _insert_message_sync(conn: sqlite3.Connection, payload: dict) -> None:
     insert_message_store(conn, payload)
 
+def _insert_messages_batch_sync(conn: sqlite3.Connection, payloads: list[dict]) -> int:
+    return insert_messages_batch_store(conn, payloads)
+
+message_write_queue: MessageWriteQueue | None = None
+if INGEST_WRITE_BEHIND:
+    message_write_queue = MessageWriteQueue(
+        db_handles=db_handles,
+        insert_messages_batch_sync=_insert_messages_batch_sync,
+        max_batch=INGEST_FLUSH_BATCH_SIZE,
+        flush_interval_seconds=INGEST_FLUSH_INTERVAL_MS / 1000.0,
+        max_pending=INGEST_MAX_PENDING,
+    )
+
+episode_log_sink: EpisodeLogSink | None = None
+if EPISODE_LOG_WRITE_BEHIND:
+    episode_log_sink = EpisodeLogSink(
+        db_handles=db_handles,
+        insert_episode_logs_batch_sync=insert_episode_logs_batch_sync,
+        max_batch=EPISODE_LOG_FLUSH_BATCH_SIZE,
+        flush_interval_seconds=EPISODE_LOG_FLUSH_INTERVAL_MS / 1000.0,
+        max_pending=EPISODE_LOG_MAX_PENDING,
+        sample_rates=EPISODE_LOG_SAMPLE_RATES,
+    )
+
 def _insert_memory_event_sync(conn: sqlite3.Connection, payload: dict) -> int:
-    return insert_memory_event_store(
+    generation = memory_write_generation()
+    mem_id = insert_memory_event_store(
+        conn,
+        payload,
+        safe_json_loads=safe_json_loads,
+    )
+    if hot_memory_index is not None:
+        hot_memory_index.add(
+            {
+                **payload,
+                "id": mem_id,
+                "tags": safe_json_loads(payload.get("tags_json", "[]")),
+                "content_hash": memory_content_hash(payload.get("text")),
+            },
+            since_generation=generation,
+        )
+    topic_registry.note_topic(payload.get("topic_id"), payload.get("created_ts"))
+    return mem_id
+
+def _merge_duplicate_memory_event_sync(
+    conn: sqlite3.Connection,
+    payload: dict,
+    target_id: int | None = None,
+) -> dict | None:
+    return merge_duplicate_memory_event_store(
         conn,
         payload,
         safe_json_loads=safe_json_loads,
+        safe_json_dumps=safe_json_dumps,
+        now_iso_utc=utc_iso(),
+        target_id=target_id,
+    )
+
+def _find_near_duplicate_memory_events_sync(conn: sqlite3.Connection, payload: dict) -> list[tuple[int, float]]:
+    return find_near_duplicate_memory_events_store(
+        conn,
+        scope=str(payload.get("scope") or "global"),
+        text=payload.get("text"),
+        threshold=MEMORY_NEAR_DUP_THRESHOLD,
     )
 
 
@@ -788,6 +1108,25 @@ def _reject_memory_sync(
         safe_json_dumps=safe_json_dumps,
     )
 
+def _merge_memory_events_sync(
+    conn: sqlite3.Connection,
+    *,
+    survivor_id: int,
+    duplicate_ids: list[int],
+    actor_person_id: int | None,
+    reason: str | None = None,
+) -> dict:
+    return merge_memory_events_service(
+        conn,
+        survivor_id=survivor_id,
+        duplicate_ids=duplicate_ids,
+        actor_person_id=actor_person_id,
+        reason=reason,
+        utc_now_iso=utc_iso,
+        safe_json_loads=safe_json_loads,
+        safe_json_dumps=safe_json_dumps,
+    )
+
 def _mark_events_summarized_sync(conn: sqlite3.Connection, event_ids: list[int]) -> None:
     mark_events_summarized_store(conn, event_ids)
 
@@ -801,42 +1140,38 @@ async def recall_profile_for_identity(
     lim = max(1, int(limit))
     search_lim = max(lim * 2, lim)
 
-    async with db_lock:
-        canonical_person_id: int | None = int(person_id) if person_id is not None else None
-        if canonical_person_id is not None:
-            canonical_person_id = await asyncio.to_thread(canonical_person_id_sync, db_conn, int(canonical_person_id))
-
-        if canonical_person_id is None and user_id is not None:
-            canonical_person_id = await asyncio.to_thread(
-                resolve_person_id_sync,
-                db_conn,
-                "discord",
-                str(int(user_id)),
-            )
+    canonical_person_id: int | None = int(person_id) if person_id is not None else None
+    if canonical_person_id is not None:
+        canonical_person_id = await db_handles.read(canonical_person_id_sync, int(canonical_person_id))
+
+    if canonical_person_id is None and user_id is not None:
+        canonical_person_id = await db_handles.read(
+            resolve_person_id_sync,
+            "discord",
+            str(int(user_id)),
+        )
 
-        merged: list[dict] = []
-        if canonical_person_id is not None:
-            merged.extend(
-                await asyncio.to_thread(
-                    _search_memory_events_by_tag_sync,
-                    db_conn,
-                    subject_person_tag(int(canonical_person_id)),
-                    "profile",
-                    search_lim,
-                )
+    merged: list[dict] = []
+    if canonical_person_id is not None:
+        merged.extend(
+            await db_handles.read(
+                _search_memory_events_by_tag_sync,
+                subject_person_tag(int(canonical_person_id)),
+                "profile",
+                search_lim,
             )
-        if user_id is not None:
-            merged.extend(
-                await asyncio.to_thread(
-                    _search_memory_events_by_tag_sync,
-                    db_conn,
-                    subject_user_tag(int(user_id)),
-                    "profile",
-                    search_lim,
-                )
+        )
+    if user_id is not None:
+        merged.extend(
+            await db_handles.read(
+                _search_memory_events_by_tag_sync,
+                subject_user_tag(int(user_id)),
+                "profile",
+                search_lim,
             )
+        )
 
-        return dedupe_memory_events_by_id(merged, limit=lim)
+    return dedupe_memory_events_by_id(merged, limit=lim)
 
 
 async def recall_profile_for_user(user_id: int, limit: int = 6) -> list[dict]:
@@ -852,22 +1187,32 @@ def _search_memory_events_by_tag_sync(conn, subject_tag: str, kind_tag: str, lim
     )
 
 def _upsert_summary_sync(conn: sqlite3.Connection, payload: dict) -> int:
-    return upsert_summary_store(
+    sid = upsert_summary_store(
         conn,
         payload,
         safe_json_loads=safe_json_loads,
     )
+    topic_registry.note_topic(payload.get("topic_id"))
+    return sid
 
-def _search_memory_events_sync(conn: sqlite3.Connection, query: str, scope: str, limit: int = 8) -> list[dict]:
+def _search_memory_events_sync(
+    conn: sqlite3.Connection,
+    query: str,
+    scope: str,
+    limit: int = 8,
+    created_before_ts: int | None = None,
+) -> list[dict]:
     return search_memory_events_store(
         conn,
         query,
         scope,
         limit=limit,
-        build_fts_query=build_fts_query,
+        build_fts_query=event_term_stats.query_builder(conn) if event_term_stats else build_fts_query,
         parse_recall_scope=parse_recall_scope,
         stage_at_least=stage_at_least,
         safe_json_loads=safe_json_loads,
+        vector_search=event_vector_index.searcher() if event_vector_index else None,
+        created_before_ts=created_before_ts,
     )
 
 def _search_memory_summaries_sync(conn: sqlite3.Connection, query: str, scope: str, limit: int = 3) -> list[dict]:
@@ -876,10 +1221,35 @@ def _search_memory_summaries_sync(conn: sqlite3.Connection, query: str, scope: s
         query,
         scope,
         limit=limit,
-        build_fts_query=build_fts_query,
+        build_fts_query=summary_term_stats.query_builder(conn) if summary_term_stats else build_fts_query,
         parse_recall_scope=parse_recall_scope,
         safe_json_loads=safe_json_loads,
+        vector_search=summary_vector_index.searcher() if summary_vector_index else None,
+    )
+
+def _load_recent_memory_events_sync(conn: sqlite3.Connection, min_created_ts: int) -> list[dict]:
+    return load_recent_memory_events_store(conn, min_created_ts=min_created_ts, safe_json_loads=safe_json_loads)
+
+def _build_event_index_query_sync(conn: sqlite3.Connection, prompt: str) -> str:
+    # Same document-frequency term selection the SQL event search uses.
+    return event_term_stats.build_query(conn, prompt)
+
+if HOT_MEMORY_INDEX and VECTOR_RECALL:
+    # The index has no vector leg; answering from it would drop the RRF fusion.
+    print("[CFG] hot_memory_index=off (EPOXY_VECTOR_RECALL=1 needs the SQL search path)")
+elif HOT_MEMORY_INDEX:
+    hot_memory_index = HotMemoryIndex(
+        load_recent_events=_load_recent_memory_events_sync,
+        parse_recall_scope=parse_recall_scope,
     )
+    hot_memory_index.rebuild(db_conn)
+    _hot_stats = hot_memory_index.stats()
+    print(
+        f"[CFG] hot_memory_index=on rows={_hot_stats['rows']} terms={_hot_stats['terms']} "
+        f"approx_kib={_hot_stats['approx_bytes'] // 1024}"
+    )
+else:
+    print("[CFG] hot_memory_index=off")
 
 def _resolve_policy_bundle_sync(
     conn: sqlite3.Connection,
@@ -895,10 +1265,11 @@ def _resolve_policy_bundle_sync(
         caller_type=caller_type,
         surface=surface,
         limit=limit,
+        policy_cache=policy_cache,
     )
 
 def _format_policy_directive(policy_bundle: dict, max_chars: int = 550) -> str:
-    return format_policy_directive_service(policy_bundle, max_chars=max_chars)
+    return format_policy_directive_service(policy_bundle, max_chars=max_chars, policy_cache=policy_cache)
 
 def _apply_policy_enforcement(
     reply: str,
@@ -914,6 +1285,7 @@ def _apply_policy_enforcement(
         author_id=author_id,
         caller_type=caller_type,
         surface=surface,
+        policy_cache=policy_cache,
     )
 
 def _cleanup_memory_sync(conn: sqlite3.Connection) -> tuple[int, int]:
@@ -967,12 +1339,12 @@ def _fetch_memory_events_since_sync(
 def _format_memory_events_window(rows: list[tuple[str, str, str, str]], max_chars: int = 12000) -> str:
     return format_memory_events_window_service(rows, max_chars=max_chars)
 
-def _fetch_last_messages_by_author_sync(conn, channel_id, before_message_id, author_name_like, limit=1):
-    return fetch_last_messages_by_author_store(
+def _fetch_last_messages_by_author_id_sync(conn, channel_id, before_message_id, author_id, limit=1):
+    return fetch_last_messages_by_author_id_store(
         conn,
         channel_id,
         before_message_id,
-        author_name_like,
+        author_id,
         limit=limit,
     )
 
@@ -1009,6 +1381,14 @@ def _fetch_recent_context_sync(
 ) -> list[tuple[str, str, str]]:
     return fetch_recent_context_store(conn, channel_id, before_message_id, limit)
 
+def _fetch_recent_message_rows_sync(
+    conn: sqlite3.Connection,
+    channel_id: int,
+    before_message_id: int,
+    limit: int,
+) -> list[tuple[int, int, str, str, str]]:
+    return fetch_recent_message_rows_store(conn, channel_id, before_message_id, limit)
+
 def _fetch_messages_since_sync(
     conn: sqlite3.Connection,
     channel_id: int,
@@ -1029,10 +1409,34 @@ async def get_recent_channel_context(channel_id: int, before_message_id: int) ->
         before_message_id,
         db_lock=db_lock,
         db_conn=db_conn,
+        db_handles=db_handles,
         fetch_recent_context_sync=_fetch_recent_context_sync,
         recent_context_limit=RECENT_CONTEXT_LIMIT,
         recent_context_max_chars=RECENT_CONTEXT_MAX_CHARS,
         max_line_chars=MAX_LINE_CHARS,
+        fetch_recent_message_rows_sync=_fetch_recent_message_rows_sync,
+        recent_buffer=recent_message_buffer,
+    )
+
+async def get_recent_context_rows(channel_id: int, before_message_id: int, limit: int) -> list[tuple[str, str, str]]:
+    return await fetch_recent_context_rows_service(
+        channel_id,
+        before_message_id,
+        limit,
+        db_handles=db_handles,
+        fetch_recent_context_sync=_fetch_recent_context_sync,
+        fetch_recent_message_rows_sync=_fetch_recent_message_rows_sync,
+        recent_buffer=recent_message_buffer,
+    )
+
+async def get_last_author_message(channel_id: int, before_message_id: int, author_id: int) -> list[tuple[str, str, str]]:
+    return await get_last_author_message_service(
+        channel_id,
+        before_message_id,
+        author_id,
+        db_handles=db_handles,
+        fetch_last_messages_by_author_id_sync=_fetch_last_messages_by_author_id_sync,
+        recent_buffer=recent_message_buffer,
     )
 
 
@@ -1075,6 +1479,7 @@ async def _get_topic_candidates() -> list[str]:
         db_lock=db_lock,
         db_conn=db_conn,
         list_known_topics_sync=_list_known_topics_sync,
+        topic_registry=topic_registry,
     )
 
 
@@ -1148,6 +1553,12 @@ async def remember_event(
         infer_tier=infer_tier,
         safe_json_dumps=safe_json_dumps,
         insert_memory_event_sync=_insert_memory_event_sync,
+        merge_duplicate_memory_event_sync=_merge_duplicate_memory_event_sync if MEMORY_DEDUPE else None,
+        find_near_duplicate_memory_events_sync=(
+            _find_near_duplicate_memory_events_sync if MEMORY_NEAR_DUP_MODE != "off" else None
+        ),
+        near_duplicate_mode=MEMORY_NEAR_DUP_MODE,
+        topic_registry=topic_registry,
     )
 
 def _budget_and_diversify_events(events: list[dict], scope: str, limit: int = 8) -> list[dict]:
@@ -1172,6 +1583,10 @@ async def recall_memory(
         db_conn=db_conn,
         search_memory_events_sync=_search_memory_events_sync,
         search_memory_summaries_sync=_search_memory_summaries_sync,
+        db_handles=db_handles,
+        recall_cache=recall_cache,
+        hot_index=hot_memory_index,
+        build_index_query=_build_event_index_query_sync if event_term_stats else None,
     )
 
 def format_memory_for_llm(events: list[dict], summaries: list[dict], max_chars: int = 1700) -> str:
@@ -1186,6 +1601,7 @@ async def summarize_topic(
     scope: str = "auto",
     summary_type: str = "topic_gist",
     min_age_days: int = 14,
+    job_id: str | None = None,
 ) -> str:
     return await summarize_topic_service(
         topic_id,
@@ -1204,8 +1620,34 @@ async def summarize_topic(
         safe_json_dumps=safe_json_dumps,
         upsert_summary_sync=_upsert_summary_sync,
         mark_events_summarized_sync=_mark_events_summarized_sync,
+        job_id=job_id,
+        max_events=SUMMARY_MAX_EVENTS,
+        chunk_token_budget=SUMMARY_CHUNK_TOKENS,
+    )
+
+async def _run_summarize_topic_job(payload: dict, job: dict) -> str:
+    return await summarize_topic(
+        str(payload.get("topic_id") or ""),
+        scope=str(payload.get("scope") or "auto"),
+        summary_type=str(payload.get("summary_type") or "topic_gist"),
+        min_age_days=int(payload.get("min_age_days", 14)),
+        job_id=str(job["id"]),
     )
 
+async def _run_cleanup_job(payload: dict, job: dict) -> str:
+    async with db_lock:
+        transitioned_events, transitioned_summaries = await asyncio.to_thread(_cleanup_memory_sync, db_conn)
+    if transitioned_events or transitioned_summaries:
+        print(
+            "[Memory] cleanup transitions "
+            f"events={transitioned_events} summaries={transitioned_summaries} stage={MEMORY_STAGE}"
+        )
+    return f"events={transitioned_events} summaries={transitioned_summaries}"
+
+if job_pool is not None:
+    job_pool.register("summarize_topic", _run_summarize_topic_job)
+    job_pool.register("cleanup", _run_cleanup_job)
+
 async def maintenance_loop() -> None:
     interval = int(os.getenv("EPOXY_MAINTENANCE_INTERVAL_SECONDS", "3600"))
     min_age_days = int(os.getenv("EPOXY_SUMMARY_MIN_AGE_DAYS", "14"))
@@ -1219,6 +1661,9 @@ async def maintenance_loop() -> None:
         summarize_topic_func=summarize_topic,
         interval_seconds=interval,
         min_age_days=min_age_days,
+        job_pool=job_pool,
+        prune_jobs_sync=prune_jobs_sync,
+        auto_summary_candidates_sync=auto_summary_candidates_sync,
     )
 
 async def log_message(message: discord.Message) -> None:
@@ -1227,8 +1672,28 @@ async def log_message(message: discord.Message) -> None:
         db_lock=db_lock,
         db_conn=db_conn,
         insert_message_sync=_insert_message_sync,
+        message_queue=message_write_queue,
+        recent_buffer=recent_message_buffer,
     )
 
+async def flush_messages() -> int:
+    if message_write_queue is None:
+        return 0
+    return await message_write_queue.flush()
+
+async def record_episode(payload: dict, runtime_ctx: dict | None = None) -> bool:
+    if episode_log_sink is not None:
+        return await episode_log_sink.submit(payload, runtime_ctx)
+    if not sample_episode(EPISODE_LOG_SAMPLE_RATES, runtime_ctx, tags=payload.get("tags")):
+        return False
+    await db_handles.write(insert_episode_log_sync, payload)
+    return True
+
+async def flush_episode_logs() -> int:
+    if episode_log_sink is None:
+        return 0
+    return await episode_log_sink.flush()
+
 async def is_backfill_done(channel_id: int) -> bool:
     async with db_lock:
         done, _last = await asyncio.to_thread(_get_backfill_done_sync, db_conn, channel_id)
@@ -1245,7 +1710,28 @@ async def mark_backfill_done(channel_id: int) -> None:
 intents = discord.Intents.default()
 intents.message_content = True
 
-bot = commands.Bot(command_prefix="!", intents=intents)
+
+class EpoxyBot(commands.Bot):
+    async def close(self) -> None:
+        if job_pool is not None and job_pool.started:
+            try:
+                await job_pool.stop()
+                print("[Jobs] worker pool stopped")
+            except Exception as e:
+                print(f"[Jobs] Shutdown stop failed: {e}")
+        # Flush the write-behind buffers while the event loop is still running;
+        # the sync drains after bot.run() only pick up what is left.
+        for label, buffered in (("Ingest", message_write_queue), ("EpisodeLog", episode_log_sink)):
+            if buffered is None:
+                continue
+            try:
+                await buffered.close()
+            except Exception as e:
+                print(f"[{label}] Shutdown close failed: {e}")
+        await super().close()
+
+
+bot = EpoxyBot(command_prefix="!", intents=intents)
 
 # =========================
 # COMMANDS (staff tooling)
@@ -1257,6 +1743,19 @@ BACKFILL_PAUSE_SECONDS = DEFAULT_BACKFILL_PAUSE_SECONDS
 RECENT_CONTEXT_LIMIT = int(os.getenv("EPOXY_RECENT_CONTEXT_LIMIT", str(DEFAULT_RECENT_CONTEXT_LIMIT)))
 RECENT_CONTEXT_MAX_CHARS = int(os.getenv("EPOXY_RECENT_CONTEXT_CHARS", str(DEFAULT_RECENT_CONTEXT_MAX_CHARS)))
 MAX_LINE_CHARS = int(os.getenv("EPOXY_RECENT_CONTEXT_LINE_CHARS", str(DEFAULT_RECENT_CONTEXT_LINE_CHARS)))
+RECENT_BUFFER_PER_CHANNEL = _env_int("EPOXY_RECENT_BUFFER_PER_CHANNEL", DEFAULT_RECENT_BUFFER_PER_CHANNEL)
+RECENT_BUFFER_MAX_CHANNELS = max(1, _env_int("EPOXY_RECENT_BUFFER_MAX_CHANNELS", DEFAULT_RECENT_BUFFER_MAX_CHANNELS))
+recent_message_buffer: RecentMessageBuffer | None = None
+if RECENT_BUFFER_PER_CHANNEL > 0:
+    # Must hold a full context window or every mention would fall through to the DB.
+    recent_message_buffer = RecentMessageBuffer(
+        per_channel=max(RECENT_BUFFER_PER_CHANNEL, RECENT_CONTEXT_LIMIT),
+        max_channels=RECENT_BUFFER_MAX_CHANNELS,
+    )
+print(
+    f"[CFG] recent_buffer_per_channel={recent_message_buffer.per_channel if recent_message_buffer else 0} "
+    f"max_channels={RECENT_BUFFER_MAX_CHANNELS}"
+)
 
 def _build_welcome_panel() -> discord.ui.View:
     return build_welcome_panel(
@@ -1303,6 +1802,18 @@ music_service = MusicService(
     dry_run=MUSIC_DRY_RUN,
 )
 
+async def identity_seen_flush_loop() -> None:
+    # Debounced last_seen touches are written on a timer, not by the next mention.
+    poll_seconds = max(1.0, min(30.0, IDENTITY_SEEN_FLUSH_SECONDS / 2))
+    while True:
+        await asyncio.sleep(poll_seconds)
+        if not identity_cache.seen_flush_due():
+            continue
+        try:
+            await db_handles.write(identity_cache.flush_seen_sync)
+        except Exception as e:
+            print(f"[Identity] last_seen flush failed (kept for retry): {e}")
+
 async def announcement_loop() -> None:
     return await announcement_loop_service(
         bot=bot,
@@ -1318,6 +1829,7 @@ wire_bot_runtime(
     update_latest_dm_draft_feedback_sync=update_latest_dm_draft_feedback_sync,
     update_latest_dm_draft_evaluation_sync=update_latest_dm_draft_evaluation_sync,
     list_schema_migrations_sync=_list_schema_migrations_sync,
+    maintain_memory_fts_sync=maintain_memory_fts_store,
     stage_at_least=stage_at_least,
     memory_stage=MEMORY_STAGE,
     memory_stage_rank=MEMORY_STAGE_RANK,
@@ -1329,6 +1841,7 @@ wire_bot_runtime(
     topic_allowlist=TOPIC_ALLOWLIST,
     db_lock=db_lock,
     db_conn=db_conn,
+    db_handles=db_handles,
     topic_counts_sync=_topic_counts_sync,
     list_known_topics_sync=_list_known_topics_sync,
     get_topic_summary_sync=_get_topic_summary_sync,
@@ -1348,6 +1861,10 @@ wire_bot_runtime(
     list_candidate_memories_sync=_list_candidate_memories_sync,
     approve_memory_sync=_approve_memory_sync,
     reject_memory_sync=_reject_memory_sync,
+    merge_memory_events_sync=_merge_memory_events_sync,
+    backfill_memory_event_minhash_sync=backfill_memory_event_minhash_sync,
+    near_duplicate_clusters_sync=near_duplicate_clusters_sync,
+    memory_near_dup_threshold=MEMORY_NEAR_DUP_THRESHOLD,
     parse_channel_id_token=_parse_channel_id_token,
     parse_duration_to_minutes=_parse_duration_to_minutes,
     fetch_messages_since_sync=_fetch_messages_since_sync,
@@ -1355,6 +1872,7 @@ wire_bot_runtime(
     fetch_memory_events_since_sync=_fetch_memory_events_since_sync,
     fetch_latest_memory_events_sync=_fetch_latest_memory_events_sync,
     fetch_recent_context_sync=_fetch_recent_context_sync,
+    get_recent_context_rows_func=get_recent_context_rows,
     format_recent_context=_format_recent_context,
     format_memory_events_window=_format_memory_events_window,
     extract_json_array=_extract_json_array,
@@ -1381,9 +1899,10 @@ wire_bot_runtime(
     backfill_pause_every=BACKFILL_PAUSE_EVERY,
     backfill_pause_seconds=BACKFILL_PAUSE_SECONDS,
     log_message_func=log_message,
+    flush_messages_func=flush_messages,
     maintenance_loop_func=maintenance_loop,
     get_recent_channel_context_func=get_recent_channel_context,
-    fetch_last_messages_by_author_sync=_fetch_last_messages_by_author_sync,
+    get_last_author_message_func=get_last_author_message,
     build_context_pack=build_context_pack,
     classify_context=classify_context,
     founder_user_ids=FOUNDER_USER_IDS,
@@ -1392,26 +1911,60 @@ wire_bot_runtime(
     format_profile_for_llm=format_profile_for_llm,
     dm_guidelines=DM_GUIDELINES,
     dm_guidelines_source=DM_GUIDELINES_SOURCE,
-    get_or_create_context_profile_sync=get_or_create_context_profile_sync,
+    resolve_context_profile_cached_sync=resolve_context_profile_cached_sync,
     resolve_person_id_sync=resolve_person_id_sync,
     canonical_person_id_sync=canonical_person_id_sync,
     upsert_user_profile_last_seen_sync=upsert_user_profile_last_seen_sync,
-    select_active_controller_config_sync=select_active_controller_config_sync,
+    identity_cache=identity_cache,
+    controller_cache=controller_cache,
+    recall_cache=recall_cache,
+    hot_memory_index=hot_memory_index,
+    job_pool=job_pool,
+    job_stats_sync=job_stats_sync,
+    select_active_controller_config_cached_sync=select_active_controller_config_cached_sync,
     utc_iso=utc_iso,
     system_prompt_base=SYSTEM_PROMPT_BASE,
     enable_episode_logging=ENABLE_EPISODE_LOGGING,
     episode_log_filters=EPISODE_LOG_FILTERS,
     insert_episode_log_sync=insert_episode_log_sync,
+    record_episode_func=record_episode,
+    flush_episode_logs_func=flush_episode_logs,
     recent_context_limit=RECENT_CONTEXT_LIMIT,
     announcement_enabled=ANNOUNCE_ENABLED,
     announcement_service=announcement_service,
     announcement_loop_func=announcement_loop,
+    identity_flush_loop_func=identity_seen_flush_loop if identity_cache is not None else None,
     music_service=music_service,
 )
 
 
 
-bot.run(DISCORD_TOKEN)
+try:
+    bot.run(DISCORD_TOKEN)
+finally:
+    if message_write_queue is not None:
+        try:
+            drained = message_write_queue.drain_sync(db_conn)
+            print(f"[Ingest] Shutdown drain wrote {drained} buffered rows; stats={message_write_queue.stats()}")
+        except Exception as e:
+            print(f"[Ingest] Shutdown drain failed: {e}")
+    if episode_log_sink is not None:
+        try:
+            drained = episode_log_sink.drain_sync(db_conn)
+            print(f"[EpisodeLog] Shutdown drain wrote {drained} buffered rows; stats={episode_log_sink.stats()}")
+        except Exception as e:
+            print(f"[EpisodeLog] Shutdown drain failed: {e}")
+    if identity_cache is not None:
+        try:
+            flushed = identity_cache.flush_seen_sync(db_conn)
+            print(f"[Identity] Shutdown flushed {flushed} last_seen touches; stats={identity_cache.stats()}")
+        except Exception as e:
+            print(f"[Identity] Shutdown last_seen flush failed: {e}")
+    if db_read_pool is not None:
+        try:
+            db_read_pool.close()
+        except Exception as e:
+            print(f"[DB] Shutdown read pool close failed: {e}")
 
 
 
@@ -24,6 +24,7 @@ DEFAULT_TOPIC_ALLOWLIST = (
     "roadmap,infra,bugs,deployments,epoxy_bot,experiments,baby_brain,"
     "console_bay,coaching_method,layer_model,telemetry,track_guides"
 )
+DEFAULT_TOPIC_CANDIDATE_ORDER = "recency"
 
 # Channel policy defaults
 DEFAULT_MUSIC_GENERAL_VOICE_CHANNEL_ID = 1411275538978308246
@@ -70,3 +71,36 @@ DEFAULT_BACKFILL_PAUSE_SECONDS = 0.25
 DEFAULT_RECENT_CONTEXT_LIMIT = 40
 DEFAULT_RECENT_CONTEXT_MAX_CHARS = 6000
 DEFAULT_RECENT_CONTEXT_LINE_CHARS = 600
+DEFAULT_RECENT_BUFFER_PER_CHANNEL = 200
+DEFAULT_RECENT_BUFFER_MAX_CHANNELS = 64
+DEFAULT_DB_READ_POOL_SIZE = 4
+DEFAULT_IDENTITY_CACHE_SIZE = 10000
+DEFAULT_IDENTITY_CACHE_TTL_SECONDS = 600
+DEFAULT_IDENTITY_SEEN_FLUSH_SECONDS = 60
+DEFAULT_CONTROLLER_CACHE_TTL_SECONDS = 300
+DEFAULT_POLICY_CACHE_TTL_SECONDS = 300
+DEFAULT_FTS_TERM_STATS_TTL_SECONDS = 300
+DEFAULT_FTS_CANDIDATE_BUDGET = 400
+DEFAULT_RECALL_CACHE_SIZE = 256
+DEFAULT_RECALL_CACHE_TTL_SECONDS = 60
+DEFAULT_VECTOR_RECALL = "0"
+DEFAULT_HOT_MEMORY_INDEX = "1"
+DEFAULT_JOB_WORKERS = 2
+DEFAULT_JOB_LEASE_SECONDS = 600
+DEFAULT_JOB_MAX_ATTEMPTS = 3
+DEFAULT_SUMMARY_MAX_EVENTS = 600
+DEFAULT_SUMMARY_CHUNK_TOKENS = 1500
+DEFAULT_MEMORY_NEAR_DUP_MODE = "flag"
+DEFAULT_MEMORY_NEAR_DUP_THRESHOLD = 0.8
+DEFAULT_INGEST_FLUSH_BATCH_SIZE = 200
+DEFAULT_INGEST_FLUSH_INTERVAL_MS = 500
+DEFAULT_INGEST_MAX_PENDING = 5000
+DEFAULT_EPISODE_LOG_FLUSH_BATCH_SIZE = 50
+DEFAULT_EPISODE_LOG_FLUSH_INTERVAL_MS = 2000
+DEFAULT_EPISODE_LOG_MAX_PENDING = 1000
+DEFAULT_LLM_MAX_INTERACTIVE = 4
+DEFAULT_LLM_MAX_OPERATOR = 2
+DEFAULT_LLM_MAX_BACKGROUND = 1
+DEFAULT_LLM_RATE_PER_MINUTE = 120
+DEFAULT_LLM_BURST = 10
+DEFAULT_LLM_BACKGROUND_YIELD_AT = 1
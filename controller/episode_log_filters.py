@@ -1,6 +1,33 @@
 from __future__ import annotations
 
-from typing import Any
+import random
+from typing import Any, Callable
+
+
+def _ctx_dims(runtime_ctx: dict[str, Any]) -> tuple[str, str, str]:
+    caller = str(runtime_ctx.get("caller_type") or "").strip().lower()
+    context = str(runtime_ctx.get("channel_policy_group") or "").strip().lower()
+    surface = str(runtime_ctx.get("surface") or "").strip().lower()
+    return caller, context, surface
+
+
+def _token_matches(token: str, caller: str, context: str, surface: str) -> bool:
+    if token == "all":
+        return True
+    if ":" in token:
+        key, value = token.split(":", 1)
+        key = key.strip()
+        value = value.strip()
+        if not value:
+            return False
+        if key in {"caller", "caller_type"} and value == caller:
+            return True
+        if key in {"context", "group", "channel_group"} and value == context:
+            return True
+        if key in {"surface"} and value == surface:
+            return True
+        return False
+    return token in {caller, context, surface}
 
 
 def should_log_episode(filters: set[str], runtime_ctx: dict[str, Any]) -> bool:
@@ -22,26 +49,56 @@ def should_log_episode(filters: set[str], runtime_ctx: dict[str, Any]) -> bool:
     if "all" in normalized:
         return True
 
-    caller = str(runtime_ctx.get("caller_type") or "").strip().lower()
-    context = str(runtime_ctx.get("channel_policy_group") or "").strip().lower()
-    surface = str(runtime_ctx.get("surface") or "").strip().lower()
+    caller, context, surface = _ctx_dims(runtime_ctx)
+    return any(_token_matches(token, caller, context, surface) for token in normalized)
+
 
-    for token in normalized:
-        if ":" in token:
-            key, value = token.split(":", 1)
-            key = key.strip()
-            value = value.strip()
-            if not value:
-                continue
-            if key in {"caller", "caller_type"} and value == caller:
-                return True
-            if key in {"context", "group", "channel_group"} and value == context:
-                return True
-            if key in {"surface"} and value == surface:
-                return True
+def parse_episode_sample_rates(raw: str | None) -> dict[str, float]:
+    """
+    Parse `selector=rate` pairs, e.g. `context:public=0.1,surface:public_channel=0.25`.
+    Selectors use the same syntax as `should_log_episode`; rates are clamped to [0, 1].
+    Malformed pairs are ignored.
+    """
+    rates: dict[str, float] = {}
+    for part in str(raw or "").split(","):
+        if "=" not in part:
             continue
+        token, value = part.rsplit("=", 1)
+        token = token.strip().lower()
+        if not token:
+            continue
+        try:
+            rate = float(value.strip())
+        except ValueError:
+            continue
+        rates[token] = min(1.0, max(0.0, rate))
+    return rates
 
-        if token in {caller, context, surface}:
-            return True
 
-    return False
+def episode_sample_rate(rates: dict[str, float], runtime_ctx: dict[str, Any] | None) -> float:
+    """Lowest rate among matching selectors (most specific throttle wins); 1.0 if none match."""
+    if not rates or not runtime_ctx:
+        return 1.0
+    caller, context, surface = _ctx_dims(runtime_ctx)
+    matched = [rate for token, rate in rates.items() if _token_matches(token, caller, context, surface)]
+    return min(matched) if matched else 1.0
+
+
+# Episodes that owner commands update after the fact (`!dmfeedback`,
+# `!dmeval` look them up by tag), so they are never sampled out.
+UNSAMPLED_EPISODE_TAGS = frozenset({"mode:dm_draft"})
+
+
+def sample_episode(
+    rates: dict[str, float],
+    runtime_ctx: dict[str, Any] | None,
+    rng: Callable[[], float] = random.random,
+    *,
+    tags: list[str] | None = None,
+) -> bool:
+    if tags and not UNSAMPLED_EPISODE_TAGS.isdisjoint(tags):
+        return True
+    rate = episode_sample_rate(rates, runtime_ctx)
+    if rate >= 1.0:
+        return True
+    return rate > 0.0 and rng() < rate
@@ -0,0 +1,206 @@
+"""Write-behind sink for `episode_logs`.
+
+Episode logs are diagnostic, so live mention handling only appends the payload
+to an in-memory buffer; a background task writes buffered rows in one
+transaction every `flush_interval_seconds` (or as soon as `max_batch` rows are
+waiting). Unlike the message queue, a full buffer sheds its oldest rows instead
+of applying backpressure: losing a diagnostic row is preferable to holding the
+write lock on the reply path.
+
+A batch that fails is retried row by row so one bad payload cannot wedge the
+sink; rows that still fail are counted and discarded.
+
+`sample_rates` maps `EPOXY_EPISODE_LOG_FILTERS`-style selectors to a keep
+probability, so high-volume public surfaces can be logged at a fraction. DM
+drafts are always kept because `!dmfeedback` / `!dmeval` update them later.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import random
+import time
+from datetime import datetime, timezone
+from typing import Any, Callable
+
+from controller.episode_log_filters import sample_episode
+
+
+class EpisodeLogSink:
+    def __init__(
+        self,
+        *,
+        db_handles,
+        insert_episode_logs_batch_sync: Callable[[Any, list[dict]], int],
+        max_batch: int = 50,
+        flush_interval_seconds: float = 2.0,
+        max_pending: int = 1000,
+        sample_rates: dict[str, float] | None = None,
+        rng: Callable[[], float] = random.random,
+        stats_log_interval_seconds: float = 300.0,
+    ):
+        self.db_handles = db_handles
+        self.insert_episode_logs_batch_sync = insert_episode_logs_batch_sync
+        self.max_batch = max(1, int(max_batch))
+        self.flush_interval_seconds = max(0.01, float(flush_interval_seconds))
+        self.max_pending = max(self.max_batch, int(max_pending))
+        self.sample_rates = dict(sample_rates or {})
+        self._rng = rng
+        self.stats_log_interval_seconds = max(0.0, float(stats_log_interval_seconds))
+        self._last_stats_log_at = time.monotonic()
+
+        self._pending: list[dict] = []
+        self._oldest_enqueued_at: float | None = None
+        self._flush_lock = asyncio.Lock()
+        self._wake = asyncio.Event()
+        self._task: asyncio.Task | None = None
+        self._closed = False
+
+        self._submitted = 0
+        self._sampled_out = 0
+        self._written_rows = 0
+        self._flush_count = 0
+        self._failed_flushes = 0
+        self._failed_rows = 0
+        self._dropped_rows = 0
+        self._max_depth = 0
+        self._last_flush_ms = 0.0
+        self._max_flush_ms = 0.0
+
+    @property
+    def depth(self) -> int:
+        return len(self._pending)
+
+    def _ensure_started(self) -> None:
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._run(), name="epoxy-episode-log-sink")
+
+    async def submit(self, payload: dict, runtime_ctx: dict[str, Any] | None = None) -> bool:
+        """Buffer one episode log; returns False when the row was sampled out."""
+        self._submitted += 1
+        if not sample_episode(self.sample_rates, runtime_ctx, self._rng, tags=payload.get("tags")):
+            self._sampled_out += 1
+            return False
+        # Stamp now so created_at_utc reflects the episode, not the flush.
+        payload.setdefault("created_at_utc", datetime.now(timezone.utc).isoformat())
+        if self._closed:
+            # Late episodes during shutdown are written directly.
+            self._written_rows += await self._write_rows([payload])
+            return True
+        self._ensure_started()
+        if len(self._pending) >= self.max_pending:
+            overflow = len(self._pending) - self.max_pending + 1
+            del self._pending[:overflow]
+            self._dropped_rows += overflow
+            print(f"[EpisodeLog] Buffer full; dropped {overflow} oldest rows")
+        if not self._pending:
+            self._oldest_enqueued_at = time.monotonic()
+        self._pending.append(payload)
+        self._max_depth = max(self._max_depth, len(self._pending))
+        if len(self._pending) >= self.max_batch:
+            self._wake.set()
+        return True
+
+    async def _write_rows(self, batch: list[dict]) -> int:
+        try:
+            return int(await self.db_handles.write(self.insert_episode_logs_batch_sync, batch) or 0)
+        except Exception as e:
+            self._failed_flushes += 1
+            print(f"[EpisodeLog] Batch insert failed ({len(batch)} rows); retrying individually: {e}")
+        written = 0
+        for payload in batch:
+            try:
+                written += int(await self.db_handles.write(self.insert_episode_logs_batch_sync, [payload]) or 0)
+            except Exception as e:
+                self._failed_rows += 1
+                print(f"[EpisodeLog] Dropped unwritable row (message_id={payload.get('message_id')}): {e}")
+        return written
+
+    async def flush(self) -> int:
+        """Write all currently buffered rows; returns rows written."""
+        async with self._flush_lock:
+            if not self._pending:
+                return 0
+            batch = self._pending
+            self._pending = []
+            self._oldest_enqueued_at = None
+            started = time.perf_counter()
+            written = await self._write_rows(batch)
+            elapsed_ms = (time.perf_counter() - started) * 1000.0
+            self._flush_count += 1
+            self._written_rows += written
+            self._last_flush_ms = elapsed_ms
+            self._max_flush_ms = max(self._max_flush_ms, elapsed_ms)
+            return written
+
+    async def _run(self) -> None:
+        while not self._closed:
+            timeout = self.flush_interval_seconds
+            if self._oldest_enqueued_at is not None:
+                age = time.monotonic() - self._oldest_enqueued_at
+                timeout = max(0.0, self.flush_interval_seconds - age)
+            try:
+                await asyncio.wait_for(self._wake.wait(), timeout=timeout)
+            except asyncio.TimeoutError:
+                pass
+            self._wake.clear()
+            if self._pending:
+                await self.flush()
+            self._maybe_log_stats()
+
+    def _maybe_log_stats(self) -> None:
+        if self.stats_log_interval_seconds <= 0:
+            return
+        now = time.monotonic()
+        if now - self._last_stats_log_at < self.stats_log_interval_seconds:
+            return
+        self._last_stats_log_at = now
+        st = self.stats()
+        print(
+            f"[EpisodeLog] sink depth={st['depth']} submitted={st['submitted']} sampled_out={st['sampled_out']} "
+            f"written={st['written_rows']} flushes={st['flush_count']} failed_flushes={st['failed_flushes']} "
+            f"failed_rows={st['failed_rows']} dropped={st['dropped_rows']}"
+        )
+
+    async def close(self) -> None:
+        """Stop the background flusher and write anything still buffered."""
+        self._closed = True
+        self._wake.set()
+        if self._task is not None:
+            try:
+                await self._task
+            except Exception:
+                pass
+            self._task = None
+        await self.flush()
+
+    def drain_sync(self, conn) -> int:
+        """Last-chance flush after the event loop has stopped."""
+        self._closed = True
+        if not self._pending:
+            return 0
+        batch = self._pending
+        self._pending = []
+        try:
+            written = int(self.insert_episode_logs_batch_sync(conn, batch) or 0)
+        except Exception as e:
+            self._failed_rows += len(batch)
+            print(f"[EpisodeLog] Shutdown drain failed ({len(batch)} rows lost): {e}")
+            return 0
+        self._written_rows += written
+        return written
+
+    def stats(self) -> dict[str, float | int]:
+        return {
+            "depth": len(self._pending),
+            "max_depth": self._max_depth,
+            "submitted": self._submitted,
+            "sampled_out": self._sampled_out,
+            "written_rows": self._written_rows,
+            "flush_count": self._flush_count,
+            "failed_flushes": self._failed_flushes,
+            "failed_rows": self._failed_rows,
+            "dropped_rows": self._dropped_rows,
+            "last_flush_ms": round(self._last_flush_ms, 2),
+            "max_flush_ms": round(self._max_flush_ms, 2),
+        }
@@ -1,6 +1,9 @@
 from __future__ import annotations
 
 import sqlite3
+import threading
+import time
+from collections import OrderedDict
 from datetime import datetime, timezone
 from typing import Any
 
@@ -232,6 +235,132 @@ def touch_person_seen_sync(
     conn.commit()
 
 
+class IdentityCache:
+    """In-process `(platform, external_id) -> canonical person_id` map.
+
+    Hits skip the identifier lookup and the merge-chain walk entirely. Entries
+    expire after `ttl_seconds`, which bounds how long a revoke or merge takes
+    to be picked up.
+
+    `note_seen` records last-seen touches in memory; `flush_seen_sync` writes
+    them in one transaction (`person_identifiers.last_seen_at` and
+    `user_profiles.last_seen_at_utc`), so a repeat speaker costs no writes
+    between flushes.
+    """
+
+    def __init__(
+        self,
+        *,
+        max_entries: int = 10000,
+        ttl_seconds: float = 600.0,
+        seen_flush_interval_seconds: float = 60.0,
+    ):
+        self.max_entries = max(1, int(max_entries))
+        self.ttl_seconds = max(0.0, float(ttl_seconds))
+        self.seen_flush_interval_seconds = max(0.0, float(seen_flush_interval_seconds))
+        self._entries: OrderedDict[tuple[str, str], tuple[int, float]] = OrderedDict()
+        self._pending_seen: dict[tuple[str, str], tuple[int, str]] = {}
+        self._last_seen_flush_at = time.monotonic()
+        self._lock = threading.Lock()
+        self._hits = 0
+        self._misses = 0
+        self._seen_noted = 0
+        self._seen_flushed = 0
+        self._seen_flushes = 0
+
+    @staticmethod
+    def _key(platform: str, external_id: str) -> tuple[str, str]:
+        return (_normalize_platform(platform), _normalize_external_id(external_id))
+
+    def get(self, platform: str, external_id: str) -> int | None:
+        key = self._key(platform, external_id)
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or (self.ttl_seconds > 0 and now - entry[1] > self.ttl_seconds):
+                if entry is not None:
+                    del self._entries[key]
+                self._misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self._hits += 1
+            return int(entry[0])
+
+    def put(self, platform: str, external_id: str, person_id: int) -> None:
+        key = self._key(platform, external_id)
+        with self._lock:
+            self._entries[key] = (int(person_id), time.monotonic())
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def note_seen(self, platform: str, external_id: str, person_id: int, seen_at: str | None = None) -> None:
+        key = self._key(platform, external_id)
+        with self._lock:
+            self._pending_seen[key] = (int(person_id), seen_at or _utc_now_iso())
+            self._seen_noted += 1
+
+    def seen_flush_due(self) -> bool:
+        with self._lock:
+            if not self._pending_seen:
+                return False
+            return time.monotonic() - self._last_seen_flush_at >= self.seen_flush_interval_seconds
+
+    def flush_seen_sync(self, conn: sqlite3.Connection) -> int:
+        """Write pending last-seen touches in one transaction; returns rows flushed."""
+        with self._lock:
+            pending = self._pending_seen
+            self._pending_seen = {}
+            self._last_seen_flush_at = time.monotonic()
+        if not pending:
+            return 0
+        cur = conn.cursor()
+        try:
+            cur.executemany(
+                """
+                UPDATE person_identifiers
+                SET last_seen_at = ?
+                WHERE platform = ?
+                  AND external_id = ?
+                  AND revoked_at IS NULL
+                """,
+                [(seen_at, plat, ext) for (plat, ext), (_pid, seen_at) in pending.items()],
+            )
+            cur.executemany(
+                """
+                INSERT INTO user_profiles (person_id, last_seen_at_utc)
+                VALUES (?, ?)
+                ON CONFLICT(person_id) DO UPDATE SET
+                    last_seen_at_utc = excluded.last_seen_at_utc
+                """,
+                [(pid, seen_at) for pid, seen_at in {pid: ts for pid, ts in pending.values()}.items()],
+            )
+            conn.commit()
+        except Exception:
+            conn.rollback()
+            with self._lock:
+                # Newer touches win over the ones being restored.
+                for key, value in pending.items():
+                    self._pending_seen.setdefault(key, value)
+            raise
+        with self._lock:
+            self._seen_flushed += len(pending)
+            self._seen_flushes += 1
+        return len(pending)
+
+    def stats(self) -> dict[str, int]:
+        with self._lock:
+            return {
+                "entries": len(self._entries),
+                "hits": self._hits,
+                "misses": self._misses,
+                "pending_seen": len(self._pending_seen),
+                "seen_noted": self._seen_noted,
+                "seen_flushed": self._seen_flushed,
+                "seen_flushes": self._seen_flushes,
+            }
+
+
 def dedupe_memory_events_by_id(events: list[dict[str, Any]], *, limit: int | None = None) -> list[dict[str, Any]]:
     out: list[dict[str, Any]] = []
     seen: set[int] = set()
@@ -1,7 +1,10 @@
 from __future__ import annotations
 
+import copy
 import json
 import sqlite3
+import threading
+import time
 from datetime import datetime, timezone
 from typing import Any
 
@@ -206,7 +209,11 @@ def ensure_controller_schema(conn: sqlite3.Connection) -> None:
     conn.commit()
 
 
-def seed_default_controller_configs(conn: sqlite3.Connection) -> None:
+def seed_default_controller_configs(
+    conn: sqlite3.Connection,
+    *,
+    resolution_cache: "ControllerResolutionCache | None" = None,
+) -> None:
     cur = conn.cursor()
     now = _utc_now_iso()
 
@@ -295,21 +302,29 @@ def seed_default_controller_configs(conn: sqlite3.Connection) -> None:
             ),
         )
     conn.commit()
+    if resolution_cache is not None:
+        resolution_cache.invalidate_controller_configs()
+
+
+def _context_profile_key(payload: dict[str, Any]) -> tuple:
+    return (
+        (payload.get("caller_type") or "member").strip(),
+        (payload.get("surface") or "public_channel").strip(),
+        payload.get("channel_id"),
+        payload.get("guild_id"),
+        (payload.get("sensitivity_policy_id") or "policy:default").strip(),
+    )
 
 
 def get_or_create_context_profile_sync(conn: sqlite3.Connection, payload: dict[str, Any]) -> int:
     cur = conn.cursor()
-    caller_type = (payload.get("caller_type") or "member").strip()
-    surface = (payload.get("surface") or "public_channel").strip()
-    channel_id = payload.get("channel_id")
-    guild_id = payload.get("guild_id")
-    sensitivity_policy_id = (payload.get("sensitivity_policy_id") or "policy:default").strip()
+    caller_type, surface, channel_id, guild_id, sensitivity_policy_id = _context_profile_key(payload)
     allowed_caps_json = _dumps(payload.get("allowed_capabilities", []), "[]")
     now = _utc_now_iso()
 
     cur.execute(
         """
-        SELECT id
+        SELECT id, allowed_capabilities_json
         FROM context_profiles
         WHERE caller_type = ?
           AND surface = ?
@@ -323,15 +338,17 @@ def get_or_create_context_profile_sync(conn: sqlite3.Connection, payload: dict[s
     row = cur.fetchone()
     if row:
         cid = int(row[0])
-        cur.execute(
-            """
-            UPDATE context_profiles
-            SET allowed_capabilities_json = ?, updated_at_utc = ?
-            WHERE id = ?
-            """,
-            (allowed_caps_json, now, cid),
-        )
-        conn.commit()
+        if row[1] != allowed_caps_json:
+            # Only touch the row (and commit) when capabilities actually changed.
+            cur.execute(
+                """
+                UPDATE context_profiles
+                SET allowed_capabilities_json = ?, updated_at_utc = ?
+                WHERE id = ?
+                """,
+                (allowed_caps_json, now, cid),
+            )
+            conn.commit()
         return cid
 
     cur.execute(
@@ -348,6 +365,120 @@ def get_or_create_context_profile_sync(conn: sqlite3.Connection, payload: dict[s
     return int(cur.lastrowid)
 
 
+class ControllerResolutionCache:
+    """In-process memo of context-profile ids and effective controller configs.
+
+    Context profiles are keyed by the runtime context tuple and remember the
+    capabilities last written, so an unchanged mention costs no query. Configs
+    are keyed by `(caller_type, context_profile_id, user_id, person_id)`.
+    Anything that writes `controller_configs` must call
+    `invalidate_controller_configs()`; `ttl_seconds` bounds staleness for edits
+    made outside the process.
+    """
+
+    def __init__(self, *, max_entries: int = 4096, ttl_seconds: float = 300.0):
+        self.max_entries = max(1, int(max_entries))
+        self.ttl_seconds = max(0.0, float(ttl_seconds))
+        self._profiles: dict[tuple, tuple[int, str]] = {}
+        self._configs: dict[tuple, tuple[dict[str, Any], float]] = {}
+        self._lock = threading.Lock()
+        self._profile_hits = 0
+        self._profile_misses = 0
+        self._config_hits = 0
+        self._config_misses = 0
+        self._invalidations = 0
+
+    @staticmethod
+    def _config_key(*, caller_type: str, context_profile_id: int, user_id: int, person_id: int | None) -> tuple:
+        return (str(caller_type), int(context_profile_id), int(user_id), int(person_id) if person_id is not None else None)
+
+    def profile_for(self, payload: dict[str, Any]) -> int | None:
+        """Cached profile id, or None on a miss / changed capabilities."""
+        key = _context_profile_key(payload)
+        caps_json = _dumps(payload.get("allowed_capabilities", []), "[]")
+        with self._lock:
+            entry = self._profiles.get(key)
+            if entry is None or entry[1] != caps_json:
+                return None
+            self._profile_hits += 1
+            return entry[0]
+
+    def remember_profile(self, payload: dict[str, Any], profile_id: int) -> None:
+        # Misses are counted when a loaded value is stored, so a lock-free probe
+        # followed by a re-check under the DB lock counts once.
+        key = _context_profile_key(payload)
+        caps_json = _dumps(payload.get("allowed_capabilities", []), "[]")
+        with self._lock:
+            self._profile_misses += 1
+            if len(self._profiles) >= self.max_entries and key not in self._profiles:
+                self._profiles.clear()
+            self._profiles[key] = (int(profile_id), caps_json)
+
+    def config_for(self, **scope_kwargs) -> dict[str, Any] | None:
+        key = self._config_key(**scope_kwargs)
+        with self._lock:
+            entry = self._configs.get(key)
+            if entry is None or (self.ttl_seconds > 0 and time.monotonic() - entry[1] > self.ttl_seconds):
+                self._configs.pop(key, None)
+                return None
+            self._config_hits += 1
+            return copy.deepcopy(entry[0])
+
+    def remember_config(self, cfg: dict[str, Any], **scope_kwargs) -> None:
+        key = self._config_key(**scope_kwargs)
+        with self._lock:
+            self._config_misses += 1
+            if len(self._configs) >= self.max_entries and key not in self._configs:
+                self._configs.clear()
+            self._configs[key] = (copy.deepcopy(cfg), time.monotonic())
+
+    def invalidate_controller_configs(self) -> None:
+        with self._lock:
+            self._invalidations += 1
+            self._configs.clear()
+
+    def invalidate_context_profiles(self) -> None:
+        with self._lock:
+            self._invalidations += 1
+            self._profiles.clear()
+            # Configs can be scoped to a context_profile_id.
+            self._configs.clear()
+
+    def stats(self) -> dict[str, int]:
+        with self._lock:
+            return {
+                "profile_entries": len(self._profiles),
+                "profile_hits": self._profile_hits,
+                "profile_misses": self._profile_misses,
+                "config_entries": len(self._configs),
+                "config_hits": self._config_hits,
+                "config_misses": self._config_misses,
+                "invalidations": self._invalidations,
+            }
+
+
+def resolve_context_profile_cached_sync(
+    conn: sqlite3.Connection | None,
+    payload: dict[str, Any],
+    *,
+    resolution_cache: ControllerResolutionCache | None = None,
+) -> int | None:
+    """
+    Context-profile id for `payload`, served from `resolution_cache` when warm.
+
+    With `conn=None` only the cache is consulted (None on a miss), so async
+    callers can take a hit without the DB lock and re-call with a connection.
+    """
+    if resolution_cache is None:
+        return get_or_create_context_profile_sync(conn, payload) if conn is not None else None
+    cached = resolution_cache.profile_for(payload)
+    if cached is not None or conn is None:
+        return cached
+    profile_id = get_or_create_context_profile_sync(conn, payload)
+    resolution_cache.remember_profile(payload, profile_id)
+    return profile_id
+
+
 def upsert_user_profile_last_seen_sync(conn: sqlite3.Connection, person_id: int, last_seen_at_utc: str | None = None) -> None:
     cur = conn.cursor()
     ts = last_seen_at_utc or _utc_now_iso()
@@ -438,64 +569,108 @@ def select_active_controller_config_sync(
     )
 
 
+def select_active_controller_config_cached_sync(
+    conn: sqlite3.Connection | None,
+    *,
+    caller_type: str,
+    context_profile_id: int,
+    user_id: int,
+    person_id: int | None = None,
+    resolution_cache: ControllerResolutionCache | None = None,
+) -> dict[str, Any] | None:
+    """Effective controller config, served from `resolution_cache` when warm; `conn=None` is cache-only."""
+    scope_kwargs = {
+        "caller_type": caller_type,
+        "context_profile_id": int(context_profile_id),
+        "user_id": int(user_id),
+        "person_id": int(person_id) if person_id is not None else None,
+    }
+    if resolution_cache is None:
+        return select_active_controller_config_sync(conn, **scope_kwargs) if conn is not None else None
+    cached = resolution_cache.config_for(**scope_kwargs)
+    if cached is not None or conn is None:
+        return cached
+    cfg = select_active_controller_config_sync(conn, **scope_kwargs)
+    resolution_cache.remember_config(cfg, **scope_kwargs)
+    return cfg
+
+
+_EPISODE_LOG_INSERT_SQL = """
+    INSERT INTO episode_logs (
+        timestamp_utc, context_profile_id, user_id, person_id, controller_config_id,
+        input_excerpt, assistant_output_excerpt,
+        retrieved_memory_ids_json, tags_json,
+        explicit_rating, implicit_signals_json, human_notes,
+        target_user_id, target_person_id, target_display_name, target_type, target_confidence, target_entity_key,
+        mode_requested, mode_inferred, mode_used,
+        dm_guidelines_version, dm_guidelines_source,
+        blocking_collab, critical_missing_fields_json, blocking_reason,
+        draft_version, draft_variant_id, prompt_fingerprint,
+        guild_id, channel_id, message_id, created_at_utc
+    ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+"""
+
+
+def _episode_log_row(payload: dict[str, Any], now: str) -> tuple:
+    return (
+        payload.get("timestamp_utc") or now,
+        payload.get("context_profile_id"),
+        payload.get("user_id"),
+        payload.get("person_id"),
+        payload.get("controller_config_id"),
+        payload.get("input_excerpt"),
+        payload.get("assistant_output_excerpt"),
+        _dumps(payload.get("retrieved_memory_ids", []), "[]"),
+        _dumps(payload.get("tags", []), "[]"),
+        payload.get("explicit_rating"),
+        _dumps(payload.get("implicit_signals", {}), "{}"),
+        payload.get("human_notes"),
+        payload.get("target_user_id"),
+        payload.get("target_person_id"),
+        payload.get("target_display_name"),
+        payload.get("target_type"),
+        payload.get("target_confidence"),
+        payload.get("target_entity_key"),
+        payload.get("mode_requested"),
+        payload.get("mode_inferred"),
+        payload.get("mode_used"),
+        payload.get("dm_guidelines_version"),
+        payload.get("dm_guidelines_source"),
+        int(1 if payload.get("blocking_collab") else 0),
+        _dumps(payload.get("critical_missing_fields", []), "[]"),
+        payload.get("blocking_reason"),
+        payload.get("draft_version"),
+        payload.get("draft_variant_id"),
+        payload.get("prompt_fingerprint"),
+        payload.get("guild_id"),
+        payload.get("channel_id"),
+        payload.get("message_id"),
+        payload.get("created_at_utc") or now,
+    )
+
+
 def insert_episode_log_sync(conn: sqlite3.Connection, payload: dict[str, Any]) -> int:
     cur = conn.cursor()
-    now = _utc_now_iso()
-    cur.execute(
-        """
-        INSERT INTO episode_logs (
-            timestamp_utc, context_profile_id, user_id, person_id, controller_config_id,
-            input_excerpt, assistant_output_excerpt,
-            retrieved_memory_ids_json, tags_json,
-            explicit_rating, implicit_signals_json, human_notes,
-            target_user_id, target_person_id, target_display_name, target_type, target_confidence, target_entity_key,
-            mode_requested, mode_inferred, mode_used,
-            dm_guidelines_version, dm_guidelines_source,
-            blocking_collab, critical_missing_fields_json, blocking_reason,
-            draft_version, draft_variant_id, prompt_fingerprint,
-            guild_id, channel_id, message_id, created_at_utc
-        ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-        """,
-        (
-            payload.get("timestamp_utc") or now,
-            payload.get("context_profile_id"),
-            payload.get("user_id"),
-            payload.get("person_id"),
-            payload.get("controller_config_id"),
-            payload.get("input_excerpt"),
-            payload.get("assistant_output_excerpt"),
-            _dumps(payload.get("retrieved_memory_ids", []), "[]"),
-            _dumps(payload.get("tags", []), "[]"),
-            payload.get("explicit_rating"),
-            _dumps(payload.get("implicit_signals", {}), "{}"),
-            payload.get("human_notes"),
-            payload.get("target_user_id"),
-            payload.get("target_person_id"),
-            payload.get("target_display_name"),
-            payload.get("target_type"),
-            payload.get("target_confidence"),
-            payload.get("target_entity_key"),
-            payload.get("mode_requested"),
-            payload.get("mode_inferred"),
-            payload.get("mode_used"),
-            payload.get("dm_guidelines_version"),
-            payload.get("dm_guidelines_source"),
-            int(1 if payload.get("blocking_collab") else 0),
-            _dumps(payload.get("critical_missing_fields", []), "[]"),
-            payload.get("blocking_reason"),
-            payload.get("draft_version"),
-            payload.get("draft_variant_id"),
-            payload.get("prompt_fingerprint"),
-            payload.get("guild_id"),
-            payload.get("channel_id"),
-            payload.get("message_id"),
-            now,
-        ),
-    )
+    cur.execute(_EPISODE_LOG_INSERT_SQL, _episode_log_row(payload, _utc_now_iso()))
     conn.commit()
     return int(cur.lastrowid)
 
 
+def insert_episode_logs_batch_sync(conn: sqlite3.Connection, payloads: list[dict[str, Any]]) -> int:
+    """Insert many episode logs in one transaction; rolls back and re-raises on error."""
+    if not payloads:
+        return 0
+    now = _utc_now_iso()
+    rows = [_episode_log_row(payload, now) for payload in payloads]
+    try:
+        conn.executemany(_EPISODE_LOG_INSERT_SQL, rows)
+        conn.commit()
+    except Exception:
+        conn.rollback()
+        raise
+    return len(rows)
+
+
 def fetch_episode_logs_sync(conn: sqlite3.Connection, limit: int = 20) -> list[dict[str, Any]]:
     cur = conn.cursor()
     cur.execute(
@@ -0,0 +1,45 @@
+"""Explicit read/write DB handles for runtime and command dependencies."""
+
+from __future__ import annotations
+
+import asyncio
+from typing import Any, Callable
+
+DB_MODE_READ = "read"
+DB_MODE_WRITE = "write"
+
+
+class DbHandles:
+    """Route `*_sync` store calls to the write connection or the read pool.
+
+    Writes always go through the primary connection under `db_lock`. Reads use
+    the read-only pool when one is configured and otherwise fall back to the
+    write path (in-memory DBs, tests, pool size 0).
+    """
+
+    def __init__(self, *, db_lock, db_conn, read_pool: Any = None):
+        self.db_lock = db_lock
+        self.db_conn = db_conn
+        self.read_pool = read_pool
+
+    @property
+    def has_read_pool(self) -> bool:
+        return self.read_pool is not None
+
+    async def write(self, fn: Callable[..., Any], *args, **kwargs) -> Any:
+        async with self.db_lock:
+            return await asyncio.to_thread(fn, self.db_conn, *args, **kwargs)
+
+    async def read(self, fn: Callable[..., Any], *args, **kwargs) -> Any:
+        if self.read_pool is None:
+            return await self.write(fn, *args, **kwargs)
+        return await self.read_pool.run(fn, *args, **kwargs)
+
+    def handle(self, mode: str) -> Callable[..., Any]:
+        """Return the runner for an explicit access mode ("read" or "write")."""
+        clean = str(mode or "").strip().lower()
+        if clean == DB_MODE_READ:
+            return self.read
+        if clean == DB_MODE_WRITE:
+            return self.write
+        raise ValueError(f"Unknown DB access mode: {mode!r}")
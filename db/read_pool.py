@@ -0,0 +1,92 @@
+"""Read-only SQLite connection pool.
+
+Each pooled connection is opened read-only and pinned to its own worker
+thread, so `*_sync` readers can run concurrently against the WAL database
+while writes stay serialized on the primary connection under `db_lock`.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import functools
+import sqlite3
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Callable
+
+
+@dataclass
+class _ReadSlot:
+    index: int
+    conn: sqlite3.Connection
+    executor: ThreadPoolExecutor
+
+
+def _open_read_only_connection(db_path: str) -> sqlite3.Connection:
+    uri = f"{Path(db_path).resolve().as_uri()}?mode=ro"
+    # The connection is created here but only ever used from its slot's
+    # single worker thread.
+    conn = sqlite3.connect(uri, uri=True, check_same_thread=False)
+    conn.execute("PRAGMA query_only=ON;")
+    return conn
+
+
+class ReadConnectionPool:
+    def __init__(self, db_path: str, *, size: int = 4):
+        self.db_path = str(db_path)
+        self.size = max(1, int(size))
+        self._slots: list[_ReadSlot] = []
+        self._idle: asyncio.Queue[_ReadSlot] = asyncio.Queue()
+        self._closed = False
+        self._stats_lock = threading.Lock()
+        self._reads_total = 0
+        self._in_use = 0
+        self._max_in_use = 0
+        for idx in range(self.size):
+            slot = _ReadSlot(
+                index=idx,
+                conn=_open_read_only_connection(self.db_path),
+                executor=ThreadPoolExecutor(max_workers=1, thread_name_prefix=f"epoxy-db-read-{idx}"),
+            )
+            self._slots.append(slot)
+            self._idle.put_nowait(slot)
+
+    async def run(self, fn: Callable[..., Any], *args, **kwargs) -> Any:
+        """Run `fn(conn, *args, **kwargs)` on a leased read-only connection."""
+        if self._closed:
+            raise RuntimeError("ReadConnectionPool is closed")
+        slot = await self._idle.get()
+        with self._stats_lock:
+            self._in_use += 1
+            self._max_in_use = max(self._max_in_use, self._in_use)
+        try:
+            loop = asyncio.get_running_loop()
+            call = functools.partial(fn, slot.conn, *args, **kwargs)
+            return await loop.run_in_executor(slot.executor, call)
+        finally:
+            with self._stats_lock:
+                self._in_use -= 1
+                self._reads_total += 1
+            self._idle.put_nowait(slot)
+
+    def stats(self) -> dict[str, int]:
+        with self._stats_lock:
+            return {
+                "size": self.size,
+                "in_use": self._in_use,
+                "max_in_use": self._max_in_use,
+                "reads_total": self._reads_total,
+            }
+
+    def close(self) -> None:
+        if self._closed:
+            return
+        self._closed = True
+        for slot in self._slots:
+            try:
+                slot.executor.submit(slot.conn.close).result(timeout=5)
+            except Exception:
+                pass
+            slot.executor.shutdown(wait=False)
@@ -4,11 +4,15 @@ import asyncio
 import json
 import os
 import sqlite3
+import time
 from typing import Any
 
 from db.migrate import apply_sqlite_migrations
+from memory.store import memory_content_hash
 from memory.store import search_memory_events_sync
 from memory.store import search_memory_summaries_sync
+from memory.store import write_memory_event_tags_sync
+from retrieval.fts_query import FtsTermStats
 from retrieval.fts_query import build_fts_query
 from retrieval.service import recall_memory
 
@@ -76,8 +80,21 @@ def _stage_at_least_factory(current_stage: str):
     return _stage_at_least
 
 
+# Representative ages for fixtures that declare a tier but no created_ts;
+# recall derives tier from created_ts, so the two must agree.
+_FIXTURE_TIER_AGE_SECONDS = {0: 3600, 1: 3 * 86400, 2: 30 * 86400, 3: 180 * 86400}
+
+
+def _fixture_created_ts(event: dict[str, Any], now: int) -> int:
+    if event.get("created_ts") is not None:
+        return int(event["created_ts"])
+    tier = _int_or_default(event.get("tier"), 1)
+    return now - _FIXTURE_TIER_AGE_SECONDS.get(tier, _FIXTURE_TIER_AGE_SECONDS[3])
+
+
 def _seed_memory_fixture(conn: sqlite3.Connection, fixture: dict[str, Any]) -> None:
     cur = conn.cursor()
+    now = int(time.time())
 
     for event in fixture.get("events", []):
         event_id = int(event["id"])
@@ -87,13 +104,13 @@ def _seed_memory_fixture(conn: sqlite3.Connection, fixture: dict[str, Any]) -> N
             """
             INSERT INTO memory_events (
                 id, created_at_utc, created_ts, scope, guild_id, channel_id, channel_name,
-                author_id, author_name, text, tags_json, importance, tier, lifecycle, topic_id
-            ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+                author_id, author_name, text, tags_json, importance, tier, lifecycle, topic_id, content_hash
+            ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
             """,
             (
                 event_id,
                 str(event.get("created_at_utc") or "2026-02-13T00:00:00+00:00"),
-                int(event.get("created_ts") or 1),
+                _fixture_created_ts(event, now),
                 str(event.get("scope") or "global"),
                 event.get("guild_id"),
                 event.get("channel_id"),
@@ -106,12 +123,10 @@ def _seed_memory_fixture(conn: sqlite3.Connection, fixture: dict[str, Any]) -> N
                 _int_or_default(event.get("tier"), 1),
                 str(event.get("lifecycle") or "active"),
                 event.get("topic_id"),
+                memory_content_hash(event.get("text")),
             ),
         )
-        cur.execute(
-            "INSERT INTO memory_events_fts(rowid, text, tags) VALUES (?, ?, ?)",
-            (event_id, str(event.get("text") or ""), " ".join(tags)),
-        )
+        write_memory_event_tags_sync(conn, memory_id=event_id, tags=tags)
 
     for summary in fixture.get("summaries", []):
         summary_id = int(summary["id"])
@@ -141,10 +156,6 @@ def _seed_memory_fixture(conn: sqlite3.Connection, fixture: dict[str, Any]) -> N
                 str(summary.get("lifecycle") or "active"),
             ),
         )
-        cur.execute(
-            "INSERT INTO memory_summaries_fts(rowid, topic_id, summary_text, tags) VALUES (?, ?, ?, ?)",
-            (summary_id, topic_id, summary_text, " ".join(tags)),
-        )
 
     conn.commit()
 
@@ -207,16 +218,29 @@ def _evaluate_case(case: dict[str, Any], events: list[dict[str, Any]], summaries
     if hit_forbidden:
         reasons.append(f"forbidden_tiers_present={hit_forbidden}")
 
+    event_recall = None
+    if case.get("expected_event_ids"):
+        expected_set = {int(v) for v in case.get("expected_event_ids", [])}
+        event_recall = round(len(expected_set.intersection(observed_event_ids)) / len(expected_set), 4)
+
     return {
         "name": name,
         "passed": len(reasons) == 0,
         "reasons": reasons,
+        "event_recall": event_recall,
         "observed_event_ids": observed_event_ids,
         "observed_summary_ids": observed_summary_ids,
         "observed_tiers": observed_tiers,
     }
 
 
+def _count_event_candidates(conn: sqlite3.Connection, fts_q: str) -> int:
+    if not fts_q:
+        return 0
+    row = conn.execute("SELECT COUNT(*) FROM memory_events_fts WHERE memory_events_fts MATCH ?", (fts_q,)).fetchone()
+    return int(row[0] or 0) if row else 0
+
+
 async def run_memory_recall_baseline(fixture: dict[str, Any]) -> dict[str, Any]:
     conn = sqlite3.connect(":memory:", check_same_thread=False)
     try:
@@ -225,6 +249,10 @@ async def run_memory_recall_baseline(fixture: dict[str, Any]) -> dict[str, Any]:
 
         stage_name = str(fixture.get("stage") or "M3").upper()
         stage_at_least = _stage_at_least_factory(stage_name)
+        event_terms = FtsTermStats(vocab_table="memory_events_fts_vocab", fts_table="memory_events_fts", ttl_seconds=0)
+        summary_terms = FtsTermStats(
+            vocab_table="memory_summaries_fts_vocab", fts_table="memory_summaries_fts", ttl_seconds=0
+        )
 
         def _search_events(_conn, query: str, scope: str, limit: int):
             return search_memory_events_sync(
@@ -232,7 +260,7 @@ async def run_memory_recall_baseline(fixture: dict[str, Any]) -> dict[str, Any]:
                 query,
                 scope,
                 int(limit),
-                build_fts_query=build_fts_query,
+                build_fts_query=event_terms.query_builder(_conn),
                 parse_recall_scope=_parse_recall_scope,
                 stage_at_least=stage_at_least,
                 safe_json_loads=_safe_json_loads,
@@ -244,7 +272,7 @@ async def run_memory_recall_baseline(fixture: dict[str, Any]) -> dict[str, Any]:
                 query,
                 scope,
                 int(limit),
-                build_fts_query=build_fts_query,
+                build_fts_query=summary_terms.query_builder(_conn),
                 parse_recall_scope=_parse_recall_scope,
                 safe_json_loads=_safe_json_loads,
             )
@@ -264,14 +292,22 @@ async def run_memory_recall_baseline(fixture: dict[str, Any]) -> dict[str, Any]:
                 search_memory_events_sync=_search_events,
                 search_memory_summaries_sync=_search_summaries,
             )
-            results.append(_evaluate_case(case, events, summaries))
+            result = _evaluate_case(case, events, summaries)
+            # Candidate-set size: FTS matches before any filtering or ranking.
+            result["candidate_events"] = _count_event_candidates(conn, event_terms.build_query(conn, prompt))
+            result["candidate_events_unselective"] = _count_event_candidates(conn, build_fts_query(prompt))
+            results.append(result)
 
         failed = [r for r in results if not r["passed"]]
+        recalls = [r["event_recall"] for r in results if r.get("event_recall") is not None]
         return {
             "stage": stage_name,
             "total": len(results),
             "failed": len(failed),
             "passed": len(failed) == 0,
+            "candidate_events_total": sum(r["candidate_events"] for r in results),
+            "candidate_events_unselective_total": sum(r["candidate_events_unselective"] for r in results),
+            "mean_event_recall": round(sum(recalls) / len(recalls), 4) if recalls else None,
             "results": results,
         }
     finally:
@@ -0,0 +1,164 @@
+"""In-memory ring buffer of recent messages per channel.
+
+Every logged message (live traffic and backfill) is added here as well as to
+`messages`, so mention context, reply anchors and `!ctxpeek` can be answered
+without touching SQLite.
+
+A channel only serves reads once it has been seeded from the DB (or has been
+shown to hold the channel's whole history). From then on the buffer is
+complete for every message id >= its `floor`, because every later message
+passes through `add`. Reads that reach below the floor return a miss and the
+caller falls back to the DB (and reseeds).
+"""
+
+from __future__ import annotations
+
+import bisect
+from collections import OrderedDict
+
+# Row layout: (message_id, author_id, created_at_utc, author_name, content)
+_ID, _AUTHOR_ID, _CREATED, _AUTHOR_NAME, _CONTENT = range(5)
+
+
+class _ChannelRing:
+    __slots__ = ("ids", "rows", "floor")
+
+    def __init__(self):
+        self.ids: list[int] = []
+        self.rows: list[tuple] = []
+        # None = not seeded (contents may have gaps); 0 = whole history held.
+        self.floor: int | None = None
+
+
+def _has_text(row: tuple) -> bool:
+    return bool(str(row[_CONTENT] or "").strip())
+
+
+class RecentMessageBuffer:
+    def __init__(self, *, per_channel: int = 200, max_channels: int = 64):
+        self.per_channel = max(1, int(per_channel))
+        self.max_channels = max(1, int(max_channels))
+        self._channels: OrderedDict[int, _ChannelRing] = OrderedDict()
+        self._hits = 0
+        self._misses = 0
+        self._seeds = 0
+
+    def _ring(self, channel_id: int, *, create: bool) -> _ChannelRing | None:
+        key = int(channel_id)
+        ring = self._channels.get(key)
+        if ring is None:
+            if not create:
+                return None
+            ring = _ChannelRing()
+            self._channels[key] = ring
+            while len(self._channels) > self.max_channels:
+                self._channels.popitem(last=False)
+        else:
+            self._channels.move_to_end(key)
+        return ring
+
+    def _insert(self, ring: _ChannelRing, row: tuple) -> None:
+        message_id = int(row[_ID])
+        pos = bisect.bisect_left(ring.ids, message_id)
+        if pos < len(ring.ids) and ring.ids[pos] == message_id:
+            return  # INSERT OR IGNORE semantics, same as `messages`
+        ring.ids.insert(pos, message_id)
+        ring.rows.insert(pos, row)
+        overflow = len(ring.ids) - self.per_channel
+        if overflow > 0:
+            del ring.ids[:overflow]
+            del ring.rows[:overflow]
+            if ring.floor is not None:
+                ring.floor = max(ring.floor, ring.ids[0])
+
+    def add(self, payload: dict) -> None:
+        """Record one `messages` payload (same dict `log_message` builds)."""
+        if payload.get("message_id") is None or payload.get("channel_id") is None:
+            return
+        row = (
+            int(payload["message_id"]),
+            int(payload["author_id"]) if payload.get("author_id") is not None else None,
+            str(payload.get("created_at_utc") or ""),
+            str(payload.get("author_name") or ""),
+            str(payload.get("content") or ""),
+        )
+        ring = self._ring(payload["channel_id"], create=True)
+        self._insert(ring, row)
+
+    def seed(self, channel_id: int, rows: list[tuple], *, complete_history: bool) -> None:
+        """Merge DB rows (newest first or any order) and mark the channel servable.
+
+        `complete_history` means the DB returned fewer rows than asked for, so
+        there is nothing older to miss.
+        """
+        ring = self._ring(channel_id, create=True)
+        for row in rows or []:
+            self._insert(ring, tuple(row))
+        if complete_history and len(ring.ids) < self.per_channel:
+            ring.floor = 0
+        else:
+            ring.floor = ring.ids[0] if ring.ids else 0
+        self._seeds += 1
+
+    def is_seeded(self, channel_id: int) -> bool:
+        ring = self._channels.get(int(channel_id))
+        return ring is not None and ring.floor is not None
+
+    def recent(self, channel_id: int, before_message_id: int, limit: int) -> list[tuple[str, str, str]] | None:
+        """Newest-first (created_at_utc, author_name, content) rows, or None on a miss."""
+        ring = self._ring(channel_id, create=False)
+        if ring is None or ring.floor is None:
+            self._misses += 1
+            return None
+        limit = max(0, int(limit))
+        end = bisect.bisect_left(ring.ids, int(before_message_id))
+        out: list[tuple[str, str, str]] = []
+        i = end - 1
+        while i >= 0 and len(out) < limit:
+            row = ring.rows[i]
+            if row[_ID] < ring.floor:
+                break
+            if _has_text(row):
+                out.append((row[_CREATED], row[_AUTHOR_NAME], row[_CONTENT]))
+            i -= 1
+        if len(out) < limit and ring.floor > 0:
+            # Ran into the floor before filling the window: older rows exist only on disk.
+            self._misses += 1
+            return None
+        self._hits += 1
+        return out
+
+    def last_by_author(
+        self,
+        channel_id: int,
+        before_message_id: int,
+        author_id: int,
+    ) -> tuple[bool, list[tuple[str, str, str]]]:
+        """Returns (hit, rows). On a hit, rows is [] or one (created, author, content) row."""
+        ring = self._ring(channel_id, create=False)
+        if ring is None or ring.floor is None:
+            self._misses += 1
+            return (False, [])
+        end = bisect.bisect_left(ring.ids, int(before_message_id))
+        for i in range(end - 1, -1, -1):
+            row = ring.rows[i]
+            if row[_ID] < ring.floor:
+                break
+            if row[_AUTHOR_ID] == int(author_id) and _has_text(row):
+                self._hits += 1
+                return (True, [(row[_CREATED], row[_AUTHOR_NAME], row[_CONTENT])])
+        if ring.floor > 0:
+            self._misses += 1
+            return (False, [])
+        self._hits += 1
+        return (True, [])
+
+    def stats(self) -> dict[str, int]:
+        return {
+            "channels": len(self._channels),
+            "seeded_channels": sum(1 for r in self._channels.values() if r.floor is not None),
+            "rows": sum(len(r.ids) for r in self._channels.values()),
+            "hits": self._hits,
+            "misses": self._misses,
+            "seeds": self._seeds,
+        }
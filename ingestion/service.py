@@ -4,6 +4,8 @@ import asyncio
 import re
 from typing import Any
 
+from llm.scheduler import PRIORITY_BACKGROUND
+from llm.scheduler import llm_priority
 from memory.tagging import normalize_memory_tags
 
 
@@ -13,6 +15,8 @@ async def log_message(
     db_lock,
     db_conn,
     insert_message_sync,
+    message_queue=None,
+    recent_buffer=None,
 ) -> None:
     attachments = ""
     if getattr(message, "attachments", None):
@@ -32,6 +36,13 @@ async def log_message(
         "attachments": attachments,
     }
 
+    if recent_buffer is not None:
+        recent_buffer.add(payload)
+
+    if message_queue is not None:
+        await message_queue.enqueue(payload)
+        return
+
     async with db_lock:
         await asyncio.to_thread(insert_message_sync, db_conn, payload)
 
@@ -45,6 +56,12 @@ async def maybe_auto_capture(
 ) -> None:
     if not (auto_capture and stage_at_least("M1")):
         return
+    # Topic suggestion during auto-capture is enrichment, not a reply.
+    with llm_priority(PRIORITY_BACKGROUND):
+        await _auto_capture(message, remember_event_func=remember_event_func)
+
+
+async def _auto_capture(message: Any, *, remember_event_func) -> None:
     content = (message.content or "").strip()
     if not content:
         return
@@ -98,6 +115,7 @@ async def backfill_channel(
     backfill_pause_seconds: float,
     bot_user: Any | None,
     mark_backfill_done_func,
+    flush_messages_func=None,
 ) -> None:
     if not hasattr(channel, "id"):
         return
@@ -140,5 +158,8 @@ async def backfill_channel(
         print(f"[Backfill] Error in channel {channel_id}: {e}")
         return
 
+    if flush_messages_func is not None:
+        # Only mark done once the buffered history is actually on disk.
+        await flush_messages_func()
     await mark_backfill_done_func(channel_id)
     print(f"[Backfill] Done channel {channel_id}. Logged {count} messages. BootstrapProcessed={captured}")
@@ -3,33 +3,52 @@ from __future__ import annotations
 import sqlite3
 
 
+_INSERT_MESSAGE_SQL = """
+    INSERT OR IGNORE INTO messages (
+        message_id, guild_id, guild_name,
+        channel_id, channel_name,
+        author_id, author_name,
+        created_at_utc, content, attachments
+    ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+"""
+
+
+def _message_row(payload: dict) -> tuple:
+    return (
+        payload["message_id"],
+        payload["guild_id"],
+        payload["guild_name"],
+        payload["channel_id"],
+        payload["channel_name"],
+        payload["author_id"],
+        payload["author_name"],
+        payload["created_at_utc"],
+        payload["content"],
+        payload["attachments"],
+    )
+
+
 def insert_message_sync(conn: sqlite3.Connection, payload: dict) -> None:
     cur = conn.cursor()
-    cur.execute(
-        """
-        INSERT OR IGNORE INTO messages (
-            message_id, guild_id, guild_name,
-            channel_id, channel_name,
-            author_id, author_name,
-            created_at_utc, content, attachments
-        ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-        """,
-        (
-            payload["message_id"],
-            payload["guild_id"],
-            payload["guild_name"],
-            payload["channel_id"],
-            payload["channel_name"],
-            payload["author_id"],
-            payload["author_name"],
-            payload["created_at_utc"],
-            payload["content"],
-            payload["attachments"],
-        ),
-    )
+    cur.execute(_INSERT_MESSAGE_SQL, _message_row(payload))
     conn.commit()
 
 
+def insert_messages_batch_sync(conn: sqlite3.Connection, payloads: list[dict]) -> int:
+    """Insert many message rows in one transaction (one commit per batch)."""
+    rows = [_message_row(p) for p in (payloads or [])]
+    if not rows:
+        return 0
+    cur = conn.cursor()
+    try:
+        cur.executemany(_INSERT_MESSAGE_SQL, rows)
+        conn.commit()
+    except Exception:
+        conn.rollback()
+        raise
+    return len(rows)
+
+
 def fetch_last_messages_by_author_sync(
     conn: sqlite3.Connection,
     channel_id: int,
@@ -55,6 +74,31 @@ def fetch_last_messages_by_author_sync(
     return cur.fetchall()
 
 
+def fetch_last_messages_by_author_id_sync(
+    conn: sqlite3.Connection,
+    channel_id: int,
+    before_message_id: int,
+    author_id: int,
+    limit: int = 1,
+) -> list[tuple[str, str, str]]:
+    cur = conn.cursor()
+    cur.execute(
+        """
+        SELECT created_at_utc, author_name, content
+        FROM messages
+        WHERE channel_id = ?
+          AND author_id = ?
+          AND message_id < ?
+          AND content IS NOT NULL
+          AND TRIM(content) != ''
+        ORDER BY message_id DESC
+        LIMIT ?
+        """,
+        (channel_id, author_id, before_message_id, limit),
+    )
+    return cur.fetchall()
+
+
 def get_backfill_done_sync(conn: sqlite3.Connection, channel_id: int) -> tuple[bool, str | None]:
     cur = conn.cursor()
     cur.execute(
@@ -125,6 +169,30 @@ def fetch_recent_context_sync(
     return cur.fetchall()
 
 
+def fetch_recent_message_rows_sync(
+    conn: sqlite3.Connection,
+    channel_id: int,
+    before_message_id: int,
+    limit: int,
+) -> list[tuple[int, int, str, str, str]]:
+    """Like `fetch_recent_context_sync`, with ids for seeding the recent-message buffer."""
+    cur = conn.cursor()
+    cur.execute(
+        """
+        SELECT message_id, author_id, created_at_utc, author_name, content
+        FROM messages
+        WHERE channel_id = ?
+          AND message_id < ?
+          AND content IS NOT NULL
+          AND TRIM(content) != ''
+        ORDER BY message_id DESC
+        LIMIT ?
+        """,
+        (channel_id, before_message_id, limit),
+    )
+    return cur.fetchall()
+
+
 def fetch_messages_since_sync(
     conn: sqlite3.Connection,
     channel_id: int,
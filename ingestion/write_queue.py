@@ -0,0 +1,185 @@
+"""Write-behind queue for `messages` ingestion.
+
+Rows are buffered in memory and group-committed with one `executemany`
+transaction when the buffer reaches `max_batch` rows or the oldest row has
+waited `flush_interval_seconds`. The buffer is bounded: once `max_pending`
+rows are waiting, `enqueue` flushes inline before accepting more (backpressure
+instead of unbounded growth).
+"""
+
+from __future__ import annotations
+
+import asyncio
+import time
+from typing import Any, Callable
+
+
+class MessageWriteQueue:
+    def __init__(
+        self,
+        *,
+        db_handles,
+        insert_messages_batch_sync: Callable[[Any, list[dict]], int],
+        max_batch: int = 200,
+        flush_interval_seconds: float = 0.5,
+        max_pending: int = 5000,
+        stats_log_interval_seconds: float = 300.0,
+    ):
+        self.db_handles = db_handles
+        self.insert_messages_batch_sync = insert_messages_batch_sync
+        self.max_batch = max(1, int(max_batch))
+        self.flush_interval_seconds = max(0.01, float(flush_interval_seconds))
+        self.max_pending = max(self.max_batch, int(max_pending))
+        self.stats_log_interval_seconds = max(0.0, float(stats_log_interval_seconds))
+        self._last_stats_log_at = time.monotonic()
+
+        self._pending: list[dict] = []
+        self._oldest_enqueued_at: float | None = None
+        self._flush_lock = asyncio.Lock()
+        self._wake = asyncio.Event()
+        self._task: asyncio.Task | None = None
+        self._closed = False
+
+        self._enqueued_total = 0
+        self._flushed_rows = 0
+        self._flush_count = 0
+        self._failed_flushes = 0
+        self._backpressure_waits = 0
+        self._dropped_rows = 0
+        self._max_depth = 0
+        self._last_flush_ms = 0.0
+        self._max_flush_ms = 0.0
+        self._total_flush_ms = 0.0
+
+    @property
+    def depth(self) -> int:
+        return len(self._pending)
+
+    def _ensure_started(self) -> None:
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._run(), name="epoxy-message-write-queue")
+
+    async def enqueue(self, payload: dict) -> None:
+        if self._closed:
+            # Late messages during shutdown are written directly.
+            await self.db_handles.write(self.insert_messages_batch_sync, [payload])
+            return
+        self._ensure_started()
+        while len(self._pending) >= self.max_pending:
+            self._backpressure_waits += 1
+            if await self.flush():
+                continue
+            if len(self._pending) >= self.max_pending:
+                # Flush is failing and the buffer is full: shed the oldest rows
+                # rather than stalling ingestion forever.
+                overflow = len(self._pending) - self.max_pending + 1
+                del self._pending[:overflow]
+                self._dropped_rows += overflow
+                print(f"[Ingest] Buffer full and flush failing; dropped {overflow} oldest rows")
+        if not self._pending:
+            self._oldest_enqueued_at = time.monotonic()
+        self._pending.append(payload)
+        self._enqueued_total += 1
+        self._max_depth = max(self._max_depth, len(self._pending))
+        if len(self._pending) >= self.max_batch:
+            self._wake.set()
+
+    async def flush(self) -> int:
+        """Write all currently buffered rows; returns rows written."""
+        async with self._flush_lock:
+            if not self._pending:
+                return 0
+            batch = self._pending
+            self._pending = []
+            self._oldest_enqueued_at = None
+            started = time.perf_counter()
+            try:
+                written = await self.db_handles.write(self.insert_messages_batch_sync, batch)
+            except Exception as e:
+                self._failed_flushes += 1
+                # Put the batch back in front so ordering survives a transient error.
+                self._pending = batch + self._pending
+                self._oldest_enqueued_at = time.monotonic()
+                print(f"[Ingest] Flush failed ({len(batch)} rows kept): {e}")
+                return 0
+            elapsed_ms = (time.perf_counter() - started) * 1000.0
+            self._flush_count += 1
+            self._flushed_rows += int(written or 0)
+            self._last_flush_ms = elapsed_ms
+            self._max_flush_ms = max(self._max_flush_ms, elapsed_ms)
+            self._total_flush_ms += elapsed_ms
+            return int(written or 0)
+
+    async def _run(self) -> None:
+        while not self._closed:
+            timeout = self.flush_interval_seconds
+            if self._oldest_enqueued_at is not None:
+                age = time.monotonic() - self._oldest_enqueued_at
+                timeout = max(0.0, self.flush_interval_seconds - age)
+            try:
+                await asyncio.wait_for(self._wake.wait(), timeout=timeout)
+            except asyncio.TimeoutError:
+                pass
+            self._wake.clear()
+            if self._pending:
+                await self.flush()
+            self._maybe_log_stats()
+
+    def _maybe_log_stats(self) -> None:
+        if self.stats_log_interval_seconds <= 0:
+            return
+        now = time.monotonic()
+        if now - self._last_stats_log_at < self.stats_log_interval_seconds:
+            return
+        self._last_stats_log_at = now
+        st = self.stats()
+        print(
+            f"[Ingest] queue depth={st['depth']} max_depth={st['max_depth']} "
+            f"flushes={st['flush_count']} rows={st['flushed_rows']} "
+            f"flush_ms(last/avg/max)={st['last_flush_ms']}/{st['avg_flush_ms']}/{st['max_flush_ms']} "
+            f"failed={st['failed_flushes']} backpressure={st['backpressure_waits']} dropped={st['dropped_rows']}"
+        )
+
+    async def close(self) -> None:
+        """Stop the background flusher and write anything still buffered."""
+        self._closed = True
+        self._wake.set()
+        if self._task is not None:
+            try:
+                await self._task
+            except Exception:
+                pass
+            self._task = None
+        await self.flush()
+
+    def drain_sync(self, conn) -> int:
+        """Last-chance flush after the event loop has stopped."""
+        self._closed = True
+        if not self._pending:
+            return 0
+        batch = self._pending
+        self._pending = []
+        try:
+            written = self.insert_messages_batch_sync(conn, batch)
+        except Exception as e:
+            self._dropped_rows += len(batch)
+            print(f"[Ingest] Shutdown drain failed ({len(batch)} rows lost): {e}")
+            return 0
+        self._flushed_rows += int(written or 0)
+        return int(written or 0)
+
+    def stats(self) -> dict[str, float | int]:
+        avg_ms = (self._total_flush_ms / self._flush_count) if self._flush_count else 0.0
+        return {
+            "depth": len(self._pending),
+            "max_depth": self._max_depth,
+            "enqueued_total": self._enqueued_total,
+            "flushed_rows": self._flushed_rows,
+            "flush_count": self._flush_count,
+            "failed_flushes": self._failed_flushes,
+            "backpressure_waits": self._backpressure_waits,
+            "dropped_rows": self._dropped_rows,
+            "last_flush_ms": round(self._last_flush_ms, 2),
+            "max_flush_ms": round(self._max_flush_ms, 2),
+            "avg_flush_ms": round(avg_ms, 2),
+        }
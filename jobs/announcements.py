@@ -2,6 +2,9 @@ from __future__ import annotations
 
 import asyncio
 
+from llm.scheduler import PRIORITY_BACKGROUND
+from llm.scheduler import set_llm_priority
+
 
 async def announcement_loop(
     *,
@@ -9,6 +12,7 @@ async def announcement_loop(
     announcement_service,
     interval_seconds: int = 30,
 ) -> None:
+    set_llm_priority(PRIORITY_BACKGROUND)
     while True:
         try:
             await announcement_service.run_tick(bot)
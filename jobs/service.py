@@ -1,9 +1,14 @@
 from __future__ import annotations
 
 import asyncio
+import hashlib
 import re
 import time
 
+from llm.gateway import chat_completion
+from llm.scheduler import PRIORITY_BACKGROUND
+from llm.scheduler import set_llm_priority
+
 
 def _canonical_summary_scope(scope: str | None) -> str:
     text = (scope or "").strip().lower()
@@ -21,6 +26,152 @@ def _canonical_summary_scope(scope: str | None) -> str:
     return "global"
 
 
+# Rough OpenAI-family ratio; only used to size chunks, never to bill.
+_CHARS_PER_TOKEN = 4
+# Bump whenever the summarizer prompts change so memoized summaries are redone.
+SUMMARY_PROMPT_VERSION = "topic_gist/2"
+_MEMO_STATS = {"memo_hits": 0, "llm_runs": 0}
+_SUMMARY_SYSTEM = (
+    "You are Epoxy's memory consolidator.\n"
+    "Your job: produce a compact, staff-usable topic summary from the event snippets.\n"
+    "Rules:\n"
+    "- Output 3-8 bullet points.\n"
+    "- Prefer decisions, constraints, and stable takeaways.\n"
+    "- Do NOT invent facts. If uncertain, say so.\n"
+    "- Keep it concise and operational.\n"
+)
+_CHUNK_SYSTEM = (
+    "You are Epoxy's memory consolidator.\n"
+    "Condense this slice of a topic's event snippets into 2-6 bullet notes.\n"
+    "Rules:\n"
+    "- Keep decisions, constraints, owners and dates; drop chatter.\n"
+    "- Do NOT invent facts. If uncertain, say so.\n"
+)
+
+
+class _EmptySummaryError(RuntimeError):
+    pass
+
+
+def estimate_tokens(text: str) -> int:
+    return len(text or "") // _CHARS_PER_TOKEN + 1
+
+
+def _event_line(event: dict) -> str:
+    when = event.get("created_at_utc") or ""
+    who = event.get("author_name") or ""
+    txt = " ".join((event.get("text") or "").split())
+    if len(txt) > 260:
+        txt = txt[:259] + "..."
+    return f"[{when}] {who}: {txt}"
+
+
+def chunk_by_token_budget(lines: list[str], token_budget: int) -> list[list[str]]:
+    """Split `lines` (in order) into consecutive batches of at most `token_budget` estimated tokens each."""
+    budget = max(1, int(token_budget))
+    chunks: list[list[str]] = []
+    current: list[str] = []
+    used = 0
+    for line in lines:
+        cost = estimate_tokens(line)
+        if current and used + cost > budget:
+            chunks.append(current)
+            current, used = [], 0
+        current.append(line)
+        used += cost
+    if current:
+        chunks.append(current)
+    return chunks
+
+
+def summary_prompt_hash(*, model: str, summary_text: str, lines: list[str], chunk_token_budget: int) -> str:
+    """
+    Deterministic key for folding `lines` (ordered event snippets, each led by
+    its event id) into `summary_text` with `model` under the current prompts.
+    """
+    h = hashlib.sha256()
+    for part in (SUMMARY_PROMPT_VERSION, model or "", str(int(chunk_token_budget)), summary_text or ""):
+        h.update(part.encode("utf-8"))
+        h.update(b"\x00")
+    for line in lines:
+        h.update(line.encode("utf-8"))
+        h.update(b"\x1e")
+    return h.hexdigest()
+
+
+def summary_memo_stats() -> dict[str, int]:
+    """Process-wide counts of summaries skipped by `prompt_hash` vs produced by the LLM."""
+    return dict(_MEMO_STATS)
+
+
+async def _complete(client, openai_model: str, system: str, user: str) -> str:
+    resp = await chat_completion(
+        client,
+        model=openai_model,
+        messages=[
+            {"role": "system", "content": system},
+            {"role": "user", "content": user},
+        ],
+    )
+    text = (resp.choices[0].message.content or "").strip()
+    if not text:
+        raise _EmptySummaryError("Summarizer returned empty output.")
+    return text
+
+
+async def map_reduce_summary(
+    topic_id: str,
+    lines: list[str],
+    *,
+    prior: str,
+    client,
+    openai_model: str,
+    chunk_token_budget: int,
+) -> tuple[str, int]:
+    """
+    Summarize `lines` (chronological event snippets) into an updated topic summary.
+
+    Lines that fit one budget go straight to the final prompt. Otherwise each
+    budget-sized chunk is condensed concurrently (the LLM scheduler's class cap
+    bounds how many run at once), and the partial notes are reduced level by
+    level until one batch remains for the final prompt with `prior`.
+    Returns `(summary_text, llm_calls)`; any failed call raises.
+    """
+    calls = 0
+    level = chunk_by_token_budget(lines, chunk_token_budget)
+    while len(level) > 1:
+        partials = await asyncio.gather(
+            *(
+                _complete(
+                    client,
+                    openai_model,
+                    _CHUNK_SYSTEM,
+                    f"Topic: {topic_id}\n\nSnippets (chronological):\n"
+                    + "\n".join(chunk)
+                    + "\n\nReturn only the bullet notes.",
+                )
+                for chunk in level
+            )
+        )
+        calls += len(level)
+        # Partial notes keep chronological order, so the next level chunks them the same way.
+        notes = [p.strip() for p in partials]
+        next_level = chunk_by_token_budget(notes, chunk_token_budget)
+        if len(next_level) >= len(level):
+            # Notes came back too long to shrink the level; pair them so the reduce still converges.
+            next_level = [notes[i : i + 2] for i in range(0, len(notes), 2)]
+        level = next_level
+    source_pack = "\n".join(level[0]) if level else ""
+    user = (
+        f"Topic: {topic_id}\n\n"
+        f"Existing summary (may be empty):\n{prior}\n\n"
+        f"New event snippets to incorporate (chronological):\n{source_pack}\n\n"
+        "Return only the updated bullet summary."
+    )
+    summary_text = await _complete(client, openai_model, _SUMMARY_SYSTEM, user)
+    return summary_text, calls + 1
+
+
 async def summarize_topic(
     topic_id: str,
     *,
@@ -39,7 +190,25 @@ async def summarize_topic(
     safe_json_dumps,
     upsert_summary_sync,
     mark_events_summarized_sync,
+    job_id: str | None = None,
+    max_events: int = 600,
+    chunk_token_budget: int = 1500,
 ) -> str:
+    """
+    Fold eligible events for `topic_id` into its summary and return the text.
+
+    Up to `max_events` events are summarized map-reduce style (see
+    `map_reduce_summary`), so every fetched event reaches the model and is
+    recorded in `covers_event_ids_json`.
+
+    The stored `prompt_hash` keys the resulting summary text with the events
+    folded into it; a run that would fold the same events into that same text
+    (same model and prompt version) only marks them summarized and skips the LLM.
+
+    Outcomes that are not worth retrying come back as messages. With `job_id`
+    (a run from the job queue) LLM failures raise so the queue can retry them,
+    and the id is stored on the summary row.
+    """
     if not stage_at_least("M3"):
         return "Memory stage is not M3; summaries are disabled."
 
@@ -51,58 +220,58 @@ async def summarize_topic(
 
     async with db_lock:
         existing = await asyncio.to_thread(get_topic_summary_sync, db_conn, topic_id, scope, summary_type)
-        events = await asyncio.to_thread(fetch_topic_events_sync, db_conn, topic_id, scope, min_age_days, 200)
+        events = await asyncio.to_thread(fetch_topic_events_sync, db_conn, topic_id, scope, min_age_days, max_events)
 
     if not events:
         if existing:
             return existing["summary_text"]
         return f"No eligible events to summarize for topic '{topic_id}'."
 
-    lines = []
-    for e in events:
-        when = e.get("created_at_utc") or ""
-        who = e.get("author_name") or ""
-        txt = " ".join((e.get("text") or "").split())
-        if len(txt) > 260:
-            txt = txt[:259] + "..."
-        lines.append(f"[{when}] {who}: {txt}")
-    source_pack = "\\n".join(lines)
-    if len(source_pack) > 6500:
-        source_pack = source_pack[:6500] + "\\n...(truncated)"
-
     prior = existing["summary_text"] if existing else ""
-    sys = (
-        "You are Epoxy's memory consolidator.\\n"
-        "Your job: produce a compact, staff-usable topic summary from the event snippets.\\n"
-        "Rules:\\n"
-        "- Output 3-8 bullet points.\\n"
-        "- Prefer decisions, constraints, and stable takeaways.\\n"
-        "- Do NOT invent facts. If uncertain, say so.\\n"
-        "- Keep it concise and operational.\\n"
-    )
-    user = (
-        f"Topic: {topic_id}\\n\\n"
-        f"Existing summary (may be empty):\\n{prior}\\n\\n"
-        f"New event snippets to incorporate (chronological):\\n{source_pack}\\n\\n"
-        "Return only the updated bullet summary."
-    )
+    event_ids = [e["id"] for e in events]
+    lines = [_event_line(e) for e in events]
+    hash_lines = [f"{int(e['id'])} {line}" for e, line in zip(events, lines)]
+    if existing and existing.get("prompt_hash") == summary_prompt_hash(
+        model=openai_model, summary_text=prior, lines=hash_lines, chunk_token_budget=chunk_token_budget
+    ):
+        _MEMO_STATS["memo_hits"] += 1
+        print(f"[Memory] summary memo hit topic={topic_id} events={len(events)}")
+        async with db_lock:
+            await asyncio.to_thread(mark_events_summarized_sync, db_conn, event_ids)
+        return prior
 
+    started = time.perf_counter()
     try:
-        resp = client.chat.completions.create(
-            model=openai_model,
-            messages=[
-                {"role": "system", "content": sys[:1900]},
-                {"role": "user", "content": user[:1900]},
-            ],
+        summary_text, calls = await map_reduce_summary(
+            topic_id,
+            lines,
+            prior=prior,
+            client=client,
+            openai_model=openai_model,
+            chunk_token_budget=chunk_token_budget,
         )
-        summary_text = (resp.choices[0].message.content or "").strip()
-        if not summary_text:
-            return "Summarizer returned empty output."
+    except _EmptySummaryError as e:
+        if job_id is not None:
+            raise
+        return str(e)
     except Exception as e:
+        if job_id is not None:
+            raise
         return f"Summarizer error: {e}"
+    _MEMO_STATS["llm_runs"] += 1
+    print(
+        f"[Memory] summarized topic={topic_id} events={len(events)} llm_calls={calls} "
+        f"ms={(time.perf_counter() - started) * 1000.0:.0f}"
+    )
 
     start_ts = min(e["created_ts"] for e in events)
     end_ts = max(e["created_ts"] for e in events)
+    covers = set(event_ids)
+    if existing:
+        covers.update(int(i) for i in existing.get("covers_event_ids") or [])
+        if existing.get("start_ts"):
+            start_ts = min(int(start_ts), int(existing["start_ts"]))
+        end_ts = max(int(end_ts), int(existing.get("end_ts") or 0))
     tags = normalize_tags([topic_id])
     payload = {
         "topic_id": topic_id,
@@ -115,8 +284,13 @@ async def summarize_topic(
         "tags_json": safe_json_dumps(tags),
         "importance": 1,
         "summary_text": summary_text,
+        "covers_event_ids_json": safe_json_dumps(sorted(covers)),
+        "generated_by_model": openai_model,
+        "prompt_hash": summary_prompt_hash(
+            model=openai_model, summary_text=summary_text, lines=hash_lines, chunk_token_budget=chunk_token_budget
+        ),
+        "job_id": job_id,
     }
-    event_ids = [e["id"] for e in events]
 
     async with db_lock:
         await asyncio.to_thread(upsert_summary_sync, db_conn, payload)
@@ -136,39 +310,89 @@ async def maintenance_loop(
     summarize_topic_func,
     interval_seconds: int = 3600,
     min_age_days: int = 14,
+    job_pool=None,
+    prune_jobs_sync=None,
+    job_retention_days: int = 7,
+    auto_summary_candidates_sync=None,
 ) -> None:
+    """
+    Hourly memory upkeep. With `job_pool` the loop only schedules: cleanup and
+    auto-summaries are enqueued as jobs (deduped per topic) and run by the pool.
+    `auto_summary_candidates_sync(conn, cutoff_ts=, limit=)` picks topics from
+    the materialized `topic_stats`; without it the events are grouped directly.
+    """
     if not stage_at_least("M1"):
         return
 
+    # Auto-summaries from this loop must never make a live mention wait.
+    set_llm_priority(PRIORITY_BACKGROUND)
+    memo_seen = summary_memo_stats()
     while True:
         try:
-            async with db_lock:
-                transitioned_events, transitioned_summaries = await asyncio.to_thread(cleanup_memory_sync, db_conn)
-            if transitioned_events or transitioned_summaries:
-                print(
-                    "[Memory] cleanup transitions "
-                    f"events={transitioned_events} summaries={transitioned_summaries} stage={memory_stage}"
-                )
+            if job_pool is not None:
+                await job_pool.enqueue("cleanup", {}, dedupe_key="cleanup")
+                if prune_jobs_sync is not None:
+                    async with db_lock:
+                        pruned = await asyncio.to_thread(
+                            prune_jobs_sync, db_conn, older_than_ts=int(time.time()) - job_retention_days * 86400
+                        )
+                    if pruned:
+                        print(f"[Jobs] pruned finished jobs n={pruned}")
+            else:
+                async with db_lock:
+                    transitioned_events, transitioned_summaries = await asyncio.to_thread(cleanup_memory_sync, db_conn)
+                if transitioned_events or transitioned_summaries:
+                    print(
+                        "[Memory] cleanup transitions "
+                        f"events={transitioned_events} summaries={transitioned_summaries} stage={memory_stage}"
+                    )
 
             if auto_summary and stage_at_least("M3"):
                 cutoff = int(time.time()) - min_age_days * 86400
                 async with db_lock:
-                    rows = await asyncio.to_thread(
-                        lambda c: c.execute(
-                            "SELECT topic_id, COUNT(*) as n FROM memory_events "
-                            "WHERE importance=1 AND summarized=0 AND created_ts < ? "
-                            "AND COALESCE(lifecycle, 'active')='active' "
-                            "AND topic_id IS NOT NULL AND topic_id != '' "
-                            "GROUP BY topic_id ORDER BY n DESC LIMIT 2",
-                            (cutoff,),
-                        ).fetchall(),
-                        db_conn,
-                    )
+                    if auto_summary_candidates_sync is not None:
+                        rows = await asyncio.to_thread(auto_summary_candidates_sync, db_conn, cutoff_ts=cutoff, limit=2)
+                    else:
+                        rows = await asyncio.to_thread(
+                            lambda c: c.execute(
+                                "SELECT topic_id, COUNT(*) as n FROM memory_events "
+                                "WHERE importance=1 AND summarized=0 AND created_ts < ? "
+                                "AND COALESCE(lifecycle, 'active')='active' "
+                                "AND topic_id IS NOT NULL AND topic_id != '' "
+                                "GROUP BY topic_id ORDER BY n DESC LIMIT 2",
+                                (cutoff,),
+                            ).fetchall(),
+                            db_conn,
+                        )
                 topics = [(t, int(n)) for (t, n) in rows if t]
                 for topic_id, n in topics:
+                    if job_pool is not None:
+                        job_id, created = await job_pool.enqueue(
+                            "summarize_topic",
+                            {
+                                "topic_id": topic_id,
+                                "scope": "auto",
+                                "summary_type": "topic_gist",
+                                "min_age_days": min_age_days,
+                            },
+                            dedupe_key=f"summarize_topic:{topic_id}:auto:topic_gist",
+                        )
+                        print(
+                            f"[Memory] auto-summary topic={topic_id} events={n} "
+                            f"job=#{job_id}{'' if created else ' (already queued)'}"
+                        )
+                        continue
                     print(f"[Memory] auto-summarizing topic={topic_id} events={n}")
                     _ = await summarize_topic_func(topic_id, min_age_days=min_age_days)
 
+            # Covers inline runs, queued jobs and `!summarize` since the previous tick.
+            memo_now = summary_memo_stats()
+            memo_hits = memo_now["memo_hits"] - memo_seen["memo_hits"]
+            llm_runs = memo_now["llm_runs"] - memo_seen["llm_runs"]
+            memo_seen = memo_now
+            if memo_hits or llm_runs:
+                print(f"[Memory] summaries since last tick llm_runs={llm_runs} memo_skips={memo_hits}")
+
         except Exception as e:
             print(f"[Memory] maintenance loop error: {e}")
 
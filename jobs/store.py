@@ -0,0 +1,274 @@
+from __future__ import annotations
+
+import json
+import sqlite3
+import time
+from typing import Any
+
+JOB_QUEUED = "queued"
+JOB_RUNNING = "running"
+JOB_DONE = "done"
+JOB_FAILED = "failed"
+
+
+def _now(now_ts: int | None) -> int:
+    return int(time.time()) if now_ts is None else int(now_ts)
+
+
+def enqueue_job_sync(
+    conn: sqlite3.Connection,
+    *,
+    job_type: str,
+    payload: dict[str, Any] | None = None,
+    dedupe_key: str | None = None,
+    max_attempts: int = 3,
+    delay_seconds: int = 0,
+    now_ts: int | None = None,
+) -> tuple[int, bool]:
+    """
+    Queue a job. Returns `(job_id, created)`; when `dedupe_key` matches a job
+    that is still queued or running, that job's id is returned instead.
+    """
+    now = _now(now_ts)
+    cur = conn.execute(
+        """
+        INSERT OR IGNORE INTO jobs (job_type, payload_json, dedupe_key, status, max_attempts, run_after_ts, created_ts)
+        VALUES (?, ?, ?, 'queued', ?, ?, ?)
+        """,
+        (
+            str(job_type),
+            json.dumps(payload or {}, sort_keys=True),
+            dedupe_key,
+            max(1, int(max_attempts)),
+            now + max(0, int(delay_seconds)),
+            now,
+        ),
+    )
+    if cur.rowcount:
+        conn.commit()
+        return int(cur.lastrowid), True
+    row = conn.execute(
+        "SELECT id FROM jobs WHERE dedupe_key = ? AND status IN ('queued', 'running') ORDER BY id DESC LIMIT 1",
+        (dedupe_key,),
+    ).fetchone()
+    return int(row[0]), False
+
+
+def recover_running_jobs_sync(conn: sqlite3.Connection) -> int:
+    """Requeue every running job; call once at startup, before any worker claims (single bot process)."""
+    cur = conn.execute(
+        """
+        UPDATE jobs
+        SET status = 'queued', lease_owner = NULL, lease_expires_ts = NULL
+        WHERE status = 'running'
+        """
+    )
+    conn.commit()
+    return int(cur.rowcount or 0)
+
+
+def claim_job_sync(
+    conn: sqlite3.Connection,
+    *,
+    worker_id: str,
+    lease_seconds: int,
+    job_types: list[str] | None = None,
+    now_ts: int | None = None,
+) -> dict[str, Any] | None:
+    """
+    Lease the next due job (oldest `run_after_ts` first) to `worker_id`.
+
+    Running jobs whose lease expired are reclaimable, except that a job that
+    has used all its attempts is failed instead of being run again.
+    """
+    now = _now(now_ts)
+    types = [str(t) for t in (job_types or [])]
+    type_sql = f"AND job_type IN ({','.join('?' for _ in types)})" if types else ""
+    conn.execute(
+        f"""
+        UPDATE jobs
+        SET status = 'failed', finished_ts = ?, lease_owner = NULL, lease_expires_ts = NULL,
+            last_error = COALESCE(last_error, 'lease expired')
+        WHERE status = 'running' AND lease_expires_ts < ? AND attempts >= max_attempts {type_sql}
+        """,
+        (now, now, *types),
+    )
+    row = conn.execute(
+        f"""
+        UPDATE jobs
+        SET status = 'running', attempts = attempts + 1, lease_owner = ?, lease_expires_ts = ?, started_ts = ?
+        WHERE id = (
+            SELECT id FROM jobs
+            WHERE ((status = 'queued' AND run_after_ts <= ?) OR (status = 'running' AND lease_expires_ts < ?))
+              {type_sql}
+            ORDER BY run_after_ts, id
+            LIMIT 1
+        )
+        RETURNING id, job_type, payload_json, attempts, max_attempts, dedupe_key
+        """,
+        (str(worker_id), now + max(1, int(lease_seconds)), now, now, now, *types),
+    ).fetchone()
+    conn.commit()
+    if row is None:
+        return None
+    try:
+        payload = json.loads(row[2] or "{}")
+    except Exception:
+        payload = {}
+    return {
+        "id": int(row[0]),
+        "job_type": row[1],
+        "payload": payload if isinstance(payload, dict) else {},
+        "attempts": int(row[3]),
+        "max_attempts": int(row[4]),
+        "dedupe_key": row[5],
+    }
+
+
+def save_job_payload_sync(
+    conn: sqlite3.Connection,
+    job_id: int,
+    *,
+    worker_id: str,
+    payload: dict[str, Any],
+) -> bool:
+    """
+    Persist a running job's payload (handler progress), so a retry resumes
+    instead of redoing side effects. False when the lease was lost.
+    """
+    cur = conn.execute(
+        "UPDATE jobs SET payload_json = ? WHERE id = ? AND status = 'running' AND lease_owner = ?",
+        (json.dumps(payload or {}, sort_keys=True), int(job_id), str(worker_id)),
+    )
+    conn.commit()
+    return bool(cur.rowcount)
+
+
+def complete_job_sync(
+    conn: sqlite3.Connection,
+    job_id: int,
+    *,
+    worker_id: str,
+    result_text: str | None = None,
+    now_ts: int | None = None,
+) -> bool:
+    """Mark a leased job done; False when the lease was lost to another worker."""
+    cur = conn.execute(
+        """
+        UPDATE jobs
+        SET status = 'done', finished_ts = ?, result_text = ?, lease_owner = NULL, lease_expires_ts = NULL
+        WHERE id = ? AND status = 'running' AND lease_owner = ?
+        """,
+        (_now(now_ts), (result_text or "")[:500], int(job_id), str(worker_id)),
+    )
+    conn.commit()
+    return bool(cur.rowcount)
+
+
+def fail_job_sync(
+    conn: sqlite3.Connection,
+    job_id: int,
+    *,
+    worker_id: str,
+    error: str,
+    backoff_base_seconds: int = 30,
+    backoff_max_seconds: int = 3600,
+    now_ts: int | None = None,
+) -> str | None:
+    """
+    Record a failed attempt: requeue with exponential backoff (base * 2^(attempt-1),
+    capped) while attempts remain, else fail for good. Returns the new status,
+    or None when the lease was lost.
+    """
+    now = _now(now_ts)
+    row = conn.execute(
+        "SELECT attempts, max_attempts FROM jobs WHERE id = ? AND status = 'running' AND lease_owner = ?",
+        (int(job_id), str(worker_id)),
+    ).fetchone()
+    if row is None:
+        return None
+    attempts, max_attempts = int(row[0]), int(row[1])
+    if attempts >= max_attempts:
+        conn.execute(
+            """
+            UPDATE jobs
+            SET status = 'failed', finished_ts = ?, last_error = ?, lease_owner = NULL, lease_expires_ts = NULL
+            WHERE id = ?
+            """,
+            (now, str(error)[:500], int(job_id)),
+        )
+        status = JOB_FAILED
+    else:
+        delay = min(int(backoff_max_seconds), int(backoff_base_seconds) * (2 ** max(0, attempts - 1)))
+        conn.execute(
+            """
+            UPDATE jobs
+            SET status = 'queued', run_after_ts = ?, last_error = ?, lease_owner = NULL, lease_expires_ts = NULL
+            WHERE id = ?
+            """,
+            (now + max(0, delay), str(error)[:500], int(job_id)),
+        )
+        status = JOB_QUEUED
+    conn.commit()
+    return status
+
+
+def job_stats_sync(conn: sqlite3.Connection, *, since_ts: int, now_ts: int | None = None) -> list[dict[str, Any]]:
+    """
+    Per job type: queue depth (queued / due now), running, done and failed
+    since `since_ts`, average run seconds of those done jobs, retried jobs
+    and the most recent error.
+    """
+    now = _now(now_ts)
+    rows = conn.execute(
+        """
+        SELECT job_type,
+               SUM(status = 'queued'),
+               SUM(status = 'queued' AND run_after_ts <= ?),
+               SUM(status = 'running'),
+               SUM(status = 'done' AND finished_ts >= ?),
+               SUM(status = 'failed' AND finished_ts >= ?),
+               AVG(CASE WHEN status = 'done' AND finished_ts >= ? THEN finished_ts - started_ts END),
+               SUM(attempts > 1 AND (status IN ('queued', 'running') OR finished_ts >= ?))
+        FROM jobs
+        WHERE status IN ('queued', 'running') OR finished_ts >= ?
+        GROUP BY job_type
+        ORDER BY job_type
+        """,
+        (now, since_ts, since_ts, since_ts, since_ts, since_ts),
+    ).fetchall()
+    out: list[dict[str, Any]] = []
+    for job_type, queued, due, running, done, failed, avg_run, retried in rows:
+        last = conn.execute(
+            """
+            SELECT last_error FROM jobs
+            WHERE job_type = ? AND last_error IS NOT NULL
+            ORDER BY COALESCE(finished_ts, started_ts, created_ts) DESC, id DESC
+            LIMIT 1
+            """,
+            (job_type,),
+        ).fetchone()
+        out.append(
+            {
+                "job_type": job_type,
+                "queued": int(queued or 0),
+                "due": int(due or 0),
+                "running": int(running or 0),
+                "done": int(done or 0),
+                "failed": int(failed or 0),
+                "avg_run_seconds": round(float(avg_run), 1) if avg_run is not None else None,
+                "retried": int(retried or 0),
+                "last_error": last[0] if last else None,
+            }
+        )
+    return out
+
+
+def prune_jobs_sync(conn: sqlite3.Connection, *, older_than_ts: int) -> int:
+    """Delete finished (done/failed) jobs that finished before `older_than_ts`."""
+    cur = conn.execute(
+        "DELETE FROM jobs WHERE status IN ('done', 'failed') AND finished_ts < ?",
+        (int(older_than_ts),),
+    )
+    conn.commit()
+    return int(cur.rowcount or 0)
@@ -0,0 +1,172 @@
+from __future__ import annotations
+
+import asyncio
+import os
+import time
+from typing import Any, Awaitable, Callable
+
+from jobs.store import claim_job_sync
+from jobs.store import complete_job_sync
+from jobs.store import enqueue_job_sync
+from jobs.store import fail_job_sync
+from jobs.store import recover_running_jobs_sync
+from jobs.store import save_job_payload_sync
+from llm.scheduler import PRIORITY_BACKGROUND
+from llm.scheduler import set_llm_priority
+
+JobHandler = Callable[[dict[str, Any], dict[str, Any]], Awaitable[str | None]]
+
+
+class JobWorkerPool:
+    """
+    Bounded set of asyncio workers draining the `jobs` table.
+
+    Handlers are registered per job type and called as `handler(payload, job)`;
+    a returned string is stored as the job result, an exception (or running
+    past `lease_seconds`) counts as a failed attempt and is retried with
+    backoff. Handlers with side effects call `checkpoint(job, payload)` after
+    each one, so the retry sees their progress. All DB access goes through
+    `db_handles.write`.
+    """
+
+    def __init__(
+        self,
+        *,
+        db_handles,
+        workers: int = 2,
+        lease_seconds: int = 600,
+        poll_seconds: float = 5.0,
+        max_attempts: int = 3,
+        backoff_base_seconds: int = 30,
+        backoff_max_seconds: int = 3600,
+    ):
+        self.db = db_handles
+        self.workers = max(1, int(workers))
+        self.lease_seconds = max(10, int(lease_seconds))
+        self.poll_seconds = max(0.05, float(poll_seconds))
+        self.max_attempts = max(1, int(max_attempts))
+        self.backoff_base_seconds = max(0, int(backoff_base_seconds))
+        self.backoff_max_seconds = max(0, int(backoff_max_seconds))
+        self._handlers: dict[str, JobHandler] = {}
+        self._tasks: list[asyncio.Task] = []
+        self._wake = asyncio.Event()
+        self._in_flight: dict[int, tuple[str, float]] = {}
+        self._worker_prefix = f"{os.getpid()}-{int(time.time())}"
+
+    def register(self, job_type: str, handler: JobHandler) -> None:
+        self._handlers[str(job_type)] = handler
+
+    @property
+    def started(self) -> bool:
+        return bool(self._tasks)
+
+    async def start(self) -> int:
+        """Requeue jobs orphaned by the previous process and spawn the workers; returns jobs recovered."""
+        if self._tasks:
+            return 0
+        recovered = await self.db.write(recover_running_jobs_sync)
+        self._tasks = [asyncio.create_task(self._worker(n)) for n in range(self.workers)]
+        return int(recovered or 0)
+
+    async def stop(self) -> None:
+        tasks, self._tasks = self._tasks, []
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+
+    async def enqueue(
+        self,
+        job_type: str,
+        payload: dict[str, Any] | None = None,
+        *,
+        dedupe_key: str | None = None,
+        delay_seconds: int = 0,
+    ) -> tuple[int, bool]:
+        job_id, created = await self.db.write(
+            enqueue_job_sync,
+            job_type=job_type,
+            payload=payload,
+            dedupe_key=dedupe_key,
+            max_attempts=self.max_attempts,
+            delay_seconds=delay_seconds,
+        )
+        if created and delay_seconds <= 0:
+            self._wake.set()
+        return job_id, created
+
+    async def checkpoint(self, job: dict[str, Any], payload: dict[str, Any]) -> bool:
+        """Store `payload` as the job's payload while the calling worker still holds its lease."""
+        return bool(
+            await self.db.write(
+                save_job_payload_sync,
+                int(job["id"]),
+                worker_id=str(job["worker_id"]),
+                payload=payload,
+            )
+        )
+
+    async def _worker(self, n: int) -> None:
+        # Job LLM calls queue behind live mentions unless a handler says otherwise.
+        set_llm_priority(PRIORITY_BACKGROUND)
+        worker_id = f"{self._worker_prefix}-{n}"
+        while True:
+            try:
+                self._wake.clear()
+                job = await self.db.write(
+                    claim_job_sync,
+                    worker_id=worker_id,
+                    lease_seconds=self.lease_seconds,
+                    job_types=sorted(self._handlers),
+                )
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                print(f"[Jobs] claim error worker={worker_id}: {e}")
+                job = None
+            if job is None:
+                try:
+                    await asyncio.wait_for(self._wake.wait(), timeout=self.poll_seconds)
+                except asyncio.TimeoutError:
+                    pass
+                continue
+            await self._run(job, worker_id)
+
+    async def _run(self, job: dict[str, Any], worker_id: str) -> None:
+        job_id = int(job["id"])
+        job_type = str(job["job_type"])
+        self._in_flight[job_id] = (job_type, time.monotonic())
+        job["worker_id"] = worker_id
+        try:
+            result = await asyncio.wait_for(self._handlers[job_type](job["payload"], job), timeout=self.lease_seconds)
+        except asyncio.CancelledError:
+            # Shutdown: the lease lapses and the next start() requeues the job.
+            raise
+        except Exception as e:
+            error = f"{type(e).__name__}: {e}" if str(e) else type(e).__name__
+            status = await self.db.write(
+                fail_job_sync,
+                job_id,
+                worker_id=worker_id,
+                error=error,
+                backoff_base_seconds=self.backoff_base_seconds,
+                backoff_max_seconds=self.backoff_max_seconds,
+            )
+            print(
+                f"[Jobs] {job_type} #{job_id} attempt {job['attempts']}/{job['max_attempts']} failed: {error} "
+                f"-> {status or 'lease lost'}"
+            )
+        else:
+            await self.db.write(complete_job_sync, job_id, worker_id=worker_id, result_text=result)
+        finally:
+            self._in_flight.pop(job_id, None)
+
+    def stats(self) -> dict[str, Any]:
+        now = time.monotonic()
+        return {
+            "workers": len(self._tasks),
+            "job_types": sorted(self._handlers),
+            "in_flight": [
+                {"id": job_id, "job_type": job_type, "running_seconds": round(now - started, 1)}
+                for job_id, (job_type, started) in sorted(self._in_flight.items())
+            ],
+        }
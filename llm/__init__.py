@@ -0,0 +1 @@
+"""Shared LLM access."""
@@ -0,0 +1,146 @@
+"""Async LLM gateway.
+
+Every chat-completion call site goes through `chat_completion(client, ...)`.
+In production `client` is an `LLMGateway` wrapping one shared `AsyncOpenAI`
+instance (one HTTP connection pool). Tests and smoke scripts can pass any
+object with the OpenAI shape (`client.chat.completions.create`), sync or
+async; sync stubs are run off the event loop.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import inspect
+import time
+from contextlib import nullcontext
+from typing import Any
+
+
+class LLMTimeoutError(RuntimeError):
+    pass
+
+
+def _is_async_callable(fn) -> bool:
+    # openai's AsyncCompletions.create is a sync-looking decorator around an
+    # async def, so unwrap before checking.
+    return inspect.iscoroutinefunction(fn) or inspect.iscoroutinefunction(inspect.unwrap(fn))
+
+
+async def _call_create(create, *, timeout: float | None, kwargs: dict) -> Any:
+    if _is_async_callable(create):
+        call = create(**kwargs)
+    else:
+        # Sync clients/stubs must never block the gateway heartbeat.
+        call = asyncio.to_thread(create, **kwargs)
+    if timeout is None or timeout <= 0:
+        return await call
+    try:
+        return await asyncio.wait_for(call, timeout=float(timeout))
+    except asyncio.TimeoutError as e:
+        raise LLMTimeoutError(f"LLM call timed out after {float(timeout):.1f}s") from e
+
+
+class LLMGateway:
+    def __init__(
+        self,
+        *,
+        client: Any,
+        default_timeout_seconds: float = 60.0,
+        scheduler: Any = None,
+    ):
+        self.client = client
+        self.default_timeout_seconds = float(default_timeout_seconds)
+        self.scheduler = scheduler
+        self._calls = 0
+        self._errors = 0
+        self._timeouts = 0
+        self._cancelled = 0
+        self._total_latency_ms = 0.0
+        self._max_latency_ms = 0.0
+
+    async def chat_completion(
+        self,
+        *,
+        model: str,
+        messages: list[dict],
+        timeout: float | None = None,
+        priority: str | None = None,
+        **kwargs,
+    ) -> Any:
+        """Run one chat completion; cancelling the awaiting task cancels the request.
+
+        With a scheduler attached, the call first waits for a slot in its
+        priority class (explicit `priority`, else the caller's context class).
+        The timeout covers the model call only, not queue time.
+        """
+        effective_timeout = self.default_timeout_seconds if timeout is None else float(timeout)
+        slot = self.scheduler.slot(priority) if self.scheduler is not None else nullcontext()
+        async with slot:
+            return await self._timed_call(model=model, messages=messages, timeout=effective_timeout, kwargs=kwargs)
+
+    async def _timed_call(self, *, model: str, messages: list[dict], timeout: float, kwargs: dict) -> Any:
+        started = time.perf_counter()
+        self._calls += 1
+        try:
+            return await _call_create(
+                self.client.chat.completions.create,
+                timeout=timeout,
+                kwargs={"model": model, "messages": messages, **kwargs},
+            )
+        except LLMTimeoutError:
+            self._timeouts += 1
+            raise
+        except asyncio.CancelledError:
+            self._cancelled += 1
+            raise
+        except Exception:
+            self._errors += 1
+            raise
+        finally:
+            elapsed_ms = (time.perf_counter() - started) * 1000.0
+            self._total_latency_ms += elapsed_ms
+            self._max_latency_ms = max(self._max_latency_ms, elapsed_ms)
+
+    def stats(self) -> dict[str, Any]:
+        avg_ms = (self._total_latency_ms / self._calls) if self._calls else 0.0
+        out = {
+            "calls": self._calls,
+            "errors": self._errors,
+            "timeouts": self._timeouts,
+            "cancelled": self._cancelled,
+            "avg_latency_ms": round(avg_ms, 2),
+            "max_latency_ms": round(self._max_latency_ms, 2),
+        }
+        if self.scheduler is not None:
+            out["scheduler"] = self.scheduler.stats()
+        return out
+
+    async def close(self) -> None:
+        closer = getattr(self.client, "close", None)
+        if closer is None:
+            return
+        result = closer()
+        if inspect.isawaitable(result):
+            await result
+
+
+async def chat_completion(
+    client: Any,
+    *,
+    model: str,
+    messages: list[dict],
+    timeout: float | None = None,
+    priority: str | None = None,
+    **kwargs,
+) -> Any:
+    """Route a chat completion through the gateway (or an OpenAI-shaped stand-in)."""
+    if client is None:
+        raise RuntimeError("LLM client is not configured")
+    gateway_call = getattr(client, "chat_completion", None)
+    if callable(gateway_call):
+        return await gateway_call(model=model, messages=messages, timeout=timeout, priority=priority, **kwargs)
+    return await _call_create(
+        client.chat.completions.create,
+        timeout=timeout,
+        kwargs={"model": model, "messages": messages, **kwargs},
+    )
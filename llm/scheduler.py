@@ -0,0 +1,205 @@
+"""Prioritized LLM request scheduler.
+
+Three priority classes share the model:
+- `interactive`: mention replies and DM drafts (a person is waiting in chat)
+- `operator`: staff commands (`!mine`, `!summarize`, `!announce.generate`, ...)
+- `background`: maintenance auto-summaries, announcement ticks, auto-capture enrichment
+
+Admission rules:
+- each class has its own concurrency cap,
+- one shared token bucket rate-limits all classes,
+- waiters are admitted highest-priority first (FIFO within a class),
+- background work yields while interactive load (queued + in flight) is at or
+  above `background_yield_at`.
+
+The active class is carried in a context variable so shared services
+(`summarize_topic`, `suggest_topic_id`, announcement drafting) inherit the
+caller's class without extra parameters. Unset means `operator`.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import contextvars
+import itertools
+import time
+from contextlib import asynccontextmanager
+from contextlib import contextmanager
+
+PRIORITY_INTERACTIVE = "interactive"
+PRIORITY_OPERATOR = "operator"
+PRIORITY_BACKGROUND = "background"
+
+PRIORITY_RANK = {
+    PRIORITY_INTERACTIVE: 0,
+    PRIORITY_OPERATOR: 1,
+    PRIORITY_BACKGROUND: 2,
+}
+
+_current_priority: contextvars.ContextVar[str] = contextvars.ContextVar(
+    "epoxy_llm_priority",
+    default=PRIORITY_OPERATOR,
+)
+
+
+def normalize_priority(priority: str | None) -> str:
+    clean = str(priority or "").strip().lower()
+    return clean if clean in PRIORITY_RANK else PRIORITY_OPERATOR
+
+
+def current_llm_priority() -> str:
+    return _current_priority.get()
+
+
+def set_llm_priority(priority: str) -> contextvars.Token:
+    """Set the class for the rest of the current task (use in long-lived loops)."""
+    return _current_priority.set(normalize_priority(priority))
+
+
+@contextmanager
+def llm_priority(priority: str):
+    token = _current_priority.set(normalize_priority(priority))
+    try:
+        yield
+    finally:
+        _current_priority.reset(token)
+
+
+class _ClassStats:
+    def __init__(self, cap: int):
+        self.cap = max(1, int(cap))
+        self.in_flight = 0
+        self.waiting = 0
+        self.submitted = 0
+        self.completed = 0
+        self.yielded = 0
+        self.total_queue_ms = 0.0
+        self.max_queue_ms = 0.0
+        self.last_queue_ms = 0.0
+
+
+class LLMScheduler:
+    def __init__(
+        self,
+        *,
+        interactive_limit: int = 4,
+        operator_limit: int = 2,
+        background_limit: int = 1,
+        rate_per_minute: float = 120.0,
+        burst: int = 10,
+        background_yield_at: int = 1,
+    ):
+        self._classes = {
+            PRIORITY_INTERACTIVE: _ClassStats(interactive_limit),
+            PRIORITY_OPERATOR: _ClassStats(operator_limit),
+            PRIORITY_BACKGROUND: _ClassStats(background_limit),
+        }
+        self.rate_per_second = max(0.0, float(rate_per_minute)) / 60.0
+        self.burst = max(1, int(burst))
+        self.background_yield_at = max(0, int(background_yield_at))
+        self._tokens = float(self.burst)
+        self._tokens_at = time.monotonic()
+        self._waiters: list[tuple[int, int, str]] = []
+        self._seq = itertools.count()
+        self._cond = asyncio.Condition()
+
+    def _refill(self) -> None:
+        if self.rate_per_second <= 0:
+            self._tokens = float(self.burst)
+            return
+        now = time.monotonic()
+        elapsed = max(0.0, now - self._tokens_at)
+        self._tokens = min(float(self.burst), self._tokens + elapsed * self.rate_per_second)
+        self._tokens_at = now
+
+    def _interactive_load(self) -> int:
+        st = self._classes[PRIORITY_INTERACTIVE]
+        return st.in_flight + st.waiting
+
+    def _background_should_yield(self) -> bool:
+        return self.background_yield_at > 0 and self._interactive_load() >= self.background_yield_at
+
+    def _has_capacity(self, priority: str) -> bool:
+        st = self._classes[priority]
+        if st.in_flight >= st.cap:
+            return False
+        if priority == PRIORITY_BACKGROUND and self._background_should_yield():
+            return False
+        return True
+
+    def _next_admissible(self) -> tuple[int, int, str] | None:
+        # Best-ranked waiter whose class can run now; a full class does not
+        # block lower classes that still have capacity.
+        for ticket in sorted(self._waiters):
+            if self._has_capacity(ticket[2]):
+                return ticket
+        return None
+
+    @asynccontextmanager
+    async def slot(self, priority: str | None = None):
+        cls = normalize_priority(priority if priority is not None else current_llm_priority())
+        st = self._classes[cls]
+        ticket = (PRIORITY_RANK[cls], next(self._seq), cls)
+        enqueued_at = time.monotonic()
+        yielded_once = False
+
+        async with self._cond:
+            self._waiters.append(ticket)
+            st.waiting += 1
+            st.submitted += 1
+            try:
+                while True:
+                    self._refill()
+                    if self._next_admissible() == ticket and self._tokens >= 1.0:
+                        break
+                    if cls == PRIORITY_BACKGROUND and not yielded_once and self._background_should_yield():
+                        st.yielded += 1
+                        yielded_once = True
+                    timeout = None
+                    if self._tokens < 1.0 and self.rate_per_second > 0:
+                        timeout = (1.0 - self._tokens) / self.rate_per_second
+                    try:
+                        await asyncio.wait_for(self._cond.wait(), timeout=timeout)
+                    except asyncio.TimeoutError:
+                        pass
+            except BaseException:
+                self._waiters.remove(ticket)
+                st.waiting -= 1
+                self._cond.notify_all()
+                raise
+            self._waiters.remove(ticket)
+            st.waiting -= 1
+            st.in_flight += 1
+            self._tokens -= 1.0
+            # The next waiter in line may also be admissible now.
+            self._cond.notify_all()
+
+        queue_ms = (time.monotonic() - enqueued_at) * 1000.0
+        st.last_queue_ms = queue_ms
+        st.max_queue_ms = max(st.max_queue_ms, queue_ms)
+        st.total_queue_ms += queue_ms
+        try:
+            yield
+        finally:
+            async with self._cond:
+                st.in_flight -= 1
+                st.completed += 1
+                self._cond.notify_all()
+
+    def stats(self) -> dict[str, dict[str, float | int]]:
+        out: dict[str, dict[str, float | int]] = {}
+        for name, st in self._classes.items():
+            admitted = st.submitted - st.waiting
+            avg_ms = (st.total_queue_ms / admitted) if admitted > 0 else 0.0
+            out[name] = {
+                "cap": st.cap,
+                "in_flight": st.in_flight,
+                "waiting": st.waiting,
+                "submitted": st.submitted,
+                "completed": st.completed,
+                "yielded": st.yielded,
+                "last_queue_ms": round(st.last_queue_ms, 2),
+                "avg_queue_ms": round(avg_ms, 2),
+                "max_queue_ms": round(st.max_queue_ms, 2),
+            }
+        return out
@@ -4,6 +4,9 @@ import sqlite3
 from typing import Any
 from typing import Callable
 
+from memory.store import bump_memory_write_generation
+from memory.store import write_memory_event_tags_sync
+
 
 class MemoryLifecycleError(RuntimeError):
     def __init__(self, code: str, message: str):
@@ -199,15 +202,7 @@ def approve_memory_sync(
             ),
         )
 
-        cur.execute("DELETE FROM memory_events_fts WHERE rowid = ?", (int(memory_id),))
-        cur.execute(
-            "INSERT INTO memory_events_fts(rowid, text, tags) VALUES (?, ?, ?)",
-            (
-                int(memory_id),
-                str(before_row.get("text") or ""),
-                " ".join(next_tags),
-            ),
-        )
+        write_memory_event_tags_sync(conn, memory_id=int(memory_id), tags=next_tags)
 
         after_row = _fetch_memory_row_by_id(cur, int(memory_id))
         if after_row is None:
@@ -228,6 +223,7 @@ def approve_memory_sync(
         )
 
         conn.commit()
+        bump_memory_write_generation()
         return after_snapshot
     except Exception:
         conn.rollback()
@@ -295,7 +291,113 @@ def reject_memory_sync(
         )
 
         conn.commit()
+        bump_memory_write_generation()
         return after_snapshot
     except Exception:
         conn.rollback()
         raise
+
+
+def merge_memory_events_sync(
+    conn: sqlite3.Connection,
+    *,
+    survivor_id: int,
+    duplicate_ids: list[int],
+    actor_person_id: int | None,
+    reason: str | None = None,
+    utc_now_iso: Callable[[], str],
+    safe_json_loads: Callable[[str], Any],
+    safe_json_dumps: Callable[[Any], str],
+) -> dict[str, Any]:
+    """
+    Fold near-duplicate events into `survivor_id` and deprecate them.
+
+    The survivor gains the union of tags, the highest importance and a topic if
+    it had none; each duplicate becomes `deprecated` with a review note naming
+    the survivor. Every changed row gets a `merge` audit entry.
+    """
+    now_iso = str(utc_now_iso())
+    dup_ids = [int(x) for x in duplicate_ids if int(x) != int(survivor_id)]
+    conn.execute("BEGIN")
+    try:
+        cur = conn.cursor()
+        survivor_before = _fetch_memory_row_by_id(cur, int(survivor_id))
+        if survivor_before is None:
+            raise MemoryLifecycleError("not_found", f"memory #{int(survivor_id)} not found")
+        if str(survivor_before.get("lifecycle") or "active").strip().lower() == "deprecated":
+            raise MemoryLifecycleError("deprecated", "survivor memory is deprecated")
+
+        survivor_snapshot = _normalize_memory_row(survivor_before, safe_json_loads=safe_json_loads)
+        tags = list(survivor_snapshot["tags"])
+        importance = float(survivor_snapshot["importance"])
+        topic_id = survivor_before.get("topic_id")
+        clean_reason = str(reason).strip() if reason and str(reason).strip() else None
+        note = f"merged into #{int(survivor_id)}" + (f": {clean_reason}" if clean_reason else "")
+
+        merged: list[int] = []
+        for dup_id in dup_ids:
+            before_row = _fetch_memory_row_by_id(cur, dup_id)
+            if before_row is None or str(before_row.get("lifecycle") or "active").strip().lower() == "deprecated":
+                continue
+            before_snapshot = _normalize_memory_row(before_row, safe_json_loads=safe_json_loads)
+            tags += [tag for tag in before_snapshot["tags"] if tag not in tags]
+            importance = max(importance, float(before_snapshot["importance"]))
+            topic_id = topic_id or before_row.get("topic_id")
+            cur.execute(
+                """
+                UPDATE memory_events
+                SET lifecycle = 'deprecated',
+                    updated_at_utc = ?,
+                    reviewed_by_user_id = ?,
+                    reviewed_at_utc = ?,
+                    review_note = ?
+                WHERE id = ?
+                """,
+                (
+                    now_iso,
+                    int(actor_person_id) if actor_person_id is not None else None,
+                    now_iso,
+                    note,
+                    dup_id,
+                ),
+            )
+            after_row = _fetch_memory_row_by_id(cur, dup_id) or before_row
+            write_memory_audit_sync(
+                conn,
+                memory_id=dup_id,
+                action="merge",
+                actor_person_id=actor_person_id,
+                before_obj=before_snapshot,
+                after_obj=_normalize_memory_row(after_row, safe_json_loads=safe_json_loads),
+                reason=note,
+                created_at_utc=now_iso,
+                safe_json_dumps=safe_json_dumps,
+            )
+            merged.append(dup_id)
+
+        if merged:
+            cur.execute(
+                "UPDATE memory_events SET tags_json = ?, importance = ?, topic_id = ?, updated_at_utc = ? WHERE id = ?",
+                (safe_json_dumps(tags), float(importance), topic_id, now_iso, int(survivor_id)),
+            )
+            write_memory_event_tags_sync(conn, memory_id=int(survivor_id), tags=tags)
+            survivor_after = _fetch_memory_row_by_id(cur, int(survivor_id)) or survivor_before
+            write_memory_audit_sync(
+                conn,
+                memory_id=int(survivor_id),
+                action="merge",
+                actor_person_id=actor_person_id,
+                before_obj=survivor_snapshot,
+                after_obj=_normalize_memory_row(survivor_after, safe_json_loads=safe_json_loads),
+                reason=f"absorbed {', '.join('#' + str(x) for x in merged)}",
+                created_at_utc=now_iso,
+                safe_json_dumps=safe_json_dumps,
+            )
+
+        conn.commit()
+        if merged:
+            bump_memory_write_generation()
+        return {"survivor_id": int(survivor_id), "merged_ids": merged, "tags": tags, "importance": importance}
+    except Exception:
+        conn.rollback()
+        raise
@@ -1,10 +1,27 @@
 from __future__ import annotations
 
 import re
+from dataclasses import dataclass
 from typing import Any
 
+from memory.meta_store import PolicyBundleCache
 
-def format_policy_directive(policy_bundle: dict[str, Any] | None, *, max_chars: int = 550) -> str:
+_MENTION_RE = re.compile(r"<@!?(\d{8,20})>")
+_MEMBER_CALLER_TYPES = {"member", "external"}
+
+
+def format_policy_directive(
+    policy_bundle: dict[str, Any] | None,
+    *,
+    max_chars: int = 550,
+    policy_cache: PolicyBundleCache | None = None,
+) -> str:
+    if policy_cache is not None:
+        return policy_cache.derived(
+            policy_bundle,
+            ("directive", int(max_chars)),
+            lambda: format_policy_directive(policy_bundle, max_chars=max_chars),
+        )
     if not isinstance(policy_bundle, dict):
         return ""
     policies = policy_bundle.get("policies")
@@ -24,38 +41,67 @@ def format_policy_directive(policy_bundle: dict[str, Any] | None, *, max_chars:
     return text[:max_chars] if len(text) > max_chars else text
 
 
-def apply_policy_enforcement(
-    reply: str,
-    *,
+@dataclass(frozen=True)
+class PolicyEnforcementProgram:
+    """Enforcement steps compiled once per (bundle, caller_type, surface)."""
+
+    redact_mentions: bool = False
+
+    def apply(self, reply: str, *, author_id: int | None) -> tuple[str, list[str]]:
+        text = str(reply or "")
+        applied: list[str] = []
+        if not text:
+            return text, applied
+
+        if self.redact_mentions:
+            keep = str(int(author_id)) if author_id is not None else None
+
+            def _redact(match: re.Match) -> str:
+                return match.group(0) if match.group(1) == keep else "[redacted-user]"
+
+            next_text = _MENTION_RE.sub(_redact, text)
+            if next_text != text:
+                text = next_text
+                applied.append("redact_discord_mentions")
+
+        return text, applied
+
+
+def compile_policy_enforcement(
     policy_bundle: dict[str, Any] | None,
-    author_id: int | None,
+    *,
     caller_type: str,
     surface: str,
-) -> tuple[str, list[str]]:
-    text = str(reply or "")
-    applied: list[str] = []
-    if not text:
-        return text, applied
-
+) -> PolicyEnforcementProgram:
     enforcement = {}
     if isinstance(policy_bundle, dict):
         enforcement = policy_bundle.get("enforcement") or {}
     if not isinstance(enforcement, dict):
         enforcement = {}
 
-    member_facing = str(caller_type or "").strip().lower() in {"member", "external"} or str(surface or "") == "public_channel"
-
-    if member_facing and (
+    member_facing = str(caller_type or "").strip().lower() in _MEMBER_CALLER_TYPES or str(surface or "") == "public_channel"
+    redact = member_facing and (
         bool(enforcement.get("no_cross_member_private_disclosure"))
         or bool(enforcement.get("redact_discord_mentions_in_member_context"))
-    ):
-        if author_id is not None:
-            pattern = rf"<@!?((?!{int(author_id)})\d{{8,20}})>"
-        else:
-            pattern = r"<@!?\d{8,20}>"
-        next_text = re.sub(pattern, "[redacted-user]", text)
-        if next_text != text:
-            text = next_text
-            applied.append("redact_discord_mentions")
-
-    return text, applied
+    )
+    return PolicyEnforcementProgram(redact_mentions=redact)
+
+
+def apply_policy_enforcement(
+    reply: str,
+    *,
+    policy_bundle: dict[str, Any] | None,
+    author_id: int | None,
+    caller_type: str,
+    surface: str,
+    policy_cache: PolicyBundleCache | None = None,
+) -> tuple[str, list[str]]:
+    if policy_cache is not None:
+        program = policy_cache.derived(
+            policy_bundle,
+            ("enforcement", str(caller_type or ""), str(surface or "")),
+            lambda: compile_policy_enforcement(policy_bundle, caller_type=caller_type, surface=surface),
+        )
+    else:
+        program = compile_policy_enforcement(policy_bundle, caller_type=caller_type, surface=surface)
+    return program.apply(reply, author_id=author_id)
@@ -2,11 +2,29 @@ from __future__ import annotations
 
 import json
 import sqlite3
+import threading
+import time
 from typing import Any
 
 
 _PRIORITY_ORDER = {"critical": 0, "high": 1, "medium": 2, "low": 3}
 
+# Bumped by every `meta_items` write in this process; policy caches compare
+# against it instead of re-reading the table.
+_meta_generation = 0
+_meta_generation_lock = threading.Lock()
+
+
+def meta_items_generation() -> int:
+    return _meta_generation
+
+
+def bump_meta_items_generation() -> int:
+    global _meta_generation
+    with _meta_generation_lock:
+        _meta_generation += 1
+        return _meta_generation
+
 
 def _loads(value: str | None, fallback: Any) -> Any:
     if not value:
@@ -74,6 +92,7 @@ def upsert_meta_item_sync(conn: sqlite3.Connection, payload: dict[str, Any]) ->
             ),
         )
         conn.commit()
+        bump_meta_items_generation()
         return int(item_id)
 
     cur.execute(
@@ -115,6 +134,7 @@ def upsert_meta_item_sync(conn: sqlite3.Connection, payload: dict[str, Any]) ->
             ),
         )
         conn.commit()
+        bump_meta_items_generation()
         return meta_id
 
     cur.execute(
@@ -145,6 +165,7 @@ def upsert_meta_item_sync(conn: sqlite3.Connection, payload: dict[str, Any]) ->
         ),
     )
     conn.commit()
+    bump_meta_items_generation()
     return int(cur.lastrowid)
 
 
@@ -242,6 +263,8 @@ def resolve_policy_bundle_sync(
     caller_scope = f"caller_type:{(caller_type or '').strip() or 'member'}"
     surface_scope = f"surface:{(surface or '').strip() or 'public_channel'}"
     scopes = [policy_scope, caller_scope, surface_scope, "global", "policy:default"]
+    # Read before the query so a concurrent write can only make the bundle look stale.
+    generation = meta_items_generation()
 
     cur = conn.cursor()
     scope_placeholders = ",".join("?" for _ in scopes)
@@ -296,4 +319,133 @@ def resolve_policy_bundle_sync(
         "policies": policies,
         "policy_ids": [int(p["id"]) for p in policies],
         "enforcement": enforcement,
+        "limit": int(limit),
+        "generation": generation,
+    }
+
+
+class PolicyBundleCache:
+    """In-process memo of resolved policy bundles and what is derived from them.
+
+    Entries are keyed by `(sensitivity_policy_id, caller_type, surface, limit)`
+    and tagged with the `meta_items` generation they were resolved at; any
+    `upsert_meta_item_sync` in this process bumps the generation and so
+    retires every entry. `ttl_seconds` bounds staleness for edits made outside
+    the process. Cached bundles are shared, so callers must treat them as
+    read-only.
+
+    `derived(bundle, slot, build)` memoizes per-bundle artifacts (the formatted
+    directive, the compiled enforcement program) alongside the bundle.
+    """
+
+    def __init__(self, *, max_entries: int = 256, ttl_seconds: float = 300.0):
+        self.max_entries = max(1, int(max_entries))
+        self.ttl_seconds = max(0.0, float(ttl_seconds))
+        self._entries: dict[tuple, tuple[dict[str, Any], float, dict[Any, Any]]] = {}
+        self._lock = threading.Lock()
+        self._hits = 0
+        self._misses = 0
+        self._derived_hits = 0
+        self._derived_misses = 0
+        self._invalidations = 0
+
+    @staticmethod
+    def _key(*, sensitivity_policy_id: str, caller_type: str, surface: str, limit: int = 20) -> tuple:
+        return (
+            (sensitivity_policy_id or "").strip() or "policy:default",
+            (caller_type or "").strip() or "member",
+            (surface or "").strip() or "public_channel",
+            int(limit),
+        )
+
+    def _live(self, entry, generation: int) -> bool:
+        if entry is None or entry[0].get("generation") != generation:
+            return False
+        return not (self.ttl_seconds > 0 and time.monotonic() - entry[1] > self.ttl_seconds)
+
+    def bundle_for(self, **scope_kwargs) -> dict[str, Any] | None:
+        key = self._key(**scope_kwargs)
+        generation = meta_items_generation()
+        with self._lock:
+            entry = self._entries.get(key)
+            if not self._live(entry, generation):
+                self._entries.pop(key, None)
+                self._misses += 1
+                return None
+            self._hits += 1
+            return entry[0]
+
+    def remember_bundle(self, bundle: dict[str, Any], **scope_kwargs) -> None:
+        key = self._key(**scope_kwargs)
+        with self._lock:
+            if len(self._entries) >= self.max_entries and key not in self._entries:
+                self._entries.clear()
+            self._entries[key] = (bundle, time.monotonic(), {})
+
+    def derived(self, bundle: dict[str, Any] | None, slot: Any, build):
+        """Return `build()` memoized against a bundle this cache handed out.
+
+        Bundles that did not come from the cache (or whose entry has since been
+        retired) are built every time.
+        """
+        entry = None
+        if isinstance(bundle, dict):
+            key = self._key(
+                sensitivity_policy_id=str(bundle.get("policy_scope") or ""),
+                caller_type=str(bundle.get("caller_type") or ""),
+                surface=str(bundle.get("surface") or ""),
+                limit=int(bundle.get("limit") or 20),
+            )
+            with self._lock:
+                entry = self._entries.get(key)
+                if entry is not None and entry[0] is bundle and slot in entry[2]:
+                    self._derived_hits += 1
+                    return entry[2][slot]
+                self._derived_misses += 1
+        value = build()
+        if entry is not None and entry[0] is bundle:
+            with self._lock:
+                entry[2][slot] = value
+        return value
+
+    def invalidate(self) -> None:
+        with self._lock:
+            self._invalidations += 1
+            self._entries.clear()
+
+    def stats(self) -> dict[str, int]:
+        with self._lock:
+            return {
+                "entries": len(self._entries),
+                "hits": self._hits,
+                "misses": self._misses,
+                "derived_hits": self._derived_hits,
+                "derived_misses": self._derived_misses,
+                "invalidations": self._invalidations,
+                "generation": meta_items_generation(),
+            }
+
+
+def resolve_policy_bundle_cached_sync(
+    conn: sqlite3.Connection,
+    *,
+    sensitivity_policy_id: str,
+    caller_type: str,
+    surface: str,
+    limit: int = 20,
+    policy_cache: PolicyBundleCache | None = None,
+) -> dict[str, Any]:
+    scope_kwargs = {
+        "sensitivity_policy_id": sensitivity_policy_id,
+        "caller_type": caller_type,
+        "surface": surface,
+        "limit": limit,
     }
+    if policy_cache is not None:
+        cached = policy_cache.bundle_for(**scope_kwargs)
+        if cached is not None:
+            return cached
+    bundle = resolve_policy_bundle_sync(conn, **scope_kwargs)
+    if policy_cache is not None:
+        policy_cache.remember_bundle(bundle, **scope_kwargs)
+    return bundle
@@ -0,0 +1,78 @@
+from __future__ import annotations
+
+import hashlib
+import random
+import re
+from array import array
+
+from retrieval.fts_query import STOPWORDS
+
+# 64 MinHash permutations split into 16 bands of 4 rows: two memories land in
+# a shared bucket with probability 1-(1-J^4)^16 (~0.89 at J=0.6, ~0.9998 at J=0.8).
+NUM_PERM = 64
+BANDS = 16
+ROWS_PER_BAND = NUM_PERM // BANDS
+# Below this many distinct content words a Jaccard estimate is mostly noise;
+# short memories rely on the exact `content_hash` match instead.
+MIN_TOKENS = 3
+
+_MERSENNE_PRIME = (1 << 61) - 1
+_MAX_HASH = 0xFFFFFFFF
+_rng = random.Random(0x5EED)
+_PERMUTATIONS: tuple[tuple[int, int], ...] = tuple(
+    (_rng.randrange(1, _MERSENNE_PRIME), _rng.randrange(0, _MERSENNE_PRIME)) for _ in range(NUM_PERM)
+)
+_TOKEN_RE = re.compile(r"[a-z0-9_]+")
+
+
+def content_tokens(text: str | None) -> set[str]:
+    """Distinct lowercased words of `text`, minus stopwords and 1-2 letter words (numbers are kept)."""
+    return {
+        t
+        for t in _TOKEN_RE.findall((text or "").lower())
+        if (len(t) >= 3 or t.isdigit()) and t not in STOPWORDS
+    }
+
+
+def _token_hash(token: str) -> int:
+    return int.from_bytes(hashlib.blake2b(token.encode("utf-8"), digest_size=8).digest(), "little")
+
+
+def minhash_signature(text: str | None) -> tuple[int, ...] | None:
+    """MinHash of the content-word set, or None when `text` is too short to compare."""
+    tokens = content_tokens(text)
+    if len(tokens) < MIN_TOKENS:
+        return None
+    hashes = [_token_hash(t) for t in tokens]
+    return tuple(
+        min(((a * h + b) % _MERSENNE_PRIME) & _MAX_HASH for h in hashes) for a, b in _PERMUTATIONS
+    )
+
+
+def estimate_similarity(a: tuple[int, ...], b: tuple[int, ...]) -> float:
+    """Estimated Jaccard similarity of the word sets behind two signatures."""
+    if not a or not b or len(a) != len(b):
+        return 0.0
+    return sum(1 for x, y in zip(a, b) if x == y) / len(a)
+
+
+def band_keys(signature: tuple[int, ...], scope: str) -> list[int]:
+    """One signed 64-bit bucket key per band; the scope is folded in so lookups never cross scopes."""
+    keys: list[int] = []
+    for band in range(BANDS):
+        rows = array("I", signature[band * ROWS_PER_BAND : (band + 1) * ROWS_PER_BAND]).tobytes()
+        digest = hashlib.blake2b(f"{scope}\x00{band}\x00".encode("utf-8") + rows, digest_size=8).digest()
+        keys.append(int.from_bytes(digest, "little", signed=True))
+    return keys
+
+
+def pack_signature(signature: tuple[int, ...]) -> bytes:
+    return array("I", signature).tobytes()
+
+
+def unpack_signature(blob: bytes | None) -> tuple[int, ...]:
+    if not blob:
+        return ()
+    values = array("I")
+    values.frombytes(bytes(blob))
+    return tuple(values)
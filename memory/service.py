@@ -5,6 +5,7 @@ import json
 import re
 from typing import Any
 
+from llm.gateway import chat_completion
 from memory.tagging import extract_kind
 from memory.tagging import extract_topics
 from memory.tagging import normalize_memory_tags
@@ -16,10 +17,21 @@ async def get_topic_candidates(
     db_lock,
     db_conn,
     list_known_topics_sync,
+    topic_registry=None,
 ) -> list[str]:
-    """Return candidate topic_ids to choose from (allowlist preferred; else known topics)."""
+    """
+    Return candidate topic_ids to choose from (allowlist preferred; else known topics).
+
+    With `topic_registry` the known topics come from its in-process copy, ordered
+    by recency or frequency; SQLite is only read when it is due for a reload.
+    """
     if topic_allowlist:
         return list(topic_allowlist)[:40]
+    if topic_registry is not None:
+        if topic_registry.needs_load():
+            async with db_lock:
+                await asyncio.to_thread(topic_registry.load, db_conn)
+        return topic_registry.candidates(40)
     async with db_lock:
         known = await asyncio.to_thread(list_known_topics_sync, db_conn, 200)
     return list(known)[:40]
@@ -94,7 +106,8 @@ async def suggest_topic_id(
     user = f"Candidates: {cand_pack}\n\nSnippet: {snippet}\n"
 
     try:
-        resp = client.chat.completions.create(
+        resp = await chat_completion(
+            client,
             model=openai_model,
             messages=[
                 {"role": "system", "content": sys[:1900]},
@@ -190,6 +203,10 @@ async def remember_event(
     infer_tier,
     safe_json_dumps,
     insert_memory_event_sync,
+    merge_duplicate_memory_event_sync=None,
+    find_near_duplicate_memory_events_sync=None,
+    near_duplicate_mode: str = "flag",
+    topic_registry=None,
 ) -> dict | None:
     if not stage_at_least("M1"):
         return None
@@ -218,6 +235,7 @@ async def remember_event(
             db_lock=db_lock,
             db_conn=db_conn,
             list_known_topics_sync=list_known_topics_sync,
+            topic_registry=topic_registry,
         )
         sug, conf = await suggest_topic_id(
             text,
@@ -312,8 +330,43 @@ async def remember_event(
     if not payload["text"]:
         return None
 
+    duplicate = None
+    near_duplicate: dict | None = None
     async with db_lock:
-        mem_id = await asyncio.to_thread(insert_memory_event_sync, db_conn, payload)
+        if merge_duplicate_memory_event_sync is not None:
+            duplicate = await asyncio.to_thread(merge_duplicate_memory_event_sync, db_conn, payload)
+        if duplicate is None and find_near_duplicate_memory_events_sync is not None:
+            matches = await asyncio.to_thread(find_near_duplicate_memory_events_sync, db_conn, payload)
+            if matches:
+                near_duplicate = {"id": int(matches[0][0]), "similarity": round(float(matches[0][1]), 3)}
+                if near_duplicate_mode == "merge" and merge_duplicate_memory_event_sync is not None:
+                    duplicate = await asyncio.to_thread(
+                        merge_duplicate_memory_event_sync,
+                        db_conn,
+                        payload,
+                        target_id=near_duplicate["id"],
+                    )
+                if duplicate is None:
+                    # Flag only: keep the write, but record what it resembles.
+                    provenance["near_duplicate_of"] = str(near_duplicate["id"])
+                    payload["provenance_json"] = safe_json_dumps(provenance)
+        if duplicate is None:
+            mem_id = await asyncio.to_thread(insert_memory_event_sync, db_conn, payload)
+
+    if duplicate is not None:
+        # Same (or near-same) text already remembered in this scope; it absorbed
+        # our tags/importance.
+        return {
+            "id": int(duplicate["id"]),
+            "lifecycle": duplicate.get("lifecycle") or lifecycle,
+            "topic_id": duplicate.get("topic_id"),
+            "topic_source": duplicate.get("topic_source"),
+            "topic_confidence": duplicate.get("topic_confidence"),
+            "type": memory_type,
+            "tags": duplicate.get("tags") or tags,
+            "deduplicated": True,
+            "near_duplicate_of": near_duplicate,
+        }
 
     return {
         "id": int(mem_id),
@@ -323,4 +376,6 @@ async def remember_event(
         "topic_confidence": topic_confidence,
         "type": memory_type,
         "tags": tags,
+        "deduplicated": False,
+        "near_duplicate_of": near_duplicate,
     }
@@ -1,10 +1,39 @@
 from __future__ import annotations
 
+import hashlib
 import re
 import sqlite3
+import threading
 import time
 from typing import Any, Callable
 
+from memory.near_dupe import band_keys
+from memory.near_dupe import estimate_similarity
+from memory.near_dupe import minhash_signature
+from memory.near_dupe import pack_signature
+from memory.near_dupe import unpack_signature
+from memory.tiers import COLD_MAX_AGE_SECONDS
+from memory.tiers import created_ts_bounds
+from memory.tiers import tier_sql
+from retrieval.vector_index import reciprocal_rank_fusion
+from retrieval.vector_index import write_vector_sync
+
+# Bumped by every write that can change what recall returns; read caches (see
+# retrieval.service.RecallCache) compare it to retire entries.
+_memory_write_generation = 0
+_memory_write_generation_lock = threading.Lock()
+
+
+def memory_write_generation() -> int:
+    return _memory_write_generation
+
+
+def bump_memory_write_generation() -> int:
+    global _memory_write_generation
+    with _memory_write_generation_lock:
+        _memory_write_generation += 1
+        return _memory_write_generation
+
 
 def _normalize_importance_value(raw: Any, *, default: float = 0.5) -> float:
     try:
@@ -18,6 +47,209 @@ def _normalize_importance_value(raw: Any, *, default: float = 0.5) -> float:
     return float(value)
 
 
+def memory_content_hash(text: str | None) -> str:
+    """SHA1 of case/whitespace-normalized memory text; the exact-duplicate key."""
+    norm = re.sub(r"\s+", " ", (text or "").strip().lower())
+    return hashlib.sha1(norm.encode("utf-8")).hexdigest()
+
+
+def _clean_tags(tags: Any) -> list[str]:
+    if not isinstance(tags, list):
+        return []
+    out: list[str] = []
+    seen: set[str] = set()
+    for tag in tags:
+        clean = str(tag or "").strip().lower()
+        if clean and clean not in seen:
+            seen.add(clean)
+            out.append(clean)
+    return out
+
+
+def write_memory_event_tags_sync(conn: sqlite3.Connection, *, memory_id: int, tags: list[Any]) -> None:
+    """Replace the `memory_event_tags` rows for one event (no commit).
+
+    Mirrors `tags_json` (lowercased, like the old case-insensitive LIKE match);
+    call wherever `tags_json` is written, inside the same transaction.
+    """
+    conn.execute("DELETE FROM memory_event_tags WHERE memory_id = ?", (int(memory_id),))
+    rows = [(int(memory_id), tag) for tag in _clean_tags(tags)]
+    if rows:
+        conn.executemany("INSERT OR IGNORE INTO memory_event_tags(memory_id, tag) VALUES (?, ?)", rows)
+
+
+def write_memory_event_minhash_sync(conn: sqlite3.Connection, *, memory_id: int, scope: str, text: str | None) -> None:
+    """Replace the MinHash signature and LSH bucket rows for one event (no commit).
+
+    Texts too short to sign get an empty signature so backfill skips them.
+    """
+    signature = minhash_signature(text)
+    conn.execute("DELETE FROM memory_event_minhash_bands WHERE memory_id = ?", (int(memory_id),))
+    conn.execute(
+        "INSERT OR REPLACE INTO memory_event_minhash(memory_id, scope, signature) VALUES (?, ?, ?)",
+        (int(memory_id), scope, pack_signature(signature) if signature else b""),
+    )
+    if signature:
+        conn.executemany(
+            "INSERT OR IGNORE INTO memory_event_minhash_bands(band_key, memory_id) VALUES (?, ?)",
+            [(key, int(memory_id)) for key in band_keys(signature, scope)],
+        )
+
+
+def find_near_duplicate_memory_events_sync(
+    conn: sqlite3.Connection,
+    *,
+    scope: str,
+    text: str | None,
+    threshold: float,
+    limit: int = 3,
+    exclude_ids: tuple[int, ...] = (),
+) -> list[tuple[int, float]]:
+    """
+    Events in `scope` (not deprecated or archived) whose estimated word-set
+    Jaccard with `text` is at least `threshold`, best first, as
+    `(memory_id, similarity)`.
+    """
+    signature = minhash_signature(text)
+    if not signature or not scope:
+        return []
+    keys = band_keys(signature, scope)
+    placeholders = ",".join("?" for _ in keys)
+    rows = conn.execute(
+        f"""
+        SELECT mh.memory_id, mh.signature
+        FROM memory_event_minhash mh
+        JOIN memory_events me ON me.id = mh.memory_id
+        WHERE mh.memory_id IN (
+            SELECT DISTINCT memory_id FROM memory_event_minhash_bands WHERE band_key IN ({placeholders})
+        )
+          AND COALESCE(me.lifecycle, 'active') NOT IN ('deprecated', 'archived')
+        """,
+        keys,
+    ).fetchall()
+    excluded = {int(x) for x in exclude_ids}
+    matches: list[tuple[int, float]] = []
+    for memory_id, blob in rows:
+        if int(memory_id) in excluded:
+            continue
+        similarity = estimate_similarity(signature, unpack_signature(blob))
+        if similarity >= threshold:
+            matches.append((int(memory_id), similarity))
+    matches.sort(key=lambda item: (-item[1], item[0]))
+    return matches[: max(1, int(limit))]
+
+
+def backfill_memory_event_minhash_sync(conn: sqlite3.Connection, *, batch_size: int = 500) -> int:
+    """Sign every event that has no `memory_event_minhash` row yet; returns how many were signed."""
+    signed = 0
+    last_id = 0
+    while True:
+        rows = conn.execute(
+            """
+            SELECT me.id, me.scope, me.text
+            FROM memory_events me
+            LEFT JOIN memory_event_minhash mh ON mh.memory_id = me.id
+            WHERE mh.memory_id IS NULL AND me.id > ?
+            ORDER BY me.id
+            LIMIT ?
+            """,
+            (last_id, max(1, int(batch_size))),
+        ).fetchall()
+        if not rows:
+            break
+        for memory_id, scope, text in rows:
+            write_memory_event_minhash_sync(conn, memory_id=int(memory_id), scope=str(scope or "global"), text=text)
+        conn.commit()
+        signed += len(rows)
+        last_id = int(rows[-1][0])
+    return signed
+
+
+def near_duplicate_clusters_sync(conn: sqlite3.Connection, *, threshold: float) -> list[dict[str, Any]]:
+    """
+    Group non-deprecated, signed events into near-duplicate clusters.
+
+    Pairs come from shared LSH buckets and are kept when their estimated
+    similarity reaches `threshold`; clusters are the connected components.
+    Each cluster lists `ids` (survivor first: active before candidate, then
+    oldest), `scope` and `texts`. Components chain (A~B, B~C, A!~C), so only
+    `merge_ids`, the members whose own similarity to the survivor reaches
+    `threshold`, are safe to merge into it; `min_similarity` is the lowest of
+    those survivor similarities. The other members wait for a later pass.
+    """
+    pairs = conn.execute(
+        """
+        SELECT DISTINCT a.memory_id, b.memory_id
+        FROM memory_event_minhash_bands a
+        JOIN memory_event_minhash_bands b ON b.band_key = a.band_key AND b.memory_id > a.memory_id
+        """
+    ).fetchall()
+    if not pairs:
+        return []
+
+    ids = sorted({int(x) for pair in pairs for x in pair})
+    info: dict[int, tuple[tuple[int, ...], str, str, str]] = {}
+    for start in range(0, len(ids), 500):
+        chunk = ids[start : start + 500]
+        placeholders = ",".join("?" for _ in chunk)
+        for memory_id, blob, scope, lifecycle, text in conn.execute(
+            f"""
+            SELECT mh.memory_id, mh.signature, mh.scope, COALESCE(me.lifecycle, 'active'), me.text
+            FROM memory_event_minhash mh
+            JOIN memory_events me ON me.id = mh.memory_id
+            WHERE mh.memory_id IN ({placeholders})
+              AND COALESCE(me.lifecycle, 'active') <> 'deprecated'
+            """,
+            chunk,
+        ).fetchall():
+            info[int(memory_id)] = (unpack_signature(blob), str(scope), str(lifecycle), str(text or ""))
+
+    parent: dict[int, int] = {}
+
+    def _find(x: int) -> int:
+        while parent.get(x, x) != x:
+            parent[x] = parent.get(parent[x], parent[x])
+            x = parent[x]
+        return x
+
+    kept: list[tuple[int, int]] = []
+    for a, b in pairs:
+        a, b = int(a), int(b)
+        if a not in info or b not in info or info[a][1] != info[b][1]:
+            continue
+        if estimate_similarity(info[a][0], info[b][0]) < threshold:
+            continue
+        kept.append((a, b))
+        ra, rb = _find(a), _find(b)
+        if ra != rb:
+            parent[max(ra, rb)] = min(ra, rb)
+
+    members: dict[int, list[int]] = {}
+    for a, b in kept:
+        for x in (a, b):
+            group = members.setdefault(_find(x), [])
+            if x not in group:
+                group.append(x)
+
+    clusters: list[dict[str, Any]] = []
+    for group in members.values():
+        group.sort(key=lambda x: (info[x][2] != "active", x))
+        survivor = group[0]
+        to_survivor = {x: estimate_similarity(info[survivor][0], info[x][0]) for x in group[1:]}
+        merge_ids = [x for x in group[1:] if to_survivor[x] >= threshold]
+        clusters.append(
+            {
+                "ids": group,
+                "merge_ids": merge_ids,
+                "scope": info[survivor][1],
+                "min_similarity": round(min((to_survivor[x] for x in merge_ids), default=1.0), 3),
+                "texts": [info[x][3] for x in group],
+            }
+        )
+    clusters.sort(key=lambda c: (-len(c["ids"]), c["ids"][0]))
+    return clusters
+
+
 def insert_memory_event_sync(
     conn: sqlite3.Connection,
     payload: dict[str, Any],
@@ -50,8 +282,9 @@ def insert_memory_event_sync(
             topic_id, topic_source, topic_confidence,
             summarized,
             logged_from_channel_id, logged_from_channel_name, logged_from_message_id,
-            source_channel_id, source_channel_name
-        ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+            source_channel_id, source_channel_name,
+            content_hash
+        ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
         """,
         (
             payload["created_at_utc"],
@@ -79,24 +312,107 @@ def insert_memory_event_sync(
             payload.get("logged_from_message_id"),
             payload.get("source_channel_id"),
             payload.get("source_channel_name"),
+            payload.get("content_hash") or memory_content_hash(payload.get("text")),
         ),
     )
     mem_id = int(cur.lastrowid)
 
+    # memory_events_fts is maintained by triggers (migration 0022).
     tags_list = safe_json_loads(payload.get("tags_json", "[]"))
-    topic_id = (payload.get("topic_id") or "").strip().lower()
-    if topic_id and topic_id not in tags_list:
-        tags_list = [topic_id] + list(tags_list)
-    tags_for_fts = " ".join(tags_list)
-
-    cur.execute(
-        "INSERT INTO memory_events_fts(rowid, text, tags) VALUES (?, ?, ?)",
-        (mem_id, payload["text"], tags_for_fts),
-    )
+    write_memory_event_tags_sync(conn, memory_id=mem_id, tags=tags_list)
+    write_memory_event_minhash_sync(conn, memory_id=mem_id, scope=str(scope), text=payload.get("text"))
+    write_vector_sync(conn, table="memory_event_vectors", item_id=mem_id, text=payload.get("text"))
     conn.commit()
+    bump_memory_write_generation()
     return mem_id
 
 
+def merge_duplicate_memory_event_sync(
+    conn: sqlite3.Connection,
+    payload: dict[str, Any],
+    *,
+    safe_json_loads: Callable[[str], list[Any]],
+    safe_json_dumps: Callable[[Any], str],
+    now_iso_utc: str | None = None,
+    target_id: int | None = None,
+) -> dict[str, Any] | None:
+    """
+    Fold `payload` into an existing event with the same content hash and scope.
+
+    `target_id` names the survivor directly instead (a near-duplicate found via
+    `find_near_duplicate_memory_events_sync`); it must share the scope.
+    Deprecated and archived rows never absorb a duplicate, so re-remembering
+    rejected or archived text starts over as a row recall can return. The survivor gains any new tags, the higher importance and a
+    topic if it had none. Returns the survivor (id, lifecycle, topic_id, tags,
+    changed), or None when there is no duplicate and the caller should insert.
+    """
+    scope = payload.get("scope")
+    if scope is None or not str(scope).strip():
+        return None
+    if target_id is not None:
+        match_sql, match_param = "id = ?", int(target_id)
+    else:
+        match_sql = "content_hash = ?"
+        match_param = payload.get("content_hash") or memory_content_hash(payload.get("text"))
+    cur = conn.cursor()
+    row = cur.execute(
+        f"""
+        SELECT id, COALESCE(lifecycle, 'active'), tags_json, importance, topic_id, topic_source, topic_confidence
+        FROM memory_events
+        WHERE {match_sql}
+          AND scope = ?
+          AND COALESCE(lifecycle, 'active') NOT IN ('deprecated', 'archived')
+        ORDER BY id
+        LIMIT 1
+        """,
+        (match_param, str(scope)),
+    ).fetchone()
+    if row is None:
+        return None
+
+    mem_id, lifecycle, tags_json, importance, topic_id, topic_source, topic_confidence = row
+    old_tags = list(safe_json_loads(tags_json or "[]") or [])
+    tags = old_tags + [t for t in safe_json_loads(payload.get("tags_json", "[]")) or [] if t not in old_tags]
+    old_importance = _normalize_importance_value(importance)
+    new_importance = max(old_importance, _normalize_importance_value(payload.get("importance")))
+    if not topic_id and payload.get("topic_id"):
+        topic_id = payload.get("topic_id")
+        topic_source = payload.get("topic_source", "none")
+        topic_confidence = payload.get("topic_confidence")
+
+    changed = tags != old_tags or new_importance != old_importance or topic_id != row[4]
+    if changed:
+        cur.execute(
+            """
+            UPDATE memory_events
+            SET tags_json = ?, importance = ?, topic_id = ?, topic_source = ?, topic_confidence = ?,
+                updated_at_utc = ?
+            WHERE id = ?
+            """,
+            (
+                safe_json_dumps(tags),
+                new_importance,
+                topic_id,
+                topic_source,
+                topic_confidence,
+                now_iso_utc or payload.get("created_at_utc"),
+                int(mem_id),
+            ),
+        )
+        write_memory_event_tags_sync(conn, memory_id=int(mem_id), tags=tags)
+        conn.commit()
+        bump_memory_write_generation()
+    return {
+        "id": int(mem_id),
+        "lifecycle": str(lifecycle),
+        "topic_id": topic_id,
+        "topic_source": topic_source,
+        "topic_confidence": topic_confidence,
+        "tags": tags,
+        "changed": bool(changed),
+    }
+
+
 def mark_events_summarized_sync(conn: sqlite3.Connection, event_ids: list[int]) -> None:
     if not event_ids:
         return
@@ -121,11 +437,16 @@ def search_memory_events_by_tag_sync(
         """
         SELECT id, created_at_utc, channel_name, author_name, text, tags_json, importance, topic_id
         FROM memory_events
-        WHERE tags_json LIKE ? AND tags_json LIKE ?
+        WHERE id IN (
+            SELECT s.memory_id
+            FROM memory_event_tags s
+            JOIN memory_event_tags k ON k.memory_id = s.memory_id AND k.tag = ?
+            WHERE s.tag = ?
+        )
         ORDER BY created_ts DESC
         LIMIT ?
         """,
-        (f'%"{subject_tag}"%', f'%"{kind_tag}"%', int(limit)),
+        (str(kind_tag or "").strip().lower(), str(subject_tag or "").strip().lower(), int(limit)),
     )
     rows = cur.fetchall()
     out = []
@@ -176,7 +497,8 @@ def upsert_summary_sync(
         cur.execute(
             """
             UPDATE memory_summaries
-            SET updated_at_utc=?, start_ts=?, end_ts=?, tags_json=?, importance=?, summary_text=?, scope=?, summary_type=?
+            SET updated_at_utc=?, start_ts=?, end_ts=?, tags_json=?, importance=?, summary_text=?, scope=?, summary_type=?,
+                covers_event_ids_json=COALESCE(?, covers_event_ids_json), generated_by_model=?, prompt_hash=?, job_id=?
             WHERE id=?
             """,
             (
@@ -188,6 +510,10 @@ def upsert_summary_sync(
                 payload["summary_text"],
                 scope,
                 summary_type,
+                payload.get("covers_event_ids_json"),
+                payload.get("generated_by_model"),
+                payload.get("prompt_hash"),
+                payload.get("job_id"),
                 sid,
             ),
         )
@@ -196,8 +522,9 @@ def upsert_summary_sync(
             """
             INSERT INTO memory_summaries (
                 topic_id, summary_type, scope, created_at_utc, updated_at_utc,
-                start_ts, end_ts, tags_json, importance, summary_text
-            ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+                start_ts, end_ts, tags_json, importance, summary_text, covers_event_ids_json,
+                generated_by_model, prompt_hash, job_id
+            ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
             """,
             (
                 topic_id,
@@ -210,91 +537,22 @@ def upsert_summary_sync(
                 payload.get("tags_json", "[]"),
                 int(payload.get("importance", 1)),
                 payload["summary_text"],
+                payload.get("covers_event_ids_json") or "[]",
+                payload.get("generated_by_model"),
+                payload.get("prompt_hash"),
+                payload.get("job_id"),
             ),
         )
         sid = int(cur.lastrowid)
 
-    tags_for_fts = " ".join(safe_json_loads(payload.get("tags_json", "[]")))
-    cur.execute("DELETE FROM memory_summaries_fts WHERE rowid = ?", (sid,))
-    cur.execute(
-        "INSERT INTO memory_summaries_fts(rowid, topic_id, summary_text, tags) VALUES (?, ?, ?, ?)",
-        (sid, topic_id, payload["summary_text"], tags_for_fts),
-    )
-
+    write_vector_sync(conn, table="memory_summary_vectors", item_id=sid, text=payload["summary_text"])
     conn.commit()
+    bump_memory_write_generation()
     return sid
 
 
-def search_memory_events_sync(
-    conn: sqlite3.Connection,
-    query: str,
-    scope: str,
-    limit: int = 8,
-    *,
-    build_fts_query: Callable[[str], str],
-    parse_recall_scope: Callable[[str | None], tuple[str, int | None, int | None]],
-    stage_at_least: Callable[[str], bool],
-    safe_json_loads: Callable[[str], list[Any]],
-) -> list[dict[str, Any]]:
-    fts_q = build_fts_query(query)
-    if not fts_q:
-        return []
-
-    temporal_scope, guild_id, channel_id = parse_recall_scope(scope)
-
-    if temporal_scope == "hot":
-        allowed_tiers = (0,)
-    elif temporal_scope == "warm":
-        allowed_tiers = (0, 1)
-    elif temporal_scope == "cold":
-        allowed_tiers = (2,)
-    else:
-        allowed_tiers = (0, 1, 2, 3)
-
-    cur = conn.cursor()
-    tier_placeholders = ",".join("?" for _ in allowed_tiers)
-    channel_scope = f"channel:{int(channel_id)}" if channel_id is not None else None
-    guild_scope = f"guild:{int(guild_id)}" if guild_id is not None else None
-    cur.execute(
-        f"""
-        SELECT me.id, me.created_at_utc, me.created_ts,
-               me.scope,
-               me.channel_id, me.channel_name,
-               me.author_id, me.author_name,
-               me.source_message_id,
-               me.text, me.tags_json, me.importance, me.tier,
-               me.topic_id, me.topic_source, me.topic_confidence,
-
-               me.logged_from_channel_id, me.logged_from_channel_name, me.logged_from_message_id,
-               me.source_channel_id, me.source_channel_name,
-
-               bm25(memory_events_fts) as rank
-        FROM memory_events_fts
-        JOIN memory_events me ON me.id = memory_events_fts.rowid
-        WHERE memory_events_fts MATCH ?
-        AND COALESCE(me.lifecycle, 'active') = 'active'
-        AND me.tier IN ({tier_placeholders})
-        AND (? IS NULL OR me.channel_id = ? OR me.scope = ?)
-        AND (? IS NULL OR me.guild_id = ? OR me.scope = ?)
-        LIMIT 60
-        """,
-        (
-            fts_q,
-            *allowed_tiers,
-            channel_id,
-            channel_id,
-            channel_scope,
-            guild_id,
-            guild_id,
-            guild_scope,
-        ),
-    )
-    rows = cur.fetchall()
-
-    scored: list[tuple[float, dict[str, Any]]] = []
-    now = int(time.time())
-
-    for (
+def _memory_event_row_dict(row: tuple, safe_json_loads: Callable[[str], list[Any]]) -> dict[str, Any]:
+    (
         mid,
         created_at_utc,
         created_ts,
@@ -306,6 +564,7 @@ def search_memory_events_sync(
         source_message_id,
         text,
         tags_json,
+        content_hash,
         importance,
         tier,
         topic_id,
@@ -316,64 +575,221 @@ def search_memory_events_sync(
         logged_from_message_id,
         source_channel_id,
         source_channel_name,
-        rank,
-    ) in rows:
-        tier = int(tier) if tier is not None else 1
-        if tier not in allowed_tiers:
-            continue
+        score,
+    ) = row
+    return {
+        "id": int(mid),
+        "created_at_utc": created_at_utc,
+        "created_ts": int(created_ts or 0),
+        "scope": row_scope,
+        "channel_id": row_channel_id,
+        "channel_name": channel_name,
+        "author_id": author_id,
+        "author_name": author_name,
+        "source_message_id": source_message_id,
+        "text": text,
+        "tags": safe_json_loads(tags_json),
+        "content_hash": content_hash,
+        "importance": float(importance),
+        "tier": int(tier) if tier is not None else 1,
+        "topic_id": topic_id,
+        "topic_source": topic_source,
+        "topic_confidence": topic_confidence,
+        "logged_from_channel_id": logged_from_channel_id,
+        "logged_from_channel_name": logged_from_channel_name,
+        "logged_from_message_id": logged_from_message_id,
+        "source_channel_id": source_channel_id,
+        "source_channel_name": source_channel_name,
+        "score": float(score or 0.0),
+    }
 
-        importance = _normalize_importance_value(importance, default=0.5)
-        if stage_at_least("M1") and not stage_at_least("M2"):
-            if importance <= 0.0 and (now - int(created_ts or 0)) > 14 * 86400:
-                continue
-        if stage_at_least("M2"):
-            if importance <= 0.0 and tier >= 3:
-                continue
-
-        base = -float(rank or 0.0)
-        if tier == 0:
-            recency_boost = 2.0
-        elif tier == 1:
-            recency_boost = 1.0
-        elif tier == 2:
-            recency_boost = 0.25
-        else:
-            recency_boost = 0.0
 
-        importance_boost = 2.0 * float(importance)
-        score = base + recency_boost + importance_boost
+def load_recent_memory_events_sync(
+    conn: sqlite3.Connection,
+    *,
+    min_created_ts: int,
+    safe_json_loads: Callable[[str], list[Any]],
+) -> list[dict[str, Any]]:
+    """
+    Active events with `created_ts > min_created_ts`, shaped like search rows
+    plus `guild_id` (tier and score are left for the caller to derive).
+    """
+    rows = conn.execute(
+        """
+        SELECT id, created_at_utc, created_ts, scope, channel_id, channel_name,
+               author_id, author_name, source_message_id, text, tags_json, content_hash,
+               CASE
+                   WHEN typeof(importance) IN ('integer', 'real') THEN MAX(0.0, MIN(1.0, importance))
+                   ELSE 0.5
+               END,
+               0, topic_id, topic_source, topic_confidence,
+               logged_from_channel_id, logged_from_channel_name, logged_from_message_id,
+               source_channel_id, source_channel_name, 0.0, guild_id
+        FROM memory_events
+        WHERE created_ts > ?
+          AND COALESCE(lifecycle, 'active') = 'active'
+        ORDER BY id
+        """,
+        (int(min_created_ts),),
+    ).fetchall()
+    out: list[dict[str, Any]] = []
+    for row in rows:
+        event = _memory_event_row_dict(row[:-1], safe_json_loads)
+        event["guild_id"] = row[-1]
+        out.append(event)
+    return out
 
-        scored.append(
-            (
-                score,
-                {
-                    "id": int(mid),
-                    "created_at_utc": created_at_utc,
-                    "created_ts": int(created_ts or 0),
-                    "scope": row_scope,
-                    "channel_id": row_channel_id,
-                    "channel_name": channel_name,
-                    "author_id": author_id,
-                    "author_name": author_name,
-                    "source_message_id": source_message_id,
-                    "text": text,
-                    "tags": safe_json_loads(tags_json),
-                    "importance": importance,
-                    "tier": tier,
-                    "topic_id": topic_id,
-                    "topic_source": topic_source,
-                    "topic_confidence": topic_confidence,
-                    "logged_from_channel_id": logged_from_channel_id,
-                    "logged_from_channel_name": logged_from_channel_name,
-                    "logged_from_message_id": logged_from_message_id,
-                    "source_channel_id": source_channel_id,
-                    "source_channel_name": source_channel_name,
-                },
+
+def search_memory_events_sync(
+    conn: sqlite3.Connection,
+    query: str,
+    scope: str,
+    limit: int = 8,
+    *,
+    build_fts_query: Callable[[str], str],
+    parse_recall_scope: Callable[[str | None], tuple[str, int | None, int | None]],
+    stage_at_least: Callable[[str], bool],
+    safe_json_loads: Callable[[str], list[Any]],
+    vector_search: Callable[[sqlite3.Connection, str, int], list[tuple[int, float]]] | None = None,
+    vector_candidates: int = 0,
+    rrf_k: int = 60,
+    created_before_ts: int | None = None,
+) -> list[dict[str, Any]]:
+    """
+    Top `limit` active events for `query` in `scope`.
+
+    `created_before_ts` additionally caps `created_ts` (inclusive); the hot
+    memory index uses it to leave the window it already covers out of SQL.
+
+    With `vector_search` (see `retrieval.vector_index.HashedVectorIndex`), its
+    nearest `vector_candidates` events (default 4x `limit`, since scope is
+    only applied afterwards) are put through the same filters and fused with
+    the bm25 ranking by reciprocal-rank fusion.
+    """
+    fts_q = build_fts_query(query)
+    if not fts_q and vector_search is None:
+        return []
+
+    temporal_scope, guild_id, channel_id = parse_recall_scope(scope)
+
+    cur = conn.cursor()
+    channel_scope = f"channel:{int(channel_id)}" if channel_id is not None else None
+    guild_scope = f"guild:{int(guild_id)}" if guild_id is not None else None
+    now = int(time.time())
+    # Tier is a function of age, so it is derived here rather than read from the
+    # stored `tier` column (which cleanup no longer rewrites).
+    min_created_ts, max_created_ts = created_ts_bounds(temporal_scope, now)
+    if created_before_ts is not None:
+        max_created_ts = int(created_before_ts) if max_created_ts is None else min(max_created_ts, int(created_before_ts))
+    m2 = bool(stage_at_least("M2"))
+    m1_only = bool(stage_at_least("M1")) and not m2
+
+    def _ranked(source_sql: str, rank_sql: str, source_params: tuple, top: int) -> list[tuple]:
+        # Filter, score and take top-k in one statement so the rows returned are
+        # the best `top` matches, not an arbitrary prefix of the match set.
+        # score = -rank + tier recency boost + 2 * clamped importance.
+        cur.execute(
+            f"""
+            WITH matched AS (
+                SELECT me.id, me.created_at_utc, me.created_ts,
+                       me.scope,
+                       me.channel_id, me.channel_name,
+                       me.author_id, me.author_name,
+                       me.source_message_id,
+                       me.text, me.tags_json, me.content_hash,
+                       ? - COALESCE(me.created_ts, 0) AS age,
+                       me.topic_id, me.topic_source, me.topic_confidence,
+
+                       me.logged_from_channel_id, me.logged_from_channel_name, me.logged_from_message_id,
+                       me.source_channel_id, me.source_channel_name,
+
+                       {rank_sql} AS rank,
+                       CASE
+                           WHEN typeof(me.importance) IN ('integer', 'real') THEN MAX(0.0, MIN(1.0, me.importance))
+                           ELSE 0.5
+                       END AS imp
+                {source_sql}
+                AND COALESCE(me.lifecycle, 'active') = 'active'
+                AND (? IS NULL OR COALESCE(me.created_ts, 0) > ?)
+                AND (? IS NULL OR COALESCE(me.created_ts, 0) <= ?)
+                AND (? IS NULL OR me.channel_id = ? OR me.scope = ?)
+                AND (? IS NULL OR me.guild_id = ? OR me.scope = ?)
             )
+            SELECT id, created_at_utc, created_ts, scope, channel_id, channel_name,
+                   author_id, author_name, source_message_id, text, tags_json, content_hash, imp,
+                   {tier_sql("age")} AS tier,
+                   topic_id, topic_source, topic_confidence,
+                   logged_from_channel_id, logged_from_channel_name, logged_from_message_id,
+                   source_channel_id, source_channel_name,
+                   -rank
+                     + CASE {tier_sql("age")} WHEN 0 THEN 2.0 WHEN 1 THEN 1.0 WHEN 2 THEN 0.25 ELSE 0.0 END
+                     + 2.0 * imp AS score
+            FROM matched
+            WHERE NOT (? AND imp <= 0.0 AND age > 14*86400)
+              AND NOT (? AND imp <= 0.0 AND age >= {COLD_MAX_AGE_SECONDS})
+            ORDER BY score DESC, id DESC
+            LIMIT ?
+            """,
+            (
+                now,
+                *source_params,
+                min_created_ts,
+                min_created_ts,
+                max_created_ts,
+                max_created_ts,
+                channel_id,
+                channel_id,
+                channel_scope,
+                guild_id,
+                guild_id,
+                guild_scope,
+                int(m1_only),
+                int(m2),
+                max(0, int(top)),
+            ),
+        )
+        return cur.fetchall()
+
+    lexical: list[tuple] = []
+    if fts_q:
+        lexical = _ranked(
+            """
+                FROM memory_events_fts
+                JOIN memory_events me ON me.id = memory_events_fts.rowid
+                WHERE memory_events_fts MATCH ?
+            """,
+            "bm25(memory_events_fts)",
+            (fts_q,),
+            limit,
         )
+    if vector_search is None:
+        return [_memory_event_row_dict(row, safe_json_loads) for row in lexical]
 
-    scored.sort(key=lambda x: x[0], reverse=True)
-    return [d for _, d in scored[:limit]]
+    hits = vector_search(conn, query, int(vector_candidates) or max(1, int(limit)) * 4)
+    if not hits:
+        return [_memory_event_row_dict(row, safe_json_loads) for row in lexical]
+    similarity = {int(item_id): float(sim) for item_id, sim in hits}
+    ids = list(similarity)
+    # Same filters as the lexical path; rank is neutral here because the
+    # vector ranking comes from cosine similarity, not the SQL score.
+    semantic_rows = _ranked(
+        f"""
+                FROM memory_events me
+                WHERE me.id IN ({",".join("?" for _ in ids)})
+        """,
+        "0.0",
+        tuple(ids),
+        len(ids),
+    )
+    semantic_rows.sort(key=lambda row: (-similarity.get(int(row[0]), 0.0), -int(row[0])))
+
+    rows_by_id = {int(row[0]): row for row in semantic_rows}
+    rows_by_id.update({int(row[0]): row for row in lexical})
+    fused = reciprocal_rank_fusion(
+        [[int(row[0]) for row in lexical], [int(row[0]) for row in semantic_rows]],
+        k=rrf_k,
+    )
+    return [_memory_event_row_dict(rows_by_id[mid], safe_json_loads) for mid in fused[: max(0, int(limit))]]
 
 
 def search_memory_summaries_sync(
@@ -385,9 +801,11 @@ def search_memory_summaries_sync(
     build_fts_query: Callable[[str], str],
     parse_recall_scope: Callable[[str | None], tuple[str, int | None, int | None]],
     safe_json_loads: Callable[[str], list[Any]],
+    vector_search: Callable[[sqlite3.Connection, str, int], list[tuple[int, float]]] | None = None,
+    rrf_k: int = 60,
 ) -> list[dict[str, Any]]:
     fts_q = build_fts_query(query)
-    if not fts_q:
+    if not fts_q and vector_search is None:
         return []
     _, guild_id, channel_id = parse_recall_scope(scope)
     scope_candidates: list[str] = []
@@ -395,10 +813,16 @@ def search_memory_summaries_sync(
         scope_candidates.append(f"channel:{int(channel_id)}")
     if guild_id is not None:
         scope_candidates.append(f"guild:{int(guild_id)}")
+    if scope_candidates:
+        scope_sql = f"COALESCE(ms.scope, '') IN ({','.join('?' for _ in scope_candidates)})"
+        scope_params: tuple = tuple(scope_candidates)
+    else:
+        scope_sql = "COALESCE(ms.scope, 'global') = 'global'"
+        scope_params = ()
 
     cur = conn.cursor()
-    if scope_candidates:
-        scope_placeholders = ",".join("?" for _ in scope_candidates)
+    rows: list[tuple] = []
+    if fts_q:
         cur.execute(
             f"""
             SELECT ms.id, ms.topic_id, ms.scope, ms.updated_at_utc, ms.start_ts, ms.end_ts, ms.tags_json, ms.importance, ms.summary_text,
@@ -407,26 +831,35 @@ def search_memory_summaries_sync(
             JOIN memory_summaries ms ON ms.id = memory_summaries_fts.rowid
             WHERE memory_summaries_fts MATCH ?
               AND COALESCE(ms.lifecycle, 'active') = 'active'
-              AND COALESCE(ms.scope, '') IN ({scope_placeholders})
+              AND {scope_sql}
+            ORDER BY rank
             LIMIT 20
             """,
-            (fts_q, *scope_candidates),
+            (fts_q, *scope_params),
         )
-    else:
-        cur.execute(
-            """
-            SELECT ms.id, ms.topic_id, ms.scope, ms.updated_at_utc, ms.start_ts, ms.end_ts, ms.tags_json, ms.importance, ms.summary_text,
-                   bm25(memory_summaries_fts) as rank
-            FROM memory_summaries_fts
-            JOIN memory_summaries ms ON ms.id = memory_summaries_fts.rowid
-            WHERE memory_summaries_fts MATCH ?
-              AND COALESCE(ms.lifecycle, 'active') = 'active'
-              AND COALESCE(ms.scope, 'global') = 'global'
-            LIMIT 20
-            """,
-            (fts_q,),
-        )
-    rows = cur.fetchall()
+        rows = sorted(cur.fetchall(), key=lambda r: float(r[9] or 0.0))
+
+    if vector_search is not None:
+        similarity = {int(item_id): float(sim) for item_id, sim in vector_search(conn, query, 20)}
+        if similarity:
+            ids = list(similarity)
+            cur.execute(
+                f"""
+                SELECT ms.id, ms.topic_id, ms.scope, ms.updated_at_utc, ms.start_ts, ms.end_ts, ms.tags_json, ms.importance, ms.summary_text,
+                       0.0 as rank
+                FROM memory_summaries ms
+                WHERE ms.id IN ({",".join("?" for _ in ids)})
+                  AND COALESCE(ms.lifecycle, 'active') = 'active'
+                  AND {scope_sql}
+                """,
+                (*ids, *scope_params),
+            )
+            semantic = sorted(cur.fetchall(), key=lambda r: (-similarity.get(int(r[0]), 0.0), -int(r[0])))
+            by_id = {int(r[0]): r for r in semantic}
+            by_id.update({int(r[0]): r for r in rows})
+            fused = reciprocal_rank_fusion([[int(r[0]) for r in rows], [int(r[0]) for r in semantic]], k=rrf_k)
+            rows = [by_id[sid] for sid in fused]
+
     out = []
     for (
         sid,
@@ -454,36 +887,64 @@ def search_memory_summaries_sync(
                 "rank": float(rank or 0.0),
             }
         )
-    out.sort(key=lambda d: d["rank"])
+    # Rows are already in bm25 (or fused) order.
     return out[:limit]
 
 
+def _get_maintenance_watermark(cur: sqlite3.Cursor, name: str) -> int | None:
+    cur.execute("SELECT watermark_ts FROM memory_maintenance_state WHERE name = ?", (name,))
+    row = cur.fetchone()
+    return int(row[0]) if row else None
+
+
+def _set_maintenance_watermark(cur: sqlite3.Cursor, name: str, ts: int, now_iso_utc: str) -> None:
+    cur.execute(
+        """
+        INSERT INTO memory_maintenance_state (name, watermark_ts, updated_at_utc) VALUES (?, ?, ?)
+        ON CONFLICT(name) DO UPDATE SET watermark_ts = excluded.watermark_ts, updated_at_utc = excluded.updated_at_utc
+        """,
+        (name, int(ts), now_iso_utc),
+    )
+
+
 def cleanup_memory_sync(
     conn: sqlite3.Connection,
     *,
     stage_at_least: Callable[[str], bool],
+    full_sweep_interval_seconds: int = 86400,
 ) -> tuple[int, int]:
+    """
+    Apply expiry and archival lifecycle transitions.
+
+    Tier is derived from `created_ts` at query time, so nothing here rewrites it.
+    Each rule keeps a watermark (the `now` of its last run) in
+    `memory_maintenance_state` and only visits rows whose boundary fell between
+    that watermark and now. Rows that become eligible another way (importance
+    edited to 0, expiry set in the past, re-activation) are picked up by a full
+    pass every `full_sweep_interval_seconds`, or on a rule's first run.
+    """
     cur = conn.cursor()
     now = int(time.time())
     now_iso_utc = time.strftime("%Y-%m-%dT%H:%M:%S+00:00", time.gmtime(now))
     events_transitioned = 0
     summaries_transitioned = 0
 
-    cur.execute(
-        """
-        UPDATE memory_events
-        SET tier = CASE
-            WHEN (? - created_ts) < 86400 THEN 0
-            WHEN (? - created_ts) < 14*86400 THEN 1
-            WHEN (? - created_ts) < 90*86400 THEN 2
-            ELSE 3
-        END
-        """,
-        (now, now, now),
-    )
+    last_full = _get_maintenance_watermark(cur, "full_sweep")
+    full_sweep = last_full is None or now - last_full >= max(0, int(full_sweep_interval_seconds))
+
+    def _since(rule: str) -> int | None:
+        return None if full_sweep else _get_maintenance_watermark(cur, rule)
 
+    # Lower bounds are only added when a watermark exists so each update is a
+    # two-sided range scan on its partial index.
+    since = _since("events_expiry")
+    params: list[Any] = [now_iso_utc, now_iso_utc]
+    since_sql = ""
+    if since is not None:
+        since_sql = "AND expiry_at_utc > ?"
+        params.append(time.strftime("%Y-%m-%dT%H:%M:%S+00:00", time.gmtime(since)))
     cur.execute(
-        """
+        f"""
         UPDATE memory_events
         SET lifecycle='deprecated',
             updated_at_utc=?
@@ -491,54 +952,54 @@ def cleanup_memory_sync(
           AND expiry_at_utc IS NOT NULL
           AND TRIM(expiry_at_utc) != ''
           AND expiry_at_utc <= ?
+          {since_sql}
         """,
-        (now_iso_utc, now_iso_utc),
+        params,
     )
     events_transitioned += int(cur.rowcount or 0)
+    _set_maintenance_watermark(cur, "events_expiry", now, now_iso_utc)
 
+    archive_after_days = None
     if stage_at_least("M1") and not stage_at_least("M2"):
-        cur.execute(
-            """
-            UPDATE memory_events
-            SET lifecycle='archived',
-                updated_at_utc=?
-            WHERE COALESCE(lifecycle, 'active')='active'
-              AND COALESCE(importance, 0.5) <= 0.0
-              AND created_ts < ?
-            """,
-            (now_iso_utc, now - 14 * 86400),
-        )
-        events_transitioned += int(cur.rowcount or 0)
+        archive_after_days = 14
     elif stage_at_least("M2"):
+        archive_after_days = 90
+    if archive_after_days is not None:
+        # Keyed by threshold so a stage change starts that rule with a full pass.
+        rule = f"events_archive_zero_importance_{archive_after_days}d"
+        since = _since(rule)
+        window = archive_after_days * 86400
+        params = [now_iso_utc, now - window]
+        since_sql = ""
+        if since is not None:
+            since_sql = "AND created_ts >= ?"
+            params.append(since - window)
         cur.execute(
-            """
+            f"""
             UPDATE memory_events
             SET lifecycle='archived',
                 updated_at_utc=?
             WHERE COALESCE(lifecycle, 'active')='active'
-              AND COALESCE(importance, 0.5) <= 0.0
+              AND importance <= 0.0
               AND created_ts < ?
+              {since_sql}
             """,
-            (now_iso_utc, now - 90 * 86400),
+            params,
         )
         events_transitioned += int(cur.rowcount or 0)
-
-    cur.execute(
-        """
-        UPDATE memory_summaries
-        SET tier = CASE
-            WHEN (? - COALESCE(end_ts, start_ts, ?)) < 14*86400 THEN 1
-            WHEN (? - COALESCE(end_ts, start_ts, ?)) < 90*86400 THEN 2
-            ELSE 3
-        END
-        WHERE COALESCE(end_ts, start_ts, 0) > 0
-        """,
-        (now, now, now, now),
-    )
+        _set_maintenance_watermark(cur, rule, now, now_iso_utc)
 
     if stage_at_least("M2"):
+        rule = "summaries_archive_zero_importance_180d"
+        since = _since(rule)
+        window = 180 * 86400
+        params = [now_iso_utc, now - window]
+        since_sql = ""
+        if since is not None:
+            since_sql = "AND COALESCE(end_ts, start_ts, 0) >= ?"
+            params.append(since - window)
         cur.execute(
-            """
+            f"""
             UPDATE memory_summaries
             SET lifecycle='archived',
                 updated_at_utc=?
@@ -546,17 +1007,64 @@ def cleanup_memory_sync(
               AND importance=0
               AND COALESCE(end_ts, start_ts, 0) > 0
               AND COALESCE(end_ts, start_ts, 0) < ?
+              {since_sql}
             """,
-            (now_iso_utc, now - 180 * 86400),
+            params,
         )
         summaries_transitioned += int(cur.rowcount or 0)
+        _set_maintenance_watermark(cur, rule, now, now_iso_utc)
 
-    cur.execute("DELETE FROM memory_events_fts WHERE rowid NOT IN (SELECT id FROM memory_events)")
-    cur.execute("DELETE FROM memory_summaries_fts WHERE rowid NOT IN (SELECT id FROM memory_summaries)")
+    if full_sweep:
+        _set_maintenance_watermark(cur, "full_sweep", now, now_iso_utc)
     conn.commit()
+    if events_transitioned or summaries_transitioned:
+        bump_memory_write_generation()
     return events_transitioned, summaries_transitioned
 
 
+_FTS_MAINTENANCE_ACTIONS = {
+    "rebuild": "INSERT INTO {table}({table}) VALUES ('rebuild')",
+    "optimize": "INSERT INTO {table}({table}) VALUES ('optimize')",
+    # rank=1 compares the index against the content views, not just itself.
+    "check": "INSERT INTO {table}({table}, rank) VALUES ('integrity-check', 1)",
+}
+
+
+def maintain_memory_fts_sync(conn: sqlite3.Connection, action: str) -> list[dict[str, Any]]:
+    """
+    Run an FTS5 maintenance command on memory_events_fts and memory_summaries_fts.
+
+    `rebuild` re-reads the external content views (use after editing rows with
+    triggers disabled), `optimize` merges index segments, `check` verifies the
+    index against its content. Returns one result row per table.
+    """
+    action = (action or "").strip().lower()
+    template = _FTS_MAINTENANCE_ACTIONS.get(action)
+    if template is None:
+        raise ValueError(f"unknown FTS maintenance action: {action!r}")
+    cur = conn.cursor()
+    results: list[dict[str, Any]] = []
+    for table in ("memory_events_fts", "memory_summaries_fts"):
+        started = time.perf_counter()
+        ok = True
+        error = None
+        try:
+            cur.execute(template.format(table=table))
+        except sqlite3.DatabaseError as e:
+            if action != "check":
+                raise
+            ok = False
+            error = str(e)
+        elapsed_ms = (time.perf_counter() - started) * 1000.0
+        cur.execute(f"SELECT COUNT(*) FROM {table}_docsize")
+        docs = int(cur.fetchone()[0] or 0)
+        results.append(
+            {"table": table, "action": action, "ok": ok, "error": error, "docs": docs, "elapsed_ms": round(elapsed_ms, 1)}
+        )
+    conn.commit()
+    return results
+
+
 def fetch_topic_events_sync(
     conn: sqlite3.Connection,
     topic_id: str,
@@ -575,7 +1083,6 @@ def fetch_topic_events_sync(
     channel_scope = f"channel:{int(channel_id)}" if channel_id is not None else None
     guild_scope = f"guild:{int(guild_id)}" if guild_id is not None else None
     cutoff = int(time.time()) - int(min_age_days) * 86400
-    like_pat = f'%"{topic_id}"%'
 
     cur.execute(
         """
@@ -588,8 +1095,8 @@ def fetch_topic_events_sync(
           AND (? IS NULL OR guild_id = ? OR scope = ?)
           AND created_ts < ?
           AND (
-                (topic_id IS NOT NULL AND topic_id = ?)
-                OR (tags_json LIKE ?)
+                topic_id = ?
+                OR id IN (SELECT memory_id FROM memory_event_tags WHERE tag = ?)
               )
         ORDER BY created_ts ASC
         LIMIT ?
@@ -603,7 +1110,7 @@ def fetch_topic_events_sync(
             guild_scope,
             cutoff,
             topic_id,
-            like_pat,
+            topic_id,
             int(max_events),
         ),
     )
@@ -651,7 +1158,8 @@ def get_topic_summary_sync(
         preferred_scope_2 = scope_candidates[1] if len(scope_candidates) > 1 else scope_candidates[0]
         cur.execute(
             f"""
-            SELECT id, topic_id, scope, summary_type, updated_at_utc, start_ts, end_ts, tags_json, importance, summary_text
+            SELECT id, topic_id, scope, summary_type, updated_at_utc, start_ts, end_ts, tags_json, importance, summary_text,
+                   covers_event_ids_json, generated_by_model, prompt_hash
             FROM memory_summaries
             WHERE topic_id = ?
               AND COALESCE(lifecycle, 'active') = 'active'
@@ -671,7 +1179,8 @@ def get_topic_summary_sync(
     else:
         cur.execute(
             """
-            SELECT id, topic_id, scope, summary_type, updated_at_utc, start_ts, end_ts, tags_json, importance, summary_text
+            SELECT id, topic_id, scope, summary_type, updated_at_utc, start_ts, end_ts, tags_json, importance, summary_text,
+                   covers_event_ids_json, generated_by_model, prompt_hash
             FROM memory_summaries
             WHERE topic_id = ?
               AND COALESCE(lifecycle, 'active') = 'active'
@@ -685,7 +1194,21 @@ def get_topic_summary_sync(
     row = cur.fetchone()
     if not row:
         return None
-    sid, found_topic_id, summary_scope, found_summary_type, updated_at_utc, start_ts, end_ts, tags_json, importance, summary_text = row
+    (
+        sid,
+        found_topic_id,
+        summary_scope,
+        found_summary_type,
+        updated_at_utc,
+        start_ts,
+        end_ts,
+        tags_json,
+        importance,
+        summary_text,
+        covers_event_ids_json,
+        generated_by_model,
+        prompt_hash,
+    ) = row
     return {
         "id": int(sid),
         "topic_id": found_topic_id,
@@ -697,6 +1220,9 @@ def get_topic_summary_sync(
         "tags": safe_json_loads(tags_json),
         "importance": int(importance or 1),
         "summary_text": summary_text,
+        "covers_event_ids": safe_json_loads(covers_event_ids_json),
+        "generated_by_model": generated_by_model,
+        "prompt_hash": prompt_hash,
     }
 
 
@@ -755,25 +1281,19 @@ def set_memory_origin_sync(
         (source_channel_id, source_channel_name, int(mem_id)),
     )
     conn.commit()
+    bump_memory_write_generation()
 
 
 def list_known_topics_sync(conn: sqlite3.Connection, limit: int = 200) -> list[str]:
+    """Topics seen on events or summaries, read from `topic_stats` (trigger-maintained)."""
     cur = conn.cursor()
     topics: set[str] = set()
     try:
         cur.execute(
-            "SELECT DISTINCT topic_id FROM memory_events WHERE topic_id IS NOT NULL AND topic_id != '' LIMIT ?",
-            (int(limit),),
-        )
-        for (topic_id,) in cur.fetchall():
-            if topic_id:
-                topics.add(str(topic_id).strip().lower())
-    except Exception:
-        pass
-    try:
-        cur.execute(
-            "SELECT DISTINCT topic_id FROM memory_summaries WHERE topic_id IS NOT NULL AND topic_id != '' LIMIT ?",
-            (int(limit),),
+            """
+            SELECT topic_id FROM topic_stats
+            WHERE total > 0 OR last_summary_ts IS NOT NULL
+            """
         )
         for (topic_id,) in cur.fetchall():
             if topic_id:
@@ -786,16 +1306,28 @@ def list_known_topics_sync(conn: sqlite3.Connection, limit: int = 200) -> list[s
     return out[: int(limit)]
 
 
+def load_topic_registry_sync(conn: sqlite3.Connection) -> list[tuple[str, int, int]]:
+    """`(topic_id, total, last_ts)` for every registered topic; last_ts covers events and summaries."""
+    cur = conn.cursor()
+    cur.execute(
+        """
+        SELECT topic_id, total, MAX(COALESCE(last_event_ts, 0), COALESCE(last_summary_ts, 0))
+        FROM topic_stats
+        WHERE total > 0 OR last_summary_ts IS NOT NULL
+        """
+    )
+    return [(str(topic_id), int(total or 0), int(last_ts or 0)) for (topic_id, total, last_ts) in cur.fetchall()]
+
+
 def topic_counts_sync(conn: sqlite3.Connection, limit: int = 15) -> list[tuple[str, int]]:
     cur = conn.cursor()
     try:
         cur.execute(
             """
-            SELECT topic_id, COUNT(*) as n
-            FROM memory_events
-            WHERE topic_id IS NOT NULL AND topic_id != ''
-            GROUP BY topic_id
-            ORDER BY n DESC
+            SELECT topic_id, total
+            FROM topic_stats
+            WHERE total > 0
+            ORDER BY total DESC, topic_id
             LIMIT ?
             """,
             (int(limit),),
@@ -804,3 +1336,38 @@ def topic_counts_sync(conn: sqlite3.Connection, limit: int = 15) -> list[tuple[s
         return [(str(topic_id), int(count)) for (topic_id, count) in rows if topic_id]
     except Exception:
         return []
+
+
+def auto_summary_candidates_sync(
+    conn: sqlite3.Connection,
+    *,
+    cutoff_ts: int,
+    limit: int = 2,
+) -> list[tuple[str, int]]:
+    """
+    Topics with auto-summary-eligible events (importance 1, unsummarized,
+    active) older than `cutoff_ts`, most such events first, with that count.
+
+    `topic_stats` narrows the scan to topics whose oldest pending event is old
+    enough; the ranking counts only the events before the cutoff, since fresh
+    ones cannot be summarized yet.
+    """
+    cur = conn.cursor()
+    cur.execute(
+        """
+        SELECT ts.topic_id,
+               (
+                   SELECT COUNT(*)
+                   FROM memory_events me
+                   WHERE me.topic_id = ts.topic_id
+                     AND me.created_ts < ?
+                     AND importance = 1 AND summarized = 0 AND COALESCE(lifecycle, 'active') = 'active'
+               ) AS eligible
+        FROM topic_stats ts
+        WHERE ts.unsummarized > 0 AND ts.first_unsummarized_ts < ?
+        ORDER BY eligible DESC, ts.topic_id
+        LIMIT ?
+        """,
+        (int(cutoff_ts), int(cutoff_ts), int(limit)),
+    )
+    return [(str(topic_id), int(n)) for (topic_id, n) in cur.fetchall() if topic_id]
@@ -0,0 +1,51 @@
+from __future__ import annotations
+
+import time
+
+# Upper age bound (seconds, exclusive) for tiers 0..2; anything older is tier 3.
+HOT_MAX_AGE_SECONDS = 86400
+WARM_MAX_AGE_SECONDS = 14 * 86400
+COLD_MAX_AGE_SECONDS = 90 * 86400
+
+
+def infer_tier(created_ts: int | None, now: int | None = None) -> int:
+    """0=hot (0-24h), 1=warm (1-14d), 2=cold (14-90d), 3=archive (>90d)"""
+    if now is None:
+        now = int(time.time())
+    age = max(0, int(now) - int(created_ts or 0))
+    if age < HOT_MAX_AGE_SECONDS:
+        return 0
+    if age < WARM_MAX_AGE_SECONDS:
+        return 1
+    if age < COLD_MAX_AGE_SECONDS:
+        return 2
+    return 3
+
+
+def tier_sql(age_expr: str) -> str:
+    """
+    SQL expression computing the tier for an age in seconds (`now - created_ts`).
+
+    Mirrors `infer_tier` so SQL- and Python-side tiers never disagree.
+    """
+    return (
+        f"CASE WHEN {age_expr} < {HOT_MAX_AGE_SECONDS} THEN 0 "
+        f"WHEN {age_expr} < {WARM_MAX_AGE_SECONDS} THEN 1 "
+        f"WHEN {age_expr} < {COLD_MAX_AGE_SECONDS} THEN 2 ELSE 3 END"
+    )
+
+
+def created_ts_bounds(temporal_scope: str, now: int) -> tuple[int | None, int | None]:
+    """
+    Map a recall temporal scope to a `(min_exclusive, max_inclusive)` created_ts range.
+
+    hot -> tier 0, warm -> tiers 0-1, cold -> tier 2, anything else -> unbounded.
+    Expressed as a range so the filter can use `idx_mem_events_created_ts`.
+    """
+    if temporal_scope == "hot":
+        return now - HOT_MAX_AGE_SECONDS, None
+    if temporal_scope == "warm":
+        return now - WARM_MAX_AGE_SECONDS, None
+    if temporal_scope == "cold":
+        return now - COLD_MAX_AGE_SECONDS, now - WARM_MAX_AGE_SECONDS
+    return None, None
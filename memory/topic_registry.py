@@ -0,0 +1,109 @@
+from __future__ import annotations
+
+import re
+import sqlite3
+import threading
+import time
+from typing import Callable
+
+TOPIC_ORDER_RECENCY = "recency"
+TOPIC_ORDER_FREQUENCY = "frequency"
+TOPIC_ORDERS = {TOPIC_ORDER_RECENCY, TOPIC_ORDER_FREQUENCY}
+
+# Same shape rule list_known_topics_sync applies.
+_TOPIC_RE = re.compile(r"[a-z0-9_\-]{3,}")
+
+
+class TopicRegistry:
+    """
+    In-process copy of the known-topic registry (`topic_stats`) for topic
+    suggestion, so `remember_event` does not touch SQLite to list candidates.
+
+    Loaded from `load_topics(conn) -> [(topic_id, total, last_ts)]`, then kept
+    warm by `note_topic` on every memory insert / summary write. Deletes,
+    lifecycle changes and topic reassignments are picked up by the periodic
+    reload (`max_age_seconds`). Candidates are ordered most recent first or
+    most frequent first; the sorted list is cached until the registry changes.
+    """
+
+    def __init__(
+        self,
+        *,
+        load_topics: Callable[[sqlite3.Connection], list[tuple[str, int, int]]],
+        order: str = TOPIC_ORDER_RECENCY,
+        max_age_seconds: int = 600,
+    ):
+        if order not in TOPIC_ORDERS:
+            raise ValueError(f"Unknown topic order: {order!r}")
+        self._load_topics = load_topics
+        self.order = order
+        self.max_age_seconds = max(0, int(max_age_seconds))
+        self._lock = threading.Lock()
+        self._topics: dict[str, list[int]] = {}
+        self._sorted: list[str] | None = None
+        self._loaded_at: float | None = None
+        self._loads = 0
+        self._notes = 0
+
+    def needs_load(self, now: float | None = None) -> bool:
+        with self._lock:
+            if self._loaded_at is None:
+                return True
+            if self.max_age_seconds <= 0:
+                return False
+            return (time.monotonic() if now is None else now) - self._loaded_at >= self.max_age_seconds
+
+    def invalidate(self) -> None:
+        with self._lock:
+            self._loaded_at = None
+
+    def load(self, conn: sqlite3.Connection) -> int:
+        rows = self._load_topics(conn)
+        topics: dict[str, list[int]] = {}
+        for topic_id, total, last_ts in rows:
+            clean = str(topic_id or "").strip().lower()
+            if not _TOPIC_RE.fullmatch(clean):
+                continue
+            entry = topics.setdefault(clean, [0, 0])
+            entry[0] += int(total or 0)
+            entry[1] = max(entry[1], int(last_ts or 0))
+        with self._lock:
+            self._topics = topics
+            self._sorted = None
+            self._loaded_at = time.monotonic()
+            self._loads += 1
+        return len(topics)
+
+    def note_topic(self, topic_id: str | None, ts: int | None = None) -> None:
+        """Record one write for `topic_id` (new topics become candidates immediately)."""
+        clean = str(topic_id or "").strip().lower()
+        if not _TOPIC_RE.fullmatch(clean):
+            return
+        with self._lock:
+            entry = self._topics.get(clean)
+            if entry is None:
+                entry = self._topics[clean] = [0, 0]
+            entry[0] += 1
+            entry[1] = max(entry[1], int(ts if ts is not None else time.time()))
+            self._notes += 1
+            self._sorted = None
+
+    def candidates(self, limit: int = 40) -> list[str]:
+        with self._lock:
+            if self._sorted is None:
+                if self.order == TOPIC_ORDER_FREQUENCY:
+                    ranked = sorted(self._topics.items(), key=lambda kv: (-kv[1][0], -kv[1][1], kv[0]))
+                else:
+                    ranked = sorted(self._topics.items(), key=lambda kv: (-kv[1][1], -kv[1][0], kv[0]))
+                self._sorted = [topic for topic, _ in ranked]
+            return self._sorted[: max(0, int(limit))]
+
+    def stats(self) -> dict[str, int | str | bool]:
+        with self._lock:
+            return {
+                "topics": len(self._topics),
+                "order": self.order,
+                "loaded": self._loaded_at is not None,
+                "loads": self._loads,
+                "notes": self._notes,
+            }
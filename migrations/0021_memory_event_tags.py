@@ -0,0 +1,65 @@
+from __future__ import annotations
+
+import json
+import sqlite3
+
+
+def _has_table(conn: sqlite3.Connection, table: str) -> bool:
+    cur = conn.cursor()
+    cur.execute("SELECT 1 FROM sqlite_master WHERE type='table' AND name=? LIMIT 1", (table,))
+    return cur.fetchone() is not None
+
+
+def _tags_from_json(raw: str | None) -> list[str]:
+    try:
+        parsed = json.loads(raw or "[]")
+    except Exception:
+        return []
+    if not isinstance(parsed, list):
+        return []
+    out: list[str] = []
+    seen: set[str] = set()
+    for value in parsed:
+        clean = str(value or "").strip().lower()
+        if clean and clean not in seen:
+            seen.add(clean)
+            out.append(clean)
+    return out
+
+
+def upgrade(conn: sqlite3.Connection) -> None:
+    cur = conn.cursor()
+    cur.execute(
+        """
+        CREATE TABLE IF NOT EXISTS memory_event_tags (
+            memory_id INTEGER NOT NULL,
+            tag TEXT NOT NULL,
+            PRIMARY KEY (memory_id, tag)
+        ) WITHOUT ROWID
+        """
+    )
+    # Covering index for tag -> memory ids lookups.
+    cur.execute("CREATE INDEX IF NOT EXISTS idx_memory_event_tags_tag ON memory_event_tags(tag, memory_id)")
+    if _has_table(conn, "memory_events"):
+        # Topic reads match `topic_id = ?` OR a tag row; both sides need an index.
+        cur.execute("CREATE INDEX IF NOT EXISTS idx_mem_events_topic_id ON memory_events(topic_id)")
+        cur.execute(
+            """
+            CREATE TRIGGER IF NOT EXISTS trg_memory_event_tags_delete
+            AFTER DELETE ON memory_events
+            BEGIN
+                DELETE FROM memory_event_tags WHERE memory_id = OLD.id;
+            END
+            """
+        )
+
+        cur.execute("DELETE FROM memory_event_tags")
+        cur.execute("SELECT id, tags_json FROM memory_events")
+        rows: list[tuple[int, str]] = []
+        for memory_id, tags_json in cur.fetchall():
+            for tag in _tags_from_json(tags_json):
+                rows.append((int(memory_id), tag))
+        if rows:
+            cur.executemany("INSERT OR IGNORE INTO memory_event_tags(memory_id, tag) VALUES (?, ?)", rows)
+
+    conn.commit()
@@ -0,0 +1,163 @@
+from __future__ import annotations
+
+import sqlite3
+
+# The FTS `tags` column is not stored anywhere: these views derive it from
+# tags_json (plus the event topic) and serve as the external content source for
+# both the triggers and `rebuild`. The raw JSON text is indexed as-is; unicode61
+# treats brackets, quotes and commas as separators, so it yields the same tokens
+# the old space-joined tag string did. FTS5 reads content with virtual tables
+# disabled, which rules out json_each() here. Triggers select through the same
+# views so the values passed to FTS5 'delete' always match what was indexed.
+_EVENTS_VIEW_SQL = """
+    CREATE VIEW memory_events_fts_content AS
+    SELECT
+        me.id AS id,
+        me.text AS text,
+        CASE
+            WHEN COALESCE(TRIM(me.topic_id), '') <> ''
+             AND INSTR(LOWER(COALESCE(me.tags_json, '')), '"' || LOWER(TRIM(me.topic_id)) || '"') = 0
+            THEN LOWER(TRIM(me.topic_id)) || ' ' || CASE WHEN json_valid(me.tags_json) THEN me.tags_json ELSE '' END
+            ELSE CASE WHEN json_valid(me.tags_json) THEN me.tags_json ELSE '' END
+        END AS tags
+    FROM memory_events me
+"""
+
+_SUMMARIES_VIEW_SQL = """
+    CREATE VIEW memory_summaries_fts_content AS
+    SELECT
+        ms.id AS id,
+        ms.topic_id AS topic_id,
+        ms.summary_text AS summary_text,
+        CASE WHEN json_valid(ms.tags_json) THEN ms.tags_json ELSE '' END AS tags
+    FROM memory_summaries ms
+"""
+
+
+def _has_table(conn: sqlite3.Connection, table: str) -> bool:
+    cur = conn.cursor()
+    cur.execute("SELECT 1 FROM sqlite_master WHERE type='table' AND name=? LIMIT 1", (table,))
+    return cur.fetchone() is not None
+
+
+def _convert_events_fts(cur: sqlite3.Cursor) -> None:
+    for trigger in ("trg_memory_events_fts_insert", "trg_memory_events_fts_delete",
+                    "trg_memory_events_fts_update_old", "trg_memory_events_fts_update_new"):
+        cur.execute(f"DROP TRIGGER IF EXISTS {trigger}")
+    cur.execute("DROP TABLE IF EXISTS memory_events_fts")
+    cur.execute("DROP VIEW IF EXISTS memory_events_fts_content")
+    cur.execute(_EVENTS_VIEW_SQL)
+    cur.execute(
+        """
+        CREATE VIRTUAL TABLE memory_events_fts
+        USING fts5(text, tags, content='memory_events_fts_content', content_rowid='id', tokenize='unicode61')
+        """
+    )
+    cur.execute(
+        """
+        CREATE TRIGGER trg_memory_events_fts_insert
+        AFTER INSERT ON memory_events
+        BEGIN
+            INSERT INTO memory_events_fts(rowid, text, tags)
+            SELECT id, text, tags FROM memory_events_fts_content WHERE id = NEW.id;
+        END
+        """
+    )
+    cur.execute(
+        """
+        CREATE TRIGGER trg_memory_events_fts_delete
+        BEFORE DELETE ON memory_events
+        BEGIN
+            INSERT INTO memory_events_fts(memory_events_fts, rowid, text, tags)
+            SELECT 'delete', id, text, tags FROM memory_events_fts_content WHERE id = OLD.id;
+        END
+        """
+    )
+    # Only columns that feed the index; tier/lifecycle sweeps must not churn FTS.
+    cur.execute(
+        """
+        CREATE TRIGGER trg_memory_events_fts_update_old
+        BEFORE UPDATE OF text, tags_json, topic_id ON memory_events
+        BEGIN
+            INSERT INTO memory_events_fts(memory_events_fts, rowid, text, tags)
+            SELECT 'delete', id, text, tags FROM memory_events_fts_content WHERE id = OLD.id;
+        END
+        """
+    )
+    cur.execute(
+        """
+        CREATE TRIGGER trg_memory_events_fts_update_new
+        AFTER UPDATE OF text, tags_json, topic_id ON memory_events
+        BEGIN
+            INSERT INTO memory_events_fts(rowid, text, tags)
+            SELECT id, text, tags FROM memory_events_fts_content WHERE id = NEW.id;
+        END
+        """
+    )
+    cur.execute("INSERT INTO memory_events_fts(memory_events_fts) VALUES ('rebuild')")
+
+
+def _convert_summaries_fts(cur: sqlite3.Cursor) -> None:
+    for trigger in ("trg_memory_summaries_fts_insert", "trg_memory_summaries_fts_delete",
+                    "trg_memory_summaries_fts_update_old", "trg_memory_summaries_fts_update_new"):
+        cur.execute(f"DROP TRIGGER IF EXISTS {trigger}")
+    cur.execute("DROP TABLE IF EXISTS memory_summaries_fts")
+    cur.execute("DROP VIEW IF EXISTS memory_summaries_fts_content")
+    cur.execute(_SUMMARIES_VIEW_SQL)
+    cur.execute(
+        """
+        CREATE VIRTUAL TABLE memory_summaries_fts
+        USING fts5(topic_id, summary_text, tags, content='memory_summaries_fts_content', content_rowid='id',
+                   tokenize='unicode61')
+        """
+    )
+    cur.execute(
+        """
+        CREATE TRIGGER trg_memory_summaries_fts_insert
+        AFTER INSERT ON memory_summaries
+        BEGIN
+            INSERT INTO memory_summaries_fts(rowid, topic_id, summary_text, tags)
+            SELECT id, topic_id, summary_text, tags FROM memory_summaries_fts_content WHERE id = NEW.id;
+        END
+        """
+    )
+    cur.execute(
+        """
+        CREATE TRIGGER trg_memory_summaries_fts_delete
+        BEFORE DELETE ON memory_summaries
+        BEGIN
+            INSERT INTO memory_summaries_fts(memory_summaries_fts, rowid, topic_id, summary_text, tags)
+            SELECT 'delete', id, topic_id, summary_text, tags FROM memory_summaries_fts_content WHERE id = OLD.id;
+        END
+        """
+    )
+    cur.execute(
+        """
+        CREATE TRIGGER trg_memory_summaries_fts_update_old
+        BEFORE UPDATE OF topic_id, summary_text, tags_json ON memory_summaries
+        BEGIN
+            INSERT INTO memory_summaries_fts(memory_summaries_fts, rowid, topic_id, summary_text, tags)
+            SELECT 'delete', id, topic_id, summary_text, tags FROM memory_summaries_fts_content WHERE id = OLD.id;
+        END
+        """
+    )
+    cur.execute(
+        """
+        CREATE TRIGGER trg_memory_summaries_fts_update_new
+        AFTER UPDATE OF topic_id, summary_text, tags_json ON memory_summaries
+        BEGIN
+            INSERT INTO memory_summaries_fts(rowid, topic_id, summary_text, tags)
+            SELECT id, topic_id, summary_text, tags FROM memory_summaries_fts_content WHERE id = NEW.id;
+        END
+        """
+    )
+    cur.execute("INSERT INTO memory_summaries_fts(memory_summaries_fts) VALUES ('rebuild')")
+
+
+def upgrade(conn: sqlite3.Connection) -> None:
+    cur = conn.cursor()
+    if _has_table(conn, "memory_events"):
+        _convert_events_fts(cur)
+    if _has_table(conn, "memory_summaries"):
+        _convert_summaries_fts(cur)
+    conn.commit()
@@ -0,0 +1,39 @@
+from __future__ import annotations
+
+import sqlite3
+
+
+def _has_table(conn: sqlite3.Connection, table: str) -> bool:
+    cur = conn.cursor()
+    cur.execute("SELECT 1 FROM sqlite_master WHERE type='table' AND name=? LIMIT 1", (table,))
+    return cur.fetchone() is not None
+
+
+def upgrade(conn: sqlite3.Connection) -> None:
+    cur = conn.cursor()
+    # One row per cleanup rule: the `now` of its last successful run.
+    cur.execute(
+        """
+        CREATE TABLE IF NOT EXISTS memory_maintenance_state (
+            name TEXT PRIMARY KEY,
+            watermark_ts INTEGER NOT NULL,
+            updated_at_utc TEXT NOT NULL
+        )
+        """
+    )
+    if _has_table(conn, "memory_events"):
+        cur.execute("CREATE INDEX IF NOT EXISTS idx_mem_events_created_ts ON memory_events(created_ts)")
+        cur.execute(
+            "CREATE INDEX IF NOT EXISTS idx_mem_events_expiry ON memory_events(expiry_at_utc) "
+            "WHERE expiry_at_utc IS NOT NULL"
+        )
+        cur.execute(
+            "CREATE INDEX IF NOT EXISTS idx_mem_events_zero_importance_created ON memory_events(created_ts) "
+            "WHERE importance <= 0.0"
+        )
+    if _has_table(conn, "memory_summaries"):
+        cur.execute(
+            "CREATE INDEX IF NOT EXISTS idx_mem_summaries_zero_importance_end "
+            "ON memory_summaries(COALESCE(end_ts, start_ts, 0)) WHERE importance = 0"
+        )
+    conn.commit()
@@ -0,0 +1,24 @@
+from __future__ import annotations
+
+import sqlite3
+
+
+def _has_table(conn: sqlite3.Connection, table: str) -> bool:
+    cur = conn.cursor()
+    cur.execute("SELECT 1 FROM sqlite_master WHERE type='table' AND name=? LIMIT 1", (table,))
+    return cur.fetchone() is not None
+
+
+def upgrade(conn: sqlite3.Connection) -> None:
+    cur = conn.cursor()
+    # fts5vocab tables read the live FTS index, so they never need a refresh;
+    # `row` mode gives per-term document counts for query term selection.
+    if _has_table(conn, "memory_events_fts"):
+        cur.execute(
+            "CREATE VIRTUAL TABLE IF NOT EXISTS memory_events_fts_vocab USING fts5vocab(memory_events_fts, 'row')"
+        )
+    if _has_table(conn, "memory_summaries_fts"):
+        cur.execute(
+            "CREATE VIRTUAL TABLE IF NOT EXISTS memory_summaries_fts_vocab USING fts5vocab(memory_summaries_fts, 'row')"
+        )
+    conn.commit()
@@ -0,0 +1,52 @@
+from __future__ import annotations
+
+import hashlib
+import re
+import sqlite3
+
+
+def _has_table(conn: sqlite3.Connection, table: str) -> bool:
+    cur = conn.cursor()
+    cur.execute("SELECT 1 FROM sqlite_master WHERE type='table' AND name=? LIMIT 1", (table,))
+    return cur.fetchone() is not None
+
+
+def _has_column(conn: sqlite3.Connection, table: str, column: str) -> bool:
+    cur = conn.cursor()
+    cur.execute(f"PRAGMA table_info({table})")
+    return any(str(row[1]) == column for row in cur.fetchall())
+
+
+def _content_hash(text: str | None) -> str:
+    # Must match memory.store.memory_content_hash.
+    norm = re.sub(r"\s+", " ", (text or "").strip().lower())
+    return hashlib.sha1(norm.encode("utf-8")).hexdigest()
+
+
+def upgrade(conn: sqlite3.Connection) -> None:
+    if not _has_table(conn, "memory_events"):
+        return
+    cur = conn.cursor()
+    if not _has_column(conn, "memory_events", "content_hash"):
+        cur.execute("ALTER TABLE memory_events ADD COLUMN content_hash TEXT")
+
+    last_id = 0
+    while True:
+        cur.execute(
+            "SELECT id, text FROM memory_events WHERE content_hash IS NULL AND id > ? ORDER BY id LIMIT 1000",
+            (last_id,),
+        )
+        rows = cur.fetchall()
+        if not rows:
+            break
+        cur.executemany(
+            "UPDATE memory_events SET content_hash = ? WHERE id = ?",
+            [(_content_hash(text), int(mid)) for mid, text in rows],
+        )
+        last_id = int(rows[-1][0])
+
+    # Duplicate lookups are per scope; see memory.store.merge_duplicate_memory_event_sync.
+    cur.execute(
+        "CREATE INDEX IF NOT EXISTS idx_mem_events_content_hash ON memory_events(content_hash, scope)"
+    )
+    conn.commit()
@@ -0,0 +1,32 @@
+from __future__ import annotations
+
+import sqlite3
+
+
+def upgrade(conn: sqlite3.Connection) -> None:
+    cur = conn.cursor()
+    # One MinHash signature per event (see memory/near_dupe.py). Rows are
+    # written at insert; older events are signed by `!memdedupe`.
+    cur.execute(
+        """
+        CREATE TABLE IF NOT EXISTS memory_event_minhash (
+            memory_id INTEGER PRIMARY KEY,
+            scope TEXT NOT NULL,
+            signature BLOB NOT NULL
+        )
+        """
+    )
+    # LSH buckets: events sharing any (band_key) are near-duplicate candidates.
+    cur.execute(
+        """
+        CREATE TABLE IF NOT EXISTS memory_event_minhash_bands (
+            band_key INTEGER NOT NULL,
+            memory_id INTEGER NOT NULL,
+            PRIMARY KEY (band_key, memory_id)
+        ) WITHOUT ROWID
+        """
+    )
+    cur.execute(
+        "CREATE INDEX IF NOT EXISTS idx_mem_minhash_bands_memory_id ON memory_event_minhash_bands(memory_id)"
+    )
+    conn.commit()
@@ -0,0 +1,21 @@
+from __future__ import annotations
+
+import sqlite3
+
+
+def upgrade(conn: sqlite3.Connection) -> None:
+    cur = conn.cursor()
+    # Hashed float32 vectors for local hybrid recall (retrieval/vector_index.py).
+    # `seq` grows on every write so the in-process index loads only new rows.
+    for table in ("memory_event_vectors", "memory_summary_vectors"):
+        cur.execute(
+            f"""
+            CREATE TABLE IF NOT EXISTS {table} (
+                item_id INTEGER PRIMARY KEY,
+                seq INTEGER NOT NULL,
+                vector BLOB NOT NULL
+            )
+            """
+        )
+        cur.execute(f"CREATE INDEX IF NOT EXISTS idx_{table}_seq ON {table}(seq)")
+    conn.commit()
@@ -0,0 +1,41 @@
+from __future__ import annotations
+
+import sqlite3
+
+
+def upgrade(conn: sqlite3.Connection) -> None:
+    cur = conn.cursor()
+    # Durable background work (see jobs/store.py). A running job holds a lease;
+    # once it expires another worker (or the next process) may reclaim it.
+    cur.execute(
+        """
+        CREATE TABLE IF NOT EXISTS jobs (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            job_type TEXT NOT NULL,
+            payload_json TEXT NOT NULL DEFAULT '{}',
+            dedupe_key TEXT,
+            status TEXT NOT NULL DEFAULT 'queued',
+            attempts INTEGER NOT NULL DEFAULT 0,
+            max_attempts INTEGER NOT NULL DEFAULT 3,
+            run_after_ts INTEGER NOT NULL,
+            lease_owner TEXT,
+            lease_expires_ts INTEGER,
+            created_ts INTEGER NOT NULL,
+            started_ts INTEGER,
+            finished_ts INTEGER,
+            last_error TEXT,
+            result_text TEXT
+        )
+        """
+    )
+    cur.execute("CREATE INDEX IF NOT EXISTS idx_jobs_status_run_after ON jobs(status, run_after_ts)")
+    cur.execute("CREATE INDEX IF NOT EXISTS idx_jobs_type_finished ON jobs(job_type, finished_ts)")
+    # At most one queued/running job per dedupe key (e.g. one summary per topic).
+    cur.execute(
+        """
+        CREATE UNIQUE INDEX IF NOT EXISTS idx_jobs_active_dedupe
+        ON jobs(dedupe_key)
+        WHERE dedupe_key IS NOT NULL AND status IN ('queued', 'running')
+        """
+    )
+    conn.commit()
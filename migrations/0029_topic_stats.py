@@ -0,0 +1,167 @@
+from __future__ import annotations
+
+import sqlite3
+
+# Auto-summary eligibility; must match the maintenance-loop candidate rule and
+# the partial index below term for term.
+_PENDING_OLD = "(OLD.importance = 1 AND OLD.summarized = 0 AND COALESCE(OLD.lifecycle, 'active') = 'active')"
+_PENDING_NEW = "(NEW.importance = 1 AND NEW.summarized = 0 AND COALESCE(NEW.lifecycle, 'active') = 'active')"
+
+_ADD_NEW = f"""
+    INSERT INTO topic_stats (topic_id, total, unsummarized, first_unsummarized_ts, last_event_ts)
+    SELECT NEW.topic_id, 1, {_PENDING_NEW}, CASE WHEN {_PENDING_NEW} THEN NEW.created_ts END,
+           COALESCE(NEW.created_ts, 0)
+    WHERE COALESCE(NEW.topic_id, '') <> ''
+    ON CONFLICT(topic_id) DO UPDATE SET
+        total = total + 1,
+        unsummarized = unsummarized + excluded.unsummarized,
+        first_unsummarized_ts = CASE
+            WHEN excluded.first_unsummarized_ts IS NULL THEN first_unsummarized_ts
+            ELSE MIN(COALESCE(first_unsummarized_ts, excluded.first_unsummarized_ts), excluded.first_unsummarized_ts)
+        END,
+        last_event_ts = MAX(COALESCE(last_event_ts, 0), excluded.last_event_ts);
+"""
+
+# Runs AFTER the row changed, so the recomputes already see its new state.
+_REMOVE_OLD = f"""
+    UPDATE topic_stats
+    SET total = total - 1, unsummarized = unsummarized - {_PENDING_OLD}
+    WHERE topic_id = OLD.topic_id;
+    UPDATE topic_stats
+    SET first_unsummarized_ts = (
+        SELECT MIN(created_ts) FROM memory_events
+        WHERE topic_id = OLD.topic_id
+          AND importance = 1 AND summarized = 0 AND COALESCE(lifecycle, 'active') = 'active'
+    )
+    WHERE topic_id = OLD.topic_id AND {_PENDING_OLD};
+    UPDATE topic_stats
+    SET last_event_ts = (SELECT MAX(created_ts) FROM memory_events WHERE topic_id = OLD.topic_id)
+    WHERE topic_id = OLD.topic_id AND last_event_ts <= COALESCE(OLD.created_ts, 0);
+"""
+
+_SUMMARY_TS_NEW = "COALESCE(CAST(strftime('%s', NEW.updated_at_utc) AS INTEGER), CAST(strftime('%s', 'now') AS INTEGER))"
+
+_TOUCH_SUMMARY = f"""
+    INSERT INTO topic_stats (topic_id, last_summary_ts)
+    SELECT NEW.topic_id, {_SUMMARY_TS_NEW}
+    WHERE COALESCE(NEW.topic_id, '') <> ''
+    ON CONFLICT(topic_id) DO UPDATE SET
+        last_summary_ts = MAX(COALESCE(last_summary_ts, 0), excluded.last_summary_ts);
+"""
+
+
+def upgrade(conn: sqlite3.Connection) -> None:
+    cur = conn.cursor()
+    # Per-topic counters kept current by triggers, so every writer (capture,
+    # review approve/reject, summaries, cleanup, merges) updates them in its own
+    # transaction. `unsummarized` counts events eligible for auto-summary
+    # regardless of age; `first_unsummarized_ts` is the oldest of them.
+    cur.execute(
+        """
+        CREATE TABLE IF NOT EXISTS topic_stats (
+            topic_id TEXT PRIMARY KEY,
+            total INTEGER NOT NULL DEFAULT 0,
+            unsummarized INTEGER NOT NULL DEFAULT 0,
+            first_unsummarized_ts INTEGER,
+            last_event_ts INTEGER,
+            last_summary_ts INTEGER
+        )
+        """
+    )
+    cur.execute(
+        """
+        CREATE INDEX IF NOT EXISTS idx_mem_events_topic_pending
+        ON memory_events(topic_id, created_ts)
+        WHERE importance = 1 AND summarized = 0 AND COALESCE(lifecycle, 'active') = 'active'
+        """
+    )
+
+    for trigger in (
+        "trg_topic_stats_event_insert",
+        "trg_topic_stats_event_delete",
+        "trg_topic_stats_event_update",
+        "trg_topic_stats_summary_insert",
+        "trg_topic_stats_summary_update",
+    ):
+        cur.execute(f"DROP TRIGGER IF EXISTS {trigger}")
+    cur.execute(
+        f"""
+        CREATE TRIGGER trg_topic_stats_event_insert
+        AFTER INSERT ON memory_events
+        WHEN COALESCE(NEW.topic_id, '') <> ''
+        BEGIN
+            {_ADD_NEW}
+        END
+        """
+    )
+    cur.execute(
+        f"""
+        CREATE TRIGGER trg_topic_stats_event_delete
+        AFTER DELETE ON memory_events
+        WHEN COALESCE(OLD.topic_id, '') <> ''
+        BEGIN
+            {_REMOVE_OLD}
+        END
+        """
+    )
+    cur.execute(
+        f"""
+        CREATE TRIGGER trg_topic_stats_event_update
+        AFTER UPDATE OF topic_id, importance, summarized, lifecycle, created_ts ON memory_events
+        WHEN OLD.topic_id IS NOT NEW.topic_id
+          OR OLD.importance IS NOT NEW.importance
+          OR OLD.summarized IS NOT NEW.summarized
+          OR OLD.lifecycle IS NOT NEW.lifecycle
+          OR OLD.created_ts IS NOT NEW.created_ts
+        BEGIN
+            {_REMOVE_OLD}
+            {_ADD_NEW}
+        END
+        """
+    )
+    cur.execute(
+        f"""
+        CREATE TRIGGER trg_topic_stats_summary_insert
+        AFTER INSERT ON memory_summaries
+        BEGIN
+            {_TOUCH_SUMMARY}
+        END
+        """
+    )
+    cur.execute(
+        f"""
+        CREATE TRIGGER trg_topic_stats_summary_update
+        AFTER UPDATE OF summary_text, updated_at_utc ON memory_summaries
+        BEGIN
+            {_TOUCH_SUMMARY}
+        END
+        """
+    )
+
+    cur.execute("DELETE FROM topic_stats")
+    cur.execute(
+        """
+        INSERT INTO topic_stats (topic_id, total, unsummarized, first_unsummarized_ts, last_event_ts)
+        SELECT
+            topic_id,
+            COUNT(*),
+            SUM(importance = 1 AND summarized = 0 AND COALESCE(lifecycle, 'active') = 'active'),
+            MIN(CASE WHEN importance = 1 AND summarized = 0 AND COALESCE(lifecycle, 'active') = 'active'
+                     THEN created_ts END),
+            MAX(COALESCE(created_ts, 0))
+        FROM memory_events
+        WHERE COALESCE(topic_id, '') <> ''
+        GROUP BY topic_id
+        """
+    )
+    cur.execute(
+        """
+        INSERT INTO topic_stats (topic_id, last_summary_ts)
+        SELECT topic_id, MAX(CAST(strftime('%s', updated_at_utc) AS INTEGER))
+        FROM memory_summaries
+        WHERE COALESCE(topic_id, '') <> ''
+        GROUP BY topic_id
+        ON CONFLICT(topic_id) DO UPDATE SET last_summary_ts = excluded.last_summary_ts
+        """
+    )
+    conn.commit()
@@ -11,6 +11,7 @@ from zoneinfo import ZoneInfo
 
 import yaml
 
+from llm.gateway import chat_completion
 from misc.discord_timestamps import DISCORD_TIMESTAMP_STYLES
 from misc.discord_timestamps import RecurringTimestampSpec
 from misc.discord_timestamps import TimestampRenderResult
@@ -746,7 +747,8 @@ class AnnouncementService:
 
         draft_text: str
         try:
-            resp = self.client.chat.completions.create(
+            resp = await chat_completion(
+                self.client,
                 model=self.openai_model,
                 messages=[
                     {"role": "system", "content": sys_prompt[:1800]},
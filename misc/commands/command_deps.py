@@ -5,6 +5,8 @@ from dataclasses import field
 from typing import Any
 from typing import Callable
 
+from db.handles import DbHandles
+
 
 def _default_false(*args, **kwargs) -> bool:
     return False
@@ -15,6 +17,7 @@ class CommandDeps:
     # Core/shared
     db_lock: Any = None
     db_conn: Any = None
+    db_handles: Any = None
     send_chunked: Callable | None = None
     client: Any = None
     openai_model: str = "gpt-5.1"
@@ -27,15 +30,23 @@ class CommandDeps:
     auto_capture: bool = False
     auto_summary: bool = False
     memory_review_mode: str = "capture_only"
+    memory_near_dup_threshold: float = 0.8
     topic_suggest: bool = False
     topic_min_conf: float = 0.85
     topic_allowlist: list[str] = field(default_factory=list)
 
     # Store/service functions
     fetch_episode_logs_sync: Callable | None = None
+    flush_episode_logs_func: Callable | None = None
     update_latest_dm_draft_feedback_sync: Callable | None = None
     update_latest_dm_draft_evaluation_sync: Callable | None = None
     list_schema_migrations_sync: Callable | None = None
+    maintain_memory_fts_sync: Callable | None = None
+    controller_cache: Any = None
+    recall_cache: Any = None
+    hot_memory_index: Any = None
+    job_pool: Any = None
+    job_stats_sync: Callable | None = None
     topic_counts_sync: Callable | None = None
     list_known_topics_sync: Callable | None = None
     get_topic_summary_sync: Callable | None = None
@@ -51,6 +62,9 @@ class CommandDeps:
     list_candidate_memories_sync: Callable | None = None
     approve_memory_sync: Callable | None = None
     reject_memory_sync: Callable | None = None
+    merge_memory_events_sync: Callable | None = None
+    backfill_memory_event_minhash_sync: Callable | None = None
+    near_duplicate_clusters_sync: Callable | None = None
     parse_channel_id_token: Callable | None = None
     parse_duration_to_minutes: Callable | None = None
     fetch_messages_since_sync: Callable | None = None
@@ -58,6 +72,7 @@ class CommandDeps:
     fetch_memory_events_since_sync: Callable | None = None
     fetch_latest_memory_events_sync: Callable | None = None
     fetch_recent_context_sync: Callable | None = None
+    get_recent_context_rows_func: Callable | None = None
     format_recent_context: Callable | None = None
     format_memory_events_window: Callable | None = None
     extract_json_array: Callable | None = None
@@ -76,6 +91,12 @@ class CommandDeps:
     announcement_service: Any = None
     music_service: Any = None
 
+    def __post_init__(self) -> None:
+        # Commands always get explicit read/write handles; without a read pool
+        # both modes share the write connection + lock.
+        if self.db_handles is None and self.db_conn is not None:
+            object.__setattr__(self, "db_handles", DbHandles(db_lock=self.db_lock, db_conn=self.db_conn))
+
 
 @dataclass(frozen=True)
 class CommandGates:
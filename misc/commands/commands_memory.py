@@ -171,13 +171,11 @@ def register(
             return
 
         lim = max(1, min(int(limit or 20), 100))
-        async with deps.db_lock:
-            rows = await asyncio.to_thread(
-                deps.list_candidate_memories_sync,
-                deps.db_conn,
-                lim,
-                0,
-            )
+        rows = await deps.db_handles.read(
+            deps.list_candidate_memories_sync,
+            lim,
+            0,
+        )
 
         if not rows:
             await ctx.send("No candidate memories in review queue.")
@@ -311,6 +309,91 @@ def register(
             f"Rejected memory #{int(updated.get('id') or memory_id)} -> lifecycle=deprecated."
         )
 
+    @bot.command(name="memdedupe")
+    async def memdedupe_cmd(ctx: commands.Context, *args: str):
+        if not gates.in_allowed_channel(ctx):
+            return
+        if not gates.user_is_owner(ctx.author):
+            await ctx.send("This command is owner-only.")
+            return
+        if (
+            deps.near_duplicate_clusters_sync is None
+            or deps.backfill_memory_event_minhash_sync is None
+            or deps.merge_memory_events_sync is None
+            or deps.get_or_create_person_sync is None
+        ):
+            await ctx.send("Memory dedupe service is not configured.")
+            return
+
+        threshold = float(deps.memory_near_dup_threshold)
+        apply = False
+        for arg in args:
+            token = (arg or "").strip().lower()
+            if token == "apply":
+                apply = True
+                continue
+            try:
+                threshold = float(token)
+            except ValueError:
+                await ctx.send("Usage: `!memdedupe [threshold 0..1] [apply]`")
+                return
+        if not 0.0 < threshold <= 1.0:
+            await ctx.send("Threshold must be in (0, 1].")
+            return
+
+        # Sign events written before near-duplicate indexing existed.
+        signed = await deps.db_handles.write(deps.backfill_memory_event_minhash_sync)
+        clusters = await deps.db_handles.read(deps.near_duplicate_clusters_sync, threshold=threshold)
+        redundant = sum(len(c["merge_ids"]) for c in clusters)
+
+        lines = [
+            f"Near-duplicate clusters (threshold={threshold:.2f}, newly signed={signed}): "
+            f"{len(clusters)} clusters, {redundant} redundant memories"
+        ]
+        for cluster in clusters[:20]:
+            ids = cluster["ids"]
+            dups = ", ".join(f"#{x}" for x in cluster["merge_ids"])
+            # Chained members are not similar enough to the survivor itself.
+            chained = [x for x in ids[1:] if x not in cluster["merge_ids"]]
+            later = f" (next pass: {', '.join(f'#{x}' for x in chained)})" if chained else ""
+            lines.append(
+                f"- keep #{ids[0]} <- {dups}{later} scope={cluster['scope']} sim>={cluster['min_similarity']:.2f} "
+                f":: {_shorten(cluster['texts'][0], 70)}"
+            )
+        if len(clusters) > 20:
+            lines.append(f"... {len(clusters) - 20} more")
+
+        if apply and clusters:
+            person_origin = f"discord:{int(ctx.guild.id)}" if getattr(ctx, "guild", None) is not None else "discord:dm"
+            merged = 0
+            async with deps.db_lock:
+                actor_person_id = await asyncio.to_thread(
+                    deps.get_or_create_person_sync,
+                    deps.db_conn,
+                    platform="discord",
+                    external_id=str(int(ctx.author.id)),
+                    origin=person_origin,
+                    label="discord_user_id",
+                )
+                for cluster in clusters:
+                    try:
+                        result = await asyncio.to_thread(
+                            deps.merge_memory_events_sync,
+                            deps.db_conn,
+                            survivor_id=int(cluster["ids"][0]),
+                            duplicate_ids=[int(x) for x in cluster["merge_ids"]],
+                            actor_person_id=int(actor_person_id),
+                            reason=f"near-duplicate (sim>={cluster['min_similarity']:.2f})",
+                        )
+                    except MemoryLifecycleError:
+                        continue
+                    merged += len(result.get("merged_ids") or [])
+            lines.append(f"Applied: deprecated {merged} memories into their cluster survivors.")
+        elif clusters:
+            lines.append("Dry run; re-run with `apply` to merge.")
+
+        await deps.send_chunked(ctx.channel, "```\n" + "\n".join(lines)[:7000] + "\n```")
+
     @bot.command(name="topics")
     async def topics_cmd(ctx: commands.Context, limit: int = 15):
         if not gates.in_allowed_channel(ctx):
@@ -318,9 +401,8 @@ def register(
         lim = max(1, min(int(limit or 15), 30))
 
         allow = deps.topic_allowlist
-        async with deps.db_lock:
-            counts = await asyncio.to_thread(deps.topic_counts_sync, deps.db_conn, lim)
-            known = await asyncio.to_thread(deps.list_known_topics_sync, deps.db_conn, 200)
+        counts = await deps.db_handles.read(deps.topic_counts_sync, lim)
+        known = await deps.db_handles.read(deps.list_known_topics_sync, 200)
 
         lines = []
         lines.append(f"TOPIC_SUGGEST={'1' if deps.topic_suggest else '0'} | TOPIC_MIN_CONF={deps.topic_min_conf:.2f}")
@@ -399,13 +481,24 @@ def register(
             await ctx.send("Nothing saved (empty text).")
             return
         mem_id = saved.get("id")
+        near = saved.get("near_duplicate_of") or {}
+        if saved.get("deduplicated"):
+            sim_txt = f" (similarity {near['similarity']:.2f})" if near else ""
+            await ctx.send(
+                f"Already remembered as memory #{mem_id}{sim_txt} (lifecycle={saved.get('lifecycle')}); "
+                "merged tags/importance."
+            )
+            return
         lifecycle = str(saved.get("lifecycle") or "active")
         topic_id = saved.get("topic_id")
         topic_source = saved.get("topic_source")
         conf = saved.get("topic_confidence")
         conf_txt = f" conf={conf:.2f}" if isinstance(conf, float) else ""
         topic_txt = f" topic={topic_id} ({topic_source}{conf_txt})" if topic_id else " topic=(none)"
-        await ctx.send(f"Saved memory #{mem_id} lifecycle={lifecycle} tags={tags} importance={importance}{topic_txt}")
+        near_txt = f" (near-duplicate of #{near['id']}, similarity {near['similarity']:.2f})" if near else ""
+        await ctx.send(
+            f"Saved memory #{mem_id} lifecycle={lifecycle} tags={tags} importance={importance}{topic_txt}{near_txt}"
+        )
 
     @bot.command(name="recall")
     async def recall_cmd(ctx: commands.Context, *, query: str = ""):
@@ -440,8 +533,7 @@ def register(
             return
 
         scope = _compose_scope_tokens(ctx, "auto")
-        async with deps.db_lock:
-            summary = await asyncio.to_thread(deps.get_topic_summary_sync, deps.db_conn, topic_id, scope, "topic_gist")
+        summary = await deps.db_handles.read(deps.get_topic_summary_sync, topic_id, scope, "topic_gist")
         if not summary:
             await ctx.send(f"No summary found for topic '{topic_id}'.")
             return
@@ -542,8 +634,7 @@ def register(
     async def cmd_memlast(ctx, n: int = 5):
         if ctx.channel.id not in gates.allowed_channel_ids:
             return
-        async with deps.db_lock:
-            rows = await asyncio.to_thread(_debug_last_memories_sync, deps.db_conn, int(n))
+        rows = await deps.db_handles.read(_debug_last_memories_sync, int(n))
         lines = ["Last memories:"] + [f"- #{r['id']} topic={r['topic_id']} tags={r['tags']}\n  {r['text'][:120]}" for r in rows]
         await ctx.send("\n".join(lines)[:1900])
 
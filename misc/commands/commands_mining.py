@@ -1,85 +1,95 @@
 from __future__ import annotations
 
-import asyncio
 import json
 from datetime import timedelta
 
 import discord
 from discord.ext import commands
+from llm.gateway import chat_completion
+from llm.scheduler import PRIORITY_OPERATOR
 from memory.tagging import normalize_memory_tags
 from misc.commands.command_deps import CommandDeps
 from misc.commands.command_deps import CommandGates
 
 
+_MINE_KINDS = {"decision", "policy", "canon", "profile", "proposal", "insight", "task"}
+
+
+class _MineLLMError(RuntimeError):
+    pass
+
+
 def register(
     bot: commands.Bot,
     *,
     deps: CommandDeps,
     gates: CommandGates,
 ) -> None:
-    @bot.command(name="mine")
-    async def cmd_mine(ctx, *args):
-        if ctx.channel.id not in gates.allowed_channel_ids:
-            await ctx.send("This command isn't enabled in this channel.")
-            return
-
-        if not deps.stage_at_least("M1"):
-            await ctx.send("Memory is not enabled (stage < M1).")
-            return
-
-        target_channel_id = ctx.channel.id
-        limit = 200
-
-        if len(args) >= 1:
-            maybe_ch = deps.parse_channel_id_token(args[0])
-            if maybe_ch:
-                target_channel_id = maybe_ch
-                if len(args) >= 2 and str(args[1]).isdigit():
-                    limit = max(50, min(500, int(args[1])))
-            elif str(args[0]).isdigit():
-                limit = max(50, min(500, int(args[0])))
-
-        if target_channel_id not in gates.allowed_channel_ids:
-            await ctx.send("That channel is not in Epoxy's allowlist, so I won't mine it.")
-            return
-
-        target_channel_name = None
-        ch_obj = bot.get_channel(target_channel_id)
-        if ch_obj is None:
-            try:
-                ch_obj = await bot.fetch_channel(target_channel_id)
-            except Exception:
-                ch_obj = None
-        if ch_obj is not None:
-            target_channel_name = getattr(ch_obj, "name", None) or str(ch_obj)
+    async def _store_mined_item(it, message, target_channel_id: int, target_channel_name: str | None):
+        """Save one extracted item: None when skipped, "merged" for a duplicate, else (memory_id, topic_id)."""
+        try:
+            text = (it.get("text") or "").strip()
+            kind = (it.get("kind") or "").strip().lower()
+            topic_id = it.get("topic_id", None)
+            importance = int(it.get("importance", 0))
+            conf = float(it.get("confidence", 0.0))
+        except Exception:
+            return None
+
+        if not text:
+            return None
+        if kind not in _MINE_KINDS:
+            kind = "insight"
+        importance = 1 if importance == 1 else 0
+
+        if isinstance(topic_id, str):
+            topic_id = topic_id.strip().lower()
+            if topic_id not in set(deps.topic_allowlist or []):
+                topic_id = None
+        else:
+            topic_id = None
+
+        if conf < 0.55:
+            return None
+
+        tags = normalize_memory_tags([kind], preserve_legacy=True)
+        if topic_id:
+            tags = normalize_memory_tags([topic_id] + tags, preserve_legacy=True)
+
+        res = await deps.remember_event_func(
+            text=text,
+            tags=tags,
+            importance=importance,
+            message=message,
+            topic_hint=topic_id,
+            source_path="mining",
+        )
+        if not res:
+            return None
+        if res.get("deduplicated"):
+            return "merged"
 
-        hot_minutes = None
-        for a in args:
-            hm = deps.parse_duration_to_minutes(str(a))
-            if hm is not None:
-                hot_minutes = max(5, min(240, hm))
-                break
+        await deps.set_memory_origin_func(int(res["id"]), target_channel_id, target_channel_name)
+        return (int(res["id"]), topic_id)
 
+    async def _extract_mine_items(target_channel_id: int, limit: int, hot_minutes: int | None) -> dict | str:
+        """Read the window and ask the LLM for memory items: a fresh progress dict, or a report if none."""
         if hot_minutes is not None:
             since_dt = discord.utils.utcnow() - timedelta(minutes=hot_minutes)
             since_iso = since_dt.isoformat()
-            async with deps.db_lock:
-                rows = await asyncio.to_thread(
-                    deps.fetch_messages_since_sync,
-                    deps.db_conn,
-                    target_channel_id,
-                    since_iso,
-                    500,
-                )
+            rows = await deps.db_handles.read(
+                deps.fetch_messages_since_sync,
+                target_channel_id,
+                since_iso,
+                500,
+            )
             mode_label = f"hot({hot_minutes}m)"
         else:
-            async with deps.db_lock:
-                rows = await asyncio.to_thread(deps.fetch_latest_messages_sync, deps.db_conn, target_channel_id, limit)
+            rows = await deps.db_handles.read(deps.fetch_latest_messages_sync, target_channel_id, limit)
             mode_label = f"last({limit})"
 
         if not rows:
-            await ctx.send("No messages found to mine for that channel.")
-            return
+            return "No messages found to mine for that channel."
 
         window_text = deps.format_recent_context(rows, max_chars=12000, max_line_chars=350)
         allowlist = deps.topic_allowlist[:] if deps.topic_allowlist else []
@@ -109,8 +119,10 @@ Rules:
 """.strip()
 
         try:
-            resp = deps.client.chat.completions.create(
+            resp = await chat_completion(
+                deps.client,
                 model=deps.openai_model,
+                priority=PRIORITY_OPERATOR,
                 messages=[
                     {"role": "system", "content": extraction_instructions[:1900]},
                     {"role": "user", "content": f"Channel window:\n{window_text}"[:12000]},
@@ -118,73 +130,168 @@ Rules:
             )
             raw = (resp.choices[0].message.content or "").strip()
         except Exception as e:
-            await ctx.send(f"Mine failed (LLM error): {e}")
-            return
+            raise _MineLLMError(str(e)) from e
 
         items = deps.extract_json_array(raw)
         if not items:
-            await ctx.send("Mine produced no usable JSON items.")
-            return
-
-        allowed_kinds = {"decision", "policy", "canon", "profile", "proposal", "insight", "task"}
-        allow_topics = set(deps.topic_allowlist or [])
-        saved = 0
-        topics_used: dict[str, int] = {}
-
-        for it in items:
+            return "Mine produced no usable JSON items."
+        return {
+            "rows": len(rows),
+            "mode_label": mode_label,
+            "items": items,
+            "next": 0,
+            "saved_ids": [],
+            "merged": 0,
+            "topics_used": {},
+        }
+
+    async def _mine_window(
+        message,
+        target_channel_id: int,
+        limit: int,
+        hot_minutes: int | None,
+        *,
+        progress: dict | None = None,
+        checkpoint=None,
+    ) -> str:
+        """
+        Extract memories from one channel window and store them; returns the report line.
+
+        `progress` holds the extracted items and how far saving got. When it
+        already has items (a retried job), extraction is skipped and saving
+        resumes where it stopped; `checkpoint()` persists it after each write.
+        """
+        progress = {} if progress is None else progress
+        target_channel_name = None
+        ch_obj = bot.get_channel(target_channel_id)
+        if ch_obj is None:
             try:
-                text = (it.get("text") or "").strip()
-                kind = (it.get("kind") or "").strip().lower()
-                topic_id = it.get("topic_id", None)
-                importance = int(it.get("importance", 0))
-                conf = float(it.get("confidence", 0.0))
+                ch_obj = await bot.fetch_channel(target_channel_id)
             except Exception:
-                continue
-
-            if not text:
-                continue
-            if kind not in allowed_kinds:
-                kind = "insight"
-            importance = 1 if importance == 1 else 0
-
-            if isinstance(topic_id, str):
-                topic_id = topic_id.strip().lower()
-                if topic_id not in allow_topics:
-                    topic_id = None
-            else:
-                topic_id = None
-
-            if conf < 0.55:
-                continue
-
-            tags = normalize_memory_tags([kind], preserve_legacy=True)
-            if topic_id:
-                tags = normalize_memory_tags([topic_id] + tags, preserve_legacy=True)
-
-            res = await deps.remember_event_func(
-                text=text,
-                tags=tags,
-                importance=importance,
-                message=ctx.message,
-                topic_hint=topic_id,
-                source_path="mining",
-            )
-            if not res:
-                continue
-
-            await deps.set_memory_origin_func(int(res["id"]), target_channel_id, target_channel_name)
+                ch_obj = None
+        if ch_obj is not None:
+            target_channel_name = getattr(ch_obj, "name", None) or str(ch_obj)
 
-            saved += 1
-            if topic_id:
-                topics_used[topic_id] = topics_used.get(topic_id, 0) + 1
+        if "items" not in progress:
+            extracted = await _extract_mine_items(target_channel_id, limit, hot_minutes)
+            if isinstance(extracted, str):
+                return extracted
+            progress.update(extracted)
+            if checkpoint is not None:
+                await checkpoint()
+
+        items = progress["items"]
+        saved_ids = progress["saved_ids"]
+        topics_used = progress["topics_used"]
+        for idx in range(int(progress["next"]), len(items)):
+            outcome = await _store_mined_item(items[idx], message, target_channel_id, target_channel_name)
+            if outcome == "merged":
+                progress["merged"] += 1
+            elif outcome is not None:
+                memory_id, topic_id = outcome
+                saved_ids.append(memory_id)
+                if topic_id:
+                    topics_used[topic_id] = topics_used.get(topic_id, 0) + 1
+            progress["next"] = idx + 1
+            if checkpoint is not None and outcome is not None:
+                await checkpoint()
 
         topic_summary = ", ".join(f"{k}x{v}" for k, v in sorted(topics_used.items(), key=lambda x: (-x[1], x[0])))
         if not topic_summary:
             topic_summary = "(none)"
 
-        await ctx.send(
-            f"Mined {len(rows)} msgs ({mode_label}) from <#{target_channel_id}> -> saved {saved} memories. Topics: {topic_summary}"
+        return (
+            f"Mined {progress['rows']} msgs ({progress['mode_label']}) from <#{target_channel_id}> -> "
+            f"saved {len(saved_ids)} memories ({progress['merged']} duplicates merged). Topics: {topic_summary}"
+        )
+
+    async def _run_mine_job(payload: dict, job: dict) -> str:
+        reply_channel_id = int(payload["reply_channel_id"])
+        reply_channel = bot.get_channel(reply_channel_id) or await bot.fetch_channel(reply_channel_id)
+        # Re-fetch the command message so memories keep its guild/channel/author attribution.
+        message = await reply_channel.fetch_message(int(payload["message_id"]))
+        hot_minutes = payload.get("hot_minutes")
+        # Kept in the job payload, so a retry neither re-extracts nor re-saves.
+        progress = payload.setdefault("progress", {})
+
+        async def _checkpoint() -> None:
+            await deps.job_pool.checkpoint(job, payload)
+
+        report = await _mine_window(
+            message,
+            int(payload["target_channel_id"]),
+            int(payload.get("limit", 200)),
+            int(hot_minutes) if hot_minutes is not None else None,
+            progress=progress,
+            checkpoint=_checkpoint,
         )
+        # The memories are stored; a failed post must not fail (and re-run) the job.
+        try:
+            await reply_channel.send(f"[job #{job['id']}] {report}")
+        except Exception as e:
+            print(f"[Jobs] mine #{job['id']} report not posted: {type(e).__name__}: {e}")
+        return report
+
+    if deps.job_pool is not None:
+        deps.job_pool.register("mine", _run_mine_job)
+
+    @bot.command(name="mine")
+    async def cmd_mine(ctx, *args):
+        if ctx.channel.id not in gates.allowed_channel_ids:
+            await ctx.send("This command isn't enabled in this channel.")
+            return
+
+        if not deps.stage_at_least("M1"):
+            await ctx.send("Memory is not enabled (stage < M1).")
+            return
+
+        target_channel_id = ctx.channel.id
+        limit = 200
+
+        if len(args) >= 1:
+            maybe_ch = deps.parse_channel_id_token(args[0])
+            if maybe_ch:
+                target_channel_id = maybe_ch
+                if len(args) >= 2 and str(args[1]).isdigit():
+                    limit = max(50, min(500, int(args[1])))
+            elif str(args[0]).isdigit():
+                limit = max(50, min(500, int(args[0])))
+
+        if target_channel_id not in gates.allowed_channel_ids:
+            await ctx.send("That channel is not in Epoxy's allowlist, so I won't mine it.")
+            return
+
+        hot_minutes = None
+        for a in args:
+            hm = deps.parse_duration_to_minutes(str(a))
+            if hm is not None:
+                hot_minutes = max(5, min(240, hm))
+                break
+
+        if deps.job_pool is not None:
+            job_id, created = await deps.job_pool.enqueue(
+                "mine",
+                {
+                    "reply_channel_id": ctx.channel.id,
+                    "message_id": ctx.message.id,
+                    "target_channel_id": target_channel_id,
+                    "limit": limit,
+                    "hot_minutes": hot_minutes,
+                },
+                dedupe_key=f"mine:{target_channel_id}",
+            )
+            if created:
+                await ctx.send(f"Queued mining job #{job_id} for <#{target_channel_id}>; results will be posted here.")
+            else:
+                await ctx.send(f"Mining job #{job_id} for <#{target_channel_id}> is already queued or running.")
+            return
+
+        try:
+            report = await _mine_window(ctx.message, target_channel_id, limit, hot_minutes)
+        except _MineLLMError as e:
+            await ctx.send(f"Mine failed (LLM error): {e}")
+            return
+        await ctx.send(report)
 
     @bot.command(name="ctxpeek")
     async def ctxpeek(ctx: commands.Context, n: int = 10):
@@ -192,8 +299,10 @@ Rules:
             return
         n = max(1, min(int(n), 40))
         before = 2**63 - 1
-        async with deps.db_lock:
-            rows = await asyncio.to_thread(deps.fetch_recent_context_sync, deps.db_conn, ctx.channel.id, before, n)
+        if deps.get_recent_context_rows_func is not None:
+            rows = await deps.get_recent_context_rows_func(ctx.channel.id, before, n)
+        else:
+            rows = await deps.db_handles.read(deps.fetch_recent_context_sync, ctx.channel.id, before, n)
         txt = deps.format_recent_context(rows, 1900, deps.max_line_chars)
         await ctx.send(f"Recent context ({len(rows)} rows):\n{txt}")
 
@@ -246,12 +355,10 @@ Rules:
             if hot_minutes is not None:
                 since_dt = discord.utils.utcnow() - timedelta(minutes=hot_minutes)
                 since_iso = since_dt.isoformat()
-                async with deps.db_lock:
-                    mem_rows = await asyncio.to_thread(deps.fetch_memory_events_since_sync, deps.db_conn, since_iso, 400)
+                mem_rows = await deps.db_handles.read(deps.fetch_memory_events_since_sync, since_iso, 400)
                 mode_label = f"mem_hot({hot_minutes}m)"
             else:
-                async with deps.db_lock:
-                    mem_rows = await asyncio.to_thread(deps.fetch_latest_memory_events_sync, deps.db_conn, 300)
+                mem_rows = await deps.db_handles.read(deps.fetch_latest_memory_events_sync, 300)
                 mode_label = "mem_last(300)"
 
             if not mem_rows:
@@ -264,12 +371,10 @@ Rules:
             if hot_minutes is not None:
                 since_dt = discord.utils.utcnow() - timedelta(minutes=hot_minutes)
                 since_iso = since_dt.isoformat()
-                async with deps.db_lock:
-                    rows = await asyncio.to_thread(deps.fetch_messages_since_sync, deps.db_conn, target_channel_id, since_iso, 500)
+                rows = await deps.db_handles.read(deps.fetch_messages_since_sync, target_channel_id, since_iso, 500)
                 mode_label = f"msg_hot({hot_minutes}m)"
             else:
-                async with deps.db_lock:
-                    rows = await asyncio.to_thread(deps.fetch_latest_messages_sync, deps.db_conn, target_channel_id, limit)
+                rows = await deps.db_handles.read(deps.fetch_latest_messages_sync, target_channel_id, limit)
                 mode_label = f"msg_last({limit})"
 
             if not rows:
@@ -317,8 +422,10 @@ Return JSON only.
 """.strip()
 
         try:
-            resp = deps.client.chat.completions.create(
+            resp = await chat_completion(
+                deps.client,
                 model=deps.openai_model,
+                priority=PRIORITY_OPERATOR,
                 messages=[
                     {"role": "system", "content": prompt[:1900]},
                     {
@@ -2,6 +2,7 @@ from __future__ import annotations
 
 import asyncio
 import re
+import time
 
 from discord.ext import commands
 from misc.commands.command_deps import CommandDeps
@@ -41,8 +42,9 @@ def register(
             return
 
         lim = max(1, min(int(limit or 20), 100))
-        async with deps.db_lock:
-            rows = await asyncio.to_thread(deps.fetch_episode_logs_sync, deps.db_conn, lim)
+        if deps.flush_episode_logs_func is not None:
+            await deps.flush_episode_logs_func()
+        rows = await deps.db_handles.read(deps.fetch_episode_logs_sync, lim)
 
         if not rows:
             await ctx.send("No episode logs yet.")
@@ -79,8 +81,7 @@ def register(
             return
 
         lim = max(1, min(int(limit or 30), 200))
-        async with deps.db_lock:
-            rows = await asyncio.to_thread(deps.list_schema_migrations_sync, deps.db_conn, lim)
+        rows = await deps.db_handles.read(deps.list_schema_migrations_sync, lim)
 
         if not rows:
             await ctx.send("No schema migrations found.")
@@ -92,6 +93,124 @@ def register(
 
         await deps.send_chunked(ctx.channel, "```\n" + "\n".join(lines)[:7000] + "\n```")
 
+    @bot.command(name="controllercache")
+    async def cmd_controllercache(ctx: commands.Context, action: str = ""):
+        if not gates.in_allowed_channel(ctx):
+            return
+        if not gates.user_is_owner(ctx.author):
+            await ctx.send("This command is owner-only.")
+            return
+        if deps.controller_cache is None:
+            await ctx.send("Controller resolution cache is disabled.")
+            return
+
+        if (action or "").strip().lower() == "clear":
+            # Use after editing controller_configs/context_profiles outside the bot.
+            deps.controller_cache.invalidate_context_profiles()
+            await ctx.send("Controller resolution cache cleared.")
+            return
+
+        st = deps.controller_cache.stats()
+        await ctx.send(
+            f"Controller cache: profiles={st['profile_entries']} (hit={st['profile_hits']} miss={st['profile_misses']}) "
+            f"configs={st['config_entries']} (hit={st['config_hits']} miss={st['config_misses']}) "
+            f"invalidations={st['invalidations']}"
+        )
+
+    @bot.command(name="recallcache")
+    async def cmd_recallcache(ctx: commands.Context, action: str = ""):
+        if not gates.in_allowed_channel(ctx):
+            return
+        if not gates.user_is_owner(ctx.author):
+            await ctx.send("This command is owner-only.")
+            return
+        if deps.recall_cache is None and deps.hot_memory_index is None:
+            await ctx.send("Recall cache is disabled.")
+            return
+
+        if (action or "").strip().lower() == "clear":
+            # Use after editing memory tables outside the bot.
+            if deps.recall_cache is not None:
+                deps.recall_cache.invalidate()
+            if deps.hot_memory_index is not None:
+                deps.hot_memory_index.invalidate()
+            await ctx.send("Recall cache cleared.")
+            return
+
+        lines = []
+        if deps.recall_cache is None:
+            lines.append("Recall cache: disabled")
+        else:
+            st = deps.recall_cache.stats()
+            lines.append(
+                f"Recall cache: entries={st['entries']} hit={st['hits']} miss={st['misses']} "
+                f"hit_rate={st['hit_rate']:.1%} evictions={st['evictions']} invalidations={st['invalidations']}"
+            )
+        if deps.hot_memory_index is not None:
+            hot = deps.hot_memory_index.stats()
+            lines.append(
+                f"Hot memory index: rows={hot['rows']} terms={hot['terms']} ~{hot['approx_bytes'] / 1024:.0f} KiB "
+                f"current={'yes' if hot['current'] else 'no'} rebuilds={hot['rebuilds']} adds={hot['adds']} "
+                f"searches={hot['searches']} avg_ms={hot['avg_search_ms']}"
+            )
+        await ctx.send("\n".join(lines))
+
+    @bot.command(name="jobs")
+    async def cmd_jobs(ctx: commands.Context, hours: int = 24):
+        if not gates.in_allowed_channel(ctx):
+            return
+        if not gates.user_is_owner(ctx.author):
+            await ctx.send("This command is owner-only.")
+            return
+        if deps.job_pool is None or deps.job_stats_sync is None:
+            await ctx.send("Job queue is disabled (EPOXY_JOB_WORKERS=0).")
+            return
+
+        window_hours = max(1, min(int(hours or 24), 24 * 30))
+        since_ts = int(time.time()) - window_hours * 3600
+        rows = await deps.db_handles.read(deps.job_stats_sync, since_ts=since_ts)
+        pool = deps.job_pool.stats()
+
+        lines = [f"Jobs (last {window_hours}h) workers={pool['workers']} in_flight={len(pool['in_flight'])}"]
+        for row in rows:
+            avg = f"{row['avg_run_seconds']}s" if row["avg_run_seconds"] is not None else "-"
+            lines.append(
+                f"- {row['job_type']}: queued={row['queued']} (due {row['due']}) running={row['running']} "
+                f"done={row['done']} failed={row['failed']} retried={row['retried']} avg_run={avg}"
+            )
+            if row["last_error"]:
+                lines.append(f"  last_error: {str(row['last_error'])[:160]}")
+        for job in pool["in_flight"]:
+            lines.append(f"- running #{job['id']} {job['job_type']} for {job['running_seconds']}s")
+        if len(lines) == 1:
+            lines.append("(no jobs in window)")
+
+        await deps.send_chunked(ctx.channel, "```\n" + "\n".join(lines)[:7000] + "\n```")
+
+    @bot.command(name="ftsmaint")
+    async def cmd_ftsmaint(ctx: commands.Context, action: str = "optimize"):
+        if not gates.in_allowed_channel(ctx):
+            return
+        if not gates.user_is_owner(ctx.author):
+            await ctx.send("This command is owner-only.")
+            return
+        if deps.maintain_memory_fts_sync is None:
+            await ctx.send("FTS maintenance is not wired.")
+            return
+
+        action = (action or "").strip().lower()
+        if action not in {"rebuild", "optimize", "check"}:
+            await ctx.send("Usage: `!ftsmaint [rebuild|optimize|check]`")
+            return
+
+        # Runs on the writer connection; readers on the pool keep serving recall.
+        results = await deps.db_handles.write(deps.maintain_memory_fts_sync, action)
+        lines = [f"FTS {action}:"]
+        for row in results:
+            status = "ok" if row.get("ok") else f"FAILED ({row.get('error')})"
+            lines.append(f"- {row.get('table')}: {status} docs={row.get('docs')} {row.get('elapsed_ms')}ms")
+        await ctx.send("\n".join(lines))
+
     @bot.command(name="dmfeedback")
     async def cmd_dmfeedback(ctx: commands.Context, outcome: str = "", *, note: str = ""):
         if not gates.in_allowed_channel(ctx):
@@ -108,6 +227,9 @@ def register(
             await ctx.send("DM feedback store function is not configured.")
             return
 
+        # The draft's episode row may still be buffered in the write-behind sink.
+        if deps.flush_episode_logs_func is not None:
+            await deps.flush_episode_logs_func()
         async with deps.db_lock:
             row = await asyncio.to_thread(
                 deps.update_latest_dm_draft_feedback_sync,
@@ -181,6 +303,9 @@ def register(
                     return
                 failure_tags.append(clean)
 
+        # The draft's episode row may still be buffered in the write-behind sink.
+        if deps.flush_episode_logs_func is not None:
+            await deps.flush_episode_logs_func()
         async with deps.db_lock:
             row = await asyncio.to_thread(
                 deps.update_latest_dm_draft_evaluation_sync,
@@ -21,10 +21,13 @@ from controller.dm_draft_service import select_mode
 from controller.episode_log_filters import should_log_episode
 from controller.prompt_assembly import build_chat_messages
 from discord.ext import commands
+from llm.gateway import chat_completion
+from llm.scheduler import PRIORITY_INTERACTIVE
 from memory.runtime_recall import maybe_build_memory_pack
 from misc.discord_gates import message_in_allowed_channels
 from misc.mention_routes import classify_mention_route
 from misc.mention_routes import extract_dm_mode_payload
+from misc.mention_stages import StageGraph
 from misc.runtime_deps import RuntimeBootDeps
 from misc.runtime_deps import RuntimeDeps
 
@@ -243,6 +246,11 @@ def register_runtime_events(
             bot._welcome_panel_registered = True
 
         print(f"Epoxy is online as {bot.user}")
+        # Before backfill, so queued and recovered jobs do not wait on it.
+        if boot.job_pool is not None and not boot.job_pool.started:
+            recovered = await boot.job_pool.start()
+            print(f"[Jobs] worker pool started workers={boot.job_pool.workers} recovered={recovered}")
+
         if boot.bootstrap_channel_reset_all:
             await boot.reset_all_backfill_done_func()
             print("[Backfill] Reset ALL backfill_done flags (bootstrap)")
@@ -265,6 +273,35 @@ def register_runtime_events(
             bot._announcement_task = asyncio.create_task(boot.announcement_loop_func())
             print("[Announcements] automation loop started")
 
+        if boot.identity_flush_loop_func is not None and not getattr(bot, "_identity_flush_task", None):
+            bot._identity_flush_task = asyncio.create_task(boot.identity_flush_loop_func())
+
+    async def _resolve_discord_person(user_id: int, guild) -> int:
+        """Canonical person id for a Discord user; the DB is only touched on a cache miss."""
+        external_id = str(int(user_id))
+        if deps.identity_cache is not None:
+            cached = deps.identity_cache.get("discord", external_id)
+            if cached is not None:
+                return int(cached)
+        origin = f"discord:{int(guild.id)}" if guild else "discord:dm"
+        async with deps.db_lock:
+            person_id = await asyncio.to_thread(
+                deps.get_or_create_person_sync,
+                deps.db_conn,
+                platform="discord",
+                external_id=external_id,
+                origin=origin,
+                label="discord_user_id",
+            )
+            person_id = await asyncio.to_thread(
+                deps.canonical_person_id_sync,
+                deps.db_conn,
+                int(person_id),
+            )
+        if deps.identity_cache is not None:
+            deps.identity_cache.put("discord", external_id, int(person_id))
+        return int(person_id)
+
     @bot.event
     async def on_message(message: discord.Message):
         if not message_in_allowed_channels(message, boot.allowed_channel_ids):
@@ -292,28 +329,130 @@ def register_runtime_events(
             try:
                 max_msg_content = 1900
 
-                recent_context, ctx_rows = await deps.get_recent_channel_context_func(message.channel.id, message.id)
+                # Buffered ingestion rows must be visible to the context reads below.
+                await deps.flush_messages_func()
+
+                context_pack = deps.build_context_pack()[:max_msg_content]
+                safe_prompt = prompt[:max_msg_content]
+                route = classify_mention_route(safe_prompt)
+                runtime_ctx = deps.classify_context(
+                    author_id=int(message.author.id),
+                    is_dm=(message.guild is None),
+                    channel_id=int(message.channel.id) if hasattr(message.channel, "id") else None,
+                    guild_id=(int(message.guild.id) if message.guild else None),
+                    founder_user_ids=deps.founder_user_ids,
+                    channel_groups=deps.channel_policy_groups,
+                )
+
+                async def _stage_recent_context():
+                    return await deps.get_recent_channel_context_func(message.channel.id, message.id)
+
+                async def _stage_anchors():
+                    return await asyncio.gather(
+                        deps.get_last_author_message_func(message.channel.id, message.id, int(bot.user.id)),
+                        deps.get_last_author_message_func(message.channel.id, message.id, int(message.author.id)),
+                    )
+
+                async def _stage_identity():
+                    person_id = await _resolve_discord_person(int(message.author.id), message.guild)
+                    if deps.identity_cache is not None:
+                        # Debounced: written by the identity flush loop (and at shutdown).
+                        deps.identity_cache.note_seen("discord", str(int(message.author.id)), person_id, deps.utc_iso())
+                    profile_payload = {
+                        "caller_type": runtime_ctx["caller_type"],
+                        "surface": runtime_ctx["surface"],
+                        "channel_id": runtime_ctx.get("channel_id"),
+                        "guild_id": runtime_ctx.get("guild_id"),
+                        "sensitivity_policy_id": runtime_ctx["sensitivity_policy_id"],
+                        "allowed_capabilities": runtime_ctx["allowed_capabilities"],
+                    }
+                    cache = deps.controller_cache
+                    scope_kwargs = {
+                        "caller_type": runtime_ctx["caller_type"],
+                        "user_id": int(message.author.id),
+                        "person_id": int(person_id),
+                    }
+                    # Without a connection the helpers only read the cache, so warm
+                    # mentions skip db_lock; misses re-check and load under it.
+                    profile_id = deps.resolve_context_profile_cached_sync(
+                        None, profile_payload, resolution_cache=cache
+                    )
+                    cfg = None
+                    if profile_id is not None:
+                        cfg = deps.select_active_controller_config_cached_sync(
+                            None, context_profile_id=int(profile_id), resolution_cache=cache, **scope_kwargs
+                        )
+                    if cfg is None or deps.identity_cache is None:
+                        async with deps.db_lock:
+                            if profile_id is None:
+                                profile_id = await asyncio.to_thread(
+                                    deps.resolve_context_profile_cached_sync,
+                                    deps.db_conn,
+                                    profile_payload,
+                                    resolution_cache=cache,
+                                )
+                            if deps.identity_cache is None:
+                                await asyncio.to_thread(
+                                    deps.upsert_user_profile_last_seen_sync,
+                                    deps.db_conn,
+                                    int(person_id),
+                                    deps.utc_iso(),
+                                )
+                            if cfg is None:
+                                cfg = await asyncio.to_thread(
+                                    deps.select_active_controller_config_cached_sync,
+                                    deps.db_conn,
+                                    context_profile_id=int(profile_id),
+                                    resolution_cache=cache,
+                                    **scope_kwargs,
+                                )
+                    return int(person_id), int(profile_id), cfg
+
+                async def _stage_policy():
+                    return await deps.db_handles.read(
+                        deps.resolve_policy_bundle_sync,
+                        sensitivity_policy_id=runtime_ctx["sensitivity_policy_id"],
+                        caller_type=runtime_ctx["caller_type"],
+                        surface=runtime_ctx["surface"],
+                    )
+
+                async def _stage_memory(identity):
+                    # Needs the controller's memory budget, so it waits on identity
+                    # but still overlaps the context/anchor/policy reads.
+                    temporal_scope = deps.infer_scope(safe_prompt) if deps.stage_at_least("M2") else "auto"
+                    recall_scope = _compose_recall_scope(
+                        temporal_scope=temporal_scope,
+                        channel_id=(int(message.channel.id) if hasattr(message.channel, "id") else None),
+                        guild_id=(int(message.guild.id) if message.guild else None),
+                    )
+                    return await maybe_build_memory_pack(
+                        stage_at_least=deps.stage_at_least,
+                        infer_scope=deps.infer_scope,
+                        recall_memory_func=deps.recall_memory_func,
+                        format_memory_for_llm=deps.format_memory_for_llm,
+                        safe_prompt=safe_prompt,
+                        scope=recall_scope,
+                        memory_budget=_controller_memory_budget(identity[2]),
+                        max_chars=max_msg_content,
+                    )
+
+                stages = StageGraph()
+                stages.add("recent_context", _stage_recent_context)
+                stages.add("anchors", _stage_anchors)
+                stages.add("identity", _stage_identity)
+                stages.add("policy", _stage_policy)
+                if route != "dm_draft":
+                    # DM drafts recall against the parsed request, not the raw prompt.
+                    stages.add("memory", _stage_memory, after=("identity",))
+                stage_results = await stages.run()
+                stage_timings_ms = dict(stages.timings_ms)
+
+                recent_context, ctx_rows = stage_results["recent_context"]
                 if len(recent_context) > max_msg_content:
                     recent_context = recent_context[-max_msg_content:]
 
                 anchor_block = ""
-                async with deps.db_lock:
-                    bot_rows = await asyncio.to_thread(
-                        deps.fetch_last_messages_by_author_sync,
-                        deps.db_conn,
-                        message.channel.id,
-                        message.id,
-                        "%Epoxy%",
-                        1,
-                    )
-                    user_rows = await asyncio.to_thread(
-                        deps.fetch_last_messages_by_author_sync,
-                        deps.db_conn,
-                        message.channel.id,
-                        message.id,
-                        f"%{message.author.name}%",
-                        1,
-                    )
+                bot_rows, user_rows = stage_results["anchors"]
 
                 def _fmt_anchor(rows, label: str) -> str:
                     if not rows:
@@ -339,70 +478,11 @@ def register_runtime_events(
                     if len(anchor_block) > max_msg_content:
                         anchor_block = anchor_block[-max_msg_content:]
 
-                context_pack = deps.build_context_pack()[:max_msg_content]
-                safe_prompt = prompt[:max_msg_content]
-                runtime_ctx = deps.classify_context(
-                    author_id=int(message.author.id),
-                    is_dm=(message.guild is None),
-                    channel_id=int(message.channel.id) if hasattr(message.channel, "id") else None,
-                    guild_id=(int(message.guild.id) if message.guild else None),
-                    founder_user_ids=deps.founder_user_ids,
-                    channel_groups=deps.channel_policy_groups,
-                )
-
-                async with deps.db_lock:
-                    person_origin = f"discord:{int(message.guild.id)}" if message.guild else "discord:dm"
-                    actor_person_id = await asyncio.to_thread(
-                        deps.get_or_create_person_sync,
-                        deps.db_conn,
-                        platform="discord",
-                        external_id=str(int(message.author.id)),
-                        origin=person_origin,
-                        label="discord_user_id",
-                    )
-                    actor_person_id = await asyncio.to_thread(
-                        deps.canonical_person_id_sync,
-                        deps.db_conn,
-                        int(actor_person_id),
-                    )
-                    context_profile_id = await asyncio.to_thread(
-                        deps.get_or_create_context_profile_sync,
-                        deps.db_conn,
-                        {
-                            "caller_type": runtime_ctx["caller_type"],
-                            "surface": runtime_ctx["surface"],
-                            "channel_id": runtime_ctx.get("channel_id"),
-                            "guild_id": runtime_ctx.get("guild_id"),
-                            "sensitivity_policy_id": runtime_ctx["sensitivity_policy_id"],
-                            "allowed_capabilities": runtime_ctx["allowed_capabilities"],
-                        },
-                    )
-                    await asyncio.to_thread(
-                        deps.upsert_user_profile_last_seen_sync,
-                        deps.db_conn,
-                        int(actor_person_id),
-                        deps.utc_iso(),
-                    )
-                    controller_cfg = await asyncio.to_thread(
-                        deps.select_active_controller_config_sync,
-                        deps.db_conn,
-                        caller_type=runtime_ctx["caller_type"],
-                        context_profile_id=int(context_profile_id),
-                        user_id=int(message.author.id),
-                        person_id=int(actor_person_id),
-                    )
-                    policy_bundle = await asyncio.to_thread(
-                        deps.resolve_policy_bundle_sync,
-                        deps.db_conn,
-                        sensitivity_policy_id=runtime_ctx["sensitivity_policy_id"],
-                        caller_type=runtime_ctx["caller_type"],
-                        surface=runtime_ctx["surface"],
-                    )
+                actor_person_id, context_profile_id, controller_cfg = stage_results["identity"]
+                policy_bundle = stage_results["policy"]
                 memory_budget = _controller_memory_budget(controller_cfg)
                 policy_directive = deps.format_policy_directive_func(policy_bundle, max_chars=550)
 
-                route = classify_mention_route(safe_prompt)
-
                 if route == "dm_draft":
                     if not deps.user_is_owner(message.author):
                         await message.channel.send("DM draft mode is owner-only.")
@@ -415,21 +495,7 @@ def register_runtime_events(
                     req.target_user_id = int(target_fields["target_user_id"]) if target_fields["target_user_id"] is not None else None
                     target_person_id: int | None = None
                     if req.target_user_id is not None:
-                        target_origin = f"discord:{int(message.guild.id)}" if message.guild else "discord:dm"
-                        async with deps.db_lock:
-                            target_person_id = await asyncio.to_thread(
-                                deps.get_or_create_person_sync,
-                                deps.db_conn,
-                                platform="discord",
-                                external_id=str(int(req.target_user_id)),
-                                origin=target_origin,
-                                label="discord_user_id",
-                            )
-                            target_person_id = await asyncio.to_thread(
-                                deps.canonical_person_id_sync,
-                                deps.db_conn,
-                                int(target_person_id),
-                            )
+                        target_person_id = await _resolve_discord_person(int(req.target_user_id), message.guild)
                     target_fields["target_person_id"] = int(target_person_id) if target_person_id is not None else None
 
                     mode_requested = req.mode
@@ -547,6 +613,7 @@ def register_runtime_events(
                                 ],
                                 "implicit_signals": {
                                     "ctx_rows": int(ctx_rows),
+                                    "stage_timings_ms": dict(stage_timings_ms),
                                     "memory_hits": 0,
                                     "parse_quality": parsed.parse_quality,
                                     "missing_fields_count": len(parsed.missing_fields),
@@ -590,8 +657,7 @@ def register_runtime_events(
                                 "channel_id": int(message.channel.id) if hasattr(message.channel, "id") else None,
                                 "message_id": int(message.id),
                             }
-                            async with deps.db_lock:
-                                await asyncio.to_thread(deps.insert_episode_log_sync, deps.db_conn, episode_payload)
+                            await deps.record_episode_func(episode_payload, runtime_ctx)
                         return
 
                     assumptions_used: list[str] = []
@@ -670,10 +736,11 @@ def register_runtime_events(
                         clarifying_questions=clarifying_questions,
                         max_chars=max_msg_content,
                     )
-                    dm_resp = await asyncio.to_thread(
-                        deps.client.chat.completions.create,
+                    dm_resp = await chat_completion(
+                        deps.client,
                         model=deps.openai_model,
                         messages=dm_messages,
+                        priority=PRIORITY_INTERACTIVE,
                     )
                     dm_raw = (dm_resp.choices[0].message.content or "").strip()
                     dm_result = parse_dm_result_from_model(
@@ -754,6 +821,7 @@ def register_runtime_events(
                             ],
                             "implicit_signals": {
                                 "ctx_rows": int(ctx_rows),
+                                "stage_timings_ms": dict(stage_timings_ms),
                                 "memory_hits": len(retrieved_memory_ids),
                                 "parse_quality": parsed.parse_quality,
                                 "missing_fields_count": len(parsed.missing_fields),
@@ -803,33 +871,18 @@ def register_runtime_events(
                             "channel_id": int(message.channel.id) if hasattr(message.channel, "id") else None,
                             "message_id": int(message.id),
                         }
-                        async with deps.db_lock:
-                            await asyncio.to_thread(deps.insert_episode_log_sync, deps.db_conn, episode_payload)
+                        await deps.record_episode_func(episode_payload, runtime_ctx)
                     return
 
-                temporal_scope = deps.infer_scope(safe_prompt) if deps.stage_at_least("M2") else "auto"
-                recall_scope = _compose_recall_scope(
-                    temporal_scope=temporal_scope,
-                    channel_id=(int(message.channel.id) if hasattr(message.channel, "id") else None),
-                    guild_id=(int(message.guild.id) if message.guild else None),
-                )
-                events, summaries, retrieved_memory_ids, memory_pack = await maybe_build_memory_pack(
-                    stage_at_least=deps.stage_at_least,
-                    infer_scope=deps.infer_scope,
-                    recall_memory_func=deps.recall_memory_func,
-                    format_memory_for_llm=deps.format_memory_for_llm,
-                    safe_prompt=safe_prompt,
-                    scope=recall_scope,
-                    memory_budget=memory_budget,
-                    max_chars=max_msg_content,
-                )
+                events, summaries, retrieved_memory_ids, memory_pack = stage_results["memory"]
 
                 print(
                     f"[CTX] channel={message.channel.id} rows={ctx_rows} before={message.id} "
                     f"ctx_chars={len(recent_context)} pack_chars={len(context_pack)} prompt_chars={len(safe_prompt)} "
                     f"mem_chars={len(memory_pack)} stage={deps.memory_stage} limit={deps.recent_context_limit} "
                     f"context={runtime_ctx['caller_type']}/{runtime_ctx['surface']} cfg={controller_cfg.get('scope','global')} "
-                    f"budget=hot:{memory_budget.get('hot', 0)}/warm:{memory_budget.get('warm', 0)}/cold:{memory_budget.get('cold', 0)}/sum:{memory_budget.get('summaries', 0)}"
+                    f"budget=hot:{memory_budget.get('hot', 0)}/warm:{memory_budget.get('warm', 0)}/cold:{memory_budget.get('cold', 0)}/sum:{memory_budget.get('summaries', 0)} "
+                    f"stages_ms={json.dumps(stage_timings_ms, sort_keys=True, separators=(',', ':'))}"
                 )
 
                 instructions = (
@@ -871,10 +924,11 @@ def register_runtime_events(
                     max_chars=max_msg_content,
                 )
 
-                resp = await asyncio.to_thread(
-                    deps.client.chat.completions.create,
+                resp = await chat_completion(
+                    deps.client,
                     model=deps.openai_model,
                     messages=chat_messages,
+                    priority=PRIORITY_INTERACTIVE,
                 )
                 reply = (resp.choices[0].message.content or "(no output)")
                 reply, applied_policy_clamps = deps.apply_policy_enforcement_func(
@@ -904,6 +958,7 @@ def register_runtime_events(
                         ],
                         "implicit_signals": {
                             "ctx_rows": int(ctx_rows),
+                            "stage_timings_ms": dict(stage_timings_ms),
                             "memory_hits": len(retrieved_memory_ids),
                             "memory_budget": dict(memory_budget),
                             "resolved_policy_ids": list(policy_bundle.get("policy_ids", [])),
@@ -913,8 +968,7 @@ def register_runtime_events(
                         "channel_id": int(message.channel.id) if hasattr(message.channel, "id") else None,
                         "message_id": int(message.id),
                     }
-                    async with deps.db_lock:
-                        await asyncio.to_thread(deps.insert_episode_log_sync, deps.db_conn, episode_payload)
+                    await deps.record_episode_func(episode_payload, runtime_ctx)
 
                 return
 
@@ -0,0 +1,70 @@
+"""Concurrent stage graph for the mention pipeline.
+
+Each stage is an async callable registered with the stages it depends on.
+`run()` starts every stage as its own task; a stage waits only for its own
+dependencies and receives their results positionally, so independent lookups
+(recent context, anchors, identity/controller, policy, recall) overlap instead
+of running back to back. Per-stage wall time is recorded in `timings_ms` for
+the episode log.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import time
+from typing import Any, Awaitable, Callable
+
+StageFunc = Callable[..., Awaitable[Any]]
+
+
+class StageGraph:
+    def __init__(self):
+        self._stages: dict[str, tuple[StageFunc, tuple[str, ...]]] = {}
+        self.timings_ms: dict[str, float] = {}
+
+    def add(self, name: str, fn: StageFunc, *, after: tuple[str, ...] | list[str] = ()) -> None:
+        key = str(name or "").strip()
+        if not key:
+            raise ValueError("stage name is required")
+        if key in self._stages:
+            raise ValueError(f"duplicate stage: {key}")
+        deps = tuple(after or ())
+        missing = [d for d in deps if d not in self._stages]
+        if missing:
+            # Dependencies must be registered first, which also rules out cycles.
+            raise ValueError(f"stage {key} depends on unknown stage(s): {', '.join(missing)}")
+        self._stages[key] = (fn, deps)
+
+    async def run(self) -> dict[str, Any]:
+        """Run all stages; returns {stage_name: result}.
+
+        If any stage fails, the remaining stages are cancelled and the first
+        error is raised.
+        """
+        self.timings_ms = {}
+        tasks: dict[str, asyncio.Task] = {}
+        started_all = time.perf_counter()
+
+        async def _run_stage(name: str, fn: StageFunc, deps: tuple[str, ...]) -> Any:
+            inputs = [await tasks[d] for d in deps]
+            started = time.perf_counter()
+            try:
+                return await fn(*inputs)
+            finally:
+                self.timings_ms[name] = round((time.perf_counter() - started) * 1000.0, 2)
+
+        for name, (fn, deps) in self._stages.items():
+            tasks[name] = asyncio.create_task(_run_stage(name, fn, deps), name=f"epoxy-stage-{name}")
+
+        try:
+            await asyncio.gather(*tasks.values())
+        except BaseException:
+            for task in tasks.values():
+                if not task.done():
+                    task.cancel()
+            await asyncio.gather(*tasks.values(), return_exceptions=True)
+            raise
+        finally:
+            self.timings_ms["total"] = round((time.perf_counter() - started_all) * 1000.0, 2)
+
+        return {name: task.result() for name, task in tasks.items()}
@@ -9,6 +9,7 @@ class RuntimeDeps:
     # core
     db_lock: Any
     db_conn: Any
+    db_handles: Any
     send_chunked: Callable
     user_is_owner: Callable
 
@@ -20,6 +21,7 @@ class RuntimeDeps:
 
     # logging / ingestion
     log_message_func: Callable
+    flush_messages_func: Callable
     maybe_auto_capture_func: Callable
 
     # context + controller
@@ -28,13 +30,15 @@ class RuntimeDeps:
     founder_user_ids: set[int]
     channel_policy_groups: dict
     get_recent_channel_context_func: Callable
-    fetch_last_messages_by_author_sync: Callable
-    get_or_create_context_profile_sync: Callable
+    get_last_author_message_func: Callable
+    resolve_context_profile_cached_sync: Callable
     get_or_create_person_sync: Callable
     resolve_person_id_sync: Callable
     canonical_person_id_sync: Callable
     upsert_user_profile_last_seen_sync: Callable
-    select_active_controller_config_sync: Callable
+    identity_cache: Any
+    controller_cache: Any
+    select_active_controller_config_cached_sync: Callable
 
     # memory
     infer_scope: Callable[[str], str]
@@ -56,7 +60,7 @@ class RuntimeDeps:
     # episode logging
     enable_episode_logging: bool
     episode_log_filters: set[str]
-    insert_episode_log_sync: Callable
+    record_episode_func: Callable
     recent_context_limit: int
 
 
@@ -70,3 +74,5 @@ class RuntimeBootDeps:
     maintenance_loop_func: Callable
     announcement_enabled: bool
     announcement_loop_func: Callable
+    identity_flush_loop_func: Callable | None = None
+    job_pool: Any = None
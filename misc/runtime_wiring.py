@@ -1,5 +1,6 @@
 from __future__ import annotations
 
+from db.handles import DbHandles
 from ingestion.service import backfill_channel as backfill_channel_service
 from ingestion.service import maybe_auto_capture as maybe_auto_capture_service
 from misc.commands.command_deps import CommandDeps
@@ -24,6 +25,7 @@ def wire_bot_runtime(
     update_latest_dm_draft_feedback_sync,
     update_latest_dm_draft_evaluation_sync,
     list_schema_migrations_sync,
+    maintain_memory_fts_sync=None,
     stage_at_least,
     memory_stage: str,
     memory_stage_rank: int,
@@ -35,6 +37,7 @@ def wire_bot_runtime(
     topic_allowlist: list[str],
     db_lock,
     db_conn,
+    db_handles=None,
     topic_counts_sync,
     list_known_topics_sync,
     get_topic_summary_sync,
@@ -54,6 +57,10 @@ def wire_bot_runtime(
     list_candidate_memories_sync,
     approve_memory_sync,
     reject_memory_sync,
+    merge_memory_events_sync=None,
+    backfill_memory_event_minhash_sync=None,
+    near_duplicate_clusters_sync=None,
+    memory_near_dup_threshold: float = 0.8,
     parse_channel_id_token,
     parse_duration_to_minutes,
     fetch_messages_since_sync,
@@ -61,6 +68,7 @@ def wire_bot_runtime(
     fetch_memory_events_since_sync,
     fetch_latest_memory_events_sync,
     fetch_recent_context_sync,
+    get_recent_context_rows_func=None,
     format_recent_context,
     format_memory_events_window,
     extract_json_array,
@@ -87,9 +95,10 @@ def wire_bot_runtime(
     backfill_pause_every: int,
     backfill_pause_seconds: float,
     log_message_func,
+    flush_messages_func=None,
     maintenance_loop_func,
     get_recent_channel_context_func,
-    fetch_last_messages_by_author_sync,
+    get_last_author_message_func,
     build_context_pack,
     classify_context,
     founder_user_ids: set[int],
@@ -98,20 +107,29 @@ def wire_bot_runtime(
     format_profile_for_llm,
     dm_guidelines,
     dm_guidelines_source: str,
-    get_or_create_context_profile_sync,
+    resolve_context_profile_cached_sync,
     resolve_person_id_sync,
     canonical_person_id_sync,
     upsert_user_profile_last_seen_sync,
-    select_active_controller_config_sync,
+    identity_cache=None,
+    controller_cache=None,
+    recall_cache=None,
+    hot_memory_index=None,
+    job_pool=None,
+    job_stats_sync=None,
+    select_active_controller_config_cached_sync,
     utc_iso,
     system_prompt_base: str,
     enable_episode_logging: bool,
     episode_log_filters: set[str],
     insert_episode_log_sync,
+    record_episode_func=None,
+    flush_episode_logs_func=None,
     recent_context_limit: int,
     announcement_enabled: bool,
     announcement_service,
     announcement_loop_func,
+    identity_flush_loop_func=None,
     music_service,
 ) -> None:
     def in_allowed_channel(ctx) -> bool:
@@ -120,9 +138,20 @@ def wire_bot_runtime(
         except Exception:
             return False
 
+    if db_handles is None:
+        db_handles = DbHandles(db_lock=db_lock, db_conn=db_conn)
+    if flush_messages_func is None:
+        async def flush_messages_func() -> int:
+            return 0
+    if record_episode_func is None:
+        async def record_episode_func(payload: dict, runtime_ctx: dict | None = None) -> bool:
+            await db_handles.write(insert_episode_log_sync, payload)
+            return True
+
     command_deps = CommandDeps(
         db_lock=db_lock,
         db_conn=db_conn,
+        db_handles=db_handles,
         send_chunked=send_chunked,
         client=client,
         openai_model=openai_model,
@@ -137,9 +166,16 @@ def wire_bot_runtime(
         topic_min_conf=topic_min_conf,
         topic_allowlist=topic_allowlist,
         fetch_episode_logs_sync=fetch_episode_logs_sync,
+        flush_episode_logs_func=flush_episode_logs_func,
         update_latest_dm_draft_feedback_sync=update_latest_dm_draft_feedback_sync,
         update_latest_dm_draft_evaluation_sync=update_latest_dm_draft_evaluation_sync,
         list_schema_migrations_sync=list_schema_migrations_sync,
+        maintain_memory_fts_sync=maintain_memory_fts_sync,
+        controller_cache=controller_cache,
+        recall_cache=recall_cache,
+        hot_memory_index=hot_memory_index,
+        job_pool=job_pool,
+        job_stats_sync=job_stats_sync,
         topic_counts_sync=topic_counts_sync,
         list_known_topics_sync=list_known_topics_sync,
         get_topic_summary_sync=get_topic_summary_sync,
@@ -155,6 +191,10 @@ def wire_bot_runtime(
         list_candidate_memories_sync=list_candidate_memories_sync,
         approve_memory_sync=approve_memory_sync,
         reject_memory_sync=reject_memory_sync,
+        merge_memory_events_sync=merge_memory_events_sync,
+        backfill_memory_event_minhash_sync=backfill_memory_event_minhash_sync,
+        near_duplicate_clusters_sync=near_duplicate_clusters_sync,
+        memory_near_dup_threshold=memory_near_dup_threshold,
         parse_channel_id_token=parse_channel_id_token,
         parse_duration_to_minutes=parse_duration_to_minutes,
         fetch_messages_since_sync=fetch_messages_since_sync,
@@ -162,6 +202,7 @@ def wire_bot_runtime(
         fetch_memory_events_since_sync=fetch_memory_events_since_sync,
         fetch_latest_memory_events_sync=fetch_latest_memory_events_sync,
         fetch_recent_context_sync=fetch_recent_context_sync,
+        get_recent_context_rows_func=get_recent_context_rows_func,
         format_recent_context=format_recent_context,
         format_memory_events_window=format_memory_events_window,
         extract_json_array=extract_json_array,
@@ -237,6 +278,7 @@ def wire_bot_runtime(
             backfill_pause_seconds=backfill_pause_seconds,
             bot_user=bot.user,
             mark_backfill_done_func=mark_backfill_done_func,
+            flush_messages_func=flush_messages_func,
         )
 
     async def maybe_auto_capture(message):
@@ -252,6 +294,7 @@ def wire_bot_runtime(
         deps=RuntimeDeps(
             db_lock=db_lock,
             db_conn=db_conn,
+            db_handles=db_handles,
             send_chunked=send_chunked,
             user_is_owner=user_is_owner,
             stage_at_least=stage_at_least,
@@ -259,19 +302,22 @@ def wire_bot_runtime(
             memory_review_mode=memory_review_mode,
             utc_iso=utc_iso,
             log_message_func=log_message_func,
+            flush_messages_func=flush_messages_func,
             maybe_auto_capture_func=maybe_auto_capture,
             build_context_pack=build_context_pack,
             classify_context=classify_context,
             founder_user_ids=founder_user_ids,
             channel_policy_groups=channel_policy_groups,
             get_recent_channel_context_func=get_recent_channel_context_func,
-            fetch_last_messages_by_author_sync=fetch_last_messages_by_author_sync,
-            get_or_create_context_profile_sync=get_or_create_context_profile_sync,
+            get_last_author_message_func=get_last_author_message_func,
+            resolve_context_profile_cached_sync=resolve_context_profile_cached_sync,
             get_or_create_person_sync=get_or_create_person_sync,
             resolve_person_id_sync=resolve_person_id_sync,
             canonical_person_id_sync=canonical_person_id_sync,
             upsert_user_profile_last_seen_sync=upsert_user_profile_last_seen_sync,
-            select_active_controller_config_sync=select_active_controller_config_sync,
+            identity_cache=identity_cache,
+            controller_cache=controller_cache,
+            select_active_controller_config_cached_sync=select_active_controller_config_cached_sync,
             infer_scope=infer_scope,
             recall_memory_func=recall_memory_func,
             format_memory_for_llm=format_memory_for_llm,
@@ -287,7 +333,7 @@ def wire_bot_runtime(
             openai_model=openai_model,
             enable_episode_logging=enable_episode_logging,
             episode_log_filters=episode_log_filters,
-            insert_episode_log_sync=insert_episode_log_sync,
+            record_episode_func=record_episode_func,
             recent_context_limit=recent_context_limit,
         ),
         boot=RuntimeBootDeps(
@@ -299,5 +345,7 @@ def wire_bot_runtime(
             maintenance_loop_func=maintenance_loop_func,
             announcement_enabled=announcement_enabled,
             announcement_loop_func=announcement_loop_func,
+            identity_flush_loop_func=identity_flush_loop_func,
+            job_pool=job_pool,
         ),
     )
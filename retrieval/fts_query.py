@@ -1,22 +1,274 @@
 from __future__ import annotations
 
 import re
+import sqlite3
+import threading
+import time
+from typing import Callable
 
+# Words that match most of any chat corpus and carry no topical signal.
+STOPWORDS: frozenset[str] = frozenset(
+    """
+    about above after again all also and any are around because been before being but can cant could
+    did didnt does doesnt doing dont down during each else even ever every few for from get gets got
+    had has have having her here hers him his how into its just know let lets like made make many may
+    more most much must not now off once only other our ours out over own really said same say says
+    see she should some such than that thats the their theirs them then there these they thing things
+    think this those though through too under until very want was way well were what whats when where
+    which while who whom whose why will with would yeah yes yet you your yours
+    """.split()
+)
 
-def build_fts_query(q: str) -> str:
-    """Build a conservative FTS5 query string from free text."""
-    text = (q or "").strip()
-    if not text:
-        return ""
+_PHRASE_RE = re.compile(r'"([^"]+)"')
+_WORD_RE = re.compile(r"[A-Za-z0-9_]{3,}\*?")
+
+
+def _parse_terms(text: str) -> tuple[list[str], list[str], list[str]]:
+    """Split free text into (phrases, prefixes, words); all lowercased and deduped."""
+    phrases: list[str] = []
+    for raw in _PHRASE_RE.findall(text):
+        parts = re.findall(r"[A-Za-z0-9_]+", raw.lower())
+        if len(parts) >= 2:
+            phrase = " ".join(parts)
+            if phrase not in phrases:
+                phrases.append(phrase)
+    text = _PHRASE_RE.sub(" ", text)
 
     # Hyphenated tokens can be parsed as operators/column syntax by SQLite FTS.
     # Normalize punctuation separators into spaces before tokenization.
     text = re.sub(r"[-/]+", " ", text)
 
-    words = re.findall(r"[A-Za-z0-9_]{3,}", text.lower())
-    words = words[:10]
-    if not words:
+    prefixes: list[str] = []
+    words: list[str] = []
+    for token in _WORD_RE.findall(text.lower()):
+        if token.endswith("*"):
+            stem = token[:-1]
+            if len(stem) >= 3 and stem not in prefixes:
+                prefixes.append(stem)
+        elif token not in words:
+            words.append(token)
+    return phrases, prefixes, words
+
+
+def _fts_tokens(term: str) -> list[str]:
+    """The tokens unicode61 indexes `term` as (it treats `_` as a separator)."""
+    return [part for part in term.split("_") if part]
+
+
+def _split_doc_freq(
+    doc_freq: Callable[[list[str], list[str]], dict[str, int]],
+    words: list[str],
+    prefixes: list[str],
+) -> dict[str, int]:
+    """
+    `doc_freq` for terms as FTS5 sees them.
+
+    `job_pool` has no vocab row: it is indexed (and matched) as the phrase
+    `job pool`, so its frequency is bounded by the rarer of its parts.
+    """
+    lookup_words = [w for w in words if "_" not in w]
+    lookup_prefixes = [p for p in prefixes if "_" not in p]
+    split_words = {w: _fts_tokens(w) for w in words if "_" in w}
+    split_prefixes = {p: _fts_tokens(p) for p in prefixes if "_" in p}
+    for parts in split_words.values():
+        lookup_words += parts
+    for parts in split_prefixes.values():
+        lookup_words += parts[:-1]
+        lookup_prefixes += parts[-1:]
+    freqs = dict(doc_freq(list(dict.fromkeys(lookup_words)), list(dict.fromkeys(lookup_prefixes))))
+    for w, parts in split_words.items():
+        freqs[w] = min((freqs.get(x, 0) for x in parts), default=0)
+    for p, parts in split_prefixes.items():
+        counts = [freqs.get(x, 0) for x in parts[:-1]] + [freqs.get(x + "*", 0) for x in parts[-1:]]
+        freqs[p + "*"] = min(counts, default=0)
+    return freqs
+
+
+def query_terms(q: str) -> tuple[list[str], list[str], list[str]]:
+    """(phrases, prefixes, words) `build_fts_query` searches for; stopwords dropped unless nothing else is left."""
+    phrases, prefixes, words = _parse_terms((q or "").strip())
+    content_words = [w for w in words if w not in STOPWORDS]
+    if content_words or phrases or prefixes:
+        words = content_words
+    return phrases, prefixes, words
+
+
+def build_fts_query(
+    q: str,
+    *,
+    doc_freq: Callable[[list[str], list[str]], dict[str, int]] | None = None,
+    total_docs: int = 0,
+    max_terms: int = 10,
+    candidate_budget: int = 0,
+    max_doc_ratio: float = 0.25,
+    min_docs_for_ratio: int = 50,
+) -> str:
+    """
+    Build a conservative FTS5 query string from free text.
+
+    Quoted text becomes a phrase query and `word*` a prefix query; common
+    stopwords are dropped. When `doc_freq` is given (see `FtsTermStats`), terms
+    are ranked by document frequency instead of prompt order: terms that match
+    nothing or more than `max_doc_ratio` of the corpus are dropped, and the
+    rarest are kept until their summed frequencies exceed `candidate_budget`.
+    """
+    text = (q or "").strip()
+    if not text:
+        return ""
+
+    phrases, prefixes, words = query_terms(text)
+
+    if doc_freq is not None:
+        freqs = _split_doc_freq(doc_freq, words, prefixes)
+        terms = [t for t in words if freqs.get(t, 0) > 0]
+        prefix_terms = [p for p in prefixes if freqs.get(p + "*", 0) > 0]
+        if total_docs >= min_docs_for_ratio and max_doc_ratio > 0:
+            limit = total_docs * max_doc_ratio
+            selective = [t for t in terms if freqs[t] <= limit]
+            # An all-common prompt still searches on its rarest word.
+            terms = selective or sorted(terms, key=lambda t: freqs[t])[:1]
+        ranked = sorted(
+            [(freqs[t], t) for t in terms] + [(freqs[p + "*"], p + "*") for p in prefix_terms],
+            key=lambda item: item[0],
+        )
+        chosen: list[str] = []
+        spent = 0
+        for df, term in ranked:
+            if len(chosen) >= max(1, max_terms):
+                break
+            if chosen and candidate_budget > 0 and spent + df > candidate_budget:
+                break
+            chosen.append(term)
+            spent += df
+        parts = [f'"{p}"' for p in phrases] + chosen
+    else:
+        parts = [f'"{p}"' for p in phrases] + [p + "*" for p in prefixes] + words
+
+    parts = parts[: max(1, max_terms)]
+    if not parts:
         return ""
 
     # OR keeps recall forgiving while avoiding raw user query syntax.
-    return " OR ".join(words)
+    return " OR ".join(parts)
+
+
+class FtsTermStats:
+    """
+    Cached document frequencies from an `fts5vocab` 'row' table.
+
+    Frequencies are looked up per term on first use and re-read once older than
+    `ttl_seconds`, so the cache follows the index incrementally without ever
+    scanning the whole vocabulary. Stale counts only shift term ranking; terms
+    with no matches are re-checked on every lookup.
+    """
+
+    def __init__(
+        self,
+        *,
+        vocab_table: str,
+        fts_table: str,
+        ttl_seconds: float = 300.0,
+        max_entries: int = 20000,
+        candidate_budget: int = 400,
+        max_terms: int = 10,
+    ):
+        self.vocab_table = vocab_table
+        self.fts_table = fts_table
+        self.ttl_seconds = max(0.0, float(ttl_seconds))
+        self.max_entries = max(1, int(max_entries))
+        self.candidate_budget = max(0, int(candidate_budget))
+        self.max_terms = max(1, int(max_terms))
+        self._lock = threading.Lock()
+        self._freqs: dict[str, tuple[float, int]] = {}
+        self._total: tuple[float, int] | None = None
+        self._hits = 0
+        self._misses = 0
+        self._queries_built = 0
+
+    def _fresh(self, stamped_at: float, now: float) -> bool:
+        return self.ttl_seconds <= 0 or now - stamped_at < self.ttl_seconds
+
+    def total_docs(self, conn: sqlite3.Connection) -> int:
+        now = time.monotonic()
+        with self._lock:
+            if self._total is not None and self._fresh(self._total[0], now):
+                return self._total[1]
+        row = conn.execute(f"SELECT COUNT(*) FROM {self.fts_table}_docsize").fetchone()
+        total = int(row[0] or 0) if row else 0
+        with self._lock:
+            self._total = (now, total)
+        return total
+
+    def doc_freqs(self, conn: sqlite3.Connection, words: list[str], prefixes: list[str]) -> dict[str, int]:
+        """Map each word (and `prefix*`) to the number of documents containing it."""
+        now = time.monotonic()
+        out: dict[str, int] = {}
+        missing_words: list[str] = []
+        missing_prefixes: list[str] = []
+        with self._lock:
+            for key, bucket in [(w, missing_words) for w in words] + [(p + "*", missing_prefixes) for p in prefixes]:
+                entry = self._freqs.get(key)
+                if entry is not None and self._fresh(entry[0], now):
+                    out[key] = entry[1]
+                    self._hits += 1
+                else:
+                    bucket.append(key)
+                    self._misses += 1
+
+        fetched: dict[str, int] = {w: 0 for w in missing_words}
+        if missing_words:
+            placeholders = ",".join("?" for _ in missing_words)
+            for term, doc in conn.execute(
+                f"SELECT term, doc FROM {self.vocab_table} WHERE term IN ({placeholders})", missing_words
+            ).fetchall():
+                fetched[str(term)] = int(doc or 0)
+        for key in missing_prefixes:
+            stem = key[:-1]
+            # Summed per-term counts overestimate docs matching several
+            # expansions; good enough for a budget.
+            row = conn.execute(
+                f"SELECT COALESCE(SUM(doc), 0) FROM {self.vocab_table} WHERE term >= ? AND term < ?",
+                (stem, stem + "\uffff"),
+            ).fetchone()
+            fetched[key] = int(row[0] or 0) if row else 0
+
+        if fetched:
+            with self._lock:
+                if len(self._freqs) + len(fetched) > self.max_entries:
+                    self._freqs.clear()
+                for key, df in fetched.items():
+                    # Zero is never cached: a term remembered a moment ago must
+                    # be selectable on the very next recall.
+                    if df > 0:
+                        self._freqs[key] = (now, df)
+            out.update(fetched)
+        return out
+
+    def build_query(self, conn: sqlite3.Connection, q: str) -> str:
+        with self._lock:
+            self._queries_built += 1
+        return build_fts_query(
+            q,
+            doc_freq=lambda words, prefixes: self.doc_freqs(conn, words, prefixes),
+            total_docs=self.total_docs(conn),
+            max_terms=self.max_terms,
+            candidate_budget=self.candidate_budget,
+        )
+
+    def query_builder(self, conn: sqlite3.Connection) -> Callable[[str], str]:
+        """Bind `conn` so the result can be passed as a store `build_fts_query`."""
+        return lambda q: self.build_query(conn, q)
+
+    def invalidate(self) -> None:
+        with self._lock:
+            self._freqs.clear()
+            self._total = None
+
+    def stats(self) -> dict[str, int]:
+        with self._lock:
+            return {
+                "entries": len(self._freqs),
+                "hits": self._hits,
+                "misses": self._misses,
+                "queries_built": self._queries_built,
+            }
@@ -0,0 +1,285 @@
+from __future__ import annotations
+
+import math
+import re
+import sqlite3
+import sys
+import threading
+import time
+from collections import Counter
+from typing import Callable
+
+from memory.store import memory_write_generation
+from memory.tiers import WARM_MAX_AGE_SECONDS
+from memory.tiers import created_ts_bounds
+from memory.tiers import infer_tier
+from retrieval.fts_query import query_terms
+
+# unicode61 splits on anything that is not a letter or digit (underscore included).
+_TOKEN_RE = re.compile(r"[^\W_]+")
+_TIER_BOOST = {0: 2.0, 1: 1.0, 2: 0.25, 3: 0.0}
+_PRUNE_EVERY = 256
+
+
+def _tokens(text: str | None) -> list[str]:
+    return _TOKEN_RE.findall((text or "").lower())
+
+
+class HotMemoryIndex:
+    """
+    In-process inverted index of active memory events younger than the warm
+    tier boundary (14 days), so hot/warm recalls skip the FTS join and the DB lock.
+
+    Matching mirrors `build_fts_query` (OR of words, `prefix*` and "phrases"
+    over text and tags) and scoring mirrors `search_memory_events_sync`
+    (bm25 + tier boost + 2 * importance), with bm25 statistics taken from the
+    window. The index is tied to the memory write generation: `add` applies an
+    insert in place when it is the only write since the index was current;
+    any other write (lifecycle changes, merges, cleanup) leaves the index
+    stale and the next recall rebuilds it with one `created_ts` range read.
+    """
+
+    def __init__(
+        self,
+        *,
+        load_recent_events: Callable[[sqlite3.Connection, int], list[dict]],
+        parse_recall_scope: Callable[[str | None], tuple[str, int | None, int | None]],
+        generation: Callable[[], int] = memory_write_generation,
+        max_age_seconds: int = WARM_MAX_AGE_SECONDS,
+        k1: float = 1.2,
+        b: float = 0.75,
+    ):
+        self._load_recent_events = load_recent_events
+        self._parse_recall_scope = parse_recall_scope
+        self._generation_fn = generation
+        self.max_age_seconds = int(max_age_seconds)
+        self.k1 = float(k1)
+        self.b = float(b)
+        self._lock = threading.Lock()
+        self._generation: int | None = None
+        self._rows: dict[int, dict] = {}
+        self._tokens: dict[int, list[str]] = {}
+        self._tf: dict[int, Counter] = {}
+        self._postings: dict[str, set[int]] = {}
+        self._total_len = 0
+        self._adds_since_prune = 0
+        self._rebuilds = 0
+        self._adds = 0
+        self._searches = 0
+        self._search_ms_total = 0.0
+
+    def window_start(self, now: int | None = None) -> int:
+        """Exclusive lower `created_ts` bound of the rows the index holds."""
+        return int(time.time() if now is None else now) - self.max_age_seconds
+
+    def coverage(self, scope: str | None) -> str:
+        """'full' when the index alone answers `scope`, 'partial' when SQL must add older rows, else 'none'."""
+        temporal, _, _ = self._parse_recall_scope(scope)
+        if temporal == "hot" or (temporal == "warm" and self.max_age_seconds >= WARM_MAX_AGE_SECONDS):
+            return "full"
+        if temporal == "cold":
+            return "none"
+        return "partial"
+
+    def is_current(self) -> bool:
+        with self._lock:
+            return self._generation is not None and self._generation == int(self._generation_fn())
+
+    def invalidate(self) -> None:
+        """Force a rebuild on the next recall (e.g. after out-of-process edits)."""
+        with self._lock:
+            self._generation = None
+
+    def rebuild(self, conn: sqlite3.Connection) -> int:
+        generation = int(self._generation_fn())
+        rows = self._load_recent_events(conn, self.window_start())
+        with self._lock:
+            self._rows.clear()
+            self._tokens.clear()
+            self._tf.clear()
+            self._postings.clear()
+            self._total_len = 0
+            for row in rows:
+                self._add_locked(row)
+            self._generation = generation
+            self._rebuilds += 1
+        return len(rows)
+
+    def add(self, event: dict, *, since_generation: int) -> bool:
+        """
+        Apply one committed insert. `since_generation` is the write generation
+        read before the insert; anything else written meanwhile leaves the
+        index stale instead.
+        """
+        with self._lock:
+            if self._generation != int(since_generation) or int(self._generation_fn()) != int(since_generation) + 1:
+                return False
+            if str(event.get("lifecycle") or "active") == "active" and int(event.get("created_ts") or 0) > self.window_start():
+                self._add_locked(event)
+                self._adds += 1
+            self._generation = int(since_generation) + 1
+            self._adds_since_prune += 1
+            if self._adds_since_prune >= _PRUNE_EVERY:
+                self._prune_locked()
+            return True
+
+    def _add_locked(self, event: dict) -> None:
+        mid = int(event["id"])
+        if mid in self._rows:
+            self._remove_locked(mid)
+        tags = event.get("tags") or []
+        importance = event.get("importance")
+        row = {
+            "id": mid,
+            "created_at_utc": event.get("created_at_utc"),
+            "created_ts": int(event.get("created_ts") or 0),
+            "scope": event.get("scope"),
+            "guild_id": event.get("guild_id"),
+            "channel_id": event.get("channel_id"),
+            "channel_name": event.get("channel_name"),
+            "author_id": event.get("author_id"),
+            "author_name": event.get("author_name"),
+            "source_message_id": event.get("source_message_id"),
+            "text": event.get("text"),
+            "tags": list(tags),
+            "content_hash": event.get("content_hash"),
+            "importance": max(0.0, min(1.0, float(importance))) if isinstance(importance, (int, float)) else 0.5,
+            "topic_id": event.get("topic_id"),
+            "topic_source": event.get("topic_source"),
+            "topic_confidence": event.get("topic_confidence"),
+            "logged_from_channel_id": event.get("logged_from_channel_id"),
+            "logged_from_channel_name": event.get("logged_from_channel_name"),
+            "logged_from_message_id": event.get("logged_from_message_id"),
+            "source_channel_id": event.get("source_channel_id"),
+            "source_channel_name": event.get("source_channel_name"),
+        }
+        # The FTS `tags` column also carries the topic when it is not already a tag.
+        tag_text = " ".join(str(t) for t in row["tags"])
+        topic = str(row["topic_id"] or "").strip().lower()
+        if topic and topic not in {str(t).lower() for t in row["tags"]}:
+            tag_text = f"{topic} {tag_text}"
+        tokens = _tokens(row["text"]) + _tokens(tag_text)
+        self._rows[mid] = row
+        self._tokens[mid] = tokens
+        self._tf[mid] = Counter(tokens)
+        self._total_len += len(tokens)
+        for token in self._tf[mid]:
+            self._postings.setdefault(token, set()).add(mid)
+
+    def _remove_locked(self, mid: int) -> None:
+        self._rows.pop(mid, None)
+        tokens = self._tokens.pop(mid, [])
+        self._total_len -= len(tokens)
+        for token in self._tf.pop(mid, {}):
+            ids = self._postings.get(token)
+            if ids is not None:
+                ids.discard(mid)
+                if not ids:
+                    del self._postings[token]
+
+    def _prune_locked(self) -> None:
+        cutoff = self.window_start()
+        for mid in [mid for mid, row in self._rows.items() if row["created_ts"] <= cutoff]:
+            self._remove_locked(mid)
+        self._adds_since_prune = 0
+
+    def _term_frequencies(self, phrases: list[str], prefixes: list[str], words: list[str]) -> list[dict[int, int]]:
+        """Per query term, {memory_id: occurrences} over the indexed rows."""
+        out: list[dict[int, int]] = []
+        for word in words:
+            parts = _tokens(word)
+            if len(parts) > 1:
+                phrases = [*phrases, " ".join(parts)]
+                continue
+            if parts:
+                out.append({mid: self._tf[mid][parts[0]] for mid in self._postings.get(parts[0], ())})
+        for prefix in prefixes:
+            hits: dict[int, int] = {}
+            for token, ids in self._postings.items():
+                if token.startswith(prefix):
+                    for mid in ids:
+                        hits[mid] = hits.get(mid, 0) + self._tf[mid][token]
+            out.append(hits)
+        for phrase in phrases:
+            parts = _tokens(phrase)
+            if not parts:
+                continue
+            candidates = set.intersection(*(self._postings.get(p, set()) for p in parts))
+            hits = {}
+            for mid in candidates:
+                toks = self._tokens[mid]
+                n = sum(1 for i in range(len(toks) - len(parts) + 1) if toks[i : i + len(parts)] == parts)
+                if n:
+                    hits[mid] = n
+            out.append(hits)
+        return out
+
+    def search(self, query: str, scope: str | None, limit: int, *, now: int | None = None) -> list[dict]:
+        started = time.perf_counter()
+        now = int(time.time() if now is None else now)
+        phrases, prefixes, words = query_terms(query)
+        terms = len(phrases) + len(prefixes) + len(words)
+        if terms > 10:
+            # Same cap and order as build_fts_query's plain path.
+            phrases = phrases[:10]
+            prefixes = prefixes[: max(0, 10 - len(phrases))]
+            words = words[: max(0, 10 - len(phrases) - len(prefixes))]
+        temporal, guild_id, channel_id = self._parse_recall_scope(scope)
+        min_ts, max_ts = created_ts_bounds(temporal, now)
+        floor = self.window_start(now) if min_ts is None else max(int(min_ts), self.window_start(now))
+        channel_scope = f"channel:{int(channel_id)}" if channel_id is not None else None
+        guild_scope = f"guild:{int(guild_id)}" if guild_id is not None else None
+
+        with self._lock:
+            per_term = self._term_frequencies(phrases, prefixes, words)
+            n_docs = len(self._rows)
+            avg_len = (self._total_len / n_docs) if n_docs else 0.0
+            bm25: dict[int, float] = {}
+            for hits in per_term:
+                if not hits:
+                    continue
+                idf = math.log(1.0 + (n_docs - len(hits) + 0.5) / (len(hits) + 0.5))
+                for mid, tf in hits.items():
+                    norm = self.k1 * (1.0 - self.b + self.b * len(self._tokens[mid]) / avg_len) if avg_len else self.k1
+                    bm25[mid] = bm25.get(mid, 0.0) + idf * tf * (self.k1 + 1.0) / (tf + norm)
+            scored: list[dict] = []
+            for mid, rank in bm25.items():
+                row = self._rows[mid]
+                created_ts = row["created_ts"]
+                if created_ts <= floor or (max_ts is not None and created_ts > max_ts):
+                    continue
+                if channel_id is not None and row["channel_id"] != channel_id and row["scope"] != channel_scope:
+                    continue
+                if guild_id is not None and row["guild_id"] != guild_id and row["scope"] != guild_scope:
+                    continue
+                tier = infer_tier(created_ts, now)
+                out = dict(row, tags=list(row["tags"]))
+                del out["guild_id"]
+                out["tier"] = tier
+                out["score"] = rank + _TIER_BOOST[tier] + 2.0 * row["importance"]
+                scored.append(out)
+            self._searches += 1
+            self._search_ms_total += (time.perf_counter() - started) * 1000.0
+        scored.sort(key=lambda e: (-e["score"], -e["id"]))
+        return scored[: max(0, int(limit))]
+
+    def stats(self) -> dict[str, float]:
+        with self._lock:
+            size = sys.getsizeof(self._rows) + sys.getsizeof(self._tokens) + sys.getsizeof(self._tf)
+            for mid, row in self._rows.items():
+                size += sys.getsizeof(row) + sum(sys.getsizeof(v) for v in row.values())
+                size += sum(sys.getsizeof(t) for t in row["tags"])
+                size += sys.getsizeof(self._tokens[mid]) + sys.getsizeof(self._tf[mid])
+            size += sys.getsizeof(self._postings)
+            for token, ids in self._postings.items():
+                size += sys.getsizeof(token) + sys.getsizeof(ids)
+            return {
+                "rows": len(self._rows),
+                "terms": len(self._postings),
+                "approx_bytes": size,
+                "current": self._generation is not None and self._generation == int(self._generation_fn()),
+                "rebuilds": self._rebuilds,
+                "adds": self._adds,
+                "searches": self._searches,
+                "avg_search_ms": round(self._search_ms_total / self._searches, 3) if self._searches else 0.0,
+            }
@@ -1,8 +1,18 @@
 from __future__ import annotations
 
-import asyncio
-import hashlib
 import re
+import threading
+import time
+from collections import OrderedDict
+from typing import Callable
+
+from db.handles import DbHandles
+from memory.store import memory_content_hash
+from memory.store import memory_write_generation
+from memory.tiers import infer_tier
+from retrieval.fts_query import query_terms
+from retrieval.hot_index import HotMemoryIndex
+from retrieval.vector_index import reciprocal_rank_fusion
 
 
 def _coerce_nonneg_int(value: object, default: int) -> int:
@@ -97,18 +107,26 @@ def budget_and_diversify_events(
     tier_counts: dict[int, int] = {}
 
     def _fp(e: dict) -> str:
-        txt = (e.get("text") or e.get("content") or "").strip().lower()
-        txt = re.sub(r"\s+", " ", txt)
-        return hashlib.sha1(txt.encode("utf-8")).hexdigest()
+        # Stored at insert (migration 0025); hash only rows that predate it.
+        return e.get("content_hash") or memory_content_hash(e.get("text") or e.get("content"))
 
     seen: set[str] = set()
     topic_counts: dict[str, int] = {}
     channel_counts: dict[str, int] = {}
     author_counts: dict[str, int] = {}
 
+    now = int(time.time())
+
+    def _tier(e: dict) -> int:
+        # Age decides the tier; the stored column is only a fallback for rows
+        # without a timestamp (it is no longer refreshed by cleanup).
+        if e.get("created_ts"):
+            return infer_tier(e.get("created_ts"), now)
+        return int(e.get("tier") if e.get("tier") is not None else 1)
+
     out: list[dict] = []
     for e in events:
-        tier = int(e.get("tier") if e.get("tier") is not None else 1)
+        tier = _tier(e)
         if stage_at_least("M2") and tier >= 3:
             continue
 
@@ -148,6 +166,116 @@ def budget_and_diversify_events(
     return out
 
 
+def recall_terms_key(prompt: str) -> tuple | None:
+    """
+    Every (phrases, prefixes, words) term a search could pick from `prompt`.
+
+    Not the built FTS query: that keeps only 10 terms, and with term stats the
+    10 are chosen by corpus frequency, so prompts sharing those 10 can differ.
+    """
+    phrases, prefixes, words = query_terms(prompt or "")
+    if not (phrases or prefixes or words):
+        return None
+    return (tuple(phrases), tuple(prefixes), tuple(words))
+
+
+def recall_prompt_key(prompt: str) -> tuple | None:
+    """Whitespace/case-normalized prompt; for searches (vector recall) that read the raw text."""
+    text = " ".join((prompt or "").lower().split())
+    if recall_terms_key(text) is None:
+        return None
+    return ("prompt", text)
+
+
+class RecallCache:
+    """
+    LRU memo of `recall_memory` results, keyed by prompt terms, scope and budget.
+
+    Entries are retired when the memory write generation moves; `ttl_seconds`
+    bounds staleness from tier boundaries and out-of-process writes.
+    """
+
+    def __init__(
+        self,
+        *,
+        max_entries: int = 256,
+        ttl_seconds: float = 60.0,
+        normalize_query: Callable[[str], tuple | None] = recall_terms_key,
+        generation: Callable[[], int] = memory_write_generation,
+    ):
+        self.max_entries = max(1, int(max_entries))
+        self.ttl_seconds = max(0.0, float(ttl_seconds))
+        self._normalize_query = normalize_query
+        self._generation = generation
+        self._entries: OrderedDict[tuple, tuple[int, float, list[dict], list[dict]]] = OrderedDict()
+        self._lock = threading.Lock()
+        self._hits = 0
+        self._misses = 0
+        self._evictions = 0
+        self._invalidations = 0
+
+    def key(self, prompt: str, scope: str, budget: tuple) -> tuple | None:
+        """Cache key for a recall, or None when the prompt has no searchable terms."""
+        terms = self._normalize_query(prompt or "")
+        if not terms:
+            return None
+        return (terms, scope, budget)
+
+    def generation(self) -> int:
+        return int(self._generation())
+
+    def get(self, key: tuple) -> tuple[list[dict], list[dict]] | None:
+        generation = self.generation()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and (
+                entry[0] != generation or (self.ttl_seconds > 0 and time.monotonic() - entry[1] > self.ttl_seconds)
+            ):
+                del self._entries[key]
+                entry = None
+            if entry is None:
+                self._misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self._hits += 1
+            events, summaries = entry[2], entry[3]
+        # Callers decorate result rows, so hand out copies.
+        return ([dict(e) for e in events], [dict(s) for s in summaries])
+
+    def put(self, key: tuple, generation: int, events: list[dict], summaries: list[dict]) -> None:
+        """Store a result computed at `generation` (read before the search ran)."""
+        if generation != self.generation():
+            return
+        with self._lock:
+            self._entries[key] = (
+                int(generation),
+                time.monotonic(),
+                [dict(e) for e in events],
+                [dict(s) for s in summaries],
+            )
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self._evictions += 1
+
+    def invalidate(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._invalidations += 1
+
+    def stats(self) -> dict[str, float]:
+        with self._lock:
+            lookups = self._hits + self._misses
+            return {
+                "entries": len(self._entries),
+                "hits": self._hits,
+                "misses": self._misses,
+                "hit_rate": round(self._hits / lookups, 4) if lookups else 0.0,
+                "evictions": self._evictions,
+                "invalidations": self._invalidations,
+            }
+
+
 async def recall_memory(
     prompt: str,
     scope: str | None = None,
@@ -158,7 +286,20 @@ async def recall_memory(
     db_conn,
     search_memory_events_sync,
     search_memory_summaries_sync,
+    db_handles=None,
+    recall_cache: RecallCache | None = None,
+    hot_index: HotMemoryIndex | None = None,
+    build_index_query=None,
 ) -> tuple[list[dict], list[dict]]:
+    """
+    Events and summaries relevant to `prompt`, within `memory_budget`.
+
+    `hot_index` answers the window it covers. It must not be given when the
+    event search has legs the index cannot reproduce (vector recall).
+    `build_index_query(conn, prompt)` is the event search's term selection
+    (document-frequency ranking); the index searches the query it builds so
+    both sides match on the same terms.
+    """
     if not stage_at_least("M1"):
         return ([], [])
 
@@ -167,18 +308,62 @@ async def recall_memory(
         memory_budget,
         stage_at_least=stage_at_least,
     )
-    async with db_lock:
-        events = await asyncio.to_thread(search_memory_events_sync, db_conn, prompt, scope, event_search_limit)
-        events = budget_and_diversify_events(
-            events,
+
+    cache_key = None
+    generation = 0
+    if recall_cache is not None:
+        budget_key = (
+            tuple(sorted(tier_caps.items())),
+            event_limit,
+            summary_limit,
+            bool(stage_at_least("M2")),
+        )
+        cache_key = recall_cache.key(prompt, scope, budget_key)
+        if cache_key is not None:
+            cached = recall_cache.get(cache_key)
+            if cached is not None:
+                return cached
+            generation = recall_cache.generation()
+
+    db = db_handles or DbHandles(db_lock=db_lock, db_conn=db_conn)
+    coverage = hot_index.coverage(scope) if hot_index is not None else "none"
+    if coverage != "none" and not hot_index.is_current():
+        await db.read(hot_index.rebuild)
+    now = int(time.time())
+    index_query = prompt
+    if coverage != "none" and build_index_query is not None:
+        index_query = await db.read(build_index_query, prompt)
+    if coverage == "full":
+        events = hot_index.search(index_query, scope, event_search_limit, now=now)
+    elif coverage == "partial":
+        # The index answers the recent window; SQL only searches what is older.
+        older = await db.read(
+            search_memory_events_sync,
+            prompt,
             scope,
-            stage_at_least=stage_at_least,
-            limit=event_limit,
-            tier_caps=tier_caps,
+            event_search_limit,
+            created_before_ts=hot_index.window_start(now),
         )
-        summaries = []
-        if stage_at_least("M3") and summary_limit > 0:
-            summaries = await asyncio.to_thread(search_memory_summaries_sync, db_conn, prompt, scope, summary_limit)
+        recent = hot_index.search(index_query, scope, event_search_limit, now=now)
+        # Window-local bm25 and corpus bm25 (or RRF order) are not comparable
+        # scores, so merge the two rankings by rank.
+        by_id = {int(e["id"]): e for e in older + recent}
+        fused = reciprocal_rank_fusion([[int(e["id"]) for e in recent], [int(e["id"]) for e in older]])
+        events = [by_id[mid] for mid in fused[:event_search_limit]]
+    else:
+        events = await db.read(search_memory_events_sync, prompt, scope, event_search_limit)
+    events = budget_and_diversify_events(
+        events,
+        scope,
+        stage_at_least=stage_at_least,
+        limit=event_limit,
+        tier_caps=tier_caps,
+    )
+    summaries = []
+    if stage_at_least("M3") and summary_limit > 0:
+        summaries = await db.read(search_memory_summaries_sync, prompt, scope, summary_limit)
+    if cache_key is not None:
+        recall_cache.put(cache_key, generation, events, summaries)
     return (events, summaries)
 
 
@@ -327,6 +512,58 @@ def format_recent_context(rows: list[tuple[str, str, str]], max_chars: int, max_
     return "\n".join(lines) if lines else "(context truncated to 0 lines)"
 
 
+async def fetch_recent_context_rows(
+    channel_id: int,
+    before_message_id: int,
+    limit: int,
+    *,
+    db_handles,
+    fetch_recent_context_sync,
+    fetch_recent_message_rows_sync=None,
+    recent_buffer=None,
+) -> list[tuple[str, str, str]]:
+    """Newest-first (created_at_utc, author_name, content) rows before a message.
+
+    Served from the recent-message buffer when it covers the window; an
+    unseeded channel is seeded from the DB once, otherwise the DB answers.
+    """
+    if recent_buffer is not None:
+        rows = recent_buffer.recent(channel_id, before_message_id, limit)
+        if rows is not None:
+            return rows
+        if fetch_recent_message_rows_sync is not None and not recent_buffer.is_seeded(channel_id):
+            seed_limit = max(int(limit), int(recent_buffer.per_channel))
+            seed_rows = await db_handles.read(fetch_recent_message_rows_sync, channel_id, 2**63 - 1, seed_limit)
+            recent_buffer.seed(channel_id, seed_rows, complete_history=len(seed_rows) < seed_limit)
+            rows = recent_buffer.recent(channel_id, before_message_id, limit)
+            if rows is not None:
+                return rows
+    return await db_handles.read(fetch_recent_context_sync, channel_id, before_message_id, limit)
+
+
+async def get_last_author_message(
+    channel_id: int,
+    before_message_id: int,
+    author_id: int,
+    *,
+    db_handles,
+    fetch_last_messages_by_author_id_sync,
+    recent_buffer=None,
+) -> list[tuple[str, str, str]]:
+    """Reply anchor: the author's last non-empty message in the channel ([] if none)."""
+    if recent_buffer is not None:
+        hit, rows = recent_buffer.last_by_author(channel_id, before_message_id, author_id)
+        if hit:
+            return rows
+    return await db_handles.read(
+        fetch_last_messages_by_author_id_sync,
+        channel_id,
+        before_message_id,
+        author_id,
+        1,
+    )
+
+
 async def get_recent_channel_context(
     channel_id: int,
     before_message_id: int,
@@ -337,14 +574,19 @@ async def get_recent_channel_context(
     recent_context_limit: int,
     recent_context_max_chars: int,
     max_line_chars: int,
+    db_handles=None,
+    fetch_recent_message_rows_sync=None,
+    recent_buffer=None,
 ) -> tuple[str, int]:
-    async with db_lock:
-        rows = await asyncio.to_thread(
-            fetch_recent_context_sync,
-            db_conn,
-            channel_id,
-            before_message_id,
-            recent_context_limit,
-        )
+    db = db_handles or DbHandles(db_lock=db_lock, db_conn=db_conn)
+    rows = await fetch_recent_context_rows(
+        channel_id,
+        before_message_id,
+        recent_context_limit,
+        db_handles=db,
+        fetch_recent_context_sync=fetch_recent_context_sync,
+        fetch_recent_message_rows_sync=fetch_recent_message_rows_sync,
+        recent_buffer=recent_buffer,
+    )
     text = format_recent_context(rows, recent_context_max_chars, max_line_chars)
     return text, len(rows)
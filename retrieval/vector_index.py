@@ -0,0 +1,219 @@
+from __future__ import annotations
+
+import hashlib
+import heapq
+import math
+import re
+import sqlite3
+import threading
+import time
+from array import array
+
+from retrieval.fts_query import STOPWORDS
+
+try:
+    import numpy as np
+except ModuleNotFoundError:  # pragma: no cover - optional; falls back to sparse Python dot products
+    np = None
+
+# Feature-hashed bag of words + in-word character trigrams. 256 float32 dims
+# keep a vector at 1 KiB; collisions only blur scores, they never drop rows.
+VECTOR_DIM = 256
+_TRIGRAM_WEIGHT = 0.5
+_TOKEN_RE = re.compile(r"[a-z0-9_]+")
+
+
+def _features(text: str | None) -> dict[str, float]:
+    feats: dict[str, float] = {}
+    for token in _TOKEN_RE.findall((text or "").lower()):
+        if token in STOPWORDS or (len(token) < 3 and not token.isdigit()):
+            continue
+        feats["w:" + token] = feats.get("w:" + token, 0.0) + 1.0
+        # Trigrams let "qualifying" meet "quali" and plural/tense variants.
+        padded = f"#{token}#"
+        for i in range(len(padded) - 2):
+            key = "c:" + padded[i : i + 3]
+            feats[key] = feats.get(key, 0.0) + _TRIGRAM_WEIGHT
+    return feats
+
+
+def sparse_vector(text: str | None, dim: int = VECTOR_DIM) -> dict[int, float]:
+    """L2-normalized signed feature-hashed vector of `text` as {dimension: weight}."""
+    out: dict[int, float] = {}
+    for feature, count in _features(text).items():
+        digest = int.from_bytes(hashlib.blake2b(feature.encode("utf-8"), digest_size=8).digest(), "little")
+        idx = digest % dim
+        sign = 1.0 if (digest >> 63) & 1 else -1.0
+        weight = 1.0 + math.log(count) if count > 1.0 else count
+        out[idx] = out.get(idx, 0.0) + sign * weight
+    norm = math.sqrt(sum(v * v for v in out.values()))
+    if norm <= 0.0:
+        return {}
+    return {i: v / norm for i, v in out.items() if v != 0.0}
+
+
+def pack_vector(text: str | None, dim: int = VECTOR_DIM) -> bytes:
+    """Dense float32 blob for `text`; empty when the text has no usable terms."""
+    sparse = sparse_vector(text, dim)
+    if not sparse:
+        return b""
+    dense = array("f", bytes(4 * dim))
+    for i, v in sparse.items():
+        dense[i] = v
+    return dense.tobytes()
+
+
+def write_vector_sync(conn: sqlite3.Connection, *, table: str, item_id: int, text: str | None) -> None:
+    """Upsert one row of a `memory_*_vectors` table (no commit); `seq` orders incremental loads."""
+    conn.execute(
+        f"""
+        INSERT OR REPLACE INTO {table}(item_id, seq, vector)
+        VALUES (?, (SELECT COALESCE(MAX(seq), 0) + 1 FROM {table}), ?)
+        """,
+        (int(item_id), pack_vector(text)),
+    )
+
+
+def backfill_vectors_sync(
+    conn: sqlite3.Connection,
+    *,
+    table: str,
+    source_table: str,
+    text_column: str,
+    batch_size: int = 500,
+) -> int:
+    """Vectorize every `source_table` row missing from `table`; returns how many were written."""
+    written = 0
+    last_id = 0
+    while True:
+        rows = conn.execute(
+            f"""
+            SELECT s.id, s.{text_column}
+            FROM {source_table} s
+            LEFT JOIN {table} v ON v.item_id = s.id
+            WHERE v.item_id IS NULL AND s.id > ?
+            ORDER BY s.id
+            LIMIT ?
+            """,
+            (last_id, max(1, int(batch_size))),
+        ).fetchall()
+        if not rows:
+            break
+        for item_id, text in rows:
+            write_vector_sync(conn, table=table, item_id=int(item_id), text=text)
+        conn.commit()
+        written += len(rows)
+        last_id = int(rows[-1][0])
+    return written
+
+
+class HashedVectorIndex:
+    """
+    In-process copy of a `memory_*_vectors` table for cosine top-k search.
+
+    Each search first pulls rows whose `seq` is above the last one loaded, so
+    inserts and summary rewrites are picked up incrementally without a rescan.
+    Scores use a NumPy matrix product when NumPy is installed and sparse
+    Python dot products otherwise. Hits are candidates only: lifecycle and
+    scope filtering stay in SQL.
+    """
+
+    def __init__(self, *, table: str, dim: int = VECTOR_DIM):
+        self.table = table
+        self.dim = int(dim)
+        self._lock = threading.Lock()
+        self._ids: list[int] = []
+        self._pos: dict[int, int] = {}
+        self._rows: list[array] = []
+        self._matrix = None
+        self._last_seq = 0
+        self._searches = 0
+        self._search_ms_total = 0.0
+
+    def refresh(self, conn: sqlite3.Connection) -> int:
+        with self._lock:
+            last_seq = self._last_seq
+        rows = conn.execute(
+            f"SELECT item_id, seq, vector FROM {self.table} WHERE seq > ? ORDER BY seq",
+            (last_seq,),
+        ).fetchall()
+        if not rows:
+            return 0
+        with self._lock:
+            for item_id, seq, blob in rows:
+                vec = array("f")
+                vec.frombytes(bytes(blob or b""))
+                if len(vec) != self.dim:
+                    vec = array("f", bytes(4 * self.dim))
+                pos = self._pos.get(int(item_id))
+                if pos is None:
+                    self._pos[int(item_id)] = len(self._ids)
+                    self._ids.append(int(item_id))
+                    self._rows.append(vec)
+                else:
+                    self._rows[pos] = vec
+                self._last_seq = max(self._last_seq, int(seq))
+            self._matrix = None
+        return len(rows)
+
+    def search(self, conn: sqlite3.Connection, text: str, limit: int) -> list[tuple[int, float]]:
+        """Top `limit` `(item_id, cosine)` pairs with positive similarity to `text`."""
+        started = time.perf_counter()
+        self.refresh(conn)
+        query = sparse_vector(text, self.dim)
+        if not query or limit <= 0:
+            return []
+        with self._lock:
+            if not self._ids:
+                return []
+            if np is not None:
+                if self._matrix is None:
+                    self._matrix = np.frombuffer(b"".join(r.tobytes() for r in self._rows), dtype=np.float32).reshape(
+                        len(self._rows), self.dim
+                    )
+                q = np.zeros(self.dim, dtype=np.float32)
+                for i, v in query.items():
+                    q[i] = v
+                scores = self._matrix @ q
+                k = min(int(limit), len(self._ids))
+                top = np.argpartition(-scores, k - 1)[:k]
+                pairs = [(self._ids[int(i)], float(scores[int(i)])) for i in top]
+            else:
+                items = list(query.items())
+                pairs = heapq.nlargest(
+                    int(limit),
+                    ((self._ids[n], sum(row[i] * v for i, v in items)) for n, row in enumerate(self._rows)),
+                    key=lambda p: p[1],
+                )
+            self._searches += 1
+            self._search_ms_total += (time.perf_counter() - started) * 1000.0
+        pairs = [p for p in pairs if p[1] > 0.0]
+        pairs.sort(key=lambda p: (-p[1], p[0]))
+        return pairs
+
+    def searcher(self):
+        """`(conn, text, limit) -> hits` callable for the store's `vector_search` hook."""
+        return lambda conn, text, limit: self.search(conn, text, limit)
+
+    def stats(self) -> dict[str, float]:
+        with self._lock:
+            return {
+                "rows": len(self._ids),
+                "searches": self._searches,
+                "avg_search_ms": round(self._search_ms_total / self._searches, 3) if self._searches else 0.0,
+                "numpy": np is not None,
+            }
+
+
+def reciprocal_rank_fusion(rankings: list[list[int]], *, k: int = 60) -> list[int]:
+    """Merge ranked id lists by RRF (sum of 1/(k + rank)); ties keep first-list order."""
+    scores: dict[int, float] = {}
+    first_seen: dict[int, int] = {}
+    order = 0
+    for ranking in rankings:
+        for rank, item_id in enumerate(ranking, start=1):
+            scores[item_id] = scores.get(item_id, 0.0) + 1.0 / (k + rank)
+            if item_id not in first_seen:
+                first_seen[item_id] = order
+                order += 1
+    return sorted(scores, key=lambda item_id: (-scores[item_id], first_seen[item_id]))
@@ -0,0 +1,150 @@
+"""
+Compare FTS-only and hybrid (FTS + hashed vector, RRF) memory recall.
+
+Builds an in-memory DB from a synthetic corpus in which each query names
+its target memory with different inflections ("deployed" -> "deploying",
+"server" -> "servers"), which unicode61 FTS cannot match; half of the
+queries keep one exact word so the lexical path has something to find. It
+then reports recall@k and per-query latency for both paths.
+
+    python scripts/bench_vector_recall.py --events 5000 --queries 200 --k 8
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import random
+import sqlite3
+import statistics
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from db.migrate import apply_sqlite_migrations  # noqa: E402
+from memory.store import insert_memory_event_sync  # noqa: E402
+from memory.store import search_memory_events_sync  # noqa: E402
+from retrieval.fts_query import build_fts_query  # noqa: E402
+from retrieval.vector_index import HashedVectorIndex  # noqa: E402
+from retrieval.vector_index import np  # noqa: E402
+
+# (memory form, query form) pairs: same stem, different surface word.
+_VERBS = [
+    ("deployed", "deploying"), ("scheduled", "scheduling"), ("rotated", "rotation"), ("migrated", "migrating"),
+    ("approved", "approval"), ("cancelled", "cancelling"), ("renamed", "renaming"), ("archived", "archiving"),
+    ("reviewed", "reviewing"), ("published", "publishing"), ("restarted", "restarting"), ("configured", "configuring"),
+]
+_NOUNS = [
+    ("server", "servers"), ("tournament", "tournaments"), ("playlist", "playlists"), ("moderator", "moderators"),
+    ("qualifier", "qualifiers"), ("dashboard", "dashboards"), ("channel", "channels"), ("webhook", "webhooks"),
+    ("practice", "practices"), ("livery", "liveries"), ("stream", "streams"), ("sponsor", "sponsors"),
+    ("league", "leagues"), ("ticket", "tickets"), ("backup", "backups"), ("announcement", "announcements"),
+]
+_FILLER = ["team", "weekend", "tonight", "crew", "update", "discord", "race", "notes", "plan", "ops"]
+
+
+def _safe_json_loads(raw: str | None):
+    return json.loads(raw or "[]")
+
+
+def _corpus(events: int, seed: int) -> list[tuple[str, str]]:
+    """`events` (memory text, paraphrased query) pairs."""
+    rng = random.Random(seed)
+    out: list[tuple[str, str]] = []
+    for _ in range(events):
+        verb, verb_q = rng.choice(_VERBS)
+        (noun, noun_q), (obj, obj_q) = rng.sample(_NOUNS, 2)
+        filler = " ".join(rng.sample(_FILLER, 2))
+        if rng.random() < 0.5:
+            noun_q = noun
+        out.append((f"{noun} {obj} {verb} {filler}", f"{verb_q} {noun_q} {obj_q}"))
+    return out
+
+
+def _seed(conn: sqlite3.Connection, corpus: list[tuple[str, str]]) -> list[int]:
+    now = int(time.time())
+    ids: list[int] = []
+    for text, _ in corpus:
+        ids.append(
+            insert_memory_event_sync(
+                conn,
+                {
+                    "created_at_utc": "2026-10-17T00:00:00+00:00",
+                    "created_ts": now - 3600,
+                    "scope": "global",
+                    "text": text,
+                    "tags_json": "[]",
+                    "importance": 0.5,
+                },
+                safe_json_loads=_safe_json_loads,
+            )
+        )
+    return ids
+
+
+def _run(conn, cases, k, vector_search):
+    hits = 0
+    latencies: list[float] = []
+    for target_id, query in cases:
+        started = time.perf_counter()
+        rows = search_memory_events_sync(
+            conn,
+            query,
+            "auto",
+            k,
+            build_fts_query=build_fts_query,
+            parse_recall_scope=lambda _scope: ("auto", None, None),
+            stage_at_least=lambda _stage: True,
+            safe_json_loads=_safe_json_loads,
+            vector_search=vector_search,
+        )
+        latencies.append((time.perf_counter() - started) * 1000.0)
+        hits += int(any(r["id"] == target_id for r in rows))
+    latencies.sort()
+    return {
+        "recall_at_k": round(hits / len(cases), 4) if cases else 0.0,
+        "mean_ms": round(statistics.fmean(latencies), 3) if latencies else 0.0,
+        "p95_ms": round(latencies[int(0.95 * (len(latencies) - 1))], 3) if latencies else 0.0,
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--events", type=int, default=2000)
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--k", type=int, default=8)
+    parser.add_argument("--seed", type=int, default=7)
+    args = parser.parse_args()
+
+    conn = sqlite3.connect(":memory:")
+    apply_sqlite_migrations(conn, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "migrations"))
+    corpus = _corpus(args.events, args.seed)
+    started = time.perf_counter()
+    ids = _seed(conn, corpus)
+    seed_s = time.perf_counter() - started
+
+    index = HashedVectorIndex(table="memory_event_vectors")
+    started = time.perf_counter()
+    index.refresh(conn)
+    load_ms = (time.perf_counter() - started) * 1000.0
+
+    rng = random.Random(args.seed + 1)
+    picks = rng.sample(range(len(ids)), min(args.queries, len(ids)))
+    cases = [(ids[i], corpus[i][1]) for i in picks]
+
+    fts = _run(conn, cases, args.k, None)
+    hybrid = _run(conn, cases, args.k, index.searcher())
+    print(f"events={len(ids)} queries={len(cases)} k={args.k} numpy={np is not None}")
+    print(f"seed_s={seed_s:.2f} index_load_ms={load_ms:.1f}")
+    print(f"fts_only  recall@{args.k}={fts['recall_at_k']:.3f} mean_ms={fts['mean_ms']:.3f} p95_ms={fts['p95_ms']:.3f}")
+    print(
+        f"hybrid    recall@{args.k}={hybrid['recall_at_k']:.3f} "
+        f"mean_ms={hybrid['mean_ms']:.3f} p95_ms={hybrid['p95_ms']:.3f}"
+    )
+    conn.close()
+
+
+if __name__ == "__main__":
+    main()
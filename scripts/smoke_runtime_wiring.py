@@ -98,6 +98,10 @@ async def _get_recent_context(*args, **kwargs):
     return ("", 0)
 
 
+async def _get_last_author_message(*args, **kwargs):
+    return []
+
+
 def _select_active_controller_config(*args, **kwargs):
     return {"id": 1, "persona": "guide", "scope": "global"}
 
@@ -122,12 +126,15 @@ def _main() -> int:
 
     import discord
     from discord.ext import commands
+    from llm.gateway import LLMGateway
+    from llm.gateway import chat_completion
     from misc.runtime_wiring import wire_bot_runtime
 
     intents = discord.Intents.none()
     bot = commands.Bot(command_prefix="!", intents=intents)
     db_lock = asyncio.Lock()
     db_conn = object()
+    llm_client = LLMGateway(client=_DummyClient(), default_timeout_seconds=5)
 
     wire_bot_runtime(
         bot,
@@ -183,7 +190,7 @@ def _main() -> int:
         extract_json_array=lambda text: [],
         is_valid_topic_id=lambda topic_id: True,
         set_memory_origin_func=_noop_async,
-        client=_DummyClient(),
+        client=llm_client,
         openai_model="gpt-5.1",
         max_line_chars=600,
         welcome_channel_id=123456789012345678,
@@ -206,7 +213,7 @@ def _main() -> int:
         log_message_func=_noop_async,
         maintenance_loop_func=_noop_async,
         get_recent_channel_context_func=_get_recent_context,
-        fetch_last_messages_by_author_sync=lambda conn, channel_id, before_id, like, limit=1: [],
+        get_last_author_message_func=_get_last_author_message,
         build_context_pack=lambda: "",
         classify_context=_classify_context,
         founder_user_ids=set(),
@@ -215,11 +222,11 @@ def _main() -> int:
         format_profile_for_llm=lambda user_blocks, max_chars=900: "",
         dm_guidelines=SimpleNamespace(version="dm_guidelines_test", to_prompt_block=lambda: "DM Guidelines"),
         dm_guidelines_source="file",
-        get_or_create_context_profile_sync=lambda conn, payload: 1,
+        resolve_context_profile_cached_sync=lambda conn, payload, **kwargs: 1,
         resolve_person_id_sync=lambda conn, platform, external_id: 1,
         canonical_person_id_sync=lambda conn, person_id: int(person_id),
         upsert_user_profile_last_seen_sync=_noop,
-        select_active_controller_config_sync=_select_active_controller_config,
+        select_active_controller_config_cached_sync=_select_active_controller_config,
         utc_iso=lambda dt=None: "2026-01-01T00:00:00+00:00",
         system_prompt_base="You are Epoxy.",
         enable_episode_logging=False,
@@ -235,6 +242,10 @@ def _main() -> int:
     expected_commands = {
         "episodelogs",
         "dbmigrations",
+        "controllercache",
+        "recallcache",
+        "jobs",
+        "ftsmaint",
         "dmfeedback",
         "dmeval",
         "announce.status",
@@ -260,6 +271,7 @@ def _main() -> int:
         "memreview",
         "memapprove",
         "memreject",
+        "memdedupe",
         "mine",
         "ctxpeek",
         "topicsuggest",
@@ -282,6 +294,12 @@ def _main() -> int:
     if missing:
         raise RuntimeError(f"Missing expected commands: {missing}")
 
+    smoke_resp = asyncio.run(
+        chat_completion(llm_client, model="gpt-5.1", messages=[{"role": "user", "content": "ping"}])
+    )
+    if smoke_resp.choices[0].message.content != "[]":
+        raise RuntimeError("LLM gateway did not route through the stub client")
+
     if "on_ready" not in bot.extra_events or "on_message" not in bot.extra_events:
         raise RuntimeError("Runtime events were not registered")
 
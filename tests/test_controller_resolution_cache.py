@@ -0,0 +1,148 @@
+from __future__ import annotations
+
+import sqlite3
+import unittest
+
+from controller.store import ControllerResolutionCache
+from controller.store import ensure_controller_schema
+from controller.store import get_or_create_context_profile_sync
+from controller.store import resolve_context_profile_cached_sync
+from controller.store import seed_default_controller_configs
+from controller.store import select_active_controller_config_cached_sync
+
+
+def _payload(caps: list[str] | None = None) -> dict:
+    return {
+        "caller_type": "member",
+        "surface": "public_channel",
+        "channel_id": 10,
+        "guild_id": 1,
+        "sensitivity_policy_id": "policy:member_default",
+        "allowed_capabilities": caps if caps is not None else ["chat"],
+    }
+
+
+class _CountingConn:
+    """Counts statements so tests can assert a cache hit issued none."""
+
+    def __init__(self, conn: sqlite3.Connection):
+        self.conn = conn
+        self.statements = 0
+        self.commits = 0
+        outer = self
+
+        class _Cursor:
+            def __init__(self, cur):
+                self._cur = cur
+                self.lastrowid = None
+
+            def execute(self, sql, params=()):
+                outer.statements += 1
+                self._cur.execute(sql, params)
+                self.lastrowid = self._cur.lastrowid
+                return self
+
+            def fetchone(self):
+                return self._cur.fetchone()
+
+        self._cursor_cls = _Cursor
+
+    def cursor(self):
+        return self._cursor_cls(self.conn.cursor())
+
+    def commit(self):
+        self.commits += 1
+        self.conn.commit()
+
+
+class ControllerResolutionCacheTests(unittest.TestCase):
+    def setUp(self):
+        self.raw = sqlite3.connect(":memory:")
+        ensure_controller_schema(self.raw)
+        seed_default_controller_configs(self.raw)
+        self.conn = _CountingConn(self.raw)
+        self.cache = ControllerResolutionCache(ttl_seconds=0)
+
+    def tearDown(self):
+        self.raw.close()
+
+    def test_unchanged_profile_does_not_commit(self):
+        pid = get_or_create_context_profile_sync(self.conn, _payload())
+        commits = self.conn.commits
+        self.assertEqual(get_or_create_context_profile_sync(self.conn, _payload()), pid)
+        self.assertEqual(self.conn.commits, commits)
+        self.assertEqual(get_or_create_context_profile_sync(self.conn, _payload(["chat", "recall"])), pid)
+        self.assertEqual(self.conn.commits, commits + 1)
+
+    def test_profile_hit_issues_no_queries_and_caps_change_misses(self):
+        pid = resolve_context_profile_cached_sync(self.conn, _payload(), resolution_cache=self.cache)
+        before = self.conn.statements
+        self.assertEqual(resolve_context_profile_cached_sync(self.conn, _payload(), resolution_cache=self.cache), pid)
+        self.assertEqual(self.conn.statements, before)
+        resolve_context_profile_cached_sync(self.conn, _payload(["chat", "recall"]), resolution_cache=self.cache)
+        stats = self.cache.stats()
+        self.assertEqual((stats["profile_hits"], stats["profile_misses"]), (1, 2))
+
+    def test_config_is_memoized_until_invalidated(self):
+        kwargs = {"caller_type": "member", "context_profile_id": 1, "user_id": 42, "person_id": 7}
+        cfg = select_active_controller_config_cached_sync(self.conn, resolution_cache=self.cache, **kwargs)
+        self.assertEqual(cfg["scope"], "caller_type:member")
+        before = self.conn.statements
+        again = select_active_controller_config_cached_sync(self.conn, resolution_cache=self.cache, **kwargs)
+        self.assertEqual(again, cfg)
+        self.assertEqual(self.conn.statements, before)
+
+        # Callers mutating the result must not poison the cache.
+        again["memory_budget"]["hot"] = 99
+        self.assertNotEqual(self.cache.config_for(**kwargs)["memory_budget"]["hot"], 99)
+
+        self.raw.execute(
+            """
+            INSERT INTO controller_configs (scope, persona, depth, strictness, intervention_level,
+                memory_budget_json, tool_budget_json, lifecycle, created_at_utc, updated_at_utc)
+            VALUES ('user_id:42', 'coach', 0.5, 0.5, 0.5, '{}', '[]', 'active', 't', 't')
+            """
+        )
+        self.raw.commit()
+        self.assertEqual(
+            select_active_controller_config_cached_sync(self.conn, resolution_cache=self.cache, **kwargs)["scope"],
+            "caller_type:member",
+        )
+        self.cache.invalidate_controller_configs()
+        self.assertEqual(
+            select_active_controller_config_cached_sync(self.conn, resolution_cache=self.cache, **kwargs)["scope"],
+            "user_id:42",
+        )
+
+    def test_lock_free_probe_then_locked_load(self):
+        # The mention path: probe without a connection, load under the DB lock on a miss.
+        scope = {"caller_type": "member", "user_id": 42, "person_id": 7}
+        self.assertIsNone(resolve_context_profile_cached_sync(None, _payload(), resolution_cache=self.cache))
+        pid = resolve_context_profile_cached_sync(self.conn, _payload(), resolution_cache=self.cache)
+        self.assertIsNone(
+            select_active_controller_config_cached_sync(
+                None, context_profile_id=pid, resolution_cache=self.cache, **scope
+            )
+        )
+        cfg = select_active_controller_config_cached_sync(
+            self.conn, context_profile_id=pid, resolution_cache=self.cache, **scope
+        )
+
+        before = self.conn.statements
+        self.assertEqual(resolve_context_profile_cached_sync(None, _payload(), resolution_cache=self.cache), pid)
+        self.assertEqual(
+            select_active_controller_config_cached_sync(
+                None, context_profile_id=pid, resolution_cache=self.cache, **scope
+            ),
+            cfg,
+        )
+        self.assertEqual(self.conn.statements, before)
+        stats = self.cache.stats()
+        self.assertEqual(
+            (stats["profile_hits"], stats["profile_misses"], stats["config_hits"], stats["config_misses"]),
+            (1, 1, 1, 1),
+        )
+
+
+if __name__ == "__main__":
+    unittest.main()
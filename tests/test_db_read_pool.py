@@ -0,0 +1,78 @@
+from __future__ import annotations
+
+import asyncio
+import os
+import sqlite3
+import tempfile
+import unittest
+
+from db.handles import DbHandles
+from db.read_pool import ReadConnectionPool
+
+
+def _count_rows_sync(conn: sqlite3.Connection) -> int:
+    cur = conn.cursor()
+    cur.execute("SELECT COUNT(*) FROM items")
+    return int(cur.fetchone()[0])
+
+
+def _insert_row_sync(conn: sqlite3.Connection, value: str) -> None:
+    conn.execute("INSERT INTO items (value) VALUES (?)", (value,))
+    conn.commit()
+
+
+class ReadConnectionPoolTests(unittest.IsolatedAsyncioTestCase):
+    async def asyncSetUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.db_path = os.path.join(self.tmpdir.name, "pool.db")
+        self.conn = sqlite3.connect(self.db_path, check_same_thread=False)
+        self.conn.execute("PRAGMA journal_mode=WAL;")
+        self.conn.execute("CREATE TABLE items (id INTEGER PRIMARY KEY, value TEXT)")
+        self.conn.commit()
+        self.db_lock = asyncio.Lock()
+        self.pool = ReadConnectionPool(self.db_path, size=2)
+        self.handles = DbHandles(db_lock=self.db_lock, db_conn=self.conn, read_pool=self.pool)
+
+    async def asyncTearDown(self):
+        self.pool.close()
+        self.conn.close()
+        self.tmpdir.cleanup()
+
+    async def test_reads_see_committed_writes(self):
+        await self.handles.write(_insert_row_sync, "a")
+        await self.handles.write(_insert_row_sync, "b")
+        self.assertEqual(await self.handles.read(_count_rows_sync), 2)
+        self.assertEqual(self.pool.stats()["reads_total"], 1)
+
+    async def test_pool_connections_are_read_only(self):
+        with self.assertRaises(sqlite3.OperationalError):
+            await self.pool.run(_insert_row_sync, "nope")
+
+    async def test_reads_do_not_wait_for_write_lock(self):
+        await self.handles.write(_insert_row_sync, "a")
+        async with self.db_lock:
+            count = await asyncio.wait_for(self.handles.read(_count_rows_sync), timeout=2)
+        self.assertEqual(count, 1)
+
+    async def test_concurrent_reads_use_multiple_connections(self):
+        results = await asyncio.gather(*(self.handles.read(_count_rows_sync) for _ in range(6)))
+        self.assertEqual(results, [0] * 6)
+        self.assertEqual(self.pool.stats()["reads_total"], 6)
+        self.assertLessEqual(self.pool.stats()["max_in_use"], 2)
+
+
+class DbHandlesFallbackTests(unittest.IsolatedAsyncioTestCase):
+    async def test_read_falls_back_to_write_connection_without_pool(self):
+        conn = sqlite3.connect(":memory:", check_same_thread=False)
+        conn.execute("CREATE TABLE items (id INTEGER PRIMARY KEY, value TEXT)")
+        handles = DbHandles(db_lock=asyncio.Lock(), db_conn=conn)
+        await handles.handle("write")(_insert_row_sync, "a")
+        self.assertFalse(handles.has_read_pool)
+        self.assertEqual(await handles.handle("read")(_count_rows_sync), 1)
+        with self.assertRaises(ValueError):
+            handles.handle("bogus")
+        conn.close()
+
+
+if __name__ == "__main__":
+    unittest.main()
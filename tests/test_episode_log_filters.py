@@ -2,6 +2,8 @@ from __future__ import annotations
 
 import unittest
 
+from controller.episode_log_filters import episode_sample_rate
+from controller.episode_log_filters import parse_episode_sample_rates
 from controller.episode_log_filters import should_log_episode
 
 
@@ -35,6 +37,15 @@ class EpisodeLogFilterTests(unittest.TestCase):
         ctx = {"caller_type": "external", "channel_policy_group": "public", "surface": "public_channel"}
         self.assertTrue(should_log_episode({"all"}, ctx))
 
+    def test_sample_rates_parse_and_lowest_match_wins(self):
+        rates = parse_episode_sample_rates("context:public=0.5, surface:public_channel=0.1,bad,caller:coach=2")
+        self.assertEqual(rates, {"context:public": 0.5, "surface:public_channel": 0.1, "caller:coach": 1.0})
+        public = {"caller_type": "member", "channel_policy_group": "public", "surface": "public_channel"}
+        staff = {"caller_type": "coach", "channel_policy_group": "staff", "surface": "coach_channel"}
+        self.assertEqual(episode_sample_rate(rates, public), 0.1)
+        self.assertEqual(episode_sample_rate(rates, staff), 1.0)
+        self.assertEqual(episode_sample_rate({}, public), 1.0)
+
 
 if __name__ == "__main__":
     unittest.main()
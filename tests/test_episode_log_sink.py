@@ -0,0 +1,115 @@
+from __future__ import annotations
+
+import asyncio
+import sqlite3
+import unittest
+
+from controller.episode_sink import EpisodeLogSink
+from controller.store import ensure_controller_schema
+from controller.store import insert_episode_logs_batch_sync
+from db.handles import DbHandles
+
+_PUBLIC = {"caller_type": "member", "channel_policy_group": "public", "surface": "public_channel"}
+_DM = {"caller_type": "founder", "channel_policy_group": "dm", "surface": "dm"}
+
+
+def _payload(message_id: int) -> dict:
+    return {
+        "timestamp_utc": "2026-10-17T00:00:00+00:00",
+        "user_id": 42,
+        "input_excerpt": f"prompt {message_id}",
+        "assistant_output_excerpt": "reply",
+        "tags": ["surface:public_channel"],
+        "implicit_signals": {"ctx_rows": 3},
+        "message_id": message_id,
+    }
+
+
+class EpisodeLogSinkTests(unittest.IsolatedAsyncioTestCase):
+    async def asyncSetUp(self):
+        self.conn = sqlite3.connect(":memory:", check_same_thread=False)
+        ensure_controller_schema(self.conn)
+        self.handles = DbHandles(db_lock=asyncio.Lock(), db_conn=self.conn)
+
+    async def asyncTearDown(self):
+        self.conn.close()
+
+    def _count(self) -> int:
+        return int(self.conn.execute("SELECT COUNT(*) FROM episode_logs").fetchone()[0])
+
+    async def test_rows_are_buffered_then_flushed_in_one_batch(self):
+        calls: list[int] = []
+
+        def _insert(conn, payloads):
+            calls.append(len(payloads))
+            return insert_episode_logs_batch_sync(conn, payloads)
+
+        sink = EpisodeLogSink(db_handles=self.handles, insert_episode_logs_batch_sync=_insert, flush_interval_seconds=60)
+        for i in range(3):
+            self.assertTrue(await sink.submit(_payload(i), _DM))
+        self.assertEqual(self._count(), 0)
+        await sink.close()
+        self.assertEqual(self._count(), 3)
+        self.assertEqual(calls, [3])
+        created = self.conn.execute("SELECT created_at_utc FROM episode_logs LIMIT 1").fetchone()[0]
+        self.assertTrue(created)
+
+    async def test_sampling_applies_per_context_class(self):
+        sink = EpisodeLogSink(
+            db_handles=self.handles,
+            insert_episode_logs_batch_sync=insert_episode_logs_batch_sync,
+            sample_rates={"context:public": 0.0},
+        )
+        self.assertFalse(await sink.submit(_payload(1), _PUBLIC))
+        self.assertTrue(await sink.submit(_payload(2), _DM))
+        await sink.close()
+        st = sink.stats()
+        self.assertEqual((st["submitted"], st["sampled_out"], st["written_rows"]), (2, 1, 1))
+
+    async def test_dm_drafts_are_never_sampled_out(self):
+        sink = EpisodeLogSink(
+            db_handles=self.handles,
+            insert_episode_logs_batch_sync=insert_episode_logs_batch_sync,
+            sample_rates={"all": 0.0},
+        )
+        draft = _payload(1)
+        draft["tags"] = ["mode:dm_draft", "surface:dm"]
+        self.assertTrue(await sink.submit(draft, _DM))
+        self.assertFalse(await sink.submit(_payload(2), _DM))
+        await sink.close()
+        self.assertEqual(self._count(), 1)
+        self.assertEqual(sink.stats()["sampled_out"], 1)
+
+    async def test_bad_row_is_isolated_and_counted(self):
+        def _insert(conn, payloads):
+            if any(p.get("message_id") == 2 for p in payloads):
+                raise sqlite3.IntegrityError("bad row")
+            return insert_episode_logs_batch_sync(conn, payloads)
+
+        sink = EpisodeLogSink(db_handles=self.handles, insert_episode_logs_batch_sync=_insert, flush_interval_seconds=60)
+        for i in range(1, 4):
+            await sink.submit(_payload(i), _DM)
+        await sink.close()
+        self.assertEqual(self._count(), 2)
+        st = sink.stats()
+        self.assertEqual((st["failed_flushes"], st["failed_rows"]), (1, 1))
+
+    async def test_full_buffer_drops_oldest(self):
+        sink = EpisodeLogSink(
+            db_handles=self.handles,
+            insert_episode_logs_batch_sync=insert_episode_logs_batch_sync,
+            max_batch=2,
+            max_pending=2,
+            flush_interval_seconds=60,
+        )
+        sink._ensure_started = lambda: None  # keep the flusher from draining mid-test
+        for i in range(4):
+            await sink.submit(_payload(i), _DM)
+        self.assertEqual(sink.stats()["dropped_rows"], 2)
+        self.assertEqual(sink.drain_sync(self.conn), 2)
+        ids = [r[0] for r in self.conn.execute("SELECT message_id FROM episode_logs ORDER BY message_id")]
+        self.assertEqual(ids, [2, 3])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,129 @@
+from __future__ import annotations
+
+import json
+import os
+import sqlite3
+import tempfile
+import time
+import unittest
+from importlib import import_module
+from pathlib import Path
+from shutil import copy2
+
+from db.migrate import apply_sqlite_migrations
+from memory.lifecycle_service import approve_memory_sync
+from memory.store import insert_memory_event_sync
+from memory.store import maintain_memory_fts_sync
+from memory.store import upsert_summary_sync
+
+
+def _safe_json_loads(raw: str):
+    try:
+        return json.loads(raw or "[]")
+    except Exception:
+        return []
+
+
+def _event(text: str, tags: list[str], *, topic_id: str | None = None, lifecycle: str = "active") -> dict:
+    return {
+        "created_at_utc": "2026-10-17T00:00:00+00:00",
+        "created_ts": int(time.time()),
+        "text": text,
+        "tags_json": json.dumps(tags),
+        "importance": 0.5,
+        "lifecycle": lifecycle,
+        "topic_id": topic_id,
+    }
+
+
+class ExternalContentFtsTests(unittest.TestCase):
+    def setUp(self):
+        self.conn = sqlite3.connect(":memory:", check_same_thread=False)
+        apply_sqlite_migrations(self.conn, os.path.join(os.getcwd(), "migrations"))
+
+    def tearDown(self):
+        self.conn.close()
+
+    def _match(self, table: str, query: str) -> list[int]:
+        cur = self.conn.execute(f"SELECT rowid FROM {table} WHERE {table} MATCH ? ORDER BY rowid", (query,))
+        return [int(r[0]) for r in cur.fetchall()]
+
+    def _assert_consistent(self) -> None:
+        results = maintain_memory_fts_sync(self.conn, "check")
+        self.assertTrue(all(r["ok"] for r in results), results)
+
+    def test_triggers_index_insert_update_and_delete(self):
+        mid = insert_memory_event_sync(
+            self.conn, _event("roster freeze", ["Ops"], topic_id="racing"), safe_json_loads=_safe_json_loads
+        )
+        self.assertEqual(self._match("memory_events_fts", "tags:ops"), [mid])
+        self.assertEqual(self._match("memory_events_fts", "tags:racing"), [mid])
+
+        # Tier/lifecycle sweeps touch columns outside the index and must not matter.
+        self.conn.execute("UPDATE memory_events SET tier = 3, lifecycle = 'archived' WHERE id = ?", (mid,))
+        self.conn.execute("UPDATE memory_events SET lifecycle = 'candidate' WHERE id = ?", (mid,))
+        self.conn.commit()
+        approve_memory_sync(
+            self.conn,
+            memory_id=mid,
+            actor_person_id=1,
+            tags=["decision"],
+            topic_id="governance",
+            utc_now_iso=lambda: "2026-10-17T00:00:00+00:00",
+            normalize_tags=lambda tags: [str(t).strip().lower() for t in tags if str(t).strip()],
+            safe_json_loads=_safe_json_loads,
+            safe_json_dumps=json.dumps,
+        )
+        self.assertEqual(self._match("memory_events_fts", "tags:ops"), [])
+        self.assertEqual(self._match("memory_events_fts", "tags:governance"), [mid])
+        self._assert_consistent()
+
+        self.conn.execute("DELETE FROM memory_events WHERE id = ?", (mid,))
+        self.assertEqual(self._match("memory_events_fts", "roster"), [])
+        self._assert_consistent()
+
+    def test_summary_upsert_reindexes_in_place(self):
+        payload = {
+            "topic_id": "ops",
+            "summary_type": "topic_gist",
+            "scope": "global",
+            "created_at_utc": "2026-10-17T00:00:00+00:00",
+            "updated_at_utc": "2026-10-17T00:00:00+00:00",
+            "tags_json": "[]",
+            "summary_text": "first draft wording",
+        }
+        sid = upsert_summary_sync(self.conn, payload, safe_json_loads=_safe_json_loads)
+        self.assertEqual(upsert_summary_sync(self.conn, {**payload, "summary_text": "final wording"},
+                                             safe_json_loads=_safe_json_loads), sid)
+        self.assertEqual(self._match("memory_summaries_fts", "draft"), [])
+        self.assertEqual(self._match("memory_summaries_fts", "final"), [sid])
+        self._assert_consistent()
+
+    def test_maintenance_actions(self):
+        insert_memory_event_sync(self.conn, _event("pit stop notes", []), safe_json_loads=_safe_json_loads)
+        for action in ("optimize", "rebuild", "check"):
+            results = maintain_memory_fts_sync(self.conn, action)
+            self.assertEqual([r["table"] for r in results], ["memory_events_fts", "memory_summaries_fts"])
+            self.assertEqual(results[0]["docs"], 1)
+        with self.assertRaises(ValueError):
+            maintain_memory_fts_sync(self.conn, "vacuum")
+
+    def test_migration_indexes_existing_rows(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            for src in sorted((Path(__file__).resolve().parents[1] / "migrations").iterdir()):
+                if src.is_file() and not src.name.startswith("0022_"):
+                    copy2(src, Path(tmp) / src.name)
+            conn = sqlite3.connect(":memory:")
+            apply_sqlite_migrations(conn, tmp)
+            conn.execute(
+                "INSERT INTO memory_events (id, created_at_utc, created_ts, text, tags_json, topic_id) "
+                "VALUES (7, 't', 1, 'legacy row', '[\"subject:person:9\"]', 'ops')"
+            )
+            import_module("migrations.0022_external_content_fts").upgrade(conn)
+            cur = conn.execute("SELECT rowid FROM memory_events_fts WHERE memory_events_fts MATCH 'tags:person AND ops'")
+            self.assertEqual(cur.fetchall(), [(7,)])
+            conn.close()
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -6,6 +6,7 @@ import unittest
 
 from db.migrate import apply_sqlite_migrations
 from memory.store import search_memory_events_sync
+from retrieval.fts_query import FtsTermStats
 from retrieval.fts_query import build_fts_query
 
 
@@ -34,10 +35,6 @@ class FtsQueryTests(unittest.TestCase):
             """
         )
         event_id = int(cur.lastrowid)
-        cur.execute(
-            "INSERT INTO memory_events_fts(rowid, text, tags) VALUES (?, ?, '')",
-            (event_id, "tight follow up draft"),
-        )
         conn.commit()
 
         events = search_memory_events_sync(
@@ -53,6 +50,69 @@ class FtsQueryTests(unittest.TestCase):
         self.assertIsInstance(events, list)
         conn.close()
 
+    def test_stopwords_phrases_and_prefixes(self):
+        self.assertEqual(
+            build_fts_query("what did we decide about the the race schedule"),
+            "decide OR race OR schedule",
+        )
+        self.assertEqual(build_fts_query('the "race schedule" sched*'), '"race schedule" OR sched*')
+        # All-stopword prompts keep their words rather than matching nothing.
+        self.assertEqual(build_fts_query("what about this"), "what OR about OR this")
+
+    def test_term_stats_pick_discriminative_terms_under_budget(self):
+        conn = sqlite3.connect(":memory:", check_same_thread=False)
+        apply_sqlite_migrations(conn, os.path.join(os.getcwd(), "migrations"))
+        for i in range(60):
+            text = f"race weekend note {i}" + (" stewards" if i < 3 else "") + (" tyres" if i < 30 else "")
+            conn.execute(
+                "INSERT INTO memory_events (created_at_utc, created_ts, text, tags_json) VALUES ('t', 0, ?, '[]')",
+                (text,),
+            )
+        conn.commit()
+        stats = FtsTermStats(
+            vocab_table="memory_events_fts_vocab", fts_table="memory_events_fts", ttl_seconds=0, candidate_budget=20
+        )
+
+        # "race" is in every doc, "penalty" in none; "tyres" would blow the budget.
+        self.assertEqual(stats.build_query(conn, "race stewards tyres penalty"), "stewards")
+        self.assertEqual(stats.build_query(conn, "race"), "race")
+        self.assertEqual(stats.build_query(conn, "steward*"), "steward*")
+
+        conn.execute(
+            "INSERT INTO memory_events (created_at_utc, created_ts, text, tags_json) VALUES ('t', 0, 'penalty', '[]')"
+        )
+        self.assertEqual(stats.build_query(conn, "race stewards penalty"), "penalty OR stewards")
+        self.assertGreater(stats.stats()["hits"], 0)
+        conn.close()
+
+    def test_term_stats_keep_underscored_identifiers(self):
+        conn = sqlite3.connect(":memory:", check_same_thread=False)
+        apply_sqlite_migrations(conn, os.path.join(os.getcwd(), "migrations"))
+        for text in ("restart the job_pool workers", "pool table booking", "weekly job board"):
+            conn.execute(
+                "INSERT INTO memory_events (created_at_utc, created_ts, text, tags_json) VALUES ('t', 0, ?, '[]')",
+                (text,),
+            )
+        conn.commit()
+        stats = FtsTermStats(vocab_table="memory_events_fts_vocab", fts_table="memory_events_fts", ttl_seconds=0)
+
+        # unicode61 indexes `job_pool` as `job` + `pool`; the vocab has no `job_pool` row.
+        self.assertEqual(stats.build_query(conn, "job_pool stuck"), "job_pool")
+        self.assertEqual(stats.build_query(conn, "job_po*"), "job_po*")
+        self.assertEqual(stats.build_query(conn, "job_queue"), "")
+        rows = search_memory_events_sync(
+            conn,
+            "job_pool",
+            "auto",
+            limit=5,
+            build_fts_query=stats.query_builder(conn),
+            parse_recall_scope=_parse_recall_scope,
+            stage_at_least=_stage_at_least,
+            safe_json_loads=lambda _s: [],
+        )
+        self.assertEqual([r["text"] for r in rows], ["restart the job_pool workers"])
+        conn.close()
+
 
 if __name__ == "__main__":
     unittest.main()
@@ -0,0 +1,158 @@
+from __future__ import annotations
+
+import asyncio
+import json
+import os
+import sqlite3
+import time
+import unittest
+
+from db.migrate import apply_sqlite_migrations
+from eval.memory_recall_baseline import _parse_recall_scope
+from memory.store import insert_memory_event_sync
+from memory.store import load_recent_memory_events_sync
+from memory.store import memory_write_generation
+from memory.store import search_memory_events_sync
+from retrieval.fts_query import build_fts_query
+from retrieval.hot_index import HotMemoryIndex
+from retrieval.service import recall_memory
+
+
+def _safe_json_loads(raw: str | None):
+    return json.loads(raw or "[]")
+
+
+def _stage_at_least(_stage: str) -> bool:
+    return True
+
+
+def _payload(text: str, *, age_seconds: int = 3600, channel_id: int = 100, tags: list[str] | None = None) -> dict:
+    return {
+        "created_at_utc": "2026-10-17T00:00:00+00:00",
+        "created_ts": int(time.time()) - age_seconds,
+        "scope": f"channel:{channel_id}",
+        "guild_id": 1,
+        "channel_id": channel_id,
+        "text": text,
+        "tags_json": json.dumps(tags or []),
+        "importance": 0.5,
+    }
+
+
+class HotMemoryIndexTests(unittest.TestCase):
+    def setUp(self):
+        self.conn = sqlite3.connect(":memory:", check_same_thread=False)
+        apply_sqlite_migrations(self.conn, os.path.join(os.getcwd(), "migrations"))
+        self.index = HotMemoryIndex(
+            load_recent_events=lambda conn, min_ts: load_recent_memory_events_sync(
+                conn, min_created_ts=min_ts, safe_json_loads=_safe_json_loads
+            ),
+            parse_recall_scope=_parse_recall_scope,
+        )
+        self.db_searches = 0
+
+    def tearDown(self):
+        self.conn.close()
+
+    def _insert(self, text: str, **kwargs) -> int:
+        generation = memory_write_generation()
+        payload = _payload(text, **kwargs)
+        mid = insert_memory_event_sync(self.conn, payload, safe_json_loads=_safe_json_loads)
+        self.index.add(
+            {**payload, "id": mid, "tags": _safe_json_loads(payload["tags_json"])}, since_generation=generation
+        )
+        return mid
+
+    def _search_db(self, conn, query, scope, limit, **kwargs):
+        self.db_searches += 1
+        return search_memory_events_sync(
+            conn,
+            query,
+            scope,
+            limit,
+            build_fts_query=build_fts_query,
+            parse_recall_scope=_parse_recall_scope,
+            stage_at_least=_stage_at_least,
+            safe_json_loads=_safe_json_loads,
+            **kwargs,
+        )
+
+    def _recall(self, prompt: str, scope: str, build_index_query=None) -> list[int]:
+        events, _ = asyncio.run(
+            recall_memory(
+                prompt,
+                scope,
+                {"hot": 10, "warm": 10, "cold": 10, "summaries": 0},
+                stage_at_least=_stage_at_least,
+                db_lock=asyncio.Lock(),
+                db_conn=self.conn,
+                search_memory_events_sync=self._search_db,
+                search_memory_summaries_sync=lambda *_args, **_kwargs: [],
+                hot_index=self.index,
+                build_index_query=build_index_query,
+            )
+        )
+        return [e["id"] for e in events]
+
+    def test_hot_scope_is_answered_in_process_with_db_ordering(self):
+        self.index.rebuild(self.conn)
+        strong = self._insert("pit stop window pit stop plan", tags=["strategy"])
+        weak = self._insert("pit lane speed limit")
+        self._insert("pit stop window in another channel", channel_id=200)
+        self._insert("unrelated grid walk notes")
+        self.assertTrue(self.index.is_current())
+
+        ids = self._recall("pit stop", "hot channel:100")
+
+        self.assertEqual(self.db_searches, 0)
+        self.assertEqual(ids, [strong, weak])
+        db_ids = [e["id"] for e in self._search_db(self.conn, "pit stop", "hot channel:100", 20)]
+        self.assertEqual(ids, db_ids)
+
+    def test_lifecycle_change_forces_rebuild(self):
+        self.index.rebuild(self.conn)
+        mid = self._insert("safety car restart procedure")
+        self.conn.execute("UPDATE memory_events SET lifecycle = 'deprecated' WHERE id = ?", (mid,))
+        self.conn.commit()
+        self.index.invalidate()
+
+        self.assertEqual(self._recall("safety car", "hot"), [])
+        self.assertEqual(self.index.stats()["rebuilds"], 2)
+        self.assertEqual(self.index.stats()["rows"], 0)
+
+    def test_auto_scope_merges_index_window_with_older_db_rows(self):
+        recent = self._insert("tyre allocation for the sprint")
+        older = self._insert("tyre allocation rules from last season", age_seconds=30 * 86400)
+
+        self.assertEqual(sorted(self._recall("tyre allocation", "auto")), sorted([recent, older]))
+        self.assertEqual(self.db_searches, 1)
+        stats = self.index.stats()
+        self.assertEqual(stats["rows"], 1)
+        self.assertGreater(stats["approx_bytes"], 0)
+
+    def test_partial_coverage_fuses_by_rank_not_raw_score(self):
+        recent_strong = self._insert("tyre allocation tyre allocation sprint")
+        recent_weak = self._insert("tyre blankets")
+        older_strong = self._insert("tyre allocation tyre allocation rules", age_seconds=30 * 86400)
+        older_weak = self._insert("tyre pressures", age_seconds=30 * 86400)
+
+        # Window-local and corpus bm25 differ in scale; RRF interleaves the two lists.
+        ids = self._recall("tyre allocation", "auto")
+        self.assertEqual(ids, [recent_strong, older_strong, recent_weak, older_weak])
+
+    def test_index_searches_the_selected_terms(self):
+        self.index.rebuild(self.conn)
+        stop = self._insert("pit stop rehearsal")
+        self._insert("pit lane walk")
+        built = []
+
+        def _select(conn, prompt):
+            built.append(prompt)
+            return "stop"
+
+        self.assertEqual(self._recall("pit stop", "hot channel:100", build_index_query=_select), [stop])
+        self.assertEqual((built, self.db_searches), (["pit stop"], 0))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,60 @@
+from __future__ import annotations
+
+import sqlite3
+import time
+import unittest
+
+from controller.identity_store import IdentityCache
+from controller.identity_store import get_or_create_person_sync
+from controller.store import ensure_controller_schema
+
+
+class IdentityCacheTests(unittest.TestCase):
+    def setUp(self):
+        self.conn = sqlite3.connect(":memory:", check_same_thread=False)
+        ensure_controller_schema(self.conn)
+        self.cache = IdentityCache(seen_flush_interval_seconds=0)
+
+    def tearDown(self):
+        self.conn.close()
+
+    def _person(self, external_id: str) -> int:
+        return get_or_create_person_sync(
+            self.conn,
+            platform="discord",
+            external_id=external_id,
+            origin="discord:test",
+            label="discord_user_id",
+        )
+
+    def test_hit_after_put_and_key_is_normalized(self):
+        self.assertIsNone(self.cache.get("discord", "42"))
+        self.cache.put("Discord", " 42 ", 7)
+        self.assertEqual(self.cache.get("discord", "42"), 7)
+        stats = self.cache.stats()
+        self.assertEqual((stats["hits"], stats["misses"]), (1, 1))
+
+    def test_ttl_expiry(self):
+        cache = IdentityCache(ttl_seconds=0.0001)
+        cache.put("discord", "42", 7)
+        time.sleep(0.01)
+        self.assertIsNone(cache.get("discord", "42"))
+
+    def test_seen_touches_coalesce_into_one_flush(self):
+        pid = self._person("42")
+        for ts in ("2026-10-17T00:00:01+00:00", "2026-10-17T00:00:02+00:00", "2026-10-17T00:00:03+00:00"):
+            self.cache.note_seen("discord", "42", pid, ts)
+        self.assertTrue(self.cache.seen_flush_due())
+        self.assertEqual(self.cache.flush_seen_sync(self.conn), 1)
+        self.assertFalse(self.cache.seen_flush_due())
+
+        cur = self.conn.cursor()
+        cur.execute("SELECT last_seen_at FROM person_identifiers WHERE external_id='42'")
+        self.assertEqual(cur.fetchone()[0], "2026-10-17T00:00:03+00:00")
+        cur.execute("SELECT last_seen_at_utc FROM user_profiles WHERE person_id=?", (pid,))
+        self.assertEqual(cur.fetchone()[0], "2026-10-17T00:00:03+00:00")
+        self.assertEqual(self.cache.stats()["seen_flushes"], 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
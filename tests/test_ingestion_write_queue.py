@@ -0,0 +1,154 @@
+from __future__ import annotations
+
+import asyncio
+import os
+import sqlite3
+import unittest
+
+from db.handles import DbHandles
+from db.migrate import apply_sqlite_migrations
+from ingestion.store import insert_messages_batch_sync
+from ingestion.write_queue import MessageWriteQueue
+
+
+def _payload(message_id: int, content: str = "hello") -> dict:
+    return {
+        "message_id": message_id,
+        "guild_id": 1,
+        "guild_name": "g",
+        "channel_id": 10,
+        "channel_name": "ops",
+        "author_id": 99,
+        "author_name": "tester",
+        "created_at_utc": f"2026-02-15T10:00:{message_id % 60:02d}+00:00",
+        "content": content,
+        "attachments": "",
+    }
+
+
+def _count_messages(conn: sqlite3.Connection) -> int:
+    return int(conn.execute("SELECT COUNT(*) FROM messages").fetchone()[0])
+
+
+class MessageWriteQueueTests(unittest.IsolatedAsyncioTestCase):
+    async def asyncSetUp(self):
+        self.conn = sqlite3.connect(":memory:", check_same_thread=False)
+        apply_sqlite_migrations(self.conn, os.path.join(os.getcwd(), "migrations"))
+        self.handles = DbHandles(db_lock=asyncio.Lock(), db_conn=self.conn)
+        self.batches: list[int] = []
+
+        def _batch_sync(conn, payloads):
+            self.batches.append(len(payloads))
+            return insert_messages_batch_sync(conn, payloads)
+
+        self.batch_sync = _batch_sync
+
+    async def asyncTearDown(self):
+        self.conn.close()
+
+    async def test_size_threshold_triggers_single_batch(self):
+        queue = MessageWriteQueue(
+            db_handles=self.handles,
+            insert_messages_batch_sync=self.batch_sync,
+            max_batch=5,
+            flush_interval_seconds=60,
+        )
+        for i in range(5):
+            await queue.enqueue(_payload(i + 1))
+        for _ in range(50):
+            if self.batches:
+                break
+            await asyncio.sleep(0.01)
+        self.assertEqual(self.batches, [5])
+        self.assertEqual(_count_messages(self.conn), 5)
+        await queue.close()
+
+    async def test_time_threshold_flushes_partial_batch(self):
+        queue = MessageWriteQueue(
+            db_handles=self.handles,
+            insert_messages_batch_sync=self.batch_sync,
+            max_batch=100,
+            flush_interval_seconds=0.05,
+        )
+        await queue.enqueue(_payload(1))
+        await queue.enqueue(_payload(2))
+        self.assertEqual(_count_messages(self.conn), 0)
+        await asyncio.sleep(0.2)
+        self.assertEqual(_count_messages(self.conn), 2)
+        stats = queue.stats()
+        self.assertEqual(stats["depth"], 0)
+        self.assertEqual(stats["flushed_rows"], 2)
+        await queue.close()
+
+    async def test_backpressure_flushes_inline_when_buffer_full(self):
+        queue = MessageWriteQueue(
+            db_handles=self.handles,
+            insert_messages_batch_sync=self.batch_sync,
+            max_batch=3,
+            flush_interval_seconds=60,
+            max_pending=3,
+        )
+        # Hold the flusher off so only enqueue-side backpressure can drain.
+        queue._ensure_started = lambda: None
+        for i in range(7):
+            await queue.enqueue(_payload(i + 1))
+        self.assertLessEqual(queue.depth, 3)
+        self.assertGreaterEqual(queue.stats()["backpressure_waits"], 1)
+        await queue.close()
+        self.assertEqual(_count_messages(self.conn), 7)
+
+    async def test_close_flushes_and_duplicates_are_ignored(self):
+        queue = MessageWriteQueue(
+            db_handles=self.handles,
+            insert_messages_batch_sync=self.batch_sync,
+            max_batch=100,
+            flush_interval_seconds=60,
+        )
+        await queue.enqueue(_payload(1))
+        await queue.enqueue(_payload(1, content="dupe"))
+        await queue.close()
+        self.assertEqual(_count_messages(self.conn), 1)
+        # After close, late rows bypass the buffer.
+        await queue.enqueue(_payload(2))
+        self.assertEqual(_count_messages(self.conn), 2)
+
+    async def test_failed_flush_keeps_rows_for_retry(self):
+        calls = {"n": 0}
+
+        def _flaky(conn, payloads):
+            calls["n"] += 1
+            if calls["n"] == 1:
+                raise sqlite3.OperationalError("database is locked")
+            return insert_messages_batch_sync(conn, payloads)
+
+        queue = MessageWriteQueue(
+            db_handles=self.handles,
+            insert_messages_batch_sync=_flaky,
+            max_batch=100,
+            flush_interval_seconds=60,
+        )
+        await queue.enqueue(_payload(1))
+        self.assertEqual(await queue.flush(), 0)
+        self.assertEqual(queue.depth, 1)
+        self.assertEqual(await queue.flush(), 1)
+        self.assertEqual(queue.stats()["failed_flushes"], 1)
+        await queue.close()
+
+    async def test_failed_shutdown_drain_is_counted_not_raised(self):
+        def _broken(conn, payloads):
+            raise sqlite3.OperationalError("disk I/O error")
+
+        queue = MessageWriteQueue(
+            db_handles=self.handles,
+            insert_messages_batch_sync=_broken,
+            max_batch=100,
+            flush_interval_seconds=60,
+        )
+        await queue.enqueue(_payload(1))
+        await queue.enqueue(_payload(2))
+        self.assertEqual(queue.drain_sync(self.conn), 0)
+        self.assertEqual(queue.stats()["dropped_rows"], 2)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,182 @@
+from __future__ import annotations
+
+import asyncio
+import os
+import sqlite3
+import unittest
+from types import SimpleNamespace
+
+from db.handles import DbHandles
+from db.migrate import apply_sqlite_migrations
+from jobs.store import claim_job_sync
+from jobs.store import complete_job_sync
+from jobs.store import enqueue_job_sync
+from jobs.store import fail_job_sync
+from jobs.store import job_stats_sync
+from jobs.store import prune_jobs_sync
+from jobs.store import recover_running_jobs_sync
+from jobs.worker import JobWorkerPool
+from memory.store import upsert_summary_sync
+from misc.events_runtime import register_runtime_events
+from misc.runtime_deps import RuntimeBootDeps
+
+
+class JobStoreTests(unittest.TestCase):
+    def setUp(self):
+        self.conn = sqlite3.connect(":memory:", check_same_thread=False)
+        apply_sqlite_migrations(self.conn, os.path.join(os.getcwd(), "migrations"))
+
+    def tearDown(self):
+        self.conn.close()
+
+    def test_dedupe_key_collapses_active_jobs_only(self):
+        first, created = enqueue_job_sync(self.conn, job_type="summarize_topic", dedupe_key="t:a", now_ts=100)
+        self.assertTrue(created)
+        again, created = enqueue_job_sync(self.conn, job_type="summarize_topic", dedupe_key="t:a", now_ts=101)
+        self.assertEqual((again, created), (first, False))
+
+        job = claim_job_sync(self.conn, worker_id="w1", lease_seconds=60, now_ts=102)
+        self.assertEqual(job["id"], first)
+        self.assertTrue(complete_job_sync(self.conn, first, worker_id="w1", result_text="ok", now_ts=110))
+
+        fresh, created = enqueue_job_sync(self.conn, job_type="summarize_topic", dedupe_key="t:a", now_ts=120)
+        self.assertTrue(created)
+        self.assertNotEqual(fresh, first)
+
+    def test_expired_lease_is_reclaimed_and_stale_worker_loses_it(self):
+        job_id, _ = enqueue_job_sync(self.conn, job_type="mine", payload={"x": 1}, now_ts=100)
+        job = claim_job_sync(self.conn, worker_id="w1", lease_seconds=30, now_ts=100)
+        self.assertEqual(job["payload"], {"x": 1})
+        self.assertIsNone(claim_job_sync(self.conn, worker_id="w2", lease_seconds=30, now_ts=120))
+
+        job = claim_job_sync(self.conn, worker_id="w2", lease_seconds=30, now_ts=131)
+        self.assertEqual((job["id"], job["attempts"]), (job_id, 2))
+        self.assertFalse(complete_job_sync(self.conn, job_id, worker_id="w1", now_ts=132))
+        self.assertTrue(complete_job_sync(self.conn, job_id, worker_id="w2", now_ts=133))
+
+    def test_failures_back_off_then_fail_for_good(self):
+        job_id, _ = enqueue_job_sync(self.conn, job_type="cleanup", max_attempts=2, now_ts=100)
+        claim_job_sync(self.conn, worker_id="w", lease_seconds=60, now_ts=100)
+        status = fail_job_sync(self.conn, job_id, worker_id="w", error="boom", backoff_base_seconds=30, now_ts=105)
+        self.assertEqual(status, "queued")
+        self.assertIsNone(claim_job_sync(self.conn, worker_id="w", lease_seconds=60, now_ts=134))
+
+        job = claim_job_sync(self.conn, worker_id="w", lease_seconds=60, now_ts=135)
+        self.assertEqual(job["attempts"], 2)
+        status = fail_job_sync(self.conn, job_id, worker_id="w", error="boom again", now_ts=140)
+        self.assertEqual(status, "failed")
+
+        stats = job_stats_sync(self.conn, since_ts=0, now_ts=150)
+        self.assertEqual(len(stats), 1)
+        self.assertEqual(stats[0]["job_type"], "cleanup")
+        self.assertEqual((stats[0]["failed"], stats[0]["retried"]), (1, 1))
+        self.assertEqual(stats[0]["last_error"], "boom again")
+        self.assertEqual(prune_jobs_sync(self.conn, older_than_ts=141), 1)
+
+    def test_recover_requeues_orphaned_running_jobs(self):
+        enqueue_job_sync(self.conn, job_type="mine", now_ts=100)
+        claim_job_sync(self.conn, worker_id="old-process", lease_seconds=600, now_ts=100)
+        self.assertEqual(recover_running_jobs_sync(self.conn), 1)
+        job = claim_job_sync(self.conn, worker_id="new-process", lease_seconds=600, now_ts=101)
+        self.assertEqual(job["attempts"], 2)
+
+    def test_summary_records_job_id(self):
+        upsert_summary_sync(
+            self.conn,
+            {
+                "topic_id": "ops",
+                "summary_type": "topic_gist",
+                "scope": "auto",
+                "created_at_utc": "2026-10-17T00:00:00+00:00",
+                "updated_at_utc": "2026-10-17T00:00:00+00:00",
+                "start_ts": 1,
+                "end_ts": 2,
+                "tags_json": "[]",
+                "importance": 1,
+                "summary_text": "gist",
+                "job_id": "42",
+            },
+            safe_json_loads=lambda raw: [],
+        )
+        row = self.conn.execute("SELECT job_id FROM memory_summaries WHERE topic_id = 'ops'").fetchone()
+        self.assertEqual(str(row[0]), "42")
+
+
+class JobWorkerPoolTests(unittest.TestCase):
+    def test_pool_runs_handlers_and_retries_failures(self):
+        conn = sqlite3.connect(":memory:", check_same_thread=False)
+        apply_sqlite_migrations(conn, os.path.join(os.getcwd(), "migrations"))
+        calls: dict[str, int] = {"ok": 0, "flaky": 0}
+
+        async def ok(payload, job):
+            calls["ok"] += 1
+            return f"done {payload['n']}"
+
+        async def flaky(payload, job):
+            calls["flaky"] += 1
+            if job["attempts"] < 2:
+                raise RuntimeError("llm timeout")
+            return "recovered"
+
+        async def scenario():
+            pool = JobWorkerPool(
+                db_handles=DbHandles(db_lock=asyncio.Lock(), db_conn=conn),
+                workers=2,
+                poll_seconds=0.05,
+                backoff_base_seconds=0,
+            )
+            pool.register("ok", ok)
+            pool.register("flaky", flaky)
+            await pool.start()
+            await pool.enqueue("ok", {"n": 1})
+            await pool.enqueue("flaky", {})
+            for _ in range(100):
+                done = conn.execute("SELECT COUNT(*) FROM jobs WHERE status = 'done'").fetchone()[0]
+                if done == 2:
+                    break
+                await asyncio.sleep(0.02)
+            await pool.stop()
+
+        asyncio.run(scenario())
+        rows = dict(conn.execute("SELECT job_type, result_text FROM jobs WHERE status = 'done'").fetchall())
+        self.assertEqual(rows, {"ok": "done 1", "flaky": "recovered"})
+        self.assertEqual(calls, {"ok": 1, "flaky": 2})
+        conn.close()
+
+    def test_on_ready_starts_pool_once_without_maintenance_loop(self):
+        conn = sqlite3.connect(":memory:", check_same_thread=False)
+        apply_sqlite_migrations(conn, os.path.join(os.getcwd(), "migrations"))
+        events: dict = {}
+        bot = SimpleNamespace(user="epoxy", add_view=lambda view: None, event=lambda fn: events.setdefault(fn.__name__, fn))
+
+        async def scenario():
+            pool = JobWorkerPool(db_handles=DbHandles(db_lock=asyncio.Lock(), db_conn=conn), workers=1, poll_seconds=0.05)
+            boot = RuntimeBootDeps(
+                welcome_panel_factory=lambda: None,
+                allowed_channel_ids=set(),
+                bootstrap_channel_reset_all=False,
+                reset_all_backfill_done_func=None,
+                backfill_channel_func=None,
+                maintenance_loop_func=None,
+                announcement_enabled=False,
+                announcement_loop_func=None,
+                job_pool=pool,
+            )
+            # Stage M0: the maintenance loop never starts.
+            register_runtime_events(bot, deps=SimpleNamespace(stage_at_least=lambda stage: False), boot=boot)
+            await events["on_ready"]()
+            started = pool.started
+            # A reconnect fires on_ready again; the pool must not spawn a second set of workers.
+            await events["on_ready"]()
+            workers = pool.stats()["workers"]
+            await pool.stop()
+            return started, workers
+
+        started, workers = asyncio.run(scenario())
+        conn.close()
+        self.assertTrue(started)
+        self.assertEqual(workers, 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
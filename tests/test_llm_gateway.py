@@ -0,0 +1,88 @@
+from __future__ import annotations
+
+import asyncio
+import threading
+import unittest
+from types import SimpleNamespace
+
+from llm.gateway import LLMGateway
+from llm.gateway import LLMTimeoutError
+from llm.gateway import chat_completion
+
+
+def _response(text: str):
+    return SimpleNamespace(choices=[SimpleNamespace(message=SimpleNamespace(content=text))])
+
+
+class _SyncCompletions:
+    def __init__(self, text: str = "ok"):
+        self.text = text
+        self.calls: list[dict] = []
+        self.thread_names: list[str] = []
+
+    def create(self, **kwargs):
+        self.calls.append(dict(kwargs))
+        self.thread_names.append(threading.current_thread().name)
+        return _response(self.text)
+
+
+class _AsyncCompletions:
+    def __init__(self, delay: float = 0.0, text: str = "async-ok"):
+        self.delay = delay
+        self.text = text
+        self.cancelled = False
+
+    async def create(self, **kwargs):
+        try:
+            await asyncio.sleep(self.delay)
+        except asyncio.CancelledError:
+            self.cancelled = True
+            raise
+        return _response(self.text)
+
+
+def _client(completions):
+    return SimpleNamespace(chat=SimpleNamespace(completions=completions))
+
+
+class LLMGatewayTests(unittest.IsolatedAsyncioTestCase):
+    async def test_sync_stub_runs_off_event_loop_thread(self):
+        completions = _SyncCompletions("stub")
+        gateway = LLMGateway(client=_client(completions), default_timeout_seconds=5)
+        resp = await chat_completion(gateway, model="m", messages=[{"role": "user", "content": "hi"}])
+        self.assertEqual(resp.choices[0].message.content, "stub")
+        self.assertEqual(completions.calls[0]["model"], "m")
+        self.assertNotEqual(completions.thread_names[0], threading.current_thread().name)
+        self.assertEqual(gateway.stats()["calls"], 1)
+
+    async def test_bare_openai_shaped_client_is_accepted(self):
+        completions = _SyncCompletions("bare")
+        resp = await chat_completion(_client(completions), model="m", messages=[])
+        self.assertEqual(resp.choices[0].message.content, "bare")
+
+    async def test_async_client_times_out_and_cancels_request(self):
+        completions = _AsyncCompletions(delay=5)
+        gateway = LLMGateway(client=_client(completions), default_timeout_seconds=5)
+        with self.assertRaises(LLMTimeoutError):
+            await chat_completion(gateway, model="m", messages=[], timeout=0.05)
+        self.assertTrue(completions.cancelled)
+        self.assertEqual(gateway.stats()["timeouts"], 1)
+
+    async def test_caller_cancellation_propagates(self):
+        completions = _AsyncCompletions(delay=5)
+        gateway = LLMGateway(client=_client(completions), default_timeout_seconds=0)
+        task = asyncio.create_task(chat_completion(gateway, model="m", messages=[]))
+        await asyncio.sleep(0.01)
+        task.cancel()
+        with self.assertRaises(asyncio.CancelledError):
+            await task
+        self.assertTrue(completions.cancelled)
+        self.assertEqual(gateway.stats()["cancelled"], 1)
+
+    async def test_missing_client_raises(self):
+        with self.assertRaises(RuntimeError):
+            await chat_completion(None, model="m", messages=[])
+
+
+if __name__ == "__main__":
+    unittest.main()
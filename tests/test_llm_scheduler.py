@@ -0,0 +1,111 @@
+from __future__ import annotations
+
+import asyncio
+import unittest
+from types import SimpleNamespace
+
+from llm.gateway import LLMGateway
+from llm.gateway import chat_completion
+from llm.scheduler import PRIORITY_BACKGROUND
+from llm.scheduler import PRIORITY_INTERACTIVE
+from llm.scheduler import PRIORITY_OPERATOR
+from llm.scheduler import LLMScheduler
+from llm.scheduler import current_llm_priority
+from llm.scheduler import llm_priority
+
+
+class LLMSchedulerTests(unittest.IsolatedAsyncioTestCase):
+    async def test_per_class_concurrency_cap(self):
+        scheduler = LLMScheduler(operator_limit=2, rate_per_minute=0)
+        peak = {"now": 0, "max": 0}
+
+        async def _job():
+            async with scheduler.slot(PRIORITY_OPERATOR):
+                peak["now"] += 1
+                peak["max"] = max(peak["max"], peak["now"])
+                await asyncio.sleep(0.02)
+                peak["now"] -= 1
+
+        await asyncio.gather(*(_job() for _ in range(6)))
+        self.assertEqual(peak["max"], 2)
+        stats = scheduler.stats()[PRIORITY_OPERATOR]
+        self.assertEqual(stats["completed"], 6)
+        self.assertGreater(stats["max_queue_ms"], 0)
+
+    async def test_higher_priority_waiter_admitted_first(self):
+        # One token in the bucket and a slow refill: admission order is decided
+        # purely by priority once the token comes back.
+        scheduler = LLMScheduler(rate_per_minute=600, burst=1, background_yield_at=0)
+        order: list[str] = []
+
+        async with scheduler.slot(PRIORITY_OPERATOR):
+            async def _job(cls: str):
+                async with scheduler.slot(cls):
+                    order.append(cls)
+
+            tasks = [
+                asyncio.create_task(_job(PRIORITY_BACKGROUND)),
+                asyncio.create_task(_job(PRIORITY_OPERATOR)),
+                asyncio.create_task(_job(PRIORITY_INTERACTIVE)),
+            ]
+            await asyncio.sleep(0)
+        await asyncio.gather(*tasks)
+        self.assertEqual(order, [PRIORITY_INTERACTIVE, PRIORITY_OPERATOR, PRIORITY_BACKGROUND])
+
+    async def test_background_yields_while_interactive_in_flight(self):
+        scheduler = LLMScheduler(rate_per_minute=0, background_yield_at=1)
+        events: list[str] = []
+        release = asyncio.Event()
+
+        async def _interactive():
+            async with scheduler.slot(PRIORITY_INTERACTIVE):
+                events.append("interactive:start")
+                await release.wait()
+                events.append("interactive:end")
+
+        async def _background():
+            async with scheduler.slot(PRIORITY_BACKGROUND):
+                events.append("background")
+
+        t1 = asyncio.create_task(_interactive())
+        await asyncio.sleep(0.01)
+        t2 = asyncio.create_task(_background())
+        await asyncio.sleep(0.02)
+        self.assertEqual(events, ["interactive:start"])
+        release.set()
+        await asyncio.gather(t1, t2)
+        self.assertEqual(events, ["interactive:start", "interactive:end", "background"])
+        self.assertEqual(scheduler.stats()[PRIORITY_BACKGROUND]["yielded"], 1)
+
+    async def test_token_bucket_limits_rate(self):
+        scheduler = LLMScheduler(interactive_limit=10, rate_per_minute=1200, burst=2)
+        loop = asyncio.get_running_loop()
+        started = loop.time()
+
+        async def _job():
+            async with scheduler.slot(PRIORITY_INTERACTIVE):
+                return None
+
+        await asyncio.gather(*(_job() for _ in range(4)))
+        # Two calls ride the burst; the other two wait ~50ms each for tokens.
+        self.assertGreaterEqual(loop.time() - started, 0.08)
+
+    async def test_gateway_uses_context_priority(self):
+        scheduler = LLMScheduler(rate_per_minute=0)
+        completions = SimpleNamespace(create=lambda **kwargs: SimpleNamespace(choices=[]))
+        gateway = LLMGateway(
+            client=SimpleNamespace(chat=SimpleNamespace(completions=completions)),
+            scheduler=scheduler,
+        )
+        self.assertEqual(current_llm_priority(), PRIORITY_OPERATOR)
+        with llm_priority(PRIORITY_BACKGROUND):
+            await chat_completion(gateway, model="m", messages=[])
+        await chat_completion(gateway, model="m", messages=[], priority=PRIORITY_INTERACTIVE)
+        stats = gateway.stats()["scheduler"]
+        self.assertEqual(stats[PRIORITY_BACKGROUND]["completed"], 1)
+        self.assertEqual(stats[PRIORITY_INTERACTIVE]["completed"], 1)
+        self.assertEqual(stats[PRIORITY_OPERATOR]["completed"], 0)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,172 @@
+from __future__ import annotations
+
+import json
+import os
+import sqlite3
+import time
+import unittest
+from importlib import import_module
+
+from db.migrate import apply_sqlite_migrations
+from memory.service import remember_event
+from memory.store import insert_memory_event_sync
+from memory.store import memory_content_hash
+from memory.store import merge_duplicate_memory_event_sync
+from retrieval.service import budget_and_diversify_events
+
+
+class _NoopAsyncLock:
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb):
+        return False
+
+
+def _safe_json_loads(raw: str | None):
+    return json.loads(raw or "[]")
+
+
+def _stage_at_least(_stage: str) -> bool:
+    return True
+
+
+def _payload(text: str, *, scope: str = "channel:100", tags: list[str] | None = None, importance: float = 0.5) -> dict:
+    return {
+        "created_at_utc": "2026-10-17T00:00:00+00:00",
+        "created_ts": int(time.time()),
+        "scope": scope,
+        "text": text,
+        "tags_json": json.dumps(tags or []),
+        "importance": importance,
+    }
+
+
+def _merge(conn: sqlite3.Connection, payload: dict) -> dict | None:
+    return merge_duplicate_memory_event_sync(
+        conn,
+        payload,
+        safe_json_loads=_safe_json_loads,
+        safe_json_dumps=json.dumps,
+        now_iso_utc="2026-10-18T00:00:00+00:00",
+    )
+
+
+class MemoryContentHashTests(unittest.IsolatedAsyncioTestCase):
+    async def asyncSetUp(self):
+        self.conn = sqlite3.connect(":memory:", check_same_thread=False)
+        apply_sqlite_migrations(self.conn, os.path.join(os.getcwd(), "migrations"))
+
+    async def asyncTearDown(self):
+        self.conn.close()
+
+    def _insert(self, payload: dict) -> int:
+        return insert_memory_event_sync(self.conn, payload, safe_json_loads=_safe_json_loads)
+
+    def test_hash_ignores_case_and_whitespace(self):
+        self.assertEqual(memory_content_hash("  Pit  stop\nAT lap 12 "), memory_content_hash("pit stop at lap 12"))
+        self.assertNotEqual(memory_content_hash("pit stop at lap 12"), memory_content_hash("pit stop at lap 13"))
+
+    def test_insert_stores_hash_and_migration_backfills_and_indexes(self):
+        mid = self._insert(_payload("Pit stop at lap 12"))
+        self.conn.execute("UPDATE memory_events SET content_hash = NULL WHERE id = ?", (mid,))
+        self.conn.commit()
+
+        import_module("migrations.0025_memory_content_hash").upgrade(self.conn)
+
+        row = self.conn.execute("SELECT content_hash FROM memory_events WHERE id = ?", (mid,)).fetchone()
+        self.assertEqual(row[0], memory_content_hash("pit stop at lap 12"))
+        plan = " ".join(
+            str(r[3])
+            for r in self.conn.execute(
+                "EXPLAIN QUERY PLAN SELECT id FROM memory_events WHERE content_hash = ? AND scope = ?",
+                ("x", "channel:100"),
+            ).fetchall()
+        )
+        self.assertIn("idx_mem_events_content_hash", plan)
+
+    def test_merge_folds_tags_and_importance_into_existing_row(self):
+        mid = self._insert(_payload("Pit stop at lap 12", tags=["strategy"], importance=0.3))
+
+        merged = _merge(self.conn, _payload("pit stop at LAP 12", tags=["strategy", "race"], importance=0.9))
+
+        self.assertEqual(merged["id"], mid)
+        self.assertTrue(merged["changed"])
+        row = self.conn.execute(
+            "SELECT tags_json, importance, updated_at_utc FROM memory_events WHERE id = ?", (mid,)
+        ).fetchone()
+        self.assertEqual(json.loads(row[0]), ["strategy", "race"])
+        self.assertAlmostEqual(float(row[1]), 0.9)
+        self.assertEqual(row[2], "2026-10-18T00:00:00+00:00")
+        tags = {r[0] for r in self.conn.execute("SELECT tag FROM memory_event_tags WHERE memory_id = ?", (mid,))}
+        self.assertEqual(tags, {"strategy", "race"})
+        self.assertEqual(self.conn.execute("SELECT COUNT(*) FROM memory_events").fetchone()[0], 1)
+
+    def test_other_scope_and_deprecated_rows_do_not_absorb(self):
+        mid = self._insert(_payload("Pit stop at lap 12"))
+        self.assertIsNone(_merge(self.conn, _payload("Pit stop at lap 12", scope="channel:200")))
+
+        self.conn.execute("UPDATE memory_events SET lifecycle = 'deprecated' WHERE id = ?", (mid,))
+        self.conn.commit()
+        self.assertIsNone(_merge(self.conn, _payload("Pit stop at lap 12")))
+
+    def test_archived_row_does_not_absorb_a_re_remembered_memory(self):
+        mid = self._insert(_payload("Pit stop at lap 12"))
+        self.conn.execute("UPDATE memory_events SET lifecycle = 'archived' WHERE id = ?", (mid,))
+        self.conn.commit()
+        self.assertIsNone(_merge(self.conn, _payload("Pit stop at lap 12")))
+
+        new_id = self._insert(_payload("Pit stop at lap 12"))
+        self.assertNotEqual(new_id, mid)
+        survivor = _merge(self.conn, _payload("Pit stop at lap 12"))
+        self.assertEqual(survivor["id"], new_id)
+
+    async def test_remember_event_returns_existing_memory_for_duplicate(self):
+        async def _remember(text: str) -> dict | None:
+            return await remember_event(
+                text=text,
+                tags=["ops"],
+                importance=1,
+                memory_review_mode="off",
+                stage_at_least=_stage_at_least,
+                normalize_tags=lambda tags: list(tags),
+                reserved_kind_tags=set(),
+                topic_suggest=False,
+                topic_min_conf=0.85,
+                topic_allowlist=[],
+                db_lock=_NoopAsyncLock(),
+                db_conn=self.conn,
+                list_known_topics_sync=lambda _conn, _limit: [],
+                client=None,
+                openai_model="gpt-5.1",
+                utc_iso=lambda _dt=None: "2026-10-17T00:00:00+00:00",
+                utc_ts=lambda _dt=None: int(time.time()),
+                infer_tier=lambda _ts: 1,
+                safe_json_dumps=json.dumps,
+                insert_memory_event_sync=lambda conn, payload: insert_memory_event_sync(
+                    conn, payload, safe_json_loads=_safe_json_loads
+                ),
+                merge_duplicate_memory_event_sync=_merge,
+            )
+
+        first = await _remember("Quali moved to 14:00")
+        second = await _remember("quali moved to 14:00 ")
+
+        self.assertFalse(first["deduplicated"])
+        self.assertTrue(second["deduplicated"])
+        self.assertEqual(second["id"], first["id"])
+        self.assertEqual(self.conn.execute("SELECT COUNT(*) FROM memory_events").fetchone()[0], 1)
+
+    def test_budget_and_diversify_uses_stored_hash(self):
+        now = int(time.time())
+        events = [
+            {"id": 1, "created_ts": now, "text": "first wording", "content_hash": "same", "author_id": 1},
+            {"id": 2, "created_ts": now, "text": "second wording", "content_hash": "same", "author_id": 2},
+            {"id": 3, "created_ts": now, "text": "first wording", "author_id": 3},
+        ]
+        out = budget_and_diversify_events(events, "auto", stage_at_least=_stage_at_least, limit=8)
+        self.assertEqual([e["id"] for e in out], [1, 3])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,118 @@
+from __future__ import annotations
+
+import json
+import os
+import sqlite3
+import time
+import unittest
+from importlib import import_module
+
+from db.migrate import apply_sqlite_migrations
+from memory.lifecycle_service import approve_memory_sync
+from memory.store import fetch_topic_events_sync
+from memory.store import insert_memory_event_sync
+from memory.store import search_memory_events_by_tag_sync
+
+
+def _safe_json_loads(raw: str):
+    try:
+        return json.loads(raw or "[]")
+    except Exception:
+        return []
+
+
+def _parse_recall_scope(scope: str | None):
+    return ("auto", None, None)
+
+
+class MemoryEventTagIndexTests(unittest.TestCase):
+    def setUp(self):
+        self.conn = sqlite3.connect(":memory:", check_same_thread=False)
+        apply_sqlite_migrations(self.conn, os.path.join(os.getcwd(), "migrations"))
+
+    def tearDown(self):
+        self.conn.close()
+
+    def _insert(self, tags: list[str], *, lifecycle: str = "active", age_days: int = 30, topic_id: str | None = None) -> int:
+        now = int(time.time())
+        return insert_memory_event_sync(
+            self.conn,
+            {
+                "created_at_utc": "2026-01-01T00:00:00+00:00",
+                "created_ts": now - age_days * 86400,
+                "text": "note " + " ".join(tags),
+                "tags_json": json.dumps(tags),
+                "importance": 0.8,
+                "lifecycle": lifecycle,
+                "topic_id": topic_id,
+            },
+            safe_json_loads=_safe_json_loads,
+        )
+
+    def _tags(self, memory_id: int) -> list[str]:
+        cur = self.conn.execute("SELECT tag FROM memory_event_tags WHERE memory_id=? ORDER BY tag", (memory_id,))
+        return [r[0] for r in cur.fetchall()]
+
+    def test_insert_writes_normalized_rows_and_profile_lookup_uses_them(self):
+        hit = self._insert(["Profile", "subject:person:7", "profile"])
+        self._insert(["profile", "subject:person:70"])
+        self._insert(["subject:person:7"])
+        self.assertEqual(self._tags(hit), ["profile", "subject:person:7"])
+
+        rows = search_memory_events_by_tag_sync(
+            self.conn, "subject:person:7", "profile", 10, safe_json_loads=_safe_json_loads
+        )
+        self.assertEqual([r["id"] for r in rows], [hit])
+
+    def test_approve_rewrites_tags(self):
+        mid = self._insert(["draft"], lifecycle="candidate")
+        approve_memory_sync(
+            self.conn,
+            memory_id=mid,
+            actor_person_id=1,
+            tags=["ops"],
+            topic_id="governance",
+            utc_now_iso=lambda: "2026-10-17T00:00:00+00:00",
+            normalize_tags=lambda tags: [str(t).strip().lower() for t in tags if str(t).strip()],
+            safe_json_loads=_safe_json_loads,
+            safe_json_dumps=json.dumps,
+        )
+        self.assertEqual(self._tags(mid), ["governance", "ops"])
+
+    def test_topic_events_match_tag_rows_and_delete_cascades(self):
+        tagged = self._insert(["ops"])
+        by_column = self._insert([], topic_id="ops")
+        self._insert(["ops"], age_days=1)
+        rows = fetch_topic_events_sync(
+            self.conn,
+            "ops",
+            parse_recall_scope=_parse_recall_scope,
+            safe_json_loads=_safe_json_loads,
+        )
+        self.assertEqual({r["id"] for r in rows}, {tagged, by_column})
+
+        self.conn.execute("DELETE FROM memory_events WHERE id=?", (tagged,))
+        self.assertEqual(self._tags(tagged), [])
+
+    def test_tag_lookup_does_not_scan_memory_events(self):
+        plan = self.conn.execute(
+            "EXPLAIN QUERY PLAN SELECT id FROM memory_events "
+            "WHERE id IN (SELECT memory_id FROM memory_event_tags WHERE tag = ?)",
+            ("ops",),
+        ).fetchall()
+        details = " ".join(str(row[-1]) for row in plan)
+        self.assertNotIn("SCAN memory_events", details)
+        self.assertIn("idx_memory_event_tags_tag", details)
+
+    def test_migration_backfills_existing_rows(self):
+        conn = sqlite3.connect(":memory:")
+        conn.execute("CREATE TABLE memory_events (id INTEGER PRIMARY KEY, tags_json TEXT, topic_id TEXT)")
+        conn.execute("INSERT INTO memory_events (id, tags_json) VALUES (1, '[\"Ops\", \"ops\", \"\"]'), (2, 'not json')")
+        import_module("migrations.0021_memory_event_tags").upgrade(conn)
+        rows = conn.execute("SELECT memory_id, tag FROM memory_event_tags").fetchall()
+        self.assertEqual(rows, [(1, "ops")])
+        conn.close()
+
+
+if __name__ == "__main__":
+    unittest.main()
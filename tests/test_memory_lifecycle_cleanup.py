@@ -84,15 +84,76 @@ class MemoryLifecycleCleanupTests(unittest.TestCase):
         after_count = int(cur.fetchone()[0])
         self.assertEqual(before_count, after_count)
 
+        # Tier is derived from created_ts at query time; cleanup leaves the column alone.
         cur.execute("SELECT lifecycle, tier FROM memory_events WHERE id=?", (low_id,))
         low_lifecycle, low_tier = cur.fetchone()
         self.assertEqual(low_lifecycle, "archived")
-        self.assertEqual(int(low_tier), 3)
+        self.assertEqual(int(low_tier), 1)
 
         cur.execute("SELECT lifecycle, tier FROM memory_events WHERE id=?", (high_id,))
         high_lifecycle, high_tier = cur.fetchone()
         self.assertEqual(high_lifecycle, "active")
-        self.assertEqual(int(high_tier), 3)
+        self.assertEqual(int(high_tier), 1)
+        conn.close()
+
+    def test_incremental_cleanup_only_visits_rows_past_the_watermark(self):
+        conn = sqlite3.connect(":memory:", check_same_thread=False)
+        apply_sqlite_migrations(conn, os.path.join(os.getcwd(), "migrations"))
+        cur = conn.cursor()
+        now = int(time.time())
+        m2 = _stage_checker("M2")
+
+        cleanup_memory_sync(conn, stage_at_least=m2)
+        cur.execute("SELECT name FROM memory_maintenance_state ORDER BY name")
+        self.assertEqual(
+            [r[0] for r in cur.fetchall()],
+            ["events_archive_zero_importance_90d", "events_expiry", "full_sweep", "summaries_archive_zero_importance_180d"],
+        )
+
+        # Crossed the 90d boundary long before the watermark: an incremental
+        # run skips it, the periodic full pass catches it.
+        cur.execute(
+            """
+            INSERT INTO memory_events (created_at_utc, created_ts, lifecycle, importance, text, tags_json)
+            VALUES ('2025-01-01T00:00:00+00:00', ?, 'active', 0, 'stale zero importance', '[]')
+            """,
+            (now - 200 * 86400,),
+        )
+        stale_id = int(cur.lastrowid)
+        conn.commit()
+
+        self.assertEqual(cleanup_memory_sync(conn, stage_at_least=m2), (0, 0))
+        cur.execute("SELECT lifecycle FROM memory_events WHERE id=?", (stale_id,))
+        self.assertEqual(cur.fetchone()[0], "active")
+
+        self.assertEqual(cleanup_memory_sync(conn, stage_at_least=m2, full_sweep_interval_seconds=0), (1, 0))
+        cur.execute("SELECT lifecycle FROM memory_events WHERE id=?", (stale_id,))
+        self.assertEqual(cur.fetchone()[0], "archived")
+        conn.close()
+
+    def test_incremental_cleanup_catches_rows_crossing_since_last_run(self):
+        conn = sqlite3.connect(":memory:", check_same_thread=False)
+        apply_sqlite_migrations(conn, os.path.join(os.getcwd(), "migrations"))
+        cur = conn.cursor()
+        now = int(time.time())
+        m2 = _stage_checker("M2")
+
+        cleanup_memory_sync(conn, stage_at_least=m2)
+        # Pretend the last run was an hour ago; this row crossed 90d in between.
+        cur.execute("UPDATE memory_maintenance_state SET watermark_ts = watermark_ts - 3600 WHERE name != 'full_sweep'")
+        cur.execute(
+            """
+            INSERT INTO memory_events (created_at_utc, created_ts, lifecycle, importance, text, tags_json)
+            VALUES ('2025-01-01T00:00:00+00:00', ?, 'active', 0, 'just crossed', '[]')
+            """,
+            (now - 90 * 86400 - 600,),
+        )
+        crossed_id = int(cur.lastrowid)
+        conn.commit()
+
+        self.assertEqual(cleanup_memory_sync(conn, stage_at_least=m2), (1, 0))
+        cur.execute("SELECT lifecycle FROM memory_events WHERE id=?", (crossed_id,))
+        self.assertEqual(cur.fetchone()[0], "archived")
         conn.close()
 
     def test_cleanup_deprecates_expired_event(self):
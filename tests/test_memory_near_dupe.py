@@ -0,0 +1,190 @@
+from __future__ import annotations
+
+import json
+import os
+import sqlite3
+import time
+import unittest
+
+from db.migrate import apply_sqlite_migrations
+from memory.lifecycle_service import merge_memory_events_sync
+from memory.near_dupe import estimate_similarity
+from memory.near_dupe import minhash_signature
+from memory.service import remember_event
+from memory.store import backfill_memory_event_minhash_sync
+from memory.store import find_near_duplicate_memory_events_sync
+from memory.store import insert_memory_event_sync
+from memory.store import merge_duplicate_memory_event_sync
+from memory.store import near_duplicate_clusters_sync
+
+_DECISION = "Race control decided the qualifying session moves to Saturday afternoon because of rain forecast"
+_PARAPHRASE = "Race control decided qualifying session moves to Saturday afternoon due to the rain forecast"
+_UNRELATED = "Pit crew rotation schedule posted for the endurance event next month"
+
+
+class _NoopAsyncLock:
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb):
+        return False
+
+
+def _safe_json_loads(raw: str | None):
+    return json.loads(raw or "[]")
+
+
+def _payload(text: str, *, scope: str = "channel:100", tags: list[str] | None = None) -> dict:
+    return {
+        "created_at_utc": "2026-10-17T00:00:00+00:00",
+        "created_ts": int(time.time()),
+        "scope": scope,
+        "text": text,
+        "tags_json": json.dumps(tags or []),
+        "importance": 0.5,
+    }
+
+
+class NearDuplicateSignatureTests(unittest.TestCase):
+    def test_paraphrase_scores_high_and_unrelated_low(self):
+        base = minhash_signature(_DECISION)
+        self.assertGreaterEqual(estimate_similarity(base, minhash_signature(_PARAPHRASE)), 0.7)
+        self.assertLess(estimate_similarity(base, minhash_signature(_UNRELATED)), 0.3)
+        self.assertEqual(minhash_signature(_DECISION), base)
+
+    def test_short_text_has_no_signature(self):
+        self.assertIsNone(minhash_signature("the lap"))
+
+
+class NearDuplicateStoreTests(unittest.IsolatedAsyncioTestCase):
+    async def asyncSetUp(self):
+        self.conn = sqlite3.connect(":memory:", check_same_thread=False)
+        apply_sqlite_migrations(self.conn, os.path.join(os.getcwd(), "migrations"))
+
+    async def asyncTearDown(self):
+        self.conn.close()
+
+    def _insert(self, text: str, **kwargs) -> int:
+        return insert_memory_event_sync(self.conn, _payload(text, **kwargs), safe_json_loads=_safe_json_loads)
+
+    def test_lookup_is_scoped_and_skips_deprecated(self):
+        mid = self._insert(_DECISION)
+        self._insert(_UNRELATED)
+
+        matches = find_near_duplicate_memory_events_sync(
+            self.conn, scope="channel:100", text=_PARAPHRASE, threshold=0.6
+        )
+        self.assertEqual([m[0] for m in matches], [mid])
+        self.assertEqual(
+            find_near_duplicate_memory_events_sync(self.conn, scope="channel:200", text=_PARAPHRASE, threshold=0.6),
+            [],
+        )
+
+        self.conn.execute("UPDATE memory_events SET lifecycle = 'deprecated' WHERE id = ?", (mid,))
+        self.conn.commit()
+        self.assertEqual(
+            find_near_duplicate_memory_events_sync(self.conn, scope="channel:100", text=_PARAPHRASE, threshold=0.6),
+            [],
+        )
+
+    async def test_remember_event_flags_or_merges(self):
+        async def _remember(text: str, mode: str) -> dict | None:
+            return await remember_event(
+                text=text,
+                tags=["race"],
+                importance=1,
+                memory_review_mode="off",
+                stage_at_least=lambda _stage: True,
+                normalize_tags=lambda tags: list(tags),
+                reserved_kind_tags=set(),
+                topic_suggest=False,
+                topic_min_conf=0.85,
+                topic_allowlist=[],
+                db_lock=_NoopAsyncLock(),
+                db_conn=self.conn,
+                list_known_topics_sync=lambda _conn, _limit: [],
+                client=None,
+                openai_model="gpt-5.1",
+                utc_iso=lambda _dt=None: "2026-10-17T00:00:00+00:00",
+                utc_ts=lambda _dt=None: int(time.time()),
+                infer_tier=lambda _ts: 1,
+                safe_json_dumps=json.dumps,
+                insert_memory_event_sync=lambda conn, payload: insert_memory_event_sync(
+                    conn, payload, safe_json_loads=_safe_json_loads
+                ),
+                merge_duplicate_memory_event_sync=lambda conn, payload, target_id=None: merge_duplicate_memory_event_sync(
+                    conn, payload, safe_json_loads=_safe_json_loads, safe_json_dumps=json.dumps, target_id=target_id
+                ),
+                find_near_duplicate_memory_events_sync=lambda conn, payload: find_near_duplicate_memory_events_sync(
+                    conn, scope=payload["scope"], text=payload["text"], threshold=0.6
+                ),
+                near_duplicate_mode=mode,
+            )
+
+        first = await _remember(_DECISION, "flag")
+        flagged = await _remember(_PARAPHRASE, "flag")
+        self.assertFalse(flagged["deduplicated"])
+        self.assertEqual(flagged["near_duplicate_of"]["id"], first["id"])
+        provenance = json.loads(
+            self.conn.execute("SELECT provenance_json FROM memory_events WHERE id = ?", (flagged["id"],)).fetchone()[0]
+        )
+        self.assertEqual(provenance["near_duplicate_of"], str(first["id"]))
+
+        merged = await _remember(_PARAPHRASE + " again", "merge")
+        self.assertTrue(merged["deduplicated"])
+        self.assertIn(merged["id"], {first["id"], flagged["id"]})
+        self.assertEqual(self.conn.execute("SELECT COUNT(*) FROM memory_events").fetchone()[0], 2)
+
+    def test_backfill_clusters_and_merge(self):
+        a = self._insert(_DECISION, tags=["race"])
+        b = self._insert(_PARAPHRASE, tags=["schedule"])
+        self._insert(_UNRELATED)
+        self._insert(_DECISION, scope="channel:200")
+        # Simulate rows written before the signature tables existed.
+        self.conn.execute("DELETE FROM memory_event_minhash")
+        self.conn.execute("DELETE FROM memory_event_minhash_bands")
+        self.conn.commit()
+
+        self.assertEqual(backfill_memory_event_minhash_sync(self.conn), 4)
+        self.assertEqual(backfill_memory_event_minhash_sync(self.conn), 0)
+
+        clusters = near_duplicate_clusters_sync(self.conn, threshold=0.6)
+        self.assertEqual([(c["ids"], c["merge_ids"]) for c in clusters], [([a, b], [b])])
+        self.assertEqual(clusters[0]["scope"], "channel:100")
+
+        result = merge_memory_events_sync(
+            self.conn,
+            survivor_id=a,
+            duplicate_ids=[b],
+            actor_person_id=None,
+            reason="near-duplicate",
+            utc_now_iso=lambda: "2026-10-17T00:00:00+00:00",
+            safe_json_loads=_safe_json_loads,
+            safe_json_dumps=json.dumps,
+        )
+        self.assertEqual(result["merged_ids"], [b])
+        lifecycle = self.conn.execute("SELECT lifecycle FROM memory_events WHERE id = ?", (b,)).fetchone()[0]
+        self.assertEqual(lifecycle, "deprecated")
+        tags = json.loads(self.conn.execute("SELECT tags_json FROM memory_events WHERE id = ?", (a,)).fetchone()[0])
+        self.assertEqual(tags, ["race", "schedule"])
+        audit = self.conn.execute("SELECT COUNT(*) FROM memory_audit_log WHERE action = 'merge'").fetchone()[0]
+        self.assertEqual(audit, 2)
+        self.assertEqual(near_duplicate_clusters_sync(self.conn, threshold=0.6), [])
+
+    def test_chained_members_only_merge_when_close_to_the_survivor(self):
+        words = (
+            "alpha bravo charlie delta echo foxtrot golf hotel india juliet kilo lima mike november oscar "
+            "papa quebec romeo sierra tango uniform victor whiskey xray yankee zulu amber cobalt indigo maroon"
+        ).split()
+        # a~b and b~c clear the threshold; a and c (about 0.66) do not.
+        a = self._insert(" ".join(words[0:20]))
+        b = self._insert(" ".join(words[2:22]))
+        c = self._insert(" ".join(words[4:24]))
+
+        clusters = near_duplicate_clusters_sync(self.conn, threshold=0.7)
+        self.assertEqual([(cl["ids"], cl["merge_ids"]) for cl in clusters], [([a, b, c], [b])])
+        self.assertGreaterEqual(clusters[0]["min_similarity"], 0.7)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -124,7 +124,6 @@ class MemoryReviewModeOffTests(unittest.IsolatedAsyncioTestCase):
             """
         )
         active_id = int(cur.lastrowid)
-        cur.execute("INSERT INTO memory_events_fts(rowid, text, tags) VALUES (?, ?, '')", (active_id, "review mode query"))
 
         cur.execute(
             """
@@ -134,7 +133,6 @@ class MemoryReviewModeOffTests(unittest.IsolatedAsyncioTestCase):
             """
         )
         candidate_id = int(cur.lastrowid)
-        cur.execute("INSERT INTO memory_events_fts(rowid, text, tags) VALUES (?, ?, '')", (candidate_id, "review mode query"))
         self.conn.commit()
 
         rows = search_memory_events_sync(
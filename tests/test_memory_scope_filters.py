@@ -2,6 +2,7 @@ from __future__ import annotations
 
 import os
 import sqlite3
+import time
 import unittest
 
 from db.migrate import apply_sqlite_migrations
@@ -48,10 +49,6 @@ class MemoryScopeFilterTests(unittest.TestCase):
             """
         )
         id_allowed = int(cur.lastrowid)
-        cur.execute(
-            "INSERT INTO memory_events_fts(rowid, text, tags) VALUES (?, ?, '')",
-            (id_allowed, "scope check payload"),
-        )
 
         cur.execute(
             """
@@ -61,10 +58,6 @@ class MemoryScopeFilterTests(unittest.TestCase):
             """
         )
         id_blocked = int(cur.lastrowid)
-        cur.execute(
-            "INSERT INTO memory_events_fts(rowid, text, tags) VALUES (?, ?, '')",
-            (id_blocked, "scope check payload"),
-        )
 
         cur.execute(
             """
@@ -74,10 +67,6 @@ class MemoryScopeFilterTests(unittest.TestCase):
             """
         )
         id_archived = int(cur.lastrowid)
-        cur.execute(
-            "INSERT INTO memory_events_fts(rowid, text, tags) VALUES (?, ?, '')",
-            (id_archived, "scope check payload"),
-        )
 
         conn.commit()
 
@@ -101,26 +90,28 @@ class MemoryScopeFilterTests(unittest.TestCase):
         conn = sqlite3.connect(":memory:", check_same_thread=False)
         apply_sqlite_migrations(conn, os.path.join(os.getcwd(), "migrations"))
         cur = conn.cursor()
+        now = int(time.time())
 
+        # Tier is derived from created_ts at query time, so ages decide hot vs warm.
         cur.execute(
             """
             INSERT INTO memory_events (
                 created_at_utc, created_ts, scope, guild_id, channel_id, text, tags_json, importance, tier, lifecycle
-            ) VALUES ('2026-02-13T00:00:00+00:00', 1, 'channel:100', 1, 100, 'hot tier payload', '[]', 1, 0, 'active')
-            """
+            ) VALUES ('2026-02-13T00:00:00+00:00', ?, 'channel:100', 1, 100, 'hot tier payload', '[]', 1, 0, 'active')
+            """,
+            (now - 3600,),
         )
         hot_id = int(cur.lastrowid)
-        cur.execute("INSERT INTO memory_events_fts(rowid, text, tags) VALUES (?, ?, '')", (hot_id, "hot tier payload"))
 
         cur.execute(
             """
             INSERT INTO memory_events (
                 created_at_utc, created_ts, scope, guild_id, channel_id, text, tags_json, importance, tier, lifecycle
-            ) VALUES ('2026-02-13T00:00:00+00:00', 1, 'channel:100', 1, 100, 'hot tier payload', '[]', 1, 1, 'active')
-            """
+            ) VALUES ('2026-02-13T00:00:00+00:00', ?, 'channel:100', 1, 100, 'hot tier payload', '[]', 1, 1, 'active')
+            """,
+            (now - 3 * 86400,),
         )
         warm_id = int(cur.lastrowid)
-        cur.execute("INSERT INTO memory_events_fts(rowid, text, tags) VALUES (?, ?, '')", (warm_id, "hot tier payload"))
         conn.commit()
 
         rows = search_memory_events_sync(
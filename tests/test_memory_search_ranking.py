@@ -0,0 +1,75 @@
+from __future__ import annotations
+
+import os
+import sqlite3
+import time
+import unittest
+
+from db.migrate import apply_sqlite_migrations
+from memory.store import search_memory_events_sync
+from retrieval.fts_query import build_fts_query
+
+
+def _parse_recall_scope(_scope: str | None) -> tuple[str, int | None, int | None]:
+    return ("auto", None, None)
+
+
+class MemorySearchRankingTests(unittest.TestCase):
+    def setUp(self):
+        self.conn = sqlite3.connect(":memory:", check_same_thread=False)
+        apply_sqlite_migrations(self.conn, os.path.join(os.getcwd(), "migrations"))
+
+    def tearDown(self):
+        self.conn.close()
+
+    def _insert(self, text: str, *, importance: float, tier: int, age_days: int = 1) -> int:
+        cur = self.conn.cursor()
+        cur.execute(
+            """
+            INSERT INTO memory_events (created_at_utc, created_ts, text, tags_json, importance, tier)
+            VALUES ('2026-10-17T00:00:00+00:00', ?, ?, '[]', ?, ?)
+            """,
+            (int(time.time()) - age_days * 86400, text, importance, tier),
+        )
+        mid = int(cur.lastrowid)
+        self.conn.commit()
+        return mid
+
+    def _search(self, limit: int, *, stage: str = "M3") -> list[dict]:
+        order = {"M0": 0, "M1": 1, "M2": 2, "M3": 3}
+        return search_memory_events_sync(
+            self.conn,
+            "roster",
+            "auto",
+            limit=limit,
+            build_fts_query=build_fts_query,
+            parse_recall_scope=_parse_recall_scope,
+            stage_at_least=lambda s: order[stage] >= order.get(s, 99),
+            safe_json_loads=lambda _s: [],
+        )
+
+    def test_best_match_wins_even_beyond_the_old_candidate_window(self):
+        for i in range(80):
+            self._insert(f"roster note {i}", importance=0.1, tier=2)
+        best = self._insert("roster decision", importance=1.0, tier=0)
+
+        rows = self._search(5)
+        self.assertEqual(len(rows), 5)
+        self.assertEqual(rows[0]["id"], best)
+        self.assertEqual(rows[0]["importance"], 1.0)
+
+    def test_results_are_in_score_order(self):
+        low = self._insert("roster low", importance=0.0, tier=2)
+        mid = self._insert("roster mid", importance=0.5, tier=1)
+        high = self._insert("roster high", importance=0.9, tier=0)
+        self.assertEqual([r["id"] for r in self._search(3)], [high, mid, low])
+
+    def test_stage_filters_run_in_sql(self):
+        keep = self._insert("roster keep", importance=0.5, tier=3, age_days=200)
+        self._insert("roster zero cold", importance=0.0, tier=3, age_days=200)
+        self.assertEqual([r["id"] for r in self._search(10, stage="M2")], [keep])
+        self.assertEqual(len(self._search(10, stage="M1")), 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,84 @@
+from __future__ import annotations
+
+import asyncio
+import time
+import unittest
+
+from misc.mention_stages import StageGraph
+
+
+class MentionStageGraphTests(unittest.IsolatedAsyncioTestCase):
+    async def test_independent_stages_overlap(self):
+        graph = StageGraph()
+
+        async def _slow(value):
+            await asyncio.sleep(0.1)
+            return value
+
+        graph.add("recent_context", lambda: _slow("ctx"))
+        graph.add("anchors", lambda: _slow("anchors"))
+        graph.add("policy", lambda: _slow("policy"))
+
+        started = time.perf_counter()
+        results = await graph.run()
+        elapsed = time.perf_counter() - started
+
+        self.assertEqual(results, {"recent_context": "ctx", "anchors": "anchors", "policy": "policy"})
+        self.assertLess(elapsed, 0.25)
+        self.assertEqual(set(graph.timings_ms), {"recent_context", "anchors", "policy", "total"})
+
+    async def test_dependent_stage_receives_upstream_result(self):
+        graph = StageGraph()
+        order: list[str] = []
+
+        async def _identity():
+            order.append("identity")
+            return {"memory_budget": {"hot": 2}}
+
+        async def _memory(identity):
+            order.append("memory")
+            return identity["memory_budget"]["hot"]
+
+        graph.add("identity", _identity)
+        graph.add("memory", _memory, after=("identity",))
+        results = await graph.run()
+
+        self.assertEqual(results["memory"], 2)
+        self.assertEqual(order, ["identity", "memory"])
+
+    async def test_unknown_dependency_is_rejected(self):
+        graph = StageGraph()
+
+        async def _noop():
+            return None
+
+        with self.assertRaises(ValueError):
+            graph.add("memory", _noop, after=("identity",))
+        graph.add("identity", _noop)
+        with self.assertRaises(ValueError):
+            graph.add("identity", _noop)
+
+    async def test_failure_cancels_siblings_and_raises(self):
+        graph = StageGraph()
+        cancelled = {"slow": False}
+
+        async def _boom():
+            raise RuntimeError("db down")
+
+        async def _slow():
+            try:
+                await asyncio.sleep(5)
+            except asyncio.CancelledError:
+                cancelled["slow"] = True
+                raise
+
+        graph.add("identity", _boom)
+        graph.add("anchors", _slow)
+        with self.assertRaises(RuntimeError):
+            await graph.run()
+        self.assertTrue(cancelled["slow"])
+        self.assertIn("total", graph.timings_ms)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,111 @@
+from __future__ import annotations
+
+import asyncio
+import json
+import os
+import sqlite3
+import unittest
+from types import SimpleNamespace
+
+from db.handles import DbHandles
+from db.migrate import apply_sqlite_migrations
+from jobs.worker import JobWorkerPool
+from memory.service import extract_json_array
+from misc.commands import commands_mining
+
+_ITEMS = [
+    {"text": f"Stewards confirmed rule {n} for the sprint", "kind": "decision", "topic_id": None,
+     "importance": 1, "confidence": 0.9}
+    for n in range(3)
+]
+
+
+class _Channel:
+    async def fetch_message(self, message_id):
+        return SimpleNamespace(id=message_id)
+
+    async def send(self, text):
+        raise RuntimeError("discord is down")
+
+
+class _Bot:
+    def __init__(self, channel):
+        self.channel = channel
+
+    def command(self, **_kwargs):
+        return lambda fn: fn
+
+    def get_channel(self, _channel_id):
+        return self.channel
+
+
+class _Completions:
+    def __init__(self):
+        self.calls = 0
+
+    async def create(self, **_kwargs):
+        self.calls += 1
+        content = json.dumps(_ITEMS)
+        return SimpleNamespace(choices=[SimpleNamespace(message=SimpleNamespace(content=content))])
+
+
+class MineJobTests(unittest.TestCase):
+    def test_retry_resumes_saving_without_reextracting(self):
+        conn = sqlite3.connect(":memory:", check_same_thread=False)
+        apply_sqlite_migrations(conn, os.path.join(os.getcwd(), "migrations"))
+        completions = _Completions()
+        remembered: list[str] = []
+
+        async def remember_event(*, text, **_kwargs):
+            # The second save fails once, after the first one was committed.
+            if len(remembered) == 1 and not getattr(remember_event, "failed", False):
+                remember_event.failed = True
+                raise RuntimeError("database is locked")
+            remembered.append(text)
+            return {"id": len(remembered)}
+
+        async def set_origin(*_args):
+            return None
+
+        async def scenario():
+            db = DbHandles(db_lock=asyncio.Lock(), db_conn=conn)
+            pool = JobWorkerPool(db_handles=db, workers=1, poll_seconds=0.05, backoff_base_seconds=0)
+            deps = SimpleNamespace(
+                job_pool=pool,
+                db_handles=db,
+                fetch_latest_messages_sync=lambda _conn, _channel_id, _limit: [{"content": "race notes"}],
+                format_recent_context=lambda rows, **_kwargs: "race notes",
+                topic_allowlist=[],
+                client=SimpleNamespace(chat=SimpleNamespace(completions=completions)),
+                openai_model="test-model",
+                extract_json_array=extract_json_array,
+                remember_event_func=remember_event,
+                set_memory_origin_func=set_origin,
+            )
+            commands_mining.register(_Bot(_Channel()), deps=deps, gates=SimpleNamespace())
+            await pool.start()
+            await pool.enqueue("mine", {"reply_channel_id": 1, "message_id": 2, "target_channel_id": 3, "limit": 50})
+            for _ in range(100):
+                status = conn.execute("SELECT status FROM jobs").fetchone()[0]
+                if status in ("done", "failed"):
+                    break
+                await asyncio.sleep(0.02)
+            await pool.stop()
+
+        asyncio.run(scenario())
+        status, attempts, result, payload = conn.execute(
+            "SELECT status, attempts, result_text, payload_json FROM jobs"
+        ).fetchone()
+        conn.close()
+
+        # A failed report post does not fail the job once the memories are stored.
+        self.assertEqual((status, attempts), ("done", 2))
+        self.assertIn("saved 3 memories", result)
+        self.assertEqual(completions.calls, 1)
+        self.assertEqual(remembered, [item["text"] for item in _ITEMS])
+        progress = json.loads(payload)["progress"]
+        self.assertEqual((progress["next"], progress["saved_ids"]), (3, [1, 2, 3]))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,84 @@
+from __future__ import annotations
+
+import os
+import sqlite3
+import unittest
+
+from db.migrate import apply_sqlite_migrations
+from memory.meta_service import apply_policy_enforcement
+from memory.meta_service import format_policy_directive
+from memory.meta_store import PolicyBundleCache
+from memory.meta_store import resolve_policy_bundle_cached_sync
+from memory.meta_store import upsert_meta_item_sync
+
+_SCOPE = {
+    "sensitivity_policy_id": "policy:member_privacy",
+    "caller_type": "member",
+    "surface": "public_channel",
+}
+
+
+class PolicyBundleCacheTests(unittest.TestCase):
+    def setUp(self):
+        self.conn = sqlite3.connect(":memory:", check_same_thread=False)
+        apply_sqlite_migrations(self.conn, os.path.join(os.getcwd(), "migrations"))
+        self.cache = PolicyBundleCache(ttl_seconds=0)
+
+    def tearDown(self):
+        self.conn.close()
+
+    def test_hit_returns_same_bundle_without_querying(self):
+        bundle = resolve_policy_bundle_cached_sync(self.conn, policy_cache=self.cache, **_SCOPE)
+        self.conn.execute("DELETE FROM meta_items")
+        again = resolve_policy_bundle_cached_sync(self.conn, policy_cache=self.cache, **_SCOPE)
+        self.assertIs(again, bundle)
+        stats = self.cache.stats()
+        self.assertEqual((stats["hits"], stats["misses"]), (1, 1))
+
+    def test_upsert_bumps_generation_and_retires_entries(self):
+        bundle = resolve_policy_bundle_cached_sync(self.conn, policy_cache=self.cache, **_SCOPE)
+        upsert_meta_item_sync(
+            self.conn,
+            {
+                "kind": "policy",
+                "scope": "global",
+                "priority": "critical",
+                "statement": "Never share invite links in public channels.",
+                "created_at_utc": "2026-10-17T00:00:00+00:00",
+            },
+        )
+        fresh = resolve_policy_bundle_cached_sync(self.conn, policy_cache=self.cache, **_SCOPE)
+        self.assertIsNot(fresh, bundle)
+        self.assertGreater(fresh["generation"], bundle["generation"])
+        self.assertEqual(len(fresh["policies"]), len(bundle["policies"]) + 1)
+
+    def test_directive_and_enforcement_are_memoized_per_bundle(self):
+        bundle = resolve_policy_bundle_cached_sync(self.conn, policy_cache=self.cache, **_SCOPE)
+        directive = format_policy_directive(bundle, max_chars=550, policy_cache=self.cache)
+        self.assertEqual(directive, format_policy_directive(bundle, max_chars=550))
+        format_policy_directive(bundle, max_chars=550, policy_cache=self.cache)
+
+        reply = "Ask <@123456789012345678> or <@!987654321098765432>."
+        for _ in range(2):
+            text, clamps = apply_policy_enforcement(
+                reply,
+                policy_bundle=bundle,
+                author_id=123456789012345678,
+                caller_type="member",
+                surface="public_channel",
+                policy_cache=self.cache,
+            )
+        self.assertEqual(text, "Ask <@123456789012345678> or [redacted-user].")
+        self.assertEqual(clamps, ["redact_discord_mentions"])
+        stats = self.cache.stats()
+        self.assertEqual((stats["derived_hits"], stats["derived_misses"]), (2, 2))
+
+    def test_foreign_bundle_is_not_memoized(self):
+        bundle = {"policies": [{"statement": "Be kind.", "priority": "high"}]}
+        format_policy_directive(bundle, policy_cache=self.cache)
+        format_policy_directive(bundle, policy_cache=self.cache)
+        self.assertEqual(self.cache.stats()["derived_hits"], 0)
+
+
+if __name__ == "__main__":
+    unittest.main()
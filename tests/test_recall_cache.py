@@ -0,0 +1,150 @@
+from __future__ import annotations
+
+import json
+import os
+import sqlite3
+import time
+import unittest
+
+from db.migrate import apply_sqlite_migrations
+from memory.store import insert_memory_event_sync
+from memory.store import memory_write_generation
+from retrieval.service import RecallCache
+from retrieval.service import recall_prompt_key
+from retrieval.service import recall_memory
+
+
+def _stage_at_least(stage: str) -> bool:
+    ranks = {"M0": 0, "M1": 1, "M2": 2, "M3": 3}
+    return ranks.get(stage, 0) <= ranks["M3"]
+
+
+class _NoopAsyncLock:
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb):
+        return False
+
+
+class RecallCacheTests(unittest.IsolatedAsyncioTestCase):
+    def setUp(self):
+        self.event_calls = 0
+        self.summary_calls = 0
+        now = int(time.time())
+        self.events_pool = [
+            {"id": i, "created_ts": now, "text": f"deploy note {i}", "channel_id": 100, "author_id": i}
+            for i in range(1, 4)
+        ]
+
+    def _search_events(self, _conn, _query, _scope, _limit):
+        self.event_calls += 1
+        return [dict(e) for e in self.events_pool]
+
+    def _search_summaries(self, _conn, _query, _scope, limit):
+        self.summary_calls += 1
+        return [{"id": 1, "topic_id": "ops", "summary_text": "deploys"}][: int(limit)]
+
+    async def _recall(self, prompt: str, cache: RecallCache, *, scope: str = "auto channel:100", budget=None):
+        return await recall_memory(
+            prompt,
+            scope,
+            budget,
+            stage_at_least=_stage_at_least,
+            db_lock=_NoopAsyncLock(),
+            db_conn=object(),
+            search_memory_events_sync=self._search_events,
+            search_memory_summaries_sync=self._search_summaries,
+            recall_cache=cache,
+        )
+
+    async def test_repeat_prompt_is_served_from_cache(self):
+        cache = RecallCache(max_entries=8, ttl_seconds=0)
+        first = await self._recall("what about the deploy?", cache)
+        # Same FTS terms after stopword/punctuation normalization.
+        second = await self._recall("the deploy", cache)
+
+        self.assertEqual(first, second)
+        self.assertEqual((self.event_calls, self.summary_calls), (1, 1))
+        stats = cache.stats()
+        self.assertEqual((stats["hits"], stats["misses"], stats["hit_rate"]), (1, 1, 0.5))
+
+        # Hits are copies; decorating them must not leak into the cache.
+        second[0][0]["text"] = "mutated"
+        third = await self._recall("deploy", cache)
+        self.assertNotEqual(third[0][0]["text"], "mutated")
+
+    async def test_scope_and_budget_are_part_of_the_key(self):
+        cache = RecallCache(max_entries=8, ttl_seconds=0)
+        await self._recall("deploy", cache)
+        await self._recall("deploy", cache, scope="auto channel:200")
+        await self._recall("deploy", cache, budget={"hot": 1, "warm": 0, "cold": 0, "summaries": 0})
+        self.assertEqual(self.event_calls, 3)
+
+    async def test_memory_write_retires_entries(self):
+        cache = RecallCache(max_entries=8, ttl_seconds=0)
+        await self._recall("deploy", cache)
+
+        conn = sqlite3.connect(":memory:", check_same_thread=False)
+        apply_sqlite_migrations(conn, os.path.join(os.getcwd(), "migrations"))
+        before = memory_write_generation()
+        insert_memory_event_sync(
+            conn,
+            {
+                "created_at_utc": "2026-10-17T00:00:00+00:00",
+                "created_ts": int(time.time()),
+                "text": "deploy froze again",
+                "tags_json": "[]",
+            },
+            safe_json_loads=lambda raw: json.loads(raw or "[]"),
+        )
+        conn.close()
+        self.assertGreater(memory_write_generation(), before)
+
+        await self._recall("deploy", cache)
+        self.assertEqual(self.event_calls, 2)
+
+    async def test_lru_eviction_and_ttl(self):
+        cache = RecallCache(max_entries=2, ttl_seconds=0)
+        await self._recall("alpha", cache)
+        await self._recall("bravo", cache)
+        await self._recall("alpha", cache)
+        await self._recall("charlie", cache)  # evicts bravo, the least recently used
+        await self._recall("alpha", cache)
+        self.assertEqual(self.event_calls, 3)
+        await self._recall("bravo", cache)
+        self.assertEqual(self.event_calls, 4)
+        self.assertEqual(cache.stats()["evictions"], 2)
+
+        expiring = RecallCache(max_entries=2, ttl_seconds=0.01)
+        await self._recall("delta", expiring)
+        time.sleep(0.02)
+        await self._recall("delta", expiring)
+        self.assertEqual(self.event_calls, 6)
+
+    async def test_long_prompts_differing_after_ten_terms_do_not_collide(self):
+        cache = RecallCache(max_entries=8, ttl_seconds=0)
+        shared = "alpha bravo charlie delta echo foxtrot golf hotel india juliet"
+        await self._recall(f"{shared} kilo", cache)
+        await self._recall(f"{shared} zulu", cache)
+        self.assertEqual(self.event_calls, 2)
+        await self._recall(f"{shared} zulu", cache)
+        self.assertEqual(self.event_calls, 2)
+
+    async def test_prompt_key_separates_term_equal_prompts(self):
+        cache = RecallCache(max_entries=8, ttl_seconds=0, normalize_query=recall_prompt_key)
+        await self._recall("deploy", cache)
+        await self._recall("DEPLOY  ", cache)
+        self.assertEqual(self.event_calls, 1)
+        # Same FTS terms, different raw text for the vector leg.
+        await self._recall("deploy deploy 42", cache)
+        self.assertEqual(self.event_calls, 2)
+
+    async def test_prompt_without_terms_bypasses_cache(self):
+        cache = RecallCache(max_entries=8, ttl_seconds=0)
+        await self._recall("?!", cache)
+        self.assertEqual(cache.stats()["misses"], 0)
+
+
+if __name__ == "__main__":
+    unittest.main()
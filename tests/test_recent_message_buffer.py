@@ -0,0 +1,137 @@
+from __future__ import annotations
+
+import asyncio
+import os
+import sqlite3
+import unittest
+
+from db.handles import DbHandles
+from db.migrate import apply_sqlite_migrations
+from ingestion.recent_buffer import RecentMessageBuffer
+from ingestion.store import fetch_last_messages_by_author_id_sync
+from ingestion.store import fetch_recent_context_sync
+from ingestion.store import fetch_recent_message_rows_sync
+from ingestion.store import insert_message_sync
+from retrieval.service import fetch_recent_context_rows
+from retrieval.service import get_last_author_message
+
+
+def _payload(message_id: int, author_id: int = 7, content: str | None = None, channel_id: int = 10) -> dict:
+    return {
+        "message_id": message_id,
+        "guild_id": 1,
+        "guild_name": "g",
+        "channel_id": channel_id,
+        "channel_name": "ops",
+        "author_id": author_id,
+        "author_name": f"user{author_id}",
+        "created_at_utc": f"2026-02-15T10:{message_id % 60:02d}:00+00:00",
+        "content": content if content is not None else f"msg {message_id}",
+        "attachments": "",
+    }
+
+
+class RecentMessageBufferTests(unittest.TestCase):
+    def test_unseeded_channel_misses(self):
+        buf = RecentMessageBuffer(per_channel=10)
+        buf.add(_payload(1))
+        self.assertIsNone(buf.recent(10, 100, 5))
+        self.assertEqual(buf.last_by_author(10, 100, 7), (False, []))
+
+    def test_seeded_channel_serves_newest_first_and_skips_blank(self):
+        buf = RecentMessageBuffer(per_channel=10)
+        buf.seed(10, [], complete_history=True)
+        for i in range(1, 6):
+            buf.add(_payload(i, content="" if i == 3 else None))
+        rows = buf.recent(10, 5, 10)
+        self.assertEqual([r[2] for r in rows], ["msg 4", "msg 2", "msg 1"])
+        self.assertEqual(buf.last_by_author(10, 100, 8), (True, []))
+
+    def test_window_below_floor_is_a_miss(self):
+        buf = RecentMessageBuffer(per_channel=3)
+        buf.seed(10, [], complete_history=True)
+        for i in range(1, 7):
+            buf.add(_payload(i))
+        # Only ids 4..6 are retained; asking for 5 rows reaches below the floor.
+        self.assertIsNone(buf.recent(10, 100, 5))
+        self.assertEqual(len(buf.recent(10, 100, 3)), 3)
+        self.assertEqual(buf.last_by_author(10, 100, 99), (False, []))
+
+    def test_out_of_order_and_duplicate_adds(self):
+        buf = RecentMessageBuffer(per_channel=10)
+        buf.seed(10, [], complete_history=True)
+        buf.add(_payload(5))
+        buf.add(_payload(2))
+        buf.add(_payload(5, content="dupe"))
+        rows = buf.recent(10, 100, 10)
+        self.assertEqual([r[2] for r in rows], ["msg 5", "msg 2"])
+
+    def test_channel_count_is_bounded(self):
+        buf = RecentMessageBuffer(per_channel=5, max_channels=2)
+        for channel_id in (1, 2, 3):
+            buf.add(_payload(channel_id, channel_id=channel_id))
+        self.assertEqual(buf.stats()["channels"], 2)
+
+
+class RecentContextServiceTests(unittest.IsolatedAsyncioTestCase):
+    async def asyncSetUp(self):
+        self.conn = sqlite3.connect(":memory:", check_same_thread=False)
+        apply_sqlite_migrations(self.conn, os.path.join(os.getcwd(), "migrations"))
+        self.handles = DbHandles(db_lock=asyncio.Lock(), db_conn=self.conn)
+        for i in range(1, 11):
+            insert_message_sync(self.conn, _payload(i, author_id=7 if i % 2 else 8))
+
+    async def asyncTearDown(self):
+        self.conn.close()
+
+    async def test_cold_start_seeds_then_serves_from_memory(self):
+        buf = RecentMessageBuffer(per_channel=50)
+        rows = await fetch_recent_context_rows(
+            10,
+            11,
+            4,
+            db_handles=self.handles,
+            fetch_recent_context_sync=fetch_recent_context_sync,
+            fetch_recent_message_rows_sync=fetch_recent_message_rows_sync,
+            recent_buffer=buf,
+        )
+        expected = fetch_recent_context_sync(self.conn, 10, 11, 4)
+        self.assertEqual(rows, expected)
+        self.assertTrue(buf.is_seeded(10))
+
+        # Later reads never touch the DB.
+        self.conn.execute("DELETE FROM messages")
+        buf.add(_payload(11, author_id=8))
+        rows = await fetch_recent_context_rows(
+            10,
+            12,
+            2,
+            db_handles=self.handles,
+            fetch_recent_context_sync=fetch_recent_context_sync,
+            fetch_recent_message_rows_sync=fetch_recent_message_rows_sync,
+            recent_buffer=buf,
+        )
+        self.assertEqual([r[2] for r in rows], ["msg 11", "msg 10"])
+        anchor = await get_last_author_message(
+            10,
+            12,
+            7,
+            db_handles=self.handles,
+            fetch_last_messages_by_author_id_sync=fetch_last_messages_by_author_id_sync,
+            recent_buffer=buf,
+        )
+        self.assertEqual(anchor[0][2], "msg 9")
+
+    async def test_anchor_falls_back_to_db_without_buffer(self):
+        rows = await get_last_author_message(
+            10,
+            10,
+            8,
+            db_handles=self.handles,
+            fetch_last_messages_by_author_id_sync=fetch_last_messages_by_author_id_sync,
+        )
+        self.assertEqual(rows[0][2], "msg 8")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -48,10 +48,6 @@ class SummaryScopeFilterTests(unittest.TestCase):
             """
         )
         id_allowed = int(cur.lastrowid)
-        cur.execute(
-            "INSERT INTO memory_summaries_fts(rowid, topic_id, summary_text, tags) VALUES (?, ?, ?, '')",
-            (id_allowed, "ops", "scope summary payload"),
-        )
 
         cur.execute(
             """
@@ -65,10 +61,6 @@ class SummaryScopeFilterTests(unittest.TestCase):
             """
         )
         id_blocked = int(cur.lastrowid)
-        cur.execute(
-            "INSERT INTO memory_summaries_fts(rowid, topic_id, summary_text, tags) VALUES (?, ?, ?, '')",
-            (id_blocked, "ops", "scope summary payload"),
-        )
 
         cur.execute(
             """
@@ -82,10 +74,6 @@ class SummaryScopeFilterTests(unittest.TestCase):
             """
         )
         id_global = int(cur.lastrowid)
-        cur.execute(
-            "INSERT INTO memory_summaries_fts(rowid, topic_id, summary_text, tags) VALUES (?, ?, ?, '')",
-            (id_global, "ops", "scope summary payload"),
-        )
 
         cur.execute(
             """
@@ -99,10 +87,6 @@ class SummaryScopeFilterTests(unittest.TestCase):
             """
         )
         id_archived = int(cur.lastrowid)
-        cur.execute(
-            "INSERT INTO memory_summaries_fts(rowid, topic_id, summary_text, tags) VALUES (?, ?, ?, '')",
-            (id_archived, "ops", "scope summary payload"),
-        )
         conn.commit()
 
         scoped_rows = search_memory_summaries_sync(
@@ -0,0 +1,90 @@
+from __future__ import annotations
+
+import asyncio
+import json
+import os
+import sqlite3
+import unittest
+
+from db.migrate import apply_sqlite_migrations
+from memory.service import get_topic_candidates
+from memory.store import insert_memory_event_sync
+from memory.store import load_topic_registry_sync
+from memory.topic_registry import TopicRegistry
+
+
+def _safe_json_loads(raw: str):
+    return json.loads(raw or "[]")
+
+
+class TopicRegistryTests(unittest.TestCase):
+    def setUp(self):
+        self.conn = sqlite3.connect(":memory:", check_same_thread=False)
+        apply_sqlite_migrations(self.conn, os.path.join(os.getcwd(), "migrations"))
+        # racing: 3 older events; design: 1 newest event; "x" is too short to be a topic.
+        rows = [("racing", 100), ("racing", 110), ("racing", 120), ("design", 500), ("x", 900)]
+        for i, (topic, ts) in enumerate(rows):
+            insert_memory_event_sync(
+                self.conn,
+                {
+                    "created_at_utc": "2026-10-17T00:00:00+00:00",
+                    "created_ts": ts,
+                    "scope": "global",
+                    "text": f"note {i}",
+                    "tags_json": "[]",
+                    "topic_id": topic,
+                },
+                safe_json_loads=_safe_json_loads,
+            )
+        self.known_topic_scans = 0
+
+    def tearDown(self):
+        self.conn.close()
+
+    def _list_known_topics(self, conn, limit):
+        self.known_topic_scans += 1
+        return []
+
+    def _candidates(self, registry: TopicRegistry) -> list[str]:
+        return asyncio.run(
+            get_topic_candidates(
+                topic_allowlist=[],
+                db_lock=asyncio.Lock(),
+                db_conn=self.conn,
+                list_known_topics_sync=self._list_known_topics,
+                topic_registry=registry,
+            )
+        )
+
+    def test_orders_by_recency_or_frequency(self):
+        recency = TopicRegistry(load_topics=load_topic_registry_sync)
+        frequency = TopicRegistry(load_topics=load_topic_registry_sync, order="frequency")
+
+        self.assertEqual(self._candidates(recency), ["design", "racing"])
+        self.assertEqual(self._candidates(frequency), ["racing", "design"])
+        self.assertEqual(self.known_topic_scans, 0)
+
+    def test_new_topics_are_noted_without_reloading(self):
+        registry = TopicRegistry(load_topics=load_topic_registry_sync)
+        self._candidates(registry)
+
+        registry.note_topic("pit_strategy", 1000)
+        registry.note_topic("Racing", 1001)
+        registry.note_topic(None)
+
+        self.assertEqual(self._candidates(registry), ["racing", "pit_strategy", "design"])
+        stats = registry.stats()
+        self.assertEqual((stats["loads"], stats["notes"], stats["topics"]), (1, 2, 3))
+
+    def test_reload_when_stale(self):
+        registry = TopicRegistry(load_topics=load_topic_registry_sync, max_age_seconds=60)
+        self._candidates(registry)
+        self.assertFalse(registry.needs_load())
+        registry.invalidate()
+        self.assertTrue(registry.needs_load())
+        self._candidates(registry)
+        self.assertEqual(registry.stats()["loads"], 2)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,141 @@
+from __future__ import annotations
+
+import importlib
+import json
+import os
+import sqlite3
+import unittest
+from datetime import datetime
+from datetime import timezone
+
+from db.migrate import apply_sqlite_migrations
+from memory.lifecycle_service import approve_memory_sync
+from memory.lifecycle_service import reject_memory_sync
+from memory.store import auto_summary_candidates_sync
+from memory.store import insert_memory_event_sync
+from memory.store import list_known_topics_sync
+from memory.store import mark_events_summarized_sync
+from memory.store import topic_counts_sync
+from memory.store import upsert_summary_sync
+
+_PENDING = "importance = 1 AND summarized = 0 AND COALESCE(lifecycle, 'active') = 'active'"
+
+
+def _safe_json_loads(raw: str):
+    try:
+        return json.loads(raw or "[]")
+    except Exception:
+        return []
+
+
+def _event(text: str, *, topic_id: str | None, created_ts: int, importance: float = 1, lifecycle: str = "active"):
+    return {
+        "created_at_utc": "2026-10-17T00:00:00+00:00",
+        "created_ts": created_ts,
+        "scope": "global",
+        "text": text,
+        "tags_json": "[]",
+        "importance": importance,
+        "lifecycle": lifecycle,
+        "topic_id": topic_id,
+    }
+
+
+class TopicStatsTests(unittest.TestCase):
+    def setUp(self):
+        self.conn = sqlite3.connect(":memory:", check_same_thread=False)
+        apply_sqlite_migrations(self.conn, os.path.join(os.getcwd(), "migrations"))
+
+    def tearDown(self):
+        self.conn.close()
+
+    def _insert(self, text: str, **kwargs) -> int:
+        return insert_memory_event_sync(self.conn, _event(text, **kwargs), safe_json_loads=_safe_json_loads)
+
+    def _stats(self) -> dict[str, tuple]:
+        rows = self.conn.execute(
+            "SELECT topic_id, total, unsummarized, first_unsummarized_ts, last_event_ts FROM topic_stats WHERE total > 0"
+        ).fetchall()
+        return {r[0]: tuple(r[1:]) for r in rows}
+
+    def _expected(self) -> dict[str, tuple]:
+        rows = self.conn.execute(
+            f"""
+            SELECT topic_id, COUNT(*), SUM({_PENDING}), MIN(CASE WHEN {_PENDING} THEN created_ts END), MAX(created_ts)
+            FROM memory_events
+            WHERE COALESCE(topic_id, '') <> ''
+            GROUP BY topic_id
+            """
+        ).fetchall()
+        return {r[0]: tuple(r[1:]) for r in rows}
+
+    def test_counters_follow_every_write_path(self):
+        a1 = self._insert("grid penalty appeal", topic_id="racing", created_ts=1000)
+        a2 = self._insert("pit wall radio rules", topic_id="racing", created_ts=2000)
+        cand = self._insert("new steward contact", topic_id="racing", created_ts=3000, lifecycle="candidate")
+        rej = self._insert("livery vote", topic_id="design", created_ts=1500, lifecycle="candidate")
+        self._insert("untagged chatter", topic_id=None, created_ts=1200)
+        self.assertEqual(self._stats(), self._expected())
+        self.assertEqual(self._stats()["racing"], (3, 2, 1000, 3000))
+
+        common = dict(
+            actor_person_id=1,
+            utc_now_iso=lambda: "2026-10-17T00:00:00+00:00",
+            safe_json_loads=_safe_json_loads,
+            safe_json_dumps=json.dumps,
+        )
+        approve_memory_sync(
+            self.conn, memory_id=cand, importance=1, normalize_tags=lambda tags: list(tags), **common
+        )
+        reject_memory_sync(self.conn, memory_id=rej, reason="off-topic", **common)
+        mark_events_summarized_sync(self.conn, [a1])
+        self.conn.execute("DELETE FROM memory_events WHERE id = ?", (a2,))
+        self.conn.commit()
+
+        self.assertEqual(self._stats(), self._expected())
+        self.assertEqual(self._stats()["racing"][1:3], (1, 3000))
+
+    def test_readers_use_materialized_stats(self):
+        for i in range(3):
+            self._insert(f"race control note {i}", topic_id="racing", created_ts=1000 + i)
+        self._insert("fresh design idea", topic_id="design", created_ts=9000)
+        upsert_summary_sync(
+            self.conn,
+            {
+                "topic_id": "governance",
+                "created_at_utc": "2026-10-17T00:00:00+00:00",
+                "updated_at_utc": "2026-10-17T00:00:00+00:00",
+                "summary_text": "- bylaws",
+            },
+            safe_json_loads=_safe_json_loads,
+        )
+
+        self.assertEqual(topic_counts_sync(self.conn, 10), [("racing", 3), ("design", 1)])
+        self.assertEqual(list_known_topics_sync(self.conn), ["design", "governance", "racing"])
+        # Only topics whose oldest pending event predates the cutoff qualify.
+        self.assertEqual(auto_summary_candidates_sync(self.conn, cutoff_ts=5000), [("racing", 3)])
+        # Ranked by events old enough to summarize, not by everything pending.
+        for i in range(5):
+            self._insert(f"fresh design idea {i}", topic_id="design", created_ts=9001 + i)
+        self._insert("old design idea", topic_id="design", created_ts=4000)
+        self.assertEqual(
+            auto_summary_candidates_sync(self.conn, cutoff_ts=5000),
+            [("racing", 3), ("design", 1)],
+        )
+        last_summary_ts = self.conn.execute(
+            "SELECT last_summary_ts FROM topic_stats WHERE topic_id = 'governance'"
+        ).fetchone()[0]
+        self.assertEqual(last_summary_ts, int(datetime(2026, 10, 17, tzinfo=timezone.utc).timestamp()))
+
+    def test_migration_backfills_existing_rows(self):
+        self._insert("pre-existing row", topic_id="racing", created_ts=1000)
+        self.conn.execute("DELETE FROM topic_stats")
+        self.conn.commit()
+
+        importlib.import_module("migrations.0029_topic_stats").upgrade(self.conn)
+
+        self.assertEqual(self._stats(), self._expected())
+
+
+if __name__ == "__main__":
+    unittest.main()
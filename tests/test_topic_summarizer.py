@@ -0,0 +1,174 @@
+from __future__ import annotations
+
+import asyncio
+import json
+import os
+import sqlite3
+import time
+import unittest
+from types import SimpleNamespace
+
+from db.migrate import apply_sqlite_migrations
+from eval.memory_recall_baseline import _parse_recall_scope
+from jobs.service import chunk_by_token_budget
+from jobs.service import estimate_tokens
+from jobs.service import summarize_topic
+from jobs.service import summary_memo_stats
+from memory.store import fetch_topic_events_sync
+from memory.store import get_topic_summary_sync
+from memory.store import insert_memory_event_sync
+from memory.store import mark_events_summarized_sync
+from memory.store import upsert_summary_sync
+
+
+def _safe_json_loads(raw: str | None):
+    return json.loads(raw or "[]")
+
+
+class _CountingCompletions:
+    def __init__(self):
+        self.calls: list[str] = []
+        self.in_flight = 0
+        self.max_in_flight = 0
+
+    async def create(self, *, model, messages, **kwargs):
+        self.in_flight += 1
+        self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        try:
+            await asyncio.sleep(0.01)
+            system = messages[0]["content"]
+            self.calls.append("map" if "slice" in system else "final")
+            text = f"- note {len(self.calls)}"
+            return SimpleNamespace(choices=[SimpleNamespace(message=SimpleNamespace(content=text))])
+        finally:
+            self.in_flight -= 1
+
+
+class ChunkingTests(unittest.TestCase):
+    def test_chunks_respect_budget_and_order(self):
+        lines = [f"line {i} " + "x" * 40 for i in range(20)]
+        chunks = chunk_by_token_budget(lines, 40)
+        self.assertEqual([line for chunk in chunks for line in chunk], lines)
+        for chunk in chunks:
+            self.assertLessEqual(sum(estimate_tokens(line) for line in chunk), 40)
+
+    def test_oversized_line_gets_its_own_chunk(self):
+        chunks = chunk_by_token_budget(["a" * 400, "b", "c"], 20)
+        self.assertEqual(chunks, [["a" * 400], ["b", "c"]])
+
+
+class SummarizeTopicTests(unittest.TestCase):
+    def setUp(self):
+        self.conn = sqlite3.connect(":memory:", check_same_thread=False)
+        apply_sqlite_migrations(self.conn, os.path.join(os.getcwd(), "migrations"))
+        self.client = SimpleNamespace(chat=SimpleNamespace(completions=_CountingCompletions()))
+
+    def tearDown(self):
+        self.conn.close()
+
+    def _insert(self, n: int) -> list[int]:
+        ids = []
+        for i in range(n):
+            payload = {
+                "created_at_utc": "2026-01-01T00:00:00+00:00",
+                "created_ts": int(time.time()) - 30 * 86400 + i,
+                "scope": "global",
+                "text": f"decision {i}: the pit crew rotates tyres before qualifying " + "detail " * 10,
+                "tags_json": json.dumps(["ops"]),
+                "importance": 1,
+                "topic_id": "ops",
+            }
+            ids.append(insert_memory_event_sync(self.conn, payload, safe_json_loads=_safe_json_loads))
+        return ids
+
+    def _summarize(self, **kwargs) -> str:
+        return asyncio.run(
+            summarize_topic(
+                "ops",
+                scope="global",
+                stage_at_least=lambda _stage: True,
+                db_lock=asyncio.Lock(),
+                db_conn=self.conn,
+                get_topic_summary_sync=lambda conn, topic, scope, summary_type: get_topic_summary_sync(
+                    conn,
+                    topic,
+                    scope,
+                    summary_type,
+                    parse_recall_scope=_parse_recall_scope,
+                    safe_json_loads=_safe_json_loads,
+                ),
+                fetch_topic_events_sync=lambda conn, topic, scope, min_age_days, max_events: fetch_topic_events_sync(
+                    conn,
+                    topic,
+                    scope,
+                    min_age_days,
+                    max_events,
+                    parse_recall_scope=_parse_recall_scope,
+                    safe_json_loads=_safe_json_loads,
+                ),
+                client=self.client,
+                openai_model="test-model",
+                normalize_tags=lambda tags: list(tags),
+                utc_iso=lambda: "2026-10-17T00:00:00+00:00",
+                safe_json_dumps=json.dumps,
+                upsert_summary_sync=lambda conn, payload: upsert_summary_sync(
+                    conn, payload, safe_json_loads=_safe_json_loads
+                ),
+                mark_events_summarized_sync=mark_events_summarized_sync,
+                **kwargs,
+            )
+        )
+
+    def _covers(self) -> list[int]:
+        row = self.conn.execute("SELECT covers_event_ids_json FROM memory_summaries WHERE topic_id = 'ops'").fetchone()
+        return json.loads(row[0])
+
+    def test_large_topic_is_mapped_concurrently_then_reduced(self):
+        ids = self._insert(40)
+        text = self._summarize(chunk_token_budget=300)
+
+        calls = self.client.chat.completions.calls
+        self.assertEqual(calls[-1], "final")
+        self.assertGreater(calls.count("map"), 2)
+        self.assertGreater(self.client.chat.completions.max_in_flight, 1)
+        self.assertEqual(text, f"- note {len(calls)}")
+        self.assertEqual(self._covers(), ids)
+        unsummarized = self.conn.execute("SELECT COUNT(*) FROM memory_events WHERE summarized = 0").fetchone()[0]
+        self.assertEqual(unsummarized, 0)
+
+    def test_small_topic_uses_single_call_and_covers_accumulate(self):
+        first = self._insert(3)
+        self._summarize()
+        self.assertEqual(self.client.chat.completions.calls, ["final"])
+
+        second = self._insert(2)
+        self._summarize()
+        self.assertEqual(self._covers(), sorted(first + second))
+
+    def test_unchanged_inputs_skip_the_llm(self):
+        ids = self._insert(3)
+        self._summarize()
+        row = self.conn.execute("SELECT generated_by_model, prompt_hash FROM memory_summaries").fetchone()
+        self.assertEqual(row[0], "test-model")
+        self.assertEqual(len(row[1]), 64)
+
+        # A run interrupted after the upsert leaves its events unsummarized.
+        self.conn.execute("UPDATE memory_events SET summarized = 0")
+        self.conn.commit()
+        before = summary_memo_stats()
+        text = self._summarize()
+        self.assertEqual(text, "- note 1")
+        self.assertEqual(self.client.chat.completions.calls, ["final"])
+        self.assertEqual(summary_memo_stats()["memo_hits"], before["memo_hits"] + 1)
+        unsummarized = self.conn.execute("SELECT COUNT(*) FROM memory_events WHERE summarized = 0").fetchone()[0]
+        self.assertEqual(unsummarized, 0)
+
+        # Changed event text (or model) is a miss.
+        self.conn.execute("UPDATE memory_events SET summarized = 0, text = 'revised' WHERE id = ?", (ids[0],))
+        self.conn.commit()
+        self._summarize()
+        self.assertEqual(self.client.chat.completions.calls, ["final", "final"])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,137 @@
+from __future__ import annotations
+
+import json
+import os
+import sqlite3
+import time
+import unittest
+
+from db.migrate import apply_sqlite_migrations
+from memory.store import insert_memory_event_sync
+from memory.store import search_memory_events_sync
+from memory.store import search_memory_summaries_sync
+from memory.store import upsert_summary_sync
+from retrieval.fts_query import build_fts_query
+from retrieval.vector_index import HashedVectorIndex
+from retrieval.vector_index import backfill_vectors_sync
+from retrieval.vector_index import reciprocal_rank_fusion
+from retrieval.vector_index import sparse_vector
+
+_DEPLOYED = "We deployed the scheduler to the production servers on Friday"
+_UNRELATED = "Pit crew rotation posted for the endurance race"
+
+
+def _safe_json_loads(raw: str | None):
+    return json.loads(raw or "[]")
+
+
+def _cosine(a: dict[int, float], b: dict[int, float]) -> float:
+    return sum(v * b.get(i, 0.0) for i, v in a.items())
+
+
+def _payload(text: str, *, scope: str = "channel:100") -> dict:
+    return {
+        "created_at_utc": "2026-10-17T00:00:00+00:00",
+        "created_ts": int(time.time()) - 3600,
+        "scope": scope,
+        "channel_id": int(scope.split(":", 1)[1]) if scope.startswith("channel:") else None,
+        "text": text,
+        "tags_json": "[]",
+        "importance": 0.5,
+    }
+
+
+class HashedVectorTests(unittest.TestCase):
+    def test_inflected_paraphrase_is_closer_than_unrelated_text(self):
+        query = sparse_vector("deploying schedulers to servers")
+        self.assertGreater(_cosine(query, sparse_vector(_DEPLOYED)), 0.3)
+        self.assertLess(_cosine(query, sparse_vector(_UNRELATED)), 0.1)
+        self.assertEqual(sparse_vector("the and of"), {})
+
+    def test_reciprocal_rank_fusion_rewards_agreement(self):
+        self.assertEqual(reciprocal_rank_fusion([[1, 2, 3], [3, 4, 1]], k=60), [1, 3, 2, 4])
+        self.assertEqual(reciprocal_rank_fusion([[], [5, 6]]), [5, 6])
+
+
+class VectorRecallStoreTests(unittest.TestCase):
+    def setUp(self):
+        self.conn = sqlite3.connect(":memory:", check_same_thread=False)
+        apply_sqlite_migrations(self.conn, os.path.join(os.getcwd(), "migrations"))
+        self.index = HashedVectorIndex(table="memory_event_vectors")
+
+    def tearDown(self):
+        self.conn.close()
+
+    def _insert(self, text: str, **kwargs) -> int:
+        return insert_memory_event_sync(self.conn, _payload(text, **kwargs), safe_json_loads=_safe_json_loads)
+
+    def _search(self, query: str, scope: str = "channel:100", vector: bool = True) -> list[int]:
+        rows = search_memory_events_sync(
+            self.conn,
+            query,
+            scope,
+            5,
+            build_fts_query=build_fts_query,
+            parse_recall_scope=lambda s: ("auto", None, int(s.split(":", 1)[1]) if s.startswith("channel:") else None),
+            stage_at_least=lambda _stage: True,
+            safe_json_loads=_safe_json_loads,
+            vector_search=self.index.searcher() if vector else None,
+        )
+        return [r["id"] for r in rows]
+
+    def test_hybrid_search_finds_paraphrase_fts_misses_and_keeps_filters(self):
+        target = self._insert(_DEPLOYED)
+        self._insert(_UNRELATED)
+        other_scope = self._insert(_DEPLOYED, scope="channel:200")
+
+        self.assertEqual(self._search("deploying schedulers", vector=False), [])
+        self.assertEqual(self._search("deploying schedulers"), [target])
+
+        self.conn.execute("UPDATE memory_events SET lifecycle = 'deprecated' WHERE id = ?", (target,))
+        self.conn.commit()
+        self.assertEqual(self._search("deploying schedulers"), [])
+        self.assertEqual(self._search("deploying schedulers", scope="channel:200"), [other_scope])
+
+    def test_index_picks_up_inserts_incrementally(self):
+        self._insert(_UNRELATED)
+        self.assertEqual(self.index.refresh(self.conn), 1)
+        self.assertEqual(self.index.refresh(self.conn), 0)
+
+        target = self._insert(_DEPLOYED)
+        self.assertEqual(self.index.search(self.conn, "deploying schedulers", 3)[0][0], target)
+        self.assertEqual(self.index.stats()["rows"], 2)
+
+    def test_summary_vectors_follow_upserts_and_backfill(self):
+        payload = {
+            "topic_id": "ops",
+            "scope": "channel:100",
+            "created_at_utc": "2026-10-17T00:00:00+00:00",
+            "updated_at_utc": "2026-10-17T00:00:00+00:00",
+            "summary_text": _UNRELATED,
+        }
+        sid = upsert_summary_sync(self.conn, payload, safe_json_loads=_safe_json_loads)
+        upsert_summary_sync(self.conn, {**payload, "summary_text": _DEPLOYED}, safe_json_loads=_safe_json_loads)
+        self.conn.execute("DELETE FROM memory_summary_vectors")
+        self.conn.commit()
+        self.assertEqual(
+            backfill_vectors_sync(
+                self.conn, table="memory_summary_vectors", source_table="memory_summaries", text_column="summary_text"
+            ),
+            1,
+        )
+
+        index = HashedVectorIndex(table="memory_summary_vectors")
+        rows = search_memory_summaries_sync(
+            self.conn,
+            "deploying schedulers",
+            "channel:100",
+            build_fts_query=build_fts_query,
+            parse_recall_scope=lambda _s: ("auto", None, 100),
+            safe_json_loads=_safe_json_loads,
+            vector_search=index.searcher(),
+        )
+        self.assertEqual([r["id"] for r in rows], [sid])
+
+
+if __name__ == "__main__":
+    unittest.main()